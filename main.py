@@ -9,6 +9,7 @@ DocMind - ローカルAI搭載ドキュメント検索アプリケーション
 """
 
 import logging
+import multiprocessing
 from pathlib import Path
 import sys
 
@@ -311,4 +312,6 @@ def _show_critical_error_dialog(title: str, message: str, app: QApplication = No
 
 
 if __name__ == "__main__":
+    # PyInstallerでビルドした実行ファイルで並列インデックス構築のワーカープロセスを起動するために必要
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+検索の協調的キャンセルモジュール
+
+実行中の検索を外部から中断するためのトークンと、Whooshの照合ループの中で
+トークンを確認するコレクターを提供します。キャンセルされた検索は
+SearchCancelledErrorで中断され、途中までの結果は使用しません。
+
+検索の時間予算(SearchDeadline)を超えた場合は中断せず、それまでに集めた
+結果を打ち切られた結果として返します。
+"""
+
+import threading
+import time
+from typing import Any
+
+from whoosh.collectors import Collector, FilterCollector, TimeLimit, TimeLimitCollector, WrappingCollector
+from whoosh.searching import Searcher
+
+from ..utils.exceptions import SearchCancelledError
+
+
+class CancellationToken:
+    """
+    検索のキャンセル要求を伝えるトークン
+
+    要求側(GUIスレッドなど)がcancel()を呼び、検索側が照合ループなどの
+    区切りでcancelledを確認して処理を打ち切ります。
+    """
+
+    def __init__(self):
+        """CancellationTokenの初期化"""
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """キャンセルを要求"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """キャンセルが要求されている場合True"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        キャンセルが要求されていれば例外を発生させる
+
+        Raises:
+            SearchCancelledError: キャンセルが要求されている場合
+        """
+        if self._event.is_set():
+            raise SearchCancelledError("検索がキャンセルされました")
+
+
+class SearchDeadline:
+    """
+    検索の時間予算(締め切り)
+
+    検索の各段階が残り時間を確認し、時間切れの段階はそこまでの結果で打ち切ります。
+    打ち切った段階を記録するため、呼び出し側は結果が不完全かどうかを判断できます。
+    """
+
+    # 残り時間が予算のこの割合を下回ったら、スニペットの作成など省略できる処理を省く
+    SHORT_FRACTION = 0.2
+
+    def __init__(self, timeout: float):
+        """
+        SearchDeadlineの初期化
+
+        Args:
+            timeout (float): 時間予算(秒)
+        """
+        self.timeout = timeout
+        self._expires_at = time.monotonic() + timeout
+        self._lock = threading.Lock()
+        self._truncated_stages: list[str] = []
+
+    def remaining(self) -> float:
+        """
+        残り時間を取得
+
+        Returns:
+            float: 残り時間(秒)。時間切れの場合は0
+        """
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """時間切れの場合True"""
+        return time.monotonic() >= self._expires_at
+
+    @property
+    def short(self) -> bool:
+        """残り時間が少ない場合True"""
+        return self.remaining() < self.timeout * self.SHORT_FRACTION
+
+    def mark_truncated(self, stage: str) -> None:
+        """
+        時間切れで結果を打ち切った段階を記録
+
+        Args:
+            stage (str): 検索の段階(「全文検索」など)
+        """
+        with self._lock:
+            if stage not in self._truncated_stages:
+                self._truncated_stages.append(stage)
+
+    @property
+    def truncated(self) -> bool:
+        """いずれかの段階で結果を打ち切った場合True"""
+        with self._lock:
+            return bool(self._truncated_stages)
+
+    @property
+    def truncated_stages(self) -> list[str]:
+        """結果を打ち切った段階の一覧"""
+        with self._lock:
+            return list(self._truncated_stages)
+
+
+class DeadlineCollector(TimeLimitCollector):
+    """
+    時間予算を超えたら照合を打ち切るコレクター
+
+    TimeLimitCollectorはcollect_matches()でしか時間切れを確認しないため、
+    FilterCollectorの内側(フィルターの適用時はmatches()が直接呼ばれる)でも
+    打ち切れるよう、matches()でも確認します。ワーカースレッドで使うため、
+    SIGALRMによる割り込みは使用しません。
+    """
+
+    def __init__(self, child: Collector, timelimit: float):
+        """
+        DeadlineCollectorの初期化
+
+        Args:
+            child (Collector): ラップするコレクター
+            timelimit (float): 照合に使える時間(秒)
+        """
+        super().__init__(child, timelimit, use_alarm=False)
+
+    def prepare(self, top_searcher, q, context):
+        super().prepare(top_searcher, q, context)
+        # 予算を使い切っている場合はタイマーを待たずに打ち切る
+        if self.timelimit <= 0:
+            self.timedout = True
+
+    def matches(self):
+        for sub_docnum in self.child.matches():
+            if self.timedout:
+                raise TimeLimit
+            yield sub_docnum
+
+
+class CancellableCollector(WrappingCollector):
+    """
+    一致したドキュメントごとにキャンセルを確認するコレクター
+
+    子コレクターのmatches()をそのまま使うため、上位k件収集のブロック品質による
+    読み飛ばしは維持されます。FilterCollectorの内側に置き、フィルターで除かれる
+    ドキュメントの照合中もキャンセルを確認します。
+    """
+
+    def __init__(self, child: Collector, token: CancellationToken):
+        """
+        CancellableCollectorの初期化
+
+        Args:
+            child (Collector): ラップするコレクター
+            token (CancellationToken): キャンセルを確認するトークン
+        """
+        self.child = child
+        self.token = token
+
+    def prepare(self, top_searcher, q, context):
+        self.token.raise_if_cancelled()
+        self.child.prepare(top_searcher, q, context)
+
+    def set_subsearcher(self, subsearcher, offset):
+        self.token.raise_if_cancelled()
+        super().set_subsearcher(subsearcher, offset)
+
+    def matches(self):
+        token = self.token
+        for sub_docnum in self.child.matches():
+            if token.cancelled:
+                raise SearchCancelledError("検索がキャンセルされました")
+            yield sub_docnum
+
+
+def search_cancellable(
+    searcher: Searcher,
+    query,
+    token: CancellationToken | None,
+    deadline: SearchDeadline | None = None,
+    stage: str = "全文検索",
+    **kwargs: Any,
+):
+    """
+    キャンセル可能な検索を実行(トークンも時間予算もなければ通常の検索)
+
+    時間予算を超えた場合は、それまでに集めた結果を返し、打ち切った段階を記録します。
+
+    Args:
+        searcher (Searcher): 検索に使用するサーチャー
+        query: 検索クエリ
+        token (CancellationToken | None): キャンセルを確認するトークン
+        deadline (SearchDeadline | None): 検索の時間予算
+        stage (str): 時間切れの場合に記録する検索の段階
+        **kwargs: Searcher.searchと同じ引数(limit、filter、mask、sortedbyなど)
+
+    Returns:
+        Results: 検索結果(時間切れの場合は途中までの結果)
+
+    Raises:
+        SearchCancelledError: 検索中にキャンセルが要求された場合
+    """
+    if token is None and deadline is None:
+        return searcher.search(query, **kwargs)
+
+    collector = searcher.collector(**kwargs)
+    # フィルターを適用するFilterCollectorの内側に置き、フィルターで除かれるドキュメントの照合中も確認する
+    outer = collector if isinstance(collector, FilterCollector) else None
+    inner = outer.child if outer is not None else collector
+    if token is not None:
+        inner = CancellableCollector(inner, token)
+    if deadline is not None:
+        inner = DeadlineCollector(inner, deadline.remaining())
+    if outer is not None:
+        outer.child = inner
+    else:
+        collector = inner
+
+    try:
+        searcher.search_with_collector(query, collector)
+    except TimeLimit:
+        deadline.mark_truncated(stage)
+    return collector.results()
@@ -0,0 +1,154 @@
+"""
+CJK対応アナライザーモジュール
+
+日本語(かな・漢字)の連続部分は文字バイグラムに、英数字の部分は通常の単語トークンに
+分割するWhoosh用のトークナイザーとアナライザーを提供します。
+コンテンツを一度だけインデックス化すれば部分一致検索ができるようにするためのものです。
+"""
+
+import re
+import unicodedata
+
+from whoosh.analysis import Filter, LowercaseFilter, Token, Tokenizer
+
+# CJK文字(ひらがな、カタカナ、CJK統合漢字、半角カナ、ハングル)の文字クラス
+CJK_CHAR_CLASS = (
+    "\u3005-\u3007"  # 々〆〇
+    "\u3040-\u309f"  # ひらがな
+    "\u30a0-\u30ff"  # カタカナ(長音記号を含む)
+    "\u3400-\u4dbf"  # CJK統合漢字拡張A
+    "\u4e00-\u9fff"  # CJK統合漢字
+    "\uf900-\ufaff"  # CJK互換漢字
+    "\uff66-\uff9f"  # 半角カタカナ
+    "\uac00-\ud7af"  # ハングル音節
+)
+
+# CJKの連続部分、またはCJK以外の単語(StandardAnalyzerと同じ「ドット区切り」を許容)
+_TOKEN_PATTERN = re.compile(
+    rf"(?P<cjk>[{CJK_CHAR_CLASS}]+)"
+    rf"|(?P<word>[^\W{CJK_CHAR_CLASS}]+(?:\.?[^\W{CJK_CHAR_CLASS}]+)*)"
+)
+
+
+class CJKBigramTokenizer(Tokenizer):
+    """
+    CJKバイグラムトークナイザー
+
+    かな・漢字の連続部分からは重なりのある2文字のトークンを、
+    それ以外の英数字からは単語トークンを生成します。
+    1文字だけのCJK部分はそのまま1文字のトークンとして出力します。
+    位置情報はトークン順に連番で振られるため、クエリ側のバイグラムを
+    フレーズクエリとして照合できます。
+    """
+
+    def __call__(
+        self,
+        value,
+        *,
+        positions=False,
+        chars=False,
+        keeporiginal=False,
+        removestops=True,
+        start_pos=0,
+        start_char=0,
+        tokenize=True,
+        mode="",
+        **kwargs,
+    ):
+        """
+        テキストをトークンに分割
+
+        Args:
+            value: 分割するテキスト
+            positions: 位置情報を付与するかどうか
+            chars: 文字オフセットを付与するかどうか
+            keeporiginal: 元のテキストを保持するかどうか
+            removestops: ストップワードを除去するかどうか
+            start_pos: 位置情報の開始値
+            start_char: 文字オフセットの開始値
+            tokenize: Falseの場合はテキスト全体を1トークンとして出力
+            mode: 解析モード("index" または "query")
+
+        Yields:
+            Token: 生成されたトークン
+        """
+        token = Token(positions, chars, removestops=removestops, mode=mode, **kwargs)
+
+        if not tokenize:
+            token.original = token.text = value
+            token.boost = 1.0
+            if positions:
+                token.pos = start_pos
+            if chars:
+                token.startchar = start_char
+                token.endchar = start_char + len(value)
+            yield token
+            return
+
+        pos = start_pos
+        for match in _TOKEN_PATTERN.finditer(value):
+            run = match.group()
+            run_start = match.start()
+
+            if match.lastgroup == "cjk" and len(run) > 1:
+                # 連続するCJK文字は重なりのあるバイグラムに分割
+                spans = [(i, i + 2) for i in range(len(run) - 1)]
+            else:
+                spans = [(0, len(run))]
+
+            for start, end in spans:
+                token.text = run[start:end]
+                token.boost = 1.0
+                token.stopped = False
+                if keeporiginal:
+                    token.original = token.text
+                if positions:
+                    token.pos = pos
+                    pos += 1
+                if chars:
+                    token.startchar = start_char + run_start + start
+                    token.endchar = start_char + run_start + end
+                yield token
+
+
+class NFKCFilter(Filter):
+    """
+    トークンをNFKC正規化するフィルター
+
+    全角英数字・記号と半角カナの表記を揃えます。トークン単位で正規化するため、
+    文字オフセットは元のテキストの位置のままです。
+    """
+
+    def __call__(self, tokens):
+        for token in tokens:
+            token.text = unicodedata.normalize("NFKC", token.text)
+            yield token
+
+
+def CJKBigramAnalyzer():  # noqa: N802
+    """
+    CJKバイグラムアナライザーを作成
+
+    CJKBigramTokenizerにNFKC正規化と小文字化のフィルターを組み合わせたアナライザーです。
+    StandardAnalyzerと同様に関数として提供します。
+
+    Returns:
+        CompositeAnalyzer: 作成されたアナライザー
+    """
+    return CJKBigramTokenizer() | NFKCFilter() | LowercaseFilter()
+
+
+def normalizes_width(analyzer) -> bool:
+    """
+    アナライザーがNFKC正規化を行うかどうかを判定
+
+    インデックスに保存されたスキーマのアナライザーは作成時のものが使われるため、
+    NFKCFilterを追加する前に作成したインデックスを見分けるのに使います。
+
+    Args:
+        analyzer: 判定するアナライザー
+
+    Returns:
+        bool: NFKCFilterを含む場合True
+    """
+    return any(isinstance(item, NFKCFilter) for item in getattr(analyzer, "items", ()))
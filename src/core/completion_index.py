@@ -0,0 +1,227 @@
+"""
+検索語の補完用インデックスモジュール
+
+インデックスの語彙からソート済み・重複なしの語の配列と出現ドキュメント数の重みを作り、
+前方一致する範囲を二分探索で求めて重みの大きい順に補完候補を返します。
+配列はセグメント単位で保持し、コミットで追加されたセグメントだけを読み足します。
+"""
+
+from bisect import bisect_left
+from collections import Counter
+import logging
+import os
+from pathlib import Path
+import pickle
+import re
+import threading
+
+import numpy as np
+from whoosh.reading import IndexReader
+
+from .cjk_analyzer import CJK_CHAR_CLASS
+
+# 補完候補にする語彙の語(CJKを含まない2文字以上の語。数字だけの語は除く)
+_LEXICON_WORD = re.compile(rf"(?!\d+$)[^\W_{CJK_CHAR_CLASS}][^{CJK_CHAR_CLASS}]{{1,39}}")
+
+# タイトルから補完候補にするCJKの連続部分(2文字以上)
+_CJK_RUN = re.compile(rf"[{CJK_CHAR_CLASS}]{{2,40}}")
+
+# 前方一致の範囲の終端に使う文字
+_MAX_CHAR = "\U0010ffff"
+
+
+class CompletionIndex:
+    """
+    セグメント単位のソート済み語配列による補完インデックス
+
+    語彙の語はタイトルとコンテンツの出現ドキュメント数を重みにします。
+    CJKの文章はバイグラムで索引化されており語彙から語を復元できないため、
+    タイトルの列に含まれるCJKの連続部分を、それを含むタイトルの数を重みにして加えます。
+    """
+
+    # 語彙を取り込むフィールド
+    FIELDS = ("title", "content")
+    # 保存形式のバージョン
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: str | Path | None = None):
+        """
+        CompletionIndexの初期化
+
+        Args:
+            path (str | Path, optional): 保存先(省略時は保存しない)
+        """
+        self.path = Path(path) if path else None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        # セグメントID -> (ソート済みの語, 重み)
+        self._segments: dict[str, tuple[list[str], np.ndarray]] = {}
+        self._dirty = False
+
+    def load(self) -> bool:
+        """
+        保存されている補完インデックスを読み込む
+
+        Returns:
+            bool: 読み込めた場合True
+        """
+        if self.path is None or not self.path.exists():
+            return False
+
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") != self.FORMAT_VERSION:
+                return False
+        except Exception as e:
+            self.logger.warning(f"補完インデックスを読み込めませんでした: {e}")
+            return False
+
+        with self._lock:
+            self._segments = {
+                segment_id: (terms, np.frombuffer(weights, dtype=np.uint32))
+                for segment_id, (terms, weights) in data["segments"].items()
+            }
+            self._dirty = False
+        return True
+
+    def save(self) -> None:
+        """変更があれば補完インデックスを保存(一時ファイルに書いてから置き換える)"""
+        if self.path is None:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": self.FORMAT_VERSION,
+                "segments": {
+                    segment_id: (terms, weights.tobytes()) for segment_id, (terms, weights) in self._segments.items()
+                },
+            }
+            temp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(temp_path, "wb") as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self.path)
+                self._dirty = False
+            except Exception as e:
+                self.logger.warning(f"補完インデックスを保存できませんでした: {e}")
+
+    def sync(self, reader: IndexReader) -> int:
+        """
+        現在のセグメント構成に合わせて、新しいセグメントを読み込み、消えたセグメントを捨てる
+
+        Args:
+            reader (IndexReader): ディスクのインデックスのリーダー
+
+        Returns:
+            int: 新しく読み込んだセグメントの数
+        """
+        added = 0
+        with self._lock:
+            live: set[str] = set()
+            for leaf, _ in reader.leaf_readers():
+                segment = getattr(leaf, "segment", None)
+                if segment is None:
+                    continue
+                segment_id = segment().segid
+                live.add(segment_id)
+                if segment_id not in self._segments:
+                    self._segments[segment_id] = self._read_segment(leaf)
+                    added += 1
+
+            removed = self._segments.keys() - live
+            for segment_id in removed:
+                del self._segments[segment_id]
+            if added or removed:
+                self._dirty = True
+
+        if added or removed:
+            self.logger.debug(f"補完インデックスを更新しました: 追加={added}, 削除={len(removed)}セグメント")
+        return added
+
+    def complete(self, prefix: str, limit: int = 10) -> list[tuple[str, int]]:
+        """
+        前方一致する語を重みの大きい順に取得
+
+        セグメントごとに前方一致の範囲を二分探索で求め、範囲内の上位を集めてから
+        候補の重みを全セグメントで合計し直します。
+
+        Args:
+            prefix (str): 小文字化済みの入力途中の語
+            limit (int): 最大件数
+
+        Returns:
+            List[Tuple[str, int]]: 語と重み
+        """
+        if not prefix or limit < 1:
+            return []
+
+        with self._lock:
+            parts = list(self._segments.values())
+
+        candidates: set[str] = set()
+        for terms, weights in parts:
+            start = bisect_left(terms, prefix)
+            end = bisect_left(terms, prefix + _MAX_CHAR, start)
+            if end - start <= limit:
+                candidates.update(terms[start:end])
+                continue
+            top = np.argpartition(weights[start:end], -limit)[-limit:]
+            candidates.update(terms[start + int(offset)] for offset in top)
+
+        totals = {term: self._weight(parts, term) for term in candidates if term != prefix}
+        return sorted(totals.items(), key=lambda item: (-item[1], len(item[0]), item[0]))[:limit]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(terms) for terms, _ in self._segments.values())
+
+    @staticmethod
+    def _weight(parts: list[tuple[list[str], np.ndarray]], term: str) -> int:
+        """
+        語の重みを全セグメントで合計
+
+        Args:
+            parts: セグメントごとのソート済みの語と重み
+            term (str): 対象の語
+
+        Returns:
+            int: 重みの合計
+        """
+        total = 0
+        for terms, weights in parts:
+            index = bisect_left(terms, term)
+            if index < len(terms) and terms[index] == term:
+                total += int(weights[index])
+        return total
+
+    def _read_segment(self, leaf: IndexReader) -> tuple[list[str], np.ndarray]:
+        """
+        1つのセグメントの語彙とタイトルから補完候補を作成
+
+        Args:
+            leaf (IndexReader): セグメントのリーダー
+
+        Returns:
+            Tuple[List[str], np.ndarray]: ソート済みの語と重み
+        """
+        counts: Counter[str] = Counter()
+        for fieldname in self.FIELDS:
+            if fieldname not in leaf.schema:
+                continue
+            for btext, terminfo in leaf.iter_field(fieldname):
+                text = btext.decode("utf-8")
+                if _LEXICON_WORD.fullmatch(text):
+                    counts[text] = max(counts[text], terminfo.doc_frequency())
+
+        # 列のない旧形式のインデックスでは、保存フィールド全体を読まないようCJKの語は加えない
+        if leaf.has_column("title"):
+            titles = leaf.column_reader("title")
+            for docnum in leaf.all_doc_ids():
+                counts.update({run.lower() for run in _CJK_RUN.findall(titles[docnum])})
+
+        terms = sorted(counts)
+        weights = np.fromiter((counts[term] for term in terms), dtype=np.uint32, count=len(terms))
+        return terms, weights
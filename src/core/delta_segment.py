@@ -0,0 +1,195 @@
+"""
+インメモリのデルタセグメントモジュール
+
+ファイル監視からの追加・更新・削除をメモリ上のWhooshインデックスにためて
+すぐに検索できるようにし、ディスクのインデックスへはまとめて反映します。
+反映前の変更は先行書き込みログ(WAL)に記録し、異常終了しても失われないようにします。
+"""
+
+from collections.abc import Callable
+import logging
+import os
+from pathlib import Path
+import pickle
+import threading
+from typing import Any
+
+from whoosh.fields import Schema
+from whoosh.filedb.filestore import RamStorage
+from whoosh.index import Index
+from whoosh.reading import IndexReader
+
+from ..data.models import Document
+from ..utils.exceptions import IndexingError
+
+
+class DeltaSegment:
+    """
+    ディスクのインデックスに未反映の変更を保持するデルタセグメント
+
+    ドキュメントIDごとに最新の状態(Document、削除の場合はNone)を保持し、
+    追加・更新されたドキュメントはメモリ上のインデックスにも書き込みます。
+    保持しているIDはディスクのインデックス上の同じIDを隠します(トゥームストーン)。
+    """
+
+    def __init__(self, schema: Schema, wal_path: str | Path):
+        """
+        DeltaSegmentの初期化
+
+        Args:
+            schema (Schema): ディスクのインデックスと同じスキーマ
+            wal_path (str | Path): 先行書き込みログのパス
+        """
+        self.schema = schema
+        self.wal_path = Path(wal_path)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._pending: dict[str, Document | None] = {}
+        self._ram_index: Index = RamStorage().create_index(schema)
+        # 変更のたびに増える世代(フィルターキャッシュのキーに使用)
+        self.generation = 0
+
+    def upsert(self, doc: Document, doc_fields: dict[str, Any]) -> None:
+        """
+        ドキュメントを追加または更新
+
+        Args:
+            doc (Document): 追加・更新するドキュメント
+            doc_fields (Dict[str, Any]): インデックスに書き込むフィールド値
+        """
+        with self._lock:
+            self._append_wal("upsert", doc.id, doc)
+            writer = self._ram_index.writer()
+            writer.update_document(**doc_fields)
+            writer.commit()
+            self._pending[doc.id] = doc
+            self.generation += 1
+
+    def delete(self, doc_id: str) -> None:
+        """
+        ドキュメントを削除
+
+        Args:
+            doc_id (str): 削除するドキュメントのID
+        """
+        with self._lock:
+            self._append_wal("delete", doc_id, None)
+            if self._pending.get(doc_id) is not None:
+                writer = self._ram_index.writer()
+                writer.delete_by_term("id", doc_id)
+                writer.commit()
+            self._pending[doc_id] = None
+            self.generation += 1
+
+    def flush(self, apply: Callable[[dict[str, Document | None]], None]) -> int:
+        """
+        未反映の変更を書き込み関数に渡し、成功したら変更とWALを破棄
+
+        書き込み中は新しい変更を受け付けません。書き込み後、WALの削除前に
+        異常終了した場合は次回起動時に同じ変更が再適用されます(冪等)。
+
+        Args:
+            apply: 変更(ドキュメントIDと最新の状態)をディスクのインデックスに書き込む関数
+
+        Returns:
+            int: 反映した変更の件数
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            changes = dict(self._pending)
+            apply(changes)
+            self.reset()
+            return len(changes)
+
+    def pending(self) -> dict[str, Document | None]:
+        """
+        未反映の変更を取得
+
+        Returns:
+            Dict[str, Document | None]: ドキュメントIDと最新の状態(削除の場合はNone)
+        """
+        with self._lock:
+            return dict(self._pending)
+
+    def get(self, doc_id: str) -> tuple[bool, Document | None]:
+        """
+        ドキュメントの未反映の状態を取得
+
+        Args:
+            doc_id (str): ドキュメントID
+
+        Returns:
+            Tuple[bool, Document | None]: 変更があるかどうかと、最新の状態(削除の場合はNone)
+        """
+        with self._lock:
+            return doc_id in self._pending, self._pending.get(doc_id)
+
+    def snapshot(self) -> tuple[IndexReader, set[str], int]:
+        """
+        検索用にメモリ上のインデックスと隠すIDを取得
+
+        Returns:
+            Tuple[IndexReader, Set[str], int]: メモリ上のリーダー、ディスク側で隠すID、世代
+        """
+        with self._lock:
+            return self._ram_index.reader(), set(self._pending), self.generation
+
+    def reset(self) -> None:
+        """ディスクへの反映後に変更とWALを破棄"""
+        with self._lock:
+            self._pending.clear()
+            self._ram_index = RamStorage().create_index(self.schema)
+            self.generation += 1
+            if self.wal_path.exists():
+                self.wal_path.unlink()
+
+    def replay(self) -> dict[str, Document | None]:
+        """
+        WALから未反映の変更を読み込む(異常終了からの復旧用)
+
+        途中で切れた末尾のレコードは無視します。
+
+        Returns:
+            Dict[str, Document | None]: ドキュメントIDと最新の状態(削除の場合はNone)
+        """
+        changes: dict[str, Document | None] = {}
+        if not self.wal_path.exists():
+            return changes
+
+        with open(self.wal_path, "rb") as f:
+            while True:
+                try:
+                    _, doc_id, doc = pickle.load(f)
+                except EOFError:
+                    break
+                except Exception as e:
+                    self.logger.warning(f"WALの末尾のレコードを読み込めませんでした: {e}")
+                    break
+                changes[doc_id] = doc
+
+        return changes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _append_wal(self, op: str, doc_id: str, doc: Document | None) -> None:
+        """
+        変更をWALに追記してディスクに同期
+
+        Args:
+            op (str): 操作("upsert" または "delete")
+            doc_id (str): ドキュメントID
+            doc (Document | None): 追加・更新するドキュメント
+        """
+        try:
+            self.wal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.wal_path, "ab") as f:
+                pickle.dump((op, doc_id, doc), f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            error_msg = f"WALへの書き込みに失敗しました: {doc_id} - {e}"
+            self.logger.error(error_msg)
+            raise IndexingError(error_msg) from e
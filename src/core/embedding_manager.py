@@ -5,10 +5,14 @@ EmbeddingManager - セマンティック検索用の埋め込み管理クラス
 コサイン類似度を使用したセマンティック検索機能を提供します。
 """
 
+from collections.abc import Collection
 from dataclasses import dataclass
+import hashlib
 import logging
 import os
 import pickle
+import threading
+import time
 from typing import Any
 
 import numpy as np
@@ -16,8 +20,11 @@ from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 
 from ..data.models import Document
+from ..utils.cache_manager import LRUCache
 from ..utils.config import Config
-from ..utils.exceptions import EmbeddingError
+from ..utils.exceptions import EmbeddingError, SearchCancelledError
+from ..utils.query_canonicalizer import CanonicalHitStats, normalize_query_text
+from .cancellation import CancellationToken, SearchDeadline
 
 
 @dataclass
@@ -38,6 +45,11 @@ class EmbeddingManager:
     コサイン類似度を使用したセマンティック検索を実行します。
     """
 
+    # 類似度をまとめて計算する埋め込みの件数(この単位でキャンセルと時間予算を確認する)
+    SCAN_CHUNK_SIZE = 512
+    # キャッシュするクエリの埋め込みの件数
+    QUERY_CACHE_SIZE = 256
+
     def __init__(self, model_name: str = "all-MiniLM-L6-v2", embeddings_path: str | None = None):
         """
         EmbeddingManagerを初期化
@@ -57,6 +69,18 @@ class EmbeddingManager:
         else:
             self.embeddings_path = embeddings_path
 
+        # 前回の保存以降の追加・削除を追記するジャーナル(保存時に圧縮して削除)
+        self.journal_path = self.embeddings_path + ".journal"
+        # 保存・ジャーナル追記と埋め込みの更新を排他するロック(保守処理は別スレッドで保存する)
+        self._lock = threading.RLock()
+        # 再構築中に行われた追加・削除(入れ替え後の埋め込みにも適用する)
+        self._rebuild_changes: dict[str, DocumentEmbedding | None] | None = None
+        # 埋め込みの追加・削除・読み込みのたびに進む世代(検索結果キャッシュの無効化に使う)
+        self.generation = 0
+        # 表記を揃えたクエリごとの埋め込み (埋め込み, 使われた正規化前のクエリ)
+        self._query_cache = LRUCache(max_size=self.QUERY_CACHE_SIZE)
+        self.query_cache_stats = CanonicalHitStats("クエリの埋め込み")
+
         # ログ設定
         self.logger = logging.getLogger(__name__)
 
@@ -117,6 +141,49 @@ class EmbeddingManager:
             self.logger.error(error_msg)
             raise EmbeddingError(error_msg) from e
 
+    def embed_query(self, query_text: str) -> np.ndarray:
+        """
+        検索クエリの埋め込みを取得(表記を揃えたクエリごとにキャッシュする)
+
+        全角・半角や空白だけが異なるクエリは同じ埋め込みを使います。
+
+        Args:
+            query_text: 検索クエリテキスト
+
+        Returns:
+            埋め込みベクトル(numpy配列)
+
+        Raises:
+            EmbeddingError: 埋め込み生成に失敗した場合
+        """
+        normalized = normalize_query_text(query_text)
+        cached = self._query_cache.get(normalized)
+        if cached is not None:
+            embedding, raw_forms = cached
+            self.query_cache_stats.record(True, query_text.strip(), raw_forms)
+            return embedding
+
+        self.query_cache_stats.record(False)
+        embedding = self.generate_embedding(normalized)
+        self._query_cache.put(normalized, (embedding, {query_text.strip()}))
+        return embedding
+
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        """
+        変更検出用のテキストハッシュを計算
+
+        組み込みのhash()はプロセスごとにランダム化されるため、保存した埋め込みと
+        比較できる安定したダイジェストを使用します。
+
+        Args:
+            text: ハッシュを計算するテキスト
+
+        Returns:
+            テキストのSHA-1ダイジェスト(16進文字列)
+        """
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
     def add_document_embedding(self, doc_id: str, text: str) -> None:
         """
         ドキュメントの埋め込みを生成してキャッシュに追加
@@ -127,7 +194,7 @@ class EmbeddingManager:
         """
         try:
             # テキストのハッシュを計算(変更検出用)
-            text_hash = str(hash(text))
+            text_hash = self._text_hash(text)
 
             # 既存の埋め込みがあり、テキストが変更されていない場合はスキップ
             if doc_id in self.embeddings:
@@ -144,14 +211,17 @@ class EmbeddingManager:
             embedding = self.generate_embedding(text)
 
             # キャッシュに保存
-            import time
-
-            self.embeddings[doc_id] = DocumentEmbedding(
-                doc_id=doc_id,
-                embedding=embedding,
-                text_hash=text_hash,
-                created_at=time.time(),
-            )
+            with self._lock:
+                self.embeddings[doc_id] = DocumentEmbedding(
+                    doc_id=doc_id,
+                    embedding=embedding,
+                    text_hash=text_hash,
+                    created_at=time.time(),
+                )
+                self.generation += 1
+                self._append_journal("add", doc_id, self.embeddings[doc_id])
+                if self._rebuild_changes is not None:
+                    self._rebuild_changes[doc_id] = self.embeddings[doc_id]
 
             self.logger.info(f"ドキュメント {doc_id} の埋め込みを生成しました")
 
@@ -167,21 +237,129 @@ class EmbeddingManager:
         Args:
             doc_id: 削除するドキュメントID
         """
-        if doc_id in self.embeddings:
+        with self._lock:
+            if doc_id not in self.embeddings:
+                return
             del self.embeddings[doc_id]
-            self.logger.info(f"ドキュメント {doc_id} の埋め込みを削除しました")
+            self.generation += 1
+            self._append_journal("remove", doc_id, None)
+            if self._rebuild_changes is not None:
+                self._rebuild_changes[doc_id] = None
+        self.logger.info(f"ドキュメント {doc_id} の埋め込みを削除しました")
+
+    def _append_journal(self, operation: str, doc_id: str, embedding: DocumentEmbedding | None) -> None:
+        """
+        埋め込みの変更をジャーナルに追記
+
+        ファイル全体を書き直さずに変更を永続化します。
+        追記に失敗しても次回のsave_embeddingsで保存されるため処理は継続します。
+
+        Args:
+            operation: 操作("add" または "remove")
+            doc_id: ドキュメントID
+            embedding: 追加された埋め込み(削除の場合はNone)
+        """
+        try:
+            with self._lock, open(self.journal_path, "ab") as f:
+                pickle.dump((operation, doc_id, embedding), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            self.logger.warning(f"埋め込みジャーナルへの追記に失敗しました: {e}")
 
-    def search_similar(self, query_text: str, limit: int = 100, min_similarity: float = 0.0) -> list[tuple[str, float]]:
+    def _replay_journal(self) -> int:
+        """
+        ジャーナルの変更を読み込み済みの埋め込みに適用
+
+        書き込み途中で終了した末尾のレコードは無視します。
+
+        Returns:
+            適用したレコード数
+        """
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        applied = 0
+        with open(self.journal_path, "rb") as f:
+            while True:
+                try:
+                    operation, doc_id, embedding = pickle.load(f)
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, TypeError) as e:
+                    self.logger.warning(f"埋め込みジャーナルの末尾が破損しているため読み込みを中断しました: {e}")
+                    break
+
+                if operation == "add":
+                    self.embeddings[doc_id] = embedding
+                else:
+                    self.embeddings.pop(doc_id, None)
+                applied += 1
+
+        return applied
+
+    def get_journal_size(self) -> int:
+        """
+        ジャーナルファイルのサイズを取得
+
+        Returns:
+            ジャーナルのバイト数(存在しない場合は0)
+        """
+        return os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+
+    def compact_journal(self, max_bytes: int | None = None, min_journal_bytes: int = 0) -> int:
+        """
+        ジャーナルを埋め込みファイルに統合して削除
+
+        埋め込みファイル全体を書き直すため、書き込み量がmax_bytesを超える場合は見送ります。
+
+        Args:
+            max_bytes: 書き込むバイト数の上限(Noneの場合は無制限)
+            min_journal_bytes: 統合を行うジャーナルの最小サイズ
+
+        Returns:
+            書き込んだバイト数(見送った場合は0)
+        """
+        journal_size = self.get_journal_size()
+        if journal_size == 0 or journal_size < min_journal_bytes:
+            return 0
+
+        snapshot_size = os.path.getsize(self.embeddings_path) if os.path.exists(self.embeddings_path) else 0
+        if max_bytes is not None and snapshot_size + journal_size > max_bytes:
+            self.logger.debug("書き込み量が上限を超えるため埋め込みジャーナルの統合を見送りました")
+            return 0
+
+        self.save_embeddings()
+        return os.path.getsize(self.embeddings_path)
+
+    def search_similar(
+        self,
+        query_text: str,
+        limit: int = 100,
+        min_similarity: float = 0.0,
+        *,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+        doc_ids: Collection[str] | None = None,
+    ) -> list[tuple[str, float]]:
         """
         クエリテキストに類似したドキュメントを検索
 
+        埋め込みはSCAN_CHUNK_SIZE件ずつまとめて類似度を計算し、その区切りで
+        キャンセルと時間予算を確認します。時間切れの場合は走査済みの範囲の結果を返します。
+        doc_idsを指定した場合は、そのドキュメントの埋め込みだけを走査します(直前の結果の絞り込み用)。
+
         Args:
             query_text: 検索クエリテキスト
             limit: 返す結果の最大数
             min_similarity: 最小類似度スコア(0.0-1.0)
+            cancel_token: 走査中に確認するキャンセル用トークン(オプション)
+            deadline: 検索の時間予算(オプション)
+            doc_ids: 走査の対象に限定するドキュメントID(オプション)
 
         Returns:
             (ドキュメントID, 類似度スコア)のタプルのリスト(類似度の降順)
+
+        Raises:
+            SearchCancelledError: 走査中にキャンセルが要求された場合
         """
         try:
             if not self.embeddings:
@@ -189,20 +367,33 @@ class EmbeddingManager:
                 return []
 
             # クエリの埋め込みを生成
-            query_embedding = self.generate_embedding(query_text)
+            query_embedding = self.embed_query(query_text)
 
-            # 各ドキュメントとの類似度を計算
+            # 各ドキュメントとの類似度をチャンク単位で計算
+            if doc_ids is None:
+                items = list(self.embeddings.items())
+            else:
+                items = [(doc_id, self.embeddings[doc_id]) for doc_id in doc_ids if doc_id in self.embeddings]
+            query_vector = query_embedding.reshape(1, -1)
             similarities = []
-            for doc_id, doc_embedding in self.embeddings.items():
-                # コサイン類似度を計算
-                similarity = cosine_similarity(
-                    query_embedding.reshape(1, -1),
-                    doc_embedding.embedding.reshape(1, -1),
-                )[0][0]
+            for start in range(0, len(items), self.SCAN_CHUNK_SIZE):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                if deadline is not None and deadline.expired:
+                    deadline.mark_truncated("セマンティック検索")
+                    self.logger.warning(f"時間予算を超えたため、類似度検索を{start}/{len(items)}件で打ち切りました")
+                    break
+
+                chunk = items[start : start + self.SCAN_CHUNK_SIZE]
+                matrix = np.vstack([doc_embedding.embedding.reshape(1, -1) for _, doc_embedding in chunk])
+                chunk_scores = cosine_similarity(query_vector, matrix)[0]
 
                 # 最小類似度を満たす場合のみ追加
-                if similarity >= min_similarity:
-                    similarities.append((doc_id, float(similarity)))
+                similarities.extend(
+                    (doc_id, float(similarity))
+                    for (doc_id, _), similarity in zip(chunk, chunk_scores, strict=True)
+                    if similarity >= min_similarity
+                )
 
             # 類似度の降順でソート
             similarities.sort(key=lambda x: x[1], reverse=True)
@@ -210,6 +401,8 @@ class EmbeddingManager:
             # 制限数まで返す
             return similarities[:limit]
 
+        except SearchCancelledError:
+            raise
         except Exception as e:
             error_msg = f"類似度検索に失敗しました: {e}"
             self.logger.error(error_msg)
@@ -226,11 +419,16 @@ class EmbeddingManager:
             # 一時ファイルに保存してから移動(原子的操作)
             temp_path = self.embeddings_path + ".tmp"
 
-            with open(temp_path, "wb") as f:
-                pickle.dump(self.embeddings, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                with open(temp_path, "wb") as f:
+                    pickle.dump(self.embeddings, f, protocol=pickle.HIGHEST_PROTOCOL)
 
-            # 一時ファイルを本来のファイルに移動
-            os.replace(temp_path, self.embeddings_path)
+                # 一時ファイルを本来のファイルに移動
+                os.replace(temp_path, self.embeddings_path)
+
+                # 保存済みの変更はジャーナルから削除
+                if os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
 
             self.logger.info(f"埋め込みキャッシュを保存しました: {self.embeddings_path}")
 
@@ -255,10 +453,16 @@ class EmbeddingManager:
                 self.embeddings = {}
                 self.logger.info("埋め込みキャッシュファイルが存在しません。空のキャッシュで開始します。")
 
+            applied = self._replay_journal()
+            self.generation += 1
+            if applied:
+                self.logger.info(f"埋め込みジャーナルを適用しました: {applied}件")
+
         except Exception as e:
             self.logger.warning(f"埋め込みキャッシュの読み込みに失敗しました: {e}")
             self.logger.info("空のキャッシュで開始します。")
             self.embeddings = {}
+            self.generation += 1
 
     def get_cache_info(self) -> dict[str, Any]:
         """
@@ -279,6 +483,7 @@ class EmbeddingManager:
             "cache_file_path": self.embeddings_path,
             "model_name": self.model_name,
             "model_loaded": self.model is not None,
+            "query_cache": self.query_cache_stats.snapshot(),
         }
 
     def get_cache_statistics(self) -> dict[str, Any]:
@@ -305,36 +510,66 @@ class EmbeddingManager:
         埋め込みキャッシュをクリア
         """
         self.embeddings.clear()
-        if os.path.exists(self.embeddings_path):
-            os.remove(self.embeddings_path)
+        self._query_cache.clear()
+        self.generation += 1
+        for path in (self.embeddings_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
         self.logger.info("埋め込みキャッシュをクリアしました")
 
     def rebuild_embeddings(self, documents: list[Document]) -> None:
         """
         すべてのドキュメントの埋め込みを再構築
 
+        新しい埋め込みは別の辞書に生成し、完成後に入れ替えて一時ファイル経由で保存します。
+        再構築中も既存の埋め込みで検索でき、テキストが変わっていない埋め込みは再利用します。
+
         Args:
             documents: 埋め込みを生成するドキュメントのリスト
         """
         self.logger.info(f"{len(documents)}件のドキュメントの埋め込みを再構築中...")
 
-        # キャッシュをクリア
-        self.embeddings.clear()
-
-        # 各ドキュメントの埋め込みを生成
-        for i, doc in enumerate(documents):
-            try:
-                self.add_document_embedding(doc.id, doc.content)
-
-                # 進捗をログ出力
-                if (i + 1) % 100 == 0:
-                    self.logger.info(f"進捗: {i + 1}/{len(documents)} 完了")
-
-            except Exception as e:
-                self.logger.error(f"ドキュメント {doc.id} の埋め込み生成に失敗: {e}")
-                continue
-
-        # キャッシュを保存
+        rebuilt: dict[str, DocumentEmbedding] = {}
+        with self._lock:
+            self._rebuild_changes = {}
+        try:
+            # 各ドキュメントの埋め込みを生成
+            for i, doc in enumerate(documents):
+                try:
+                    text_hash = self._text_hash(doc.content)
+                    existing = self.embeddings.get(doc.id)
+                    if existing is not None and existing.text_hash == text_hash:
+                        rebuilt[doc.id] = existing
+                    else:
+                        rebuilt[doc.id] = DocumentEmbedding(
+                            doc_id=doc.id,
+                            embedding=self.generate_embedding(doc.content),
+                            text_hash=text_hash,
+                            created_at=time.time(),
+                        )
+
+                    # 進捗をログ出力
+                    if (i + 1) % 100 == 0:
+                        self.logger.info(f"進捗: {i + 1}/{len(documents)} 完了")
+
+                except Exception as e:
+                    self.logger.error(f"ドキュメント {doc.id} の埋め込み生成に失敗: {e}")
+                    continue
+
+            # 入れ替え(再構築中に行われた変更は新しい埋め込みにも適用)
+            with self._lock:
+                for doc_id, embedding in self._rebuild_changes.items():
+                    if embedding is None:
+                        rebuilt.pop(doc_id, None)
+                    else:
+                        rebuilt[doc_id] = embedding
+                self.embeddings = rebuilt
+                self.generation += 1
+        finally:
+            with self._lock:
+                self._rebuild_changes = None
+
+        # キャッシュを保存(一時ファイルからの置き換えとジャーナルの削除)
         self.save_embeddings()
 
         self.logger.info(f"埋め込み再構築が完了しました: {len(self.embeddings)}件")
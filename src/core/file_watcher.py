@@ -27,6 +27,7 @@ from watchdog.observers import Observer
 from ..data.models import Document
 from ..utils.config import Config
 from ..utils.exceptions import DocumentProcessingError, FileSystemError
+from ..utils.maintenance_scheduler import get_global_maintenance_scheduler
 from .document_processor import DocumentProcessor
 from .embedding_manager import EmbeddingManager
 from .index_manager import IndexManager
@@ -63,8 +64,13 @@ class FileWatcher(FileSystemEventHandler):
 
     watchdogライブラリを使用してファイルシステムの変更を監視し、
     変更されたファイルのインデックスと埋め込みを増分的に更新します。
+    インデックスへの変更はデルタセグメントにためてすぐに検索できるようにし、
+    ディスクのインデックスへは一定間隔で、または監視の停止時にまとめて反映します。
     """
 
+    # デルタセグメントをディスクのインデックスに反映する間隔(秒)
+    DELTA_FLUSH_INTERVAL = 30.0
+
     def __init__(
         self,
         index_manager: IndexManager,
@@ -103,6 +109,7 @@ class FileWatcher(FileSystemEventHandler):
         # ワーカースレッド
         self.worker_thread: threading.Thread | None = None
         self.is_running = False
+        self._last_delta_flush = time.monotonic()
 
         # watchdog Observer
         self.observer: Observer | None = None
@@ -249,6 +256,9 @@ class FileWatcher(FileSystemEventHandler):
             self.worker_thread.join(timeout=5.0)
             self.worker_thread = None
 
+        # 未反映の変更をディスクのインデックスに反映
+        self._flush_delta()
+
         # ハッシュキャッシュを保存
         self._save_hash_cache()
 
@@ -425,7 +435,9 @@ class FileWatcher(FileSystemEventHandler):
                 self.processing_queue.task_done()
 
             except Empty:
-                # タイムアウト(正常)
+                # タイムアウト(正常)。キューが空いている間に一定間隔で変更を反映
+                if time.monotonic() - self._last_delta_flush >= self.DELTA_FLUSH_INTERVAL:
+                    self._flush_delta()
                 continue
             except Exception as e:
                 self.logger.error(f"ワーカーループでエラーが発生: {e}")
@@ -433,6 +445,15 @@ class FileWatcher(FileSystemEventHandler):
 
         self.logger.info("ファイル処理ワーカーを停止しました")
 
+    def _flush_delta(self) -> None:
+        """デルタセグメントにためた変更をディスクのインデックスに反映"""
+        self._last_delta_flush = time.monotonic()
+        try:
+            self.index_manager.flush_delta()
+        except Exception as e:
+            # 反映できなかった変更はWALに残り、次回の反映または起動時に再適用される
+            self.logger.error(f"デルタセグメントの反映に失敗: {e}")
+
     def _process_file_event(self, event: FileChangeEvent) -> None:
         """
         ファイル変更イベントを処理
@@ -443,6 +464,9 @@ class FileWatcher(FileSystemEventHandler):
         try:
             self.logger.info(f"ファイルイベント処理開始: {event.event_type} - {event.file_path}")
 
+            # インデックスへの書き込み中は保守処理を控えるよう通知
+            get_global_maintenance_scheduler().notify_activity()
+
             if event.event_type == "deleted":
                 self._handle_file_deleted(event.file_path)
             elif event.event_type == "moved":
@@ -473,7 +497,7 @@ class FileWatcher(FileSystemEventHandler):
         # インデックスから削除
         try:
             if self.index_manager.document_exists(doc_id):
-                self.index_manager.remove_document(doc_id)
+                self.index_manager.stage_removal(doc_id)
                 self.logger.info(f"インデックスからドキュメントを削除: {file_path}")
         except Exception as e:
             self.logger.error(f"インデックスからの削除に失敗: {file_path} - {e}")
@@ -518,13 +542,13 @@ class FileWatcher(FileSystemEventHandler):
             # ドキュメントを処理
             document = self.document_processor.process_file(file_path)
 
-            # インデックスを更新
+            # インデックスを更新(デルタセグメント経由ですぐに検索可能になる)
             if event_type == "created" or not self.index_manager.document_exists(document.id):
-                self.index_manager.add_document(document)
+                self.index_manager.stage_document(document)
                 self.stats["files_added"] += 1
                 self.logger.info(f"インデックスにドキュメントを追加: {file_path}")
             else:
-                self.index_manager.update_document(document)
+                self.index_manager.stage_document(document)
                 self.stats["files_updated"] += 1
                 self.logger.info(f"インデックスのドキュメントを更新: {file_path}")
 
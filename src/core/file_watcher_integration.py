@@ -15,8 +15,8 @@ from ..utils.exceptions import FileSystemError
 from .document_processor import DocumentProcessor
 from .embedding_manager import EmbeddingManager
 from .file_watcher import FileWatcher
-from .index_manager import IndexManager
 from .search_manager import SearchManager
+from .sharded_index_manager import create_index_manager
 
 
 class DocumentIndexingService:
@@ -63,7 +63,7 @@ class DocumentIndexingService:
         try:
             # IndexManagerの初期化
             index_path = self.config.get_index_path()
-            self.index_manager = IndexManager(index_path)
+            self.index_manager = create_index_manager(index_path, self.config)
 
             # EmbeddingManagerの初期化
             model_name = self.config.get_embedding_model()
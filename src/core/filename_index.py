@@ -0,0 +1,397 @@
+"""
+ファイル名・パスのトライグラム索引モジュール
+
+「名前に○○を含むファイル」を探す検索のために、ファイル名とフォルダパスの
+トライグラム(連続する3文字)からファイルを引くメモリ上の索引を提供します。
+フォルダは多くのファイルで共有されるため、フォルダパスはフォルダ単位で一度だけ索引化し、
+ファイル名の索引とは分けて保持します。
+"""
+
+from array import array
+from collections.abc import Iterable
+import logging
+import math
+import threading
+import unicodedata
+
+import numpy as np
+
+# ファイル名の先頭を表す記号(先頭一致の判定用にファイル名のトライグラムへ加える)
+_NAME_START = "\x02"
+
+
+def normalize_name(text: str) -> str:
+    """
+    ファイル名・パスを照合用に正規化
+
+    Args:
+        text (str): ファイル名、パスまたは検索語
+
+    Returns:
+        str: NFKC正規化・大文字小文字の統一を行い、区切り文字を「/」に揃えた文字列
+    """
+    return unicodedata.normalize("NFKC", text).casefold().replace("\\", "/")
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    文字列のトライグラムを列挙
+
+    Args:
+        text (str): 正規化済みの文字列
+
+    Returns:
+        Set[str]: 重複を除いたトライグラム(3文字未満の場合は空)
+    """
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class FilenameIndex:
+    """
+    ファイル名とフォルダパスのトライグラム索引
+
+    ファイルはスロット番号で管理し、トライグラムごとにスロット番号の配列を持ちます。
+    削除・更新されたファイルのスロットは空きとして残し、一定の割合を超えたら詰め直します。
+    部分一致は最も出現数の少ないトライグラムの候補だけを実際の文字列で確認し、
+    一致が足りない場合はトライグラムの重なりによるあいまい一致で補います。
+    """
+
+    # あいまい一致を行う検索語のトライグラムの最小数(短すぎる語は重なりで比べない)
+    MIN_FUZZY_TRIGRAMS = 2
+    # あいまい一致とみなす検索語のトライグラムの一致率
+    MIN_FUZZY_SIMILARITY = 0.5
+    # 空きスロットがこの割合を超えたら詰め直す
+    COMPACT_RATIO = 0.25
+    # 詰め直しを行う空きスロット数の下限
+    COMPACT_MIN_DEAD = 1024
+
+    def __init__(self):
+        """FilenameIndexの初期化"""
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self) -> None:
+        """索引を空にする"""
+        # スロット -> (ドキュメントID, 元のパス, 正規化済みファイル名, フォルダ番号)。削除済みはNone
+        self._entries: list[tuple[str, str, str, int] | None] = []
+        self._slots: dict[str, int] = {}
+        self._name_postings: dict[str, array] = {}
+        self._name_lengths = array("H")
+        self._dead = 0
+
+        # フォルダ番号 -> 正規化済みフォルダパス、所属するファイルのスロット
+        self._dirs: list[str] = []
+        self._dir_numbers: dict[str, int] = {}
+        self._dir_files: list[set[int]] = []
+        self._dir_postings: dict[str, array] = {}
+
+    def build(self, entries: Iterable[tuple[str, str]]) -> None:
+        """
+        索引を作り直す
+
+        Args:
+            entries: (ドキュメントID, ファイルパス)の列
+        """
+        with self._lock:
+            self._clear()
+            for doc_id, file_path in entries:
+                self._add(doc_id, file_path)
+        self.logger.info(f"ファイル名索引を作成しました: {len(self)}件")
+
+    def add(self, doc_id: str, file_path: str) -> None:
+        """
+        ファイルを追加(同じIDがある場合は置き換え)
+
+        Args:
+            doc_id (str): ドキュメントID
+            file_path (str): ファイルパス
+        """
+        with self._lock:
+            self._remove(doc_id)
+            self._add(doc_id, file_path)
+            self._maybe_compact()
+
+    def remove(self, doc_id: str) -> None:
+        """
+        ファイルを削除
+
+        Args:
+            doc_id (str): ドキュメントID
+        """
+        with self._lock:
+            self._remove(doc_id)
+            self._maybe_compact()
+
+    def search(self, query_text: str, limit: int = 100, fuzzy: bool = True) -> list[tuple[str, str, float]]:
+        """
+        ファイル名・パスの部分一致で検索
+
+        空白区切りの語はすべてを含むファイルに絞り込みます。ファイル名の先頭に一致するもの、
+        ファイル名に一致するもの、フォルダパスだけに一致するものの順に、名前の短いものを上位にします。
+
+        Args:
+            query_text (str): 検索語
+            limit (int): 最大件数
+            fuzzy (bool): 部分一致が件数に満たない場合にあいまい一致で補う場合True
+
+        Returns:
+            List[Tuple[str, str, float]]: (ドキュメントID, ファイルパス, スコア)のリスト(スコア順)
+        """
+        terms = [term for term in normalize_name(query_text).split() if term]
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            results = self._name_matches(terms, limit)
+            if len(results) < limit:
+                results += self._path_matches(terms, limit - len(results), {slot for slot, _ in results})
+            if fuzzy and len(results) < limit:
+                results += self._fuzzy_matches(max(terms, key=len), limit - len(results), {slot for slot, _ in results})
+
+            return [(self._entries[slot][0], self._entries[slot][1], score) for slot, score in results]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._slots)
+
+    def __contains__(self, doc_id: object) -> bool:
+        with self._lock:
+            return doc_id in self._slots
+
+    def _add(self, doc_id: str, file_path: str) -> None:
+        """ファイルを索引に書き込む(ロック取得済み)"""
+        key = normalize_name(file_path).rstrip("/")
+        dir_path, _, name = key.rpartition("/")
+
+        dir_number = self._dir_numbers.get(dir_path)
+        if dir_number is None:
+            dir_number = len(self._dirs)
+            self._dirs.append(dir_path)
+            self._dir_numbers[dir_path] = dir_number
+            self._dir_files.append(set())
+            for gram in trigrams(dir_path):
+                self._dir_postings.setdefault(gram, array("I")).append(dir_number)
+
+        slot = len(self._entries)
+        self._entries.append((doc_id, file_path, name, dir_number))
+        self._slots[doc_id] = slot
+        self._dir_files[dir_number].add(slot)
+        self._name_lengths.append(min(len(name), 0xFFFF))
+        for gram in trigrams(_NAME_START + name):
+            self._name_postings.setdefault(gram, array("I")).append(slot)
+
+    def _remove(self, doc_id: str) -> None:
+        """ファイルのスロットを空きにする(ロック取得済み)"""
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return
+        self._dir_files[self._entries[slot][3]].discard(slot)
+        self._entries[slot] = None
+        self._dead += 1
+
+    def _maybe_compact(self) -> None:
+        """空きスロットが増えたら索引を詰め直す(ロック取得済み)"""
+        if self._dead < self.COMPACT_MIN_DEAD or self._dead < len(self._entries) * self.COMPACT_RATIO:
+            return
+        live = [(entry[0], entry[1]) for entry in self._entries if entry is not None]
+        self._clear()
+        for doc_id, file_path in live:
+            self._add(doc_id, file_path)
+
+    def _name_matches(self, terms: list[str], limit: int) -> list[tuple[int, float]]:
+        """
+        ファイル名に検索語を含み、パス全体にすべての語を含むファイルを探す(ロック取得済み)
+
+        Args:
+            terms (List[str]): 正規化済みの検索語
+            limit (int): 最大件数
+
+        Returns:
+            List[Tuple[int, float]]: スロットとスコア(スコア順)
+        """
+        pivot = min((term for term in terms if "/" not in term), key=self._posting_estimate, default=None)
+        if pivot is None:
+            return []
+
+        grams = trigrams(pivot)
+        if not grams:
+            # トライグラムのない短い語は先頭から順に確認する
+            return self._scan_names(terms, pivot, limit)
+
+        candidates = self._intersect(self._name_postings, grams)
+        if not len(candidates):
+            return []
+
+        # ファイル名の先頭に一致するかは先頭記号付きのトライグラムで判定し、スコアをまとめて計算
+        prefix = self._intersect(self._name_postings, {_NAME_START + pivot[:2]})
+        scores = np.where(self._contains(prefix, candidates), 0.9, 0.7)
+        scores += 0.1 / (1 + np.frombuffer(self._name_lengths, dtype=np.uint16)[candidates])
+
+        # トライグラムの誤一致や他の語の不一致を確認しながらスコア順に取り出す
+        results: list[tuple[int, float]] = []
+        for index in np.argsort(-scores, kind="stable"):
+            slot = int(candidates[index])
+            entry = self._entries[slot]
+            if entry is None or pivot not in entry[2]:
+                continue
+            if len(terms) > 1 and not self._path_contains(entry, terms):
+                continue
+            results.append((slot, float(scores[index])))
+            if len(results) >= limit:
+                break
+        return results
+
+    def _path_matches(self, terms: list[str], limit: int, exclude: set[int]) -> list[tuple[int, float]]:
+        """
+        フォルダパス(またはフォルダとファイル名にまたがる部分)に検索語を含むファイルを探す(ロック取得済み)
+
+        Args:
+            terms (List[str]): 正規化済みの検索語
+            limit (int): 最大件数
+            exclude (Set[int]): ファイル名の一致で見つかったスロット
+
+        Returns:
+            List[Tuple[int, float]]: スロットとスコア(ファイル名の一致より低い値)
+        """
+        pivot = max(terms, key=len)
+        # 「/」を含む語は最後の「/」より前の部分がフォルダパスに含まれる
+        dir_part = pivot.rpartition("/")[0] if "/" in pivot else pivot
+        grams = trigrams(dir_part)
+        dir_numbers = self._intersect(self._dir_postings, grams) if grams else range(len(self._dirs))
+
+        results: list[tuple[int, float]] = []
+        needle = dir_part + "/" if "/" in pivot else dir_part
+        for dir_number in dir_numbers:
+            if needle not in self._dirs[int(dir_number)] + "/":
+                continue
+            for slot in sorted(self._dir_files[int(dir_number)]):
+                entry = self._entries[slot]
+                if slot in exclude or not self._path_contains(entry, terms):
+                    continue
+                results.append((slot, self._score(terms[0], entry[2])))
+            if len(results) >= limit:
+                break
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:limit]
+
+    def _fuzzy_matches(self, term: str, limit: int, exclude: set[int]) -> list[tuple[int, float]]:
+        """
+        トライグラムの重なりが大きいファイル名を探す(ロック取得済み)
+
+        Args:
+            term (str): 正規化済みの検索語
+            limit (int): 最大件数
+            exclude (Set[int]): 部分一致で見つかったスロット
+
+        Returns:
+            List[Tuple[int, float]]: スロットとスコア(部分一致より低い値)
+        """
+        # ファイル名と比べるため、「/」を含む語は最後の「/」より後ろを使う
+        grams = trigrams(term.rpartition("/")[2])
+        postings = [self._view(self._name_postings[gram]) for gram in grams if gram in self._name_postings]
+        if len(grams) < self.MIN_FUZZY_TRIGRAMS or not postings:
+            return []
+
+        counts = np.bincount(np.concatenate(postings))
+        slots = np.flatnonzero(counts >= math.ceil(len(grams) * self.MIN_FUZZY_SIMILARITY))
+        if not len(slots):
+            return []
+
+        similarity = counts[slots] / len(grams)
+        scores = 0.4 * similarity + 0.05 / (1 + np.frombuffer(self._name_lengths, dtype=np.uint16)[slots])
+
+        # 上位だけを並べ替える(除外されたスロットの分を見込んで多めに取る)
+        top = min(len(slots), limit + len(exclude))
+        order = np.argpartition(-scores, top - 1)[:top] if top < len(slots) else np.arange(len(slots))
+        order = order[np.argsort(-scores[order], kind="stable")]
+
+        results: list[tuple[int, float]] = []
+        for index in order:
+            slot = int(slots[index])
+            if slot in exclude or self._entries[slot] is None:
+                continue
+            results.append((slot, float(scores[index])))
+            if len(results) >= limit:
+                break
+        return results
+
+    def _scan_names(self, terms: list[str], pivot: str, limit: int) -> list[tuple[int, float]]:
+        """トライグラムのない短い語でファイル名を先頭から確認する(ロック取得済み)"""
+        results: list[tuple[int, float]] = []
+        for slot, entry in enumerate(self._entries):
+            if entry is None or pivot not in entry[2] or not self._path_contains(entry, terms):
+                continue
+            results.append((slot, self._score(terms[0], entry[2])))
+            if len(results) >= limit:
+                break
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results
+
+    def _path_contains(self, entry: tuple[str, str, str, int], terms: list[str]) -> bool:
+        """ファイルのパス全体がすべての語を含むか"""
+        path = self._dirs[entry[3]] + "/" + entry[2]
+        return all(term in path for term in terms)
+
+    def _posting_estimate(self, term: str) -> int:
+        """語のトライグラムのうち最も少ない出現数(トライグラムのない短い語は全件)"""
+        grams = trigrams(term)
+        if not grams:
+            return len(self._entries) + 1
+        return min(len(self._name_postings.get(gram, ())) for gram in grams)
+
+    def _intersect(self, postings: dict[str, array], grams: set[str]) -> np.ndarray:
+        """
+        トライグラムの配列の積集合
+
+        配列はスロット番号の昇順なので、出現数の少ない順に二分探索で絞り込みます。
+
+        Args:
+            postings (Dict[str, array]): トライグラムごとの番号の配列
+            grams (Set[str]): トライグラム
+
+        Returns:
+            np.ndarray: すべてのトライグラムを含む番号(昇順)
+        """
+        arrays = sorted((postings.get(gram) for gram in grams), key=lambda numbers: len(numbers or ()))
+        if not arrays or not arrays[0]:
+            return np.empty(0, dtype=np.uint32)
+        result = np.array(arrays[0], dtype=np.uint32)
+        for numbers in arrays[1:]:
+            result = result[self._contains(self._view(numbers), result)]
+            if not len(result):
+                break
+        return result
+
+    @staticmethod
+    def _contains(sorted_numbers: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """昇順の配列にそれぞれの値が含まれるか"""
+        if not len(sorted_numbers):
+            return np.zeros(len(values), dtype=bool)
+        positions = np.minimum(np.searchsorted(sorted_numbers, values), len(sorted_numbers) - 1)
+        return sorted_numbers[positions] == values
+
+    @staticmethod
+    def _view(numbers: array) -> np.ndarray:
+        """配列をコピーせずにNumPy配列として参照"""
+        return np.frombuffer(numbers, dtype=np.uint32)
+
+    @staticmethod
+    def _score(term: str, name: str) -> float:
+        """
+        部分一致のスコアを計算
+
+        Args:
+            term (str): 最初の検索語
+            name (str): 正規化済みのファイル名
+
+        Returns:
+            float: ファイル名の先頭一致 > ファイル名の一致 > パスだけの一致の順の値(名前が短いほど高い)
+        """
+        if name.startswith(term):
+            base = 0.9
+        elif term in name:
+            base = 0.7
+        else:
+            base = 0.5
+        return base + 0.1 / (1 + len(name))
@@ -0,0 +1,129 @@
+"""
+検索フィルターのビットセットキャッシュモジュール
+
+ファイルタイプや日付範囲などのフィルター条件をドキュメント番号の
+ビットセットに変換してキャッシュし、Whooshの``filter=``引数に渡します。
+セグメントは不変なので、ビットセットはセグメント単位で保持し、
+コミットで追加されたセグメントの分だけを計算し直します。
+フィルターは正規化した条件から作るため、指定順が違うだけの条件は同じキーになります。
+"""
+
+from collections import OrderedDict
+import logging
+import threading
+from typing import Any
+
+from whoosh.idsets import BitSet
+from whoosh.query import Query
+from whoosh.searching import Searcher
+
+from ..utils.query_canonicalizer import CanonicalHitStats
+
+
+class FilterCache:
+    """
+    フィルタークエリのビットセットキャッシュ
+
+    (フィルター, インデックス世代)単位で検索全体のビットセットを、
+    (フィルター, セグメントID)単位でセグメントごとのドキュメント番号を保持します。
+    新しい世代ではセグメント単位のキャッシュを組み合わせて全体のビットセットを作るため、
+    コミットで変化したセグメントだけが再評価されます。
+    """
+
+    def __init__(self, max_filters: int = 32):
+        """
+        FilterCacheの初期化
+
+        Args:
+            max_filters (int): 保持するフィルターの最大数(古いものから破棄)
+        """
+        self.max_filters = max_filters
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        # フィルター -> (世代, 全体のビットセット)
+        self._combined: OrderedDict[Query, tuple[Any, BitSet]] = OrderedDict()
+        # フィルター -> {セグメントID: セグメント内のドキュメント番号}
+        self._segments: dict[Query, dict[str, tuple[int, ...]]] = {}
+        # フィルター -> 使われた正規化前の条件(正規化の前後のヒット率の集計用)
+        self._raw_keys: dict[Query, set] = {}
+        self.hits = 0
+        self.misses = 0
+        self.canonical_stats = CanonicalHitStats("フィルター")
+
+    def get(self, searcher: Searcher, filter_query: Query, generation: Any = None, raw_key: Any = None) -> BitSet:
+        """
+        フィルタークエリに一致するドキュメント番号のビットセットを取得
+
+        Args:
+            searcher (Searcher): 検索に使用するサーチャー
+            filter_query (Query): フィルタークエリ
+            generation (Any, optional): 世代(省略時はリーダーの世代。
+                複数のインデックスをまとめて読む場合は呼び出し側で指定)
+            raw_key (Any, optional): 正規化前の条件(ヒット率の集計用)
+
+        Returns:
+            BitSet: ``searcher.search(filter=...)``に渡せるビットセット
+        """
+        if generation is None:
+            generation = searcher.reader().generation()
+
+        with self._lock:
+            cached = self._combined.get(filter_query)
+            if cached and cached[0] == generation:
+                self._combined.move_to_end(filter_query)
+                self.hits += 1
+                self.canonical_stats.record(True, raw_key, self._raw_keys.setdefault(filter_query, set()))
+                return cached[1]
+
+            self.misses += 1
+            self.canonical_stats.record(False)
+            per_segment = self._segments.get(filter_query, {})
+            live_segments: dict[str, tuple[int, ...]] = {}
+            bitset = BitSet(size=searcher.doc_count_all())
+
+            for subsearcher, offset in searcher.leaf_searchers():
+                segment_id = self._segment_id(subsearcher)
+                docnums = per_segment.get(segment_id) if segment_id else None
+                if docnums is None:
+                    docnums = tuple(filter_query.docs(subsearcher))
+                if segment_id:
+                    live_segments[segment_id] = docnums
+                bitset.update(offset + docnum for docnum in docnums)
+
+            # マージで消えたセグメントの分はここで破棄される
+            self._segments[filter_query] = live_segments
+            self._combined[filter_query] = (generation, bitset)
+            self._combined.move_to_end(filter_query)
+            self._raw_keys.setdefault(filter_query, set()).add(raw_key)
+            while len(self._combined) > self.max_filters:
+                evicted, _ = self._combined.popitem(last=False)
+                self._segments.pop(evicted, None)
+                self._raw_keys.pop(evicted, None)
+
+            return bitset
+
+    def clear(self) -> None:
+        """キャッシュをすべて破棄"""
+        with self._lock:
+            self._combined.clear()
+            self._segments.clear()
+            self._raw_keys.clear()
+
+    def __len__(self) -> int:
+        return len(self._combined)
+
+    @staticmethod
+    def _segment_id(searcher: Searcher) -> str | None:
+        """
+        サーチャーが読むセグメントのIDを取得
+
+        Args:
+            searcher (Searcher): セグメント単位のサーチャー
+
+        Returns:
+            str | None: セグメントID(単一セグメントのリーダーでない場合はNone)
+        """
+        segment = getattr(searcher.reader(), "segment", None)
+        if segment is None:
+            return None
+        return segment().segid
@@ -5,21 +5,56 @@ Whoosh全文検索インデックス管理モジュール
 作成、更新、検索機能を提供します。
 """
 
+from collections.abc import Callable, Collection, Iterable
 from datetime import datetime
+import json
 import logging
+import math
+import os
 from pathlib import Path
-from typing import Any
+import shutil
+import threading
+import time
+from typing import Any, ClassVar
 
-from whoosh import fields, index
-from whoosh.analysis import NgramAnalyzer, StandardAnalyzer
-from whoosh.highlight import ContextFragmenter, HtmlFormatter, highlight
-from whoosh.index import Index
+from whoosh import fields, formats, index
+from whoosh.index import Index, LockError
 from whoosh.qparser import MultifieldParser
 from whoosh.query import And, DateRange, Or, Query, Term
-from whoosh.searching import Hit
+from whoosh.reading import MultiReader, SegmentReader, TermNotFound
+from whoosh.searching import Hit, Searcher
+from whoosh.sorting import ScoreFacet
+
+from ..data.models import Document, FileType, SearchResult, SearchResultPage, SearchType
+from ..utils.exceptions import IndexingError, SearchCancelledError, SearchError
+from ..utils.query_canonicalizer import canonical_folders, normalize_folder
+from .cancellation import CancellationToken, SearchDeadline, search_cancellable
+from .cjk_analyzer import CJKBigramAnalyzer, normalizes_width
+from .completion_index import CompletionIndex
+from .delta_segment import DeltaSegment
+from .filename_index import FilenameIndex
+from .filter_cache import FilterCache
+from .query_planner import QueryPlanner
+from .snippet_engine import SnippetEngine
+from .spelling_index import SpellingIndex
+
+
+def folder_keys(file_path: str) -> list[str]:
+    """
+    ファイルを含むフォルダとその祖先フォルダのキーを列挙
+
+    Args:
+        file_path (str): ファイルパス
 
-from ..data.models import Document, FileType, SearchResult, SearchType
-from ..utils.exceptions import IndexingError, SearchError
+    Returns:
+        List[str]: 近いフォルダから順に並べた正規化済みのフォルダパス
+    """
+    keys: list[str] = []
+    folder = os.path.dirname(normalize_folder(file_path))
+    while folder and folder not in keys:
+        keys.append(folder)
+        folder = os.path.dirname(folder)
+    return keys
 
 
 class IndexManager:
@@ -27,9 +62,54 @@ class IndexManager:
     Whoosh全文検索インデックス管理クラス
 
     ドキュメントのインデックス化、検索、更新機能を提供します。
-    日本語テキストの処理に最適化されたアナライザーを使用します。
+    日本語テキストはCJKバイグラムアナライザーで処理し、
+    コンテンツを一度だけインデックス化して部分一致検索を実現します。
     """
 
+    # 並列再構築時にワーカープロセスへ渡すドキュメント数の単位
+    PARALLEL_BATCH_SIZE = 100
+    # 並列再構築時のワーカープロセスごとのメモリ上限(MB)
+    PARALLEL_LIMIT_MB = 64
+    # ライターのロック取得を待つ最大秒数(バックグラウンドのマージと競合した場合)
+    WRITER_LOCK_TIMEOUT = 5.0
+    # 段階的マージで同じ階層のセグメントがこの数以上たまったらマージする
+    MERGE_FACTOR = 4
+    # 削除済みドキュメントの割合がこの値以上のセグメントは階層に関係なくマージする
+    MERGE_DELETED_RATIO = 0.2
+    # コミットごとに更新する統計情報のファイル名(インデックスディレクトリ内)
+    STATS_FILE_NAME = "docmind_stats.json"
+    # デルタセグメントの先行書き込みログのファイル名(インデックスディレクトリ内)
+    DELTA_WAL_FILE_NAME = "docmind_delta.wal"
+    # 綴り訂正辞書のファイル名(インデックスディレクトリ内)
+    SPELLING_FILE_NAME = "docmind_spelling.pkl"
+    # 綴り訂正辞書に語彙を取り込むフィールド
+    SPELLING_FIELDS = ("title", "content")
+    # 1ページ目の総件数がこの件数以下の場合だけ綴り訂正を提案する
+    SUGGESTION_MAX_HITS = 3
+    # 検索語の補完インデックスのファイル名(インデックスディレクトリ内)
+    COMPLETION_FILE_NAME = "docmind_completion.pkl"
+    # デルタセグメントの変更がこの件数に達したらディスクのインデックスへ反映する
+    DELTA_MAX_DOCS = 500
+    # 再構築中の新しいインデックスを書き込む隣接ディレクトリの接尾辞
+    SHADOW_SUFFIX = ".rebuild"
+    # 入れ替え時に旧インデックスを退避する隣接ディレクトリの接尾辞
+    BACKUP_SUFFIX = ".old"
+    # 入れ替え時のディレクトリ名の変更を再試行する回数と間隔(秒)
+    # (Windowsでは検索中のサーチャーがセグメントファイルを開いている間は名前を変更できない)
+    SWAP_RETRY_COUNT = 50
+    SWAP_RETRY_INTERVAL = 0.1
+    # 検索結果のスニペットの最大文字数
+    SNIPPET_MAX_CHARS = 200
+    # 類似ドキュメント検索で元のドキュメントから抽出するキーワードの数
+    SIMILAR_KEY_TERMS = 12
+    # search_pageの並び替えキーとインデックスの列(Noneは関連度)
+    SORT_FIELDS: ClassVar[dict[str, str | None]] = {
+        "relevance": None,
+        "title": "title",
+        "modified_date": "modified_date",
+        "size": "size",
+    }
+
     def __init__(self, index_path: str):
         """
         IndexManagerの初期化
@@ -41,9 +121,42 @@ class IndexManager:
         self.logger = logging.getLogger(__name__)
         self._index: Index | None = None
 
-        # 日本語対応のアナライザーを設定
-        self.analyzer = StandardAnalyzer(minsize=1, maxsize=40, stoplist=None)
-        self.ngram_analyzer = NgramAnalyzer(minsize=2, maxsize=4)
+        # コミットごとに差分更新する統計情報(get_index_statsはこれを返すだけ)
+        self._stats: dict[str, Any] = {}
+        self._stats_lock = threading.RLock()
+
+        # フィルター条件のビットセットキャッシュ(セグメント単位で再利用)
+        self._filter_cache = FilterCache()
+        # ワイルドカード・前方一致の展開コストを検索前に見積もるプランナー
+        self._query_planner = QueryPlanner()
+
+        # ファイル監視からの変更をためるインメモリのデルタセグメント(_initialize_indexで作成)
+        self._delta: DeltaSegment | None = None
+
+        # ファイル名・パス検索用のトライグラム索引(最初のファイル名検索で作成し、以降は変更のたびに更新)
+        self._filename_index: FilenameIndex | None = None
+        self._filename_lock = threading.Lock()
+
+        # 綴り訂正(「もしかして」)用の辞書(最初の訂正で読み込み、コミットされたセグメントを読み足す)
+        self._spelling: SpellingIndex | None = None
+        self._spelling_lock = threading.Lock()
+
+        # 検索語の補完インデックス(最初の補完で読み込み、インデックスの世代が変わったら読み足す)
+        self._completion: CompletionIndex | None = None
+        self._completion_generation: int | None = None
+        self._completion_lock = threading.Lock()
+
+        # 再構築したインデックスとの入れ替え中に検索・書き込みが旧ディレクトリを開かないようにするロック
+        self._swap_lock = threading.RLock()
+        # 再構築中に既存のインデックスへ行われた追加・削除(入れ替え後の新しいインデックスにも適用する)
+        self._rebuild_changes: dict[str, Document | None] | None = None
+
+        # インデックスを開き直した(作り直した)回数。開き直すとコミットの世代が振り直されるため、
+        # 検索結果キャッシュ用の世代(get_generation)に含める
+        self._index_epoch = 0
+
+        # 日本語対応のアナライザーを設定(かな・漢字はバイグラム、英数字は単語単位)
+        self.analyzer = CJKBigramAnalyzer()
 
         # インデックススキーマの定義
         self._schema = self._create_schema()
@@ -60,23 +173,34 @@ class IndexManager:
         """
         return fields.Schema(
             # ドキュメント識別子(主キー)
-            id=fields.ID(stored=True, unique=True),
-            # ファイルパス(検索可能、保存)
-            file_path=fields.TEXT(stored=True, analyzer=self.analyzer),
-            # ドキュメントタイトル(検索可能、保存、重み付け高)
-            title=fields.TEXT(stored=True, analyzer=self.analyzer, field_boost=2.0),
+            id=fields.ID(stored=True, unique=True, sortable=True),
+            # ファイルパス(検索可能、保存、ファイル名索引の作成用の列あり)
+            file_path=fields.TEXT(stored=True, analyzer=self.analyzer, multitoken_query="phrase", sortable=True),
+            # 親フォルダと祖先フォルダのキー(フォルダ絞り込み用、改行区切り)
+            folder=fields.IDLIST(expression=r"[^\n]+"),
+            # ドキュメントタイトル(検索可能、保存、重み付け高、並び替え用の列あり)
+            title=fields.TEXT(
+                stored=True, analyzer=self.analyzer, field_boost=2.0, multitoken_query="phrase", sortable=True
+            ),
             # メインコンテンツ(検索可能、保存)
-            content=fields.TEXT(stored=True, analyzer=self.analyzer),
-            # N-gram検索用コンテンツ(部分一致検索用)
-            content_ngram=fields.TEXT(analyzer=self.ngram_analyzer),
+            # 複数トークンに分割される語(日本語のバイグラム列)はフレーズクエリとして照合する
+            # 文字オフセットも保存し、スニペットを再トークン化せずに切り出せるようにする
+            # 類似ドキュメント検索のキーワード抽出用に、語の出現数だけのタームベクトルも保存する
+            content=fields.TEXT(
+                stored=True,
+                analyzer=self.analyzer,
+                multitoken_query="phrase",
+                chars=True,
+                vector=formats.Frequency(),
+            ),
             # ファイルタイプ(フィルタリング用)
             file_type=fields.KEYWORD(stored=True),
-            # ファイルサイズ(数値検索用)
-            size=fields.NUMERIC(stored=True),
+            # ファイルサイズ(数値検索・並び替え用)
+            size=fields.NUMERIC(stored=True, sortable=True),
             # 作成日時(日付範囲検索用)
             created_date=fields.DATETIME(stored=True),
-            # 更新日時(日付範囲検索用)
-            modified_date=fields.DATETIME(stored=True),
+            # 更新日時(日付範囲検索・並び替え用)
+            modified_date=fields.DATETIME(stored=True, sortable=True),
             # インデックス化日時(管理用)
             indexed_date=fields.DATETIME(stored=True),
             # コンテンツハッシュ(重複検出用)
@@ -91,6 +215,9 @@ class IndexManager:
         既存のインデックスがある場合は開き、ない場合は新規作成
         """
         try:
+            # 入れ替えの途中で終了していた場合は旧インデックスを戻す
+            self._recover_swap()
+
             # インデックスディレクトリの作成
             self.index_path.mkdir(parents=True, exist_ok=True)
 
@@ -98,30 +225,120 @@ class IndexManager:
             if index.exists_in(str(self.index_path)):
                 self._index = index.open_dir(str(self.index_path))
                 self.logger.info(f"既存のインデックスを開きました: {self.index_path}")
+
+                if self._is_legacy_schema():
+                    self.logger.warning(
+                        "旧形式(content_ngramフィールドあり)のインデックスです。"
+                        "インデックスサイズと検索精度を改善するため再構築を推奨します"
+                    )
+                if not self._has_folder_field():
+                    self.logger.warning(
+                        "フォルダ絞り込み用のfolderフィールドがないインデックスです。"
+                        "フォルダ指定の検索が遅くなるため再構築を推奨します"
+                    )
+                if not normalizes_width(self._index.schema["content"].analyzer):
+                    self.logger.warning(
+                        "全角・半角の表記を揃えずに作成したインデックスです。"
+                        "全角英数字や半角カナを含む文書を検索できるよう再構築を推奨します"
+                    )
             else:
                 self._index = index.create_in(str(self.index_path), self._schema)
                 self.logger.info(f"新しいインデックスを作成しました: {self.index_path}")
 
+            self._index_epoch += 1
+            self._load_stats()
+            self._open_delta()
+            self._filename_index = None
+            self._spelling = None
+            self._completion = None
+
         except Exception as e:
             error_msg = f"インデックスの初期化に失敗しました: {e}"
             self.logger.error(error_msg)
             raise IndexingError(error_msg) from e
 
+    def _is_legacy_schema(self) -> bool:
+        """
+        開いているインデックスが旧形式のスキーマかどうかを判定
+
+        旧形式ではコンテンツをN-gram用のcontent_ngramフィールドにも重複して保持しています。
+
+        Returns:
+            bool: 旧形式の場合True
+        """
+        return self._index is not None and "content_ngram" in self._index.schema
+
+    def _has_folder_field(self) -> bool:
+        """
+        開いているインデックスにフォルダ絞り込み用のfolderフィールドがあるかどうかを判定
+
+        Returns:
+            bool: folderフィールドがある場合True
+        """
+        return self._index is not None and "folder" in self._index.schema
+
+    def _document_fields(self, doc: Document) -> dict[str, Any]:
+        """
+        ドキュメントからインデックスに書き込むフィールド値を作成
+
+        Args:
+            doc (Document): 対象のドキュメント
+
+        Returns:
+            Dict[str, Any]: フィールド名と値の辞書
+        """
+        doc_fields = {
+            "id": doc.id,
+            "file_path": doc.file_path,
+            "title": doc.title,
+            "content": doc.content,
+            "file_type": doc.file_type.value,
+            "size": doc.size,
+            "created_date": doc.created_date,
+            "modified_date": doc.modified_date,
+            "indexed_date": doc.indexed_date,
+            "content_hash": doc.content_hash,
+            "metadata": str(doc.metadata) if doc.metadata else "",
+        }
+
+        # 旧形式のインデックスでは再構築まで従来通りN-gramフィールドも更新する
+        if self._is_legacy_schema():
+            doc_fields["content_ngram"] = doc.content
+
+        # folderフィールドのない既存インデックスには書き込まない
+        if self._has_folder_field():
+            doc_fields["folder"] = "\n".join(folder_keys(doc.file_path))
+
+        return doc_fields
+
     def create_index(self) -> None:
         """
         新しいインデックスを作成(既存のインデックスを削除)
+
+        既存のインデックスは削除せずに空のインデックスと入れ替えるため、
+        作成中も検索が空や存在しないインデックスを参照することはありません。
         """
         try:
-            # 既存のインデックスファイルを削除
-            if self.index_path.exists():
-                import shutil
+            if index.exists_in(str(self.index_path)):
+                self._replace_with_empty_index()
+                self.logger.info("既存のインデックスを空のインデックスに入れ替えました")
+                return
 
+            # インデックスとして開けないファイルだけが残っている場合は削除して作り直す
+            if self.index_path.exists():
                 shutil.rmtree(self.index_path)
                 self.logger.info("既存のインデックスを削除しました")
 
             # 新しいインデックスを作成
             self.index_path.mkdir(parents=True, exist_ok=True)
             self._index = index.create_in(str(self.index_path), self._schema)
+            self._index_epoch += 1
+            self._filter_cache.clear()
+            self._delta = DeltaSegment(self._index.schema, self.index_path / self.DELTA_WAL_FILE_NAME)
+            self._filename_index = None
+            self._spelling = None
+            self._completion = None
+            self._recompute_stats()
             self.logger.info(f"新しいインデックスを作成しました: {self.index_path}")
 
         except Exception as e:
@@ -140,29 +357,24 @@ class IndexManager:
             if not self._index:
                 raise IndexingError("インデックスが初期化されていません")
 
-            writer = self._index.writer()
-            try:
-                # ドキュメントをインデックスに追加
-                writer.add_document(
-                    id=doc.id,
-                    file_path=doc.file_path,
-                    title=doc.title,
-                    content=doc.content,
-                    content_ngram=doc.content,  # N-gram検索用
-                    file_type=doc.file_type.value,
-                    size=doc.size,
-                    created_date=doc.created_date,
-                    modified_date=doc.modified_date,
-                    indexed_date=doc.indexed_date,
-                    content_hash=doc.content_hash,
-                    metadata=str(doc.metadata) if doc.metadata else "",
-                )
-                writer.commit()
-                self.logger.debug(f"ドキュメントを追加しました: {doc.title}")
-
-            except Exception as e:
-                writer.cancel()
-                raise e
+            # デルタセグメントの古い状態が新しい書き込みを隠さないよう先に反映する
+            self.flush_delta()
+
+            # 書き込み中にインデックスが入れ替わらないようにする
+            with self._swap_lock:
+                writer = self._index.writer(timeout=self.WRITER_LOCK_TIMEOUT)
+                try:
+                    # ドキュメントをインデックスに追加
+                    writer.add_document(**self._document_fields(doc))
+                    writer.commit()
+                    self._record_rebuild_change(doc.id, doc)
+                    self._update_stats(added_types=[doc.file_type.value])
+                    self._track_filename(doc.id, doc.file_path)
+                    self.logger.debug(f"ドキュメントを追加しました: {doc.title}")
+
+                except Exception as e:
+                    writer.cancel()
+                    raise e
 
         except Exception as e:
             error_msg = f"ドキュメントの追加に失敗しました: {doc.title} - {e}"
@@ -180,29 +392,26 @@ class IndexManager:
             if not self._index:
                 raise IndexingError("インデックスが初期化されていません")
 
-            writer = self._index.writer()
-            try:
-                # 既存のドキュメントを削除して新しいドキュメントを追加
-                writer.update_document(
-                    id=doc.id,
-                    file_path=doc.file_path,
-                    title=doc.title,
-                    content=doc.content,
-                    content_ngram=doc.content,
-                    file_type=doc.file_type.value,
-                    size=doc.size,
-                    created_date=doc.created_date,
-                    modified_date=doc.modified_date,
-                    indexed_date=doc.indexed_date,
-                    content_hash=doc.content_hash,
-                    metadata=str(doc.metadata) if doc.metadata else "",
-                )
-                writer.commit()
-                self.logger.debug(f"ドキュメントを更新しました: {doc.title}")
-
-            except Exception as e:
-                writer.cancel()
-                raise e
+            self.flush_delta()
+
+            with self._swap_lock:
+                previous_type = self._stored_file_type(doc.id)
+                writer = self._index.writer(timeout=self.WRITER_LOCK_TIMEOUT)
+                try:
+                    # 既存のドキュメントを削除して新しいドキュメントを追加
+                    writer.update_document(**self._document_fields(doc))
+                    writer.commit()
+                    self._record_rebuild_change(doc.id, doc)
+                    self._update_stats(
+                        added_types=[doc.file_type.value],
+                        removed_types=[previous_type] if previous_type else [],
+                    )
+                    self._track_filename(doc.id, doc.file_path)
+                    self.logger.debug(f"ドキュメントを更新しました: {doc.title}")
+
+                except Exception as e:
+                    writer.cancel()
+                    raise e
 
         except Exception as e:
             error_msg = f"ドキュメントの更新に失敗しました: {doc.title} - {e}"
@@ -220,21 +429,201 @@ class IndexManager:
             if not self._index:
                 raise IndexingError("インデックスが初期化されていません")
 
-            writer = self._index.writer()
-            try:
-                writer.delete_by_term("id", doc_id)
-                writer.commit()
-                self.logger.debug(f"ドキュメントを削除しました: {doc_id}")
+            self.flush_delta()
 
-            except Exception as e:
-                writer.cancel()
-                raise e
+            with self._swap_lock:
+                previous_type = self._stored_file_type(doc_id)
+                writer = self._index.writer(timeout=self.WRITER_LOCK_TIMEOUT)
+                try:
+                    writer.delete_by_term("id", doc_id)
+                    writer.commit()
+                    self._record_rebuild_change(doc_id, None)
+                    self._update_stats(removed_types=[previous_type] if previous_type else [])
+                    self._track_filename(doc_id, None)
+                    self.logger.debug(f"ドキュメントを削除しました: {doc_id}")
+
+                except Exception as e:
+                    writer.cancel()
+                    raise e
 
         except Exception as e:
             error_msg = f"ドキュメントの削除に失敗しました: {doc_id} - {e}"
             self.logger.error(error_msg)
             raise IndexingError(error_msg) from e
 
+    def stage_document(self, doc: Document) -> None:
+        """
+        ドキュメントの追加・更新をデルタセグメントにためる
+
+        変更はWALに記録したうえでメモリ上のインデックスに書き込まれ、すぐに検索できます。
+        ディスクのインデックスへはflush_delta(保守処理、件数の上限、終了時)でまとめて反映します。
+
+        Args:
+            doc (Document): 追加・更新するドキュメント
+        """
+        try:
+            if not self._index:
+                raise IndexingError("インデックスが初期化されていません")
+
+            with self._swap_lock:
+                self._delta.upsert(doc, self._document_fields(doc))
+                self._record_rebuild_change(doc.id, doc)
+            self._track_filename(doc.id, doc.file_path)
+            self.logger.debug(f"ドキュメントをデルタセグメントに追加しました: {doc.title}")
+
+        except Exception as e:
+            error_msg = f"ドキュメントのデルタセグメントへの追加に失敗しました: {doc.title} - {e}"
+            self.logger.error(error_msg)
+            raise IndexingError(error_msg) from e
+
+        if len(self._delta) >= self.DELTA_MAX_DOCS:
+            self.flush_delta()
+
+    def stage_removal(self, doc_id: str) -> None:
+        """
+        ドキュメントの削除をデルタセグメントにためる
+
+        Args:
+            doc_id (str): 削除するドキュメントのID
+        """
+        try:
+            if not self._index:
+                raise IndexingError("インデックスが初期化されていません")
+
+            with self._swap_lock:
+                self._delta.delete(doc_id)
+                self._record_rebuild_change(doc_id, None)
+            self._track_filename(doc_id, None)
+            self.logger.debug(f"ドキュメントの削除をデルタセグメントに記録しました: {doc_id}")
+
+        except Exception as e:
+            error_msg = f"ドキュメントの削除のデルタセグメントへの記録に失敗しました: {doc_id} - {e}"
+            self.logger.error(error_msg)
+            raise IndexingError(error_msg) from e
+
+        if len(self._delta) >= self.DELTA_MAX_DOCS:
+            self.flush_delta()
+
+    def flush_delta(self) -> int:
+        """
+        デルタセグメントの変更をディスクのインデックスに1回のコミットで反映
+
+        Returns:
+            int: 反映した変更の件数
+        """
+        if not self._index or self._delta is None or not len(self._delta):
+            return 0
+
+        try:
+            flushed = self._delta.flush(self._apply_changes)
+        except Exception as e:
+            error_msg = f"デルタセグメントの反映に失敗しました: {e}"
+            self.logger.error(error_msg)
+            raise IndexingError(error_msg) from e
+
+        if flushed:
+            self.logger.info(f"デルタセグメントをインデックスに反映しました: {flushed}件")
+        return flushed
+
+    def get_delta_size(self) -> int:
+        """
+        ディスクのインデックスに未反映の変更の件数を取得
+
+        Returns:
+            int: デルタセグメント内の変更の件数
+        """
+        return len(self._delta) if self._delta is not None else 0
+
+    def _open_delta(self) -> None:
+        """デルタセグメントを作成し、前回異常終了した場合はWALの変更をディスクに反映"""
+        self._delta = DeltaSegment(self._index.schema, self.index_path / self.DELTA_WAL_FILE_NAME)
+        changes = self._delta.replay()
+        if changes:
+            self.logger.warning(f"前回終了時に未反映の変更をWALから復旧します: {len(changes)}件")
+            self._apply_changes(changes)
+            self._delta.reset()
+
+    def _apply_changes(self, changes: dict[str, Document | None]) -> None:
+        """
+        ドキュメントIDごとの変更をディスクのインデックスに書き込む
+
+        Args:
+            changes (Dict[str, Document | None]): ドキュメントIDと最新の状態(削除の場合はNone)
+        """
+        # 書き込み中にインデックスが入れ替わらないようにする
+        with self._swap_lock:
+            with self._index.searcher() as searcher:
+                previous_types = {}
+                for doc_id in changes:
+                    stored = searcher.document(id=doc_id)
+                    if stored:
+                        previous_types[doc_id] = stored["file_type"]
+
+            writer = self._index.writer(timeout=self.WRITER_LOCK_TIMEOUT)
+            try:
+                added_types = []
+                for doc_id, doc in changes.items():
+                    if doc is None:
+                        if doc_id in previous_types:
+                            writer.delete_by_term("id", doc_id)
+                    else:
+                        writer.update_document(**self._document_fields(doc))
+                        added_types.append(doc.file_type.value)
+                writer.commit()
+            except Exception:
+                writer.cancel()
+                raise
+
+            self._update_stats(added_types=added_types, removed_types=list(previous_types.values()))
+
+    def get_generation(self) -> tuple[str, int, int, int]:
+        """
+        インデックスの内容の世代を取得
+
+        コミット、デルタセグメントへの変更、インデックスの作り直しのたびに変わるため、
+        検索結果のキャッシュが現在のインデックスに対するものかどうかの判定に使います。
+        別のインデックスの世代と区別できるよう、インデックスのパスも含めます。
+
+        Returns:
+            Tuple[str, int, int, int]: インデックスのパス、開き直した回数、コミットの世代、デルタセグメントの世代
+        """
+        with self._swap_lock:
+            if self._index is None:
+                return str(self.index_path), self._index_epoch, -1, -1
+            delta_generation = self._delta.generation if self._delta is not None else 0
+            return str(self.index_path), self._index_epoch, self._index.latest_generation(), delta_generation
+
+    def _open_searcher(self) -> tuple[Searcher, set[int] | None, Any]:
+        """
+        ディスクのインデックスとデルタセグメントをまとめて検索するサーチャーを開く
+
+        Returns:
+            Tuple[Searcher, Set[int] | None, Any]: サーチャー、デルタで置き換えられた
+            ディスク側のドキュメント番号(検索から除外するマスク)、フィルターキャッシュ用の世代
+        """
+        with self._swap_lock:
+            if self._delta is None or not len(self._delta):
+                searcher = self._index.searcher()
+                return searcher, None, searcher.reader().generation()
+
+            ram_reader, shadowed_ids, delta_generation = self._delta.snapshot()
+            disk_reader = self._index.reader()
+        disk_generation = disk_reader.generation()
+
+        # ディスク側で同じIDを持つドキュメントはデルタの状態で置き換える
+        mask = set()
+        for doc_id in shadowed_ids:
+            try:
+                mask.update(disk_reader.postings("id", doc_id).all_ids())
+            except TermNotFound:
+                continue
+
+        readers = [reader for reader, _ in disk_reader.leaf_readers()]
+        if ram_reader.doc_count_all():
+            readers += [reader for reader, _ in ram_reader.leaf_readers()]
+        searcher = Searcher(MultiReader(readers))
+        return searcher, mask or None, (disk_generation, delta_generation)
+
     def clear_index(self) -> None:
         """
         インデックス全体をクリア
@@ -246,21 +635,9 @@ class IndexManager:
             if not self._index:
                 raise IndexingError("インデックスが初期化されていません")
 
-            # 方法1: インデックスを再作成(推奨)
+            # 方法1: 空のインデックスと入れ替え(推奨)
             try:
-                # 既存のインデックスを閉じる
-                if self._index:
-                    self._index.close()
-                    self._index = None
-
-                # インデックスディレクトリを削除
-                import shutil
-
-                if self.index_path.exists():
-                    shutil.rmtree(self.index_path)
-
-                # インデックスを再初期化
-                self._initialize_index()
+                self._replace_with_empty_index()
 
                 self.logger.info("インデックス全体をクリアしました(再作成方式)")
                 return
@@ -271,7 +648,7 @@ class IndexManager:
                 pass
 
             # 方法2: 個別ドキュメント削除(フォールバック)
-            writer = self._index.writer()
+            writer = self._index.writer(timeout=self.WRITER_LOCK_TIMEOUT)
             try:
                 # すべてのドキュメントIDを取得して削除
                 with self._index.searcher() as searcher:
@@ -282,6 +659,10 @@ class IndexManager:
                     writer.delete_by_term("id", doc_id)
 
                 writer.commit()
+                if self._delta is not None:
+                    self._delta.reset()
+                self._filename_index = None
+                self._recompute_stats()
                 self.logger.info(f"インデックス全体をクリアしました(個別削除方式): {len(doc_ids)}件")
 
             except Exception as e:
@@ -300,19 +681,34 @@ class IndexManager:
         file_types: list[FileType] | None = None,
         date_from: datetime | None = None,
         date_to: datetime | None = None,
+        *,
+        folder_paths: list[str] | None = None,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+        doc_ids: Collection[str] | None = None,
     ) -> list[SearchResult]:
         """
         全文検索を実行
 
+        doc_idsを指定した場合は、そのドキュメントだけを照合します(直前の結果の絞り込み用)。
+        スコアはインデックス全体の統計で計算するため、指定しない場合と同じ値になります。
+
         Args:
             query_text (str): 検索クエリ
             limit (int): 最大結果数
             file_types (List[FileType], optional): フィルター対象のファイルタイプ
             date_from (datetime, optional): 日付範囲の開始
             date_to (datetime, optional): 日付範囲の終了
+            folder_paths (List[str], optional): 検索対象のフォルダ(配下のサブフォルダを含む)
+            cancel_token (CancellationToken, optional): 照合中に確認するキャンセル用トークン
+            deadline (SearchDeadline, optional): 検索の時間予算(超えた場合は途中までの結果を返す)
+            doc_ids (Collection[str], optional): 照合の対象に限定するドキュメントID
 
         Returns:
             List[SearchResult]: 検索結果のリスト
+
+        Raises:
+            SearchCancelledError: 検索中にキャンセルが要求された場合
         """
         try:
             if not self._index:
@@ -321,177 +717,843 @@ class IndexManager:
             if not query_text.strip():
                 return []
 
-            # 検索クエリの構築
-            query = self._build_search_query(query_text, file_types, date_from, date_to)
-
-            # 検索の実行
-            with self._index.searcher() as searcher:
-                results = searcher.search(query, limit=limit)
+            query = self._build_search_query(query_text)
+
+            # 検索の実行(未反映のデルタセグメントも含める)
+            searcher, mask, generation = self._open_searcher()
+            with searcher:
+                plan = self._query_planner.plan(query, searcher.reader())
+                query = plan.query
+                for warning in plan.warnings:
+                    self.logger.warning(warning)
+                candidates = None
+                if doc_ids is not None:
+                    candidates = {
+                        docnum
+                        for doc_id in doc_ids
+                        if (docnum := self._live_document_number(searcher, doc_id, mask)) is not None
+                    }
+                hits, _, _ = self._collect_hits(
+                    searcher,
+                    query,
+                    limit,
+                    file_types=file_types,
+                    date_from=date_from,
+                    date_to=date_to,
+                    folder_paths=folder_paths,
+                    mask=mask,
+                    generation=generation,
+                    cancel_token=cancel_token,
+                    deadline=deadline,
+                    candidates=candidates,
+                )
 
-                # 検索結果をSearchResultオブジェクトに変換
-                search_results = []
-                for i, hit in enumerate(results):
-                    search_result = self._create_search_result_from_hit(hit, query_text, i + 1)
-                    search_results.append(search_result)
+                # 検索結果をSearchResultオブジェクトに変換(スニペット生成の前にもキャンセルを確認)
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                search_results = self._create_search_results(
+                    searcher, query, query_text, hits, quick_snippets=self._is_time_short(deadline)
+                )
 
                 self.logger.info(f"検索完了: クエリ='{query_text}', 結果数={len(search_results)}")
                 return search_results
 
+        except SearchCancelledError:
+            raise
         except Exception as e:
             error_msg = f"検索に失敗しました: {query_text} - {e}"
             self.logger.error(error_msg)
             raise SearchError(error_msg) from e
 
-    def _build_search_query(
+    def search_page(
         self,
         query_text: str,
+        page: int = 1,
+        page_size: int = 20,
+        *,
+        sort_by: str = "relevance",
+        descending: bool = True,
         file_types: list[FileType] | None = None,
         date_from: datetime | None = None,
         date_to: datetime | None = None,
-    ) -> Query:
+        folder_paths: list[str] | None = None,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+    ) -> SearchResultPage:
         """
-        検索クエリを構築
+        全文検索の1ページ分だけを並び替えて取得
+
+        並び替えはインデックスの列(sortable)で行い、ページ外のヒットは
+        SearchResultに変換しません。総件数は必要に応じて推定値を返します。
 
         Args:
-            query_text (str): 検索テキスト
-            file_types (List[FileType], optional): ファイルタイプフィルター
-            date_from (datetime, optional): 日付範囲開始
-            date_to (datetime, optional): 日付範囲終了
+            query_text (str): 検索クエリ
+            page (int): ページ番号(1始まり)
+            page_size (int): 1ページあたりの件数
+            sort_by (str): 並び替えのキー(SORT_FIELDSのいずれか)
+            descending (bool): 降順の場合True
+            file_types (List[FileType], optional): フィルター対象のファイルタイプ
+            date_from (datetime, optional): 日付範囲の開始
+            date_to (datetime, optional): 日付範囲の終了
+            folder_paths (List[str], optional): 検索対象のフォルダ(配下のサブフォルダを含む)
+            cancel_token (CancellationToken, optional): 照合中に確認するキャンセル用トークン
+            deadline (SearchDeadline, optional): 検索の時間予算(超えた場合は途中までの結果を返す)
 
         Returns:
-            Query: 構築されたクエリ
+            SearchResultPage: 指定ページの検索結果と総件数
+
+        Raises:
+            SearchCancelledError: 検索中にキャンセルが要求された場合
         """
-        # メインの検索クエリ(タイトルとコンテンツを対象)
-        parser = MultifieldParser(["title", "content", "content_ngram"], self._index.schema)
-        main_query = parser.parse(query_text)
+        if page < 1 or page_size < 1:
+            raise SearchError(f"ページ指定が不正です: page={page}, page_size={page_size}")
+        if sort_by not in self.SORT_FIELDS:
+            raise SearchError(f"サポートされていない並び替えキー: {sort_by}")
 
-        # フィルター条件を追加
-        filters = []
+        try:
+            if not self._index:
+                raise SearchError("インデックスが初期化されていません")
 
-        # ファイルタイプフィルター
-        if file_types:
-            type_queries = [Term("file_type", ft.value) for ft in file_types]
-            if len(type_queries) == 1:
-                filters.append(type_queries[0])
-            else:
-                filters.append(Or(type_queries))
+            if not query_text.strip():
+                return SearchResultPage(results=[], page=page, page_size=page_size, total=0)
 
-        # 日付範囲フィルター
-        if date_from or date_to:
-            date_query = DateRange("modified_date", date_from, date_to)
-            filters.append(date_query)
+            query = self._build_search_query(query_text)
 
-        # フィルターを適用
-        if filters:
-            if len(filters) == 1:
-                return And([main_query, filters[0]])
+            # 関連度の降順はWhooshの既定の順序、それ以外はsortedbyで並び替える
+            sort_field = self.SORT_FIELDS[sort_by]
+            if sort_field is None:
+                sortedby = None if descending else ScoreFacet()
+                reverse = not descending
             else:
-                return And([main_query] + filters)
+                sortedby = sort_field
+                reverse = descending
+
+            searcher, mask, generation = self._open_searcher()
+            with searcher:
+                plan = self._query_planner.plan(query, searcher.reader())
+                query = plan.query
+                hits, total, exact = self._collect_hits(
+                    searcher,
+                    query,
+                    page * page_size,
+                    file_types=file_types,
+                    date_from=date_from,
+                    date_to=date_to,
+                    folder_paths=folder_paths,
+                    sortedby=sortedby,
+                    reverse=reverse,
+                    mask=mask,
+                    generation=generation,
+                    cancel_token=cancel_token,
+                    deadline=deadline,
+                )
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                offset = (page - 1) * page_size
+                page_hits = hits[offset : offset + page_size]
+
+                # 並び替え時のhit.scoreは並び替えキーのため、ページ内のドキュメントだけ関連度を計算し直す
+                scores = {hit.docnum: hit.score for hit in page_hits}
+                if sortedby is not None and page_hits:
+                    scored = searcher.search(query, limit=len(page_hits), filter=set(scores))
+                    scores = {hit.docnum: hit.score for hit in scored}
+
+                results = self._create_search_results(
+                    searcher,
+                    query,
+                    query_text,
+                    page_hits,
+                    first_rank=offset + 1,
+                    scores=scores,
+                    quick_snippets=self._is_time_short(deadline),
+                )
 
-        return main_query
+            self.logger.info(
+                f"ページ検索完了: クエリ='{query_text}', ページ={page}, 並び替え={sort_by}, 総件数={total}"
+            )
+            return SearchResultPage(
+                results=results,
+                page=page,
+                page_size=page_size,
+                total=total,
+                total_is_exact=exact,
+                warnings=plan.warnings,
+                suggestions=(
+                    self.suggest_corrections(query_text) if page == 1 and total <= self.SUGGESTION_MAX_HITS else []
+                ),
+                truncated=self._is_truncated(deadline),
+            )
+
+        except SearchError:
+            raise
+        except Exception as e:
+            error_msg = f"ページ検索に失敗しました: {query_text} - {e}"
+            self.logger.error(error_msg)
+            raise SearchError(error_msg) from e
 
-    def _create_search_result_from_hit(self, hit: Hit, query_text: str, rank: int) -> SearchResult:
+    def search_filenames(
+        self,
+        query_text: str,
+        limit: int = 100,
+        file_types: list[FileType] | None = None,
+        folder_paths: list[str] | None = None,
+    ) -> list[SearchResult]:
         """
-        Whooshの検索結果からSearchResultオブジェクトを作成
+        ファイル名・パスの部分一致検索
+
+        全文インデックスは使わず、メモリ上のトライグラム索引でファイル名と
+        フォルダパスを照合します。一致が少ない場合はあいまい一致で補います。
 
         Args:
-            hit (Hit): Whooshの検索結果
-            query_text (str): 検索クエリ
-            rank (int): 検索結果の順位
+            query_text (str): 検索語(空白区切りの語はすべて含むものに一致)
+            limit (int): 最大結果数
+            file_types (List[FileType], optional): フィルター対象のファイルタイプ
+            folder_paths (List[str], optional): 検索対象のフォルダ(配下のサブフォルダを含む)
 
         Returns:
-            SearchResult: 作成されたSearchResultオブジェクト
+            List[SearchResult]: ファイル名の一致度順の検索結果
         """
-        # メタデータの復元
-        metadata = {}
-        metadata_str = hit.get("metadata", "")
-        if metadata_str:
-            try:
-                import ast
+        try:
+            if not self._index:
+                raise SearchError("インデックスが初期化されていません")
 
-                metadata = ast.literal_eval(metadata_str)
-                if not isinstance(metadata, dict):
-                    metadata = {}
-            except (ValueError, SyntaxError) as e:
-                self.logger.warning(f"メタデータの復元に失敗しました: {e}")
-                metadata = {}
+            if not query_text.strip():
+                return []
 
-        # ドキュメントオブジェクトの再構築
-        document = Document(
-            id=hit["id"],
-            file_path=hit["file_path"],
-            title=hit["title"],
-            content=hit["content"],
-            file_type=FileType(hit["file_type"]),
-            size=hit["size"],
-            created_date=hit["created_date"],
-            modified_date=hit["modified_date"],
-            indexed_date=hit["indexed_date"],
-            content_hash=hit["content_hash"],
-            metadata=metadata,
-        )
+            # 絞り込みは索引の外で行うため、条件がある場合は多めに取得する
+            has_filters = bool(file_types or folder_paths)
+            matches = self._get_filename_index().search(query_text, limit=limit * 10 if has_filters else limit)
+
+            type_values = {ft.value for ft in file_types} if file_types else None
+            folders = {normalize_folder(path) for path in folder_paths} if folder_paths else None
+
+            results: list[SearchResult] = []
+            with self._swap_lock, self._index.searcher() as searcher:
+                for doc_id, file_path, score in matches:
+                    if folders is not None and not folders.intersection(folder_keys(file_path)):
+                        continue
+
+                    # 未反映の変更は保存フィールドと同じ形に変換して全文検索の結果と揃える
+                    staged, doc = self._delta.get(doc_id)
+                    if staged:
+                        stored = self._document_fields(doc) if doc is not None else None
+                    else:
+                        stored = searcher.document(id=doc_id)
+                    doc = self._document_from_hit(stored) if stored else None
+                    if doc is None or (type_values is not None and doc.file_type.value not in type_values):
+                        continue
+
+                    results.append(
+                        SearchResult(
+                            document=doc,
+                            score=score,
+                            search_type=SearchType.FILENAME,
+                            snippet=doc.file_path,
+                            highlighted_terms=query_text.split(),
+                            relevance_explanation=f"ファイル名一致スコア: {score:.2f}",
+                            rank=len(results) + 1,
+                        )
+                    )
+                    if len(results) >= limit:
+                        break
+
+            self.logger.info(f"ファイル名検索完了: クエリ='{query_text}', 結果数={len(results)}")
+            return results
+
+        except SearchError:
+            raise
+        except Exception as e:
+            error_msg = f"ファイル名検索に失敗しました: {query_text} - {e}"
+            self.logger.error(error_msg)
+            raise SearchError(error_msg) from e
 
-        # スニペットの生成
-        snippet = self._generate_snippet(hit, query_text)
+    def _get_filename_index(self) -> FilenameIndex:
+        """
+        ファイル名索引を取得(初回はインデックスの列から作成)
 
-        # ハイライト対象の用語を抽出
-        highlighted_terms = self._extract_highlighted_terms(query_text)
+        Returns:
+            FilenameIndex: 現在のインデックスと未反映の変更を含むファイル名索引
+        """
+        with self._filename_lock:
+            if self._filename_index is not None:
+                return self._filename_index
+
+            filename_index = FilenameIndex()
+            with self._swap_lock, self._index.reader() as reader:
+                filename_index.build(self._stored_paths(reader))
+                for doc_id, doc in self._delta.pending().items():
+                    if doc is None:
+                        filename_index.remove(doc_id)
+                    else:
+                        filename_index.add(doc_id, doc.file_path)
+                self._filename_index = filename_index
+
+            self.logger.info(f"ファイル名索引を作成しました: {len(filename_index)}件")
+            return filename_index
+
+    @staticmethod
+    def _stored_paths(reader) -> Iterable[tuple[str, str]]:
+        """
+        インデックス内のドキュメントIDとファイルパスを列挙
 
-        # スコアの正規化(Whooshのスコアは0-1の範囲ではないため)
-        normalized_score = min(hit.score / 10.0, 1.0)  # 適切な正規化係数を使用
+        列(sortable)がある場合は保存フィールド全体を読まずに列から取得します。
 
-        return SearchResult(
-            document=document,
-            score=normalized_score,
-            search_type=SearchType.FULL_TEXT,
-            snippet=snippet,
-            highlighted_terms=highlighted_terms,
-            relevance_explanation=f"全文検索スコア: {hit.score:.2f}",
-            rank=rank,
-        )
+        Args:
+            reader: インデックスのリーダー
 
-    def _generate_snippet(self, hit: Hit, query_text: str, max_chars: int = 200) -> str:
+        Yields:
+            Tuple[str, str]: ドキュメントIDとファイルパス
+        """
+        if reader.has_column("id") and reader.has_column("file_path"):
+            ids = reader.column_reader("id")
+            paths = reader.column_reader("file_path")
+            for docnum in reader.all_doc_ids():
+                yield ids[docnum], paths[docnum]
+        else:
+            for stored in reader.all_stored_fields():
+                yield stored["id"], stored["file_path"]
+
+    def _track_filename(self, doc_id: str, file_path: str | None) -> None:
         """
-        検索結果のスニペットを生成
+        作成済みのファイル名索引に変更を反映
 
         Args:
-            hit (Hit): Whooshの検索結果
-            query_text (str): 検索クエリ
-            max_chars (int): 最大文字数
+            doc_id (str): ドキュメントID
+            file_path (str | None): 新しいファイルパス(削除の場合はNone)
+        """
+        filename_index = self._filename_index
+        if filename_index is None:
+            return
+        if file_path is None:
+            filename_index.remove(doc_id)
+        else:
+            filename_index.add(doc_id, file_path)
+
+    def find_similar(
+        self,
+        doc_id: str,
+        limit: int = 10,
+        file_types: list[FileType] | None = None,
+        key_terms: list[tuple[str, float]] | None = None,
+    ) -> list[SearchResult]:
+        """
+        指定したドキュメントに似たドキュメントを検索(モデル不要の「関連ドキュメント」)
+
+        元のドキュメントのタームベクトル(ない場合は保存されたコンテンツ)から
+        特徴的なキーワードを抽出し、その重みを付けたOR検索で探します。
+
+        Args:
+            doc_id (str): 元のドキュメントのID
+            limit (int): 最大結果数
+            file_types (List[FileType], optional): フィルター対象のファイルタイプ
+            key_terms (List[Tuple[str, float]], optional): 抽出済みのキーワードと重み
+                (省略時は元のドキュメントから抽出)
 
         Returns:
-            str: 生成されたスニペット
+            List[SearchResult]: 類似度順の検索結果(元のドキュメントは含まない)
         """
         try:
-            # Whooshのハイライト機能を使用
-            formatter = HtmlFormatter(tagname="mark")
-            fragmenter = ContextFragmenter(maxchars=max_chars, surround=50)
+            if not self._index:
+                raise SearchError("インデックスが初期化されていません")
 
-            # コンテンツからスニペットを生成
-            content = hit.get("content", "")
-            if content:
-                # クエリパーサーを使用してハイライト
-                from whoosh.qparser import QueryParser
-
-                parser = QueryParser("content", self._index.schema)
-                parser.parse(query_text)
-
-                highlighted = highlight(
-                    content,
-                    [query_text],
-                    analyzer=self.analyzer,
-                    formatter=formatter,
-                    fragmenter=fragmenter,
+            searcher, mask, generation = self._open_searcher()
+            with searcher:
+                docnum = self._live_document_number(searcher, doc_id, mask)
+                if key_terms is None:
+                    if docnum is None:
+                        raise SearchError(f"ドキュメントが見つかりません: {doc_id}")
+                    key_terms = searcher.key_terms([docnum], "content", numterms=self.SIMILAR_KEY_TERMS)
+                if not key_terms:
+                    return []
+
+                query = Or([Term("content", term, boost=weight) for term, weight in key_terms])
+                excluded = set(mask or ())
+                if docnum is not None:
+                    excluded.add(docnum)
+                hits, _, _ = self._collect_hits(
+                    searcher, query, limit, file_types=file_types, mask=excluded or None, generation=generation
                 )
 
-                # HTMLタグを除去してプレーンテキストに変換
-                import re
+                terms_text = " ".join(term for term, _ in key_terms)
+                results = self._create_search_results(searcher, query, terms_text, hits)
+                keywords = "、".join(term for term, _ in key_terms[:5])
+                for result in results:
+                    result.relevance_explanation = f"類似ドキュメント(キーワード: {keywords})"
 
-                snippet = re.sub(r"<[^>]+>", "", highlighted)
-                return snippet[:max_chars] + "..." if len(snippet) > max_chars else snippet
+            self.logger.info(f"類似ドキュメント検索完了: 元={doc_id}, 結果数={len(results)}")
+            return results
 
-            # コンテンツがない場合はタイトルを使用
-            return hit.get("title", "")[:max_chars]
+        except SearchError:
+            raise
+        except Exception as e:
+            error_msg = f"類似ドキュメント検索に失敗しました: {doc_id} - {e}"
+            self.logger.error(error_msg)
+            raise SearchError(error_msg) from e
+
+    def get_key_terms(self, doc_id: str, numterms: int = SIMILAR_KEY_TERMS) -> list[tuple[str, float]]:
+        """
+        ドキュメントの特徴的なキーワードを抽出
+
+        Args:
+            doc_id (str): ドキュメントID
+            numterms (int): 抽出するキーワードの数
+
+        Returns:
+            List[Tuple[str, float]]: キーワードと重み(ドキュメントがない場合は空)
+        """
+        if not self._index:
+            return []
+
+        searcher, mask, _ = self._open_searcher()
+        with searcher:
+            docnum = self._live_document_number(searcher, doc_id, mask)
+            if docnum is None:
+                return []
+            return searcher.key_terms([docnum], "content", numterms=numterms)
+
+    @staticmethod
+    def _live_document_number(searcher: Searcher, doc_id: str, mask: set[int] | None) -> int | None:
+        """
+        デルタセグメントで置き換えられていないドキュメント番号を取得
+
+        Args:
+            searcher (Searcher): _open_searcherで開いたサーチャー
+            doc_id (str): ドキュメントID
+            mask (Set[int], optional): 検索から除外するドキュメント番号
+
+        Returns:
+            int | None: ドキュメント番号(存在しない場合はNone)
+        """
+        for docnum in searcher.document_numbers(id=doc_id):
+            if not mask or docnum not in mask:
+                return docnum
+        return None
+
+    def suggest_corrections(self, query_text: str, max_suggestions: int = 3) -> list[str]:
+        """
+        綴りを訂正した検索クエリを提案(「もしかして」)
+
+        インデックスにない語や出現数の極めて少ない語を、語彙の中の近い綴りの語に
+        置き換えます。訂正が必要な語がない場合は辞書を読み込まずに終了します。
+
+        Args:
+            query_text (str): 検索クエリ
+            max_suggestions (int): 提案するクエリの最大数
+
+        Returns:
+            List[str]: 訂正したクエリ(訂正の必要がない場合は空)
+        """
+        try:
+            if not self._index or not query_text.strip():
+                return []
+
+            with self._swap_lock, self._index.reader() as reader:
+                fieldnames = [name for name in self.SPELLING_FIELDS if name in reader.schema]
+
+                def frequency(word: str) -> int:
+                    return sum(reader.doc_frequency(name, word) for name in fieldnames)
+
+                if not SpellingIndex.rare_words(query_text, frequency):
+                    return []
+                spelling = self._get_spelling_index(reader)
+                return spelling.suggest(query_text, frequency, max_suggestions)
+
+        except Exception as e:
+            self.logger.warning(f"綴り訂正の候補を取得できませんでした: {query_text} - {e}")
+            return []
+
+    def _get_spelling_index(self, reader) -> SpellingIndex:
+        """
+        綴り訂正辞書を取得し、まだ取り込んでいないセグメントの語彙を読み足す
+
+        Args:
+            reader: ディスクのインデックスのリーダー
+
+        Returns:
+            SpellingIndex: 現在のインデックスの語彙を含む辞書
+        """
+        with self._spelling_lock:
+            if self._spelling is None:
+                spelling = SpellingIndex(self.index_path / self.SPELLING_FILE_NAME)
+                if spelling.load():
+                    self.logger.info(f"綴り訂正辞書を読み込みました: {len(spelling)}語")
+                self._spelling = spelling
+            self._spelling.sync(reader, self.SPELLING_FIELDS)
+            return self._spelling
+
+    def complete_terms(self, prefix: str, limit: int = 10) -> list[tuple[str, int]]:
+        """
+        入力途中の語に前方一致する語を、出現ドキュメント数の多い順に取得
+
+        Args:
+            prefix (str): 入力途中の語
+            limit (int): 最大件数
+
+        Returns:
+            List[Tuple[str, int]]: 語と重み(出現ドキュメント数)
+        """
+        try:
+            if not self._index or not prefix.strip():
+                return []
+            return self._get_completion_index().complete(prefix.strip().lower(), limit)
+
+        except Exception as e:
+            self.logger.warning(f"補完候補を取得できませんでした: {prefix} - {e}")
+            return []
+
+    def get_completion_size(self) -> int:
+        """
+        補完インデックスの語数を取得
+
+        Returns:
+            int: 読み込み済みの補完インデックスの語数(未読み込みの場合は0)
+        """
+        completion = self._completion
+        return len(completion) if completion is not None else 0
+
+    def _get_completion_index(self) -> CompletionIndex:
+        """
+        補完インデックスを取得し、インデックスの世代が変わっていればセグメントを読み足す
+
+        世代の確認はディレクトリの一覧だけで済むため、入力のたびに呼び出せます。
+
+        Returns:
+            CompletionIndex: 現在のインデックスの語彙を含む補完インデックス
+        """
+        with self._completion_lock:
+            if self._completion is None:
+                completion = CompletionIndex(self.index_path / self.COMPLETION_FILE_NAME)
+                if completion.load():
+                    self.logger.info(f"補完インデックスを読み込みました: {len(completion)}語")
+                self._completion = completion
+                self._completion_generation = None
+
+            generation = self._index.latest_generation()
+            if generation != self._completion_generation:
+                with self._swap_lock, self._index.reader() as reader:
+                    self._completion.sync(reader)
+                self._completion_generation = generation
+            return self._completion
+
+    def _sync_lexicon_indexes(self) -> None:
+        """読み込み済みの綴り訂正辞書と補完インデックスに、マージ・最適化で作られたセグメントを取り込む"""
+        try:
+            if self._spelling is not None:
+                with self._swap_lock, self._index.reader() as reader:
+                    self._get_spelling_index(reader)
+            if self._completion is not None:
+                self._get_completion_index()
+        except Exception as e:
+            self.logger.warning(f"綴り訂正辞書・補完インデックスを更新できませんでした: {e}")
+
+    def _collect_hits(
+        self,
+        searcher: Searcher,
+        query: Query,
+        limit: int | None,
+        *,
+        file_types: list[FileType] | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        folder_paths: list[str] | None = None,
+        sortedby: Any = None,
+        reverse: bool = False,
+        mask: set[int] | None = None,
+        generation: Any = None,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+        candidates: set[int] | None = None,
+    ) -> tuple[list[Hit], int, bool]:
+        """
+        フィルターを適用して上位のヒットを取得
+
+        フィルターはスコア計算に含めず、FilterCacheのビットセットとして適用します。
+
+        Args:
+            searcher (Searcher): 検索に使用するサーチャー
+            query (Query): 検索クエリ
+            limit (int | None): 取得する最大件数
+            file_types (List[FileType], optional): フィルター対象のファイルタイプ
+            date_from (datetime, optional): 日付範囲の開始
+            date_to (datetime, optional): 日付範囲の終了
+            folder_paths (List[str], optional): 検索対象のフォルダ
+            sortedby (Any, optional): Whooshのsortedby引数
+            reverse (bool): 並び順を反転する場合True
+            mask (Set[int], optional): 検索から除外するドキュメント番号(デルタで置き換えられたもの)
+            generation (Any, optional): フィルターキャッシュの世代(省略時はリーダーの世代)
+            cancel_token (CancellationToken, optional): 照合中に確認するキャンセル用トークン
+            deadline (SearchDeadline, optional): 検索の時間予算(超えた場合は途中までのヒットを返す)
+            candidates (Set[int], optional): 照合の対象に限定するドキュメント番号
+
+        Returns:
+            Tuple[List[Hit], int, bool]: ヒット、総件数、総件数が正確な場合True
+        """
+        # folderフィールドのない既存インデックスでは、フォルダ指定を件数制限の前に後から適用する
+        post_filter_folders = None
+        if folder_paths and not self._has_folder_field():
+            post_filter_folders = {normalize_folder(path) for path in folder_paths}
+            folder_paths = None
+        filter_query = self._build_filter_query(file_types, date_from, date_to, folder_paths)
+        doc_filter = None
+        if filter_query:
+            raw_key = (tuple(ft.value for ft in file_types or ()), date_from, date_to, tuple(folder_paths or ()))
+            doc_filter = self._filter_cache.get(searcher, filter_query, generation, raw_key=raw_key)
+            if not doc_filter:
+                # 一致するドキュメントがない(空のフィルターはWhooshでは絞り込みなしとして扱われる)
+                return [], 0, True
+        if candidates is not None:
+            # 対象外のドキュメントはスコアを計算せずに読み飛ばす
+            doc_filter = candidates if doc_filter is None else {docnum for docnum in candidates if docnum in doc_filter}
+            if not doc_filter:
+                # 対象のドキュメントが残っていない場合は、インデックス全体を照合せずに終える
+                return [], 0, True
+        search_kwargs = {"filter": doc_filter, "mask": mask, "sortedby": sortedby, "reverse": reverse}
+
+        if post_filter_folders is not None:
+            results = search_cancellable(searcher, query, cancel_token, deadline, limit=None, **search_kwargs)
+            hits = [hit for hit in results if post_filter_folders.intersection(folder_keys(hit["file_path"]))]
+            return hits[:limit], len(hits), not self._is_truncated(deadline)
+
+        results = search_cancellable(searcher, query, cancel_token, deadline, limit=limit, **search_kwargs)
+        # 上位だけを収集した場合の総件数は推定値で済ませ、数え直しのための再検索を避ける
+        if results.has_exact_length() and not self._is_truncated(deadline):
+            return list(results), len(results), True
+        return list(results), results.estimated_length(), False
+
+    @staticmethod
+    def _is_truncated(deadline: SearchDeadline | None) -> bool:
+        """時間予算を超えて結果を打ち切った場合True"""
+        return deadline is not None and deadline.truncated
+
+    def _is_time_short(self, deadline: SearchDeadline | None) -> bool:
+        """時間予算の残りが少なく、スニペットの作成を省く場合True"""
+        if deadline is None or not deadline.short:
+            return False
+        self.logger.debug("検索の残り時間が少ないため、スニペットの作成を省略します")
+        return True
+
+    def _build_search_query(self, query_text: str) -> Query:
+        """
+        検索クエリを構築
+
+        Args:
+            query_text (str): 検索テキスト
+
+        Returns:
+            Query: 構築されたクエリ
+        """
+        # メインの検索クエリ(タイトルとコンテンツを対象)
+        search_fields = ["title", "content"]
+        if self._is_legacy_schema():
+            search_fields.append("content_ngram")
+        parser = MultifieldParser(search_fields, self._index.schema)
+        return parser.parse(query_text)
+
+    def _build_filter_query(
+        self,
+        file_types: list[FileType] | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        folder_paths: list[str] | None = None,
+    ) -> Query | None:
+        """
+        フィルタークエリを構築
+
+        同じ条件が同じクエリになるよう正規化し、FilterCacheのキーとして使えるようにします。
+
+        Args:
+            file_types (List[FileType], optional): ファイルタイプフィルター
+            date_from (datetime, optional): 日付範囲開始
+            date_to (datetime, optional): 日付範囲終了
+            folder_paths (List[str], optional): フォルダフィルター(配下のサブフォルダを含む)
+
+        Returns:
+            Query | None: フィルタークエリ(条件がない場合はNone)
+        """
+        filters: list[Query] = []
+
+        # ファイルタイプフィルター(指定順に依存しないよう並べ替える)
+        if file_types:
+            type_values = sorted({ft.value for ft in file_types})
+            type_queries = [Term("file_type", value) for value in type_values]
+            if len(type_queries) == 1:
+                filters.append(type_queries[0])
+            else:
+                filters.append(Or(type_queries))
+
+        # 日付範囲フィルター
+        if date_from or date_to:
+            filters.append(DateRange("modified_date", date_from, date_to))
+
+        # フォルダフィルター(祖先フォルダのキーとの完全一致)
+        if folder_paths:
+            folder_queries = [Term("folder", key) for key in canonical_folders(folder_paths)]
+            if len(folder_queries) == 1:
+                filters.append(folder_queries[0])
+            else:
+                filters.append(Or(folder_queries))
+
+        if not filters:
+            return None
+        if len(filters) == 1:
+            return filters[0]
+        return And(filters)
+
+    def _document_from_hit(self, hit: Hit | dict[str, Any]) -> Document:
+        """
+        Whooshの保存フィールドからDocumentオブジェクトを復元
+
+        Args:
+            hit (Hit | dict): Whooshの検索結果、または保存フィールドの辞書
+
+        Returns:
+            Document: 復元されたドキュメント
+        """
+        # メタデータの復元
+        metadata = {}
+        metadata_str = hit.get("metadata", "")
+        if metadata_str:
+            try:
+                import ast
+
+                metadata = ast.literal_eval(metadata_str)
+                if not isinstance(metadata, dict):
+                    metadata = {}
+            except (ValueError, SyntaxError) as e:
+                self.logger.warning(f"メタデータの復元に失敗しました: {e}")
+                metadata = {}
+
+        return Document(
+            id=hit["id"],
+            file_path=hit["file_path"],
+            title=hit["title"],
+            content=hit["content"],
+            file_type=FileType(hit["file_type"]),
+            size=hit["size"],
+            created_date=hit["created_date"],
+            modified_date=hit["modified_date"],
+            indexed_date=hit["indexed_date"],
+            content_hash=hit["content_hash"],
+            metadata=metadata,
+        )
+
+    def _create_search_results(
+        self,
+        searcher: Searcher,
+        query: Query,
+        query_text: str,
+        hits: list[Hit],
+        *,
+        first_rank: int = 1,
+        scores: dict[int, float] | None = None,
+        quick_snippets: bool = False,
+    ) -> list[SearchResult]:
+        """
+        ヒットの一覧をSearchResultに変換
+
+        クエリの解析とハイライト対象の用語抽出は一度だけ行い、スニペットは
+        SnippetEngineでポスティングの文字オフセットから切り出します。
+        quick_snippetsの場合は一致箇所を探さず、本文の先頭をスニペットにします。
+
+        Args:
+            searcher (Searcher): 検索に使用したサーチャー
+            query (Query): 解析済みの検索クエリ
+            query_text (str): 検索クエリ
+            hits (List[Hit]): 変換するヒット
+            first_rank (int): 先頭のヒットの順位
+            scores (Dict[int, float], optional): ドキュメント番号ごとの関連度(省略時はhit.score)
+            quick_snippets (bool): 一致箇所からのスニペット作成を省く場合True
+
+        Returns:
+            List[SearchResult]: 検索結果のリスト
+        """
+        snippets = None
+        if not quick_snippets:
+            snippets = SnippetEngine(searcher, query, self.analyzer, max_chars=self.SNIPPET_MAX_CHARS)
+            snippets.load(hit.docnum for hit in hits)
+        highlighted_terms = self._extract_highlighted_terms(query_text)
+
+        results = []
+        for rank, hit in enumerate(hits, first_rank):
+            if snippets is None:
+                snippet = hit.get("content", "")[: self.SNIPPET_MAX_CHARS] or hit.get("title", "")
+            else:
+                snippet = snippets.snippet(hit.docnum, hit.get("content", "")) or hit.get("title", "")
+            score = None if scores is None else scores.get(hit.docnum, 0.0)
+            results.append(
+                self._create_search_result_from_hit(
+                    hit, query_text, rank, score=score, snippet=snippet, highlighted_terms=highlighted_terms
+                )
+            )
+        return results
+
+    def _create_search_result_from_hit(
+        self,
+        hit: Hit,
+        query_text: str,
+        rank: int,
+        *,
+        score: float | None = None,
+        snippet: str | None = None,
+        highlighted_terms: list[str] | None = None,
+    ) -> SearchResult:
+        """
+        Whooshの検索結果からSearchResultオブジェクトを作成
+
+        Args:
+            hit (Hit): Whooshの検索結果
+            query_text (str): 検索クエリ
+            rank (int): 検索結果の順位
+            score (float, optional): 関連度スコア(省略時はhit.score)
+            snippet (str, optional): 作成済みのスニペット(省略時はこのヒットだけで作成)
+            highlighted_terms (List[str], optional): 抽出済みのハイライト対象の用語
+
+        Returns:
+            SearchResult: 作成されたSearchResultオブジェクト
+        """
+        document = self._document_from_hit(hit)
+
+        # スニペットの生成
+        if snippet is None:
+            snippet = self._generate_snippet(hit, query_text)
+
+        # ハイライト対象の用語を抽出
+        if highlighted_terms is None:
+            highlighted_terms = self._extract_highlighted_terms(query_text)
+
+        # スコアの正規化(Whooshのスコアは0-1の範囲ではないため)
+        raw_score = hit.score if score is None else score
+        normalized_score = min(raw_score / 10.0, 1.0)  # 適切な正規化係数を使用
+
+        return SearchResult(
+            document=document,
+            score=normalized_score,
+            search_type=SearchType.FULL_TEXT,
+            snippet=snippet,
+            highlighted_terms=highlighted_terms,
+            relevance_explanation=f"全文検索スコア: {raw_score:.2f}",
+            rank=rank,
+        )
+
+    def _generate_snippet(self, hit: Hit, query_text: str, max_chars: int = SNIPPET_MAX_CHARS) -> str:
+        """
+        1件のヒットだけのスニペットを生成
+
+        複数のヒットを変換する場合は、クエリの解析を共有する_create_search_resultsを使用してください。
+
+        Args:
+            hit (Hit): Whooshの検索結果
+            query_text (str): 検索クエリ
+            max_chars (int): 最大文字数
+
+        Returns:
+            str: 生成されたスニペット
+        """
+        try:
+            snippets = SnippetEngine(
+                hit.searcher, self._build_search_query(query_text), self.analyzer, max_chars=max_chars
+            )
+            return snippets.snippet(hit.docnum, hit.get("content", "")) or hit.get("title", "")[:max_chars]
 
         except Exception as e:
             self.logger.warning(f"スニペット生成に失敗しました: {e}")
@@ -519,36 +1581,269 @@ class IndexManager:
 
         return terms
 
-    def rebuild_index(self, documents: list[Document]) -> None:
+    def rebuild_index(self, documents: list[Document], procs: int = 1) -> None:
         """
         インデックスを完全に再構築
 
+        procsが2以上の場合は、抽出済みテキストからワーカープロセスごとに
+        セグメントを並列に構築し、最後の最適化で1つのセグメントにマージします。
+        新しいインデックスは隣接ディレクトリに構築し、完成後に入れ替えるため、
+        再構築中も既存のインデックスで検索できます。
+
         Args:
             documents (List[Document]): インデックス化するドキュメントのリスト
+            procs (int): セグメントを構築するワーカープロセス数(1の場合は単一ライター)
         """
+        shadow = None
         try:
             self.logger.info(f"インデックスの再構築を開始します: {len(documents)}件のドキュメント")
 
-            # 新しいインデックスを作成
-            self.create_index()
+            # 新しいインデックスを隣接ディレクトリに作成
+            shadow = self.begin_rebuild()
+
+            # 少量のドキュメントではプロセス起動のコストが上回るため単一ライターを使用
+            if procs > 1 and len(documents) > self.PARALLEL_BATCH_SIZE:
+                shadow._add_documents_parallel(documents, procs)
+            else:
+                # バッチでドキュメントを追加
+                batch_size = 100
+                for i in range(0, len(documents), batch_size):
+                    batch = documents[i : i + batch_size]
+                    shadow._add_documents_batch(batch)
+                    self.logger.info(f"進捗: {min(i + batch_size, len(documents))}/{len(documents)}")
 
-            # バッチでドキュメントを追加
-            batch_size = 100
-            for i in range(0, len(documents), batch_size):
-                batch = documents[i : i + batch_size]
-                self._add_documents_batch(batch)
-                self.logger.info(f"進捗: {min(i + batch_size, len(documents))}/{len(documents)}")
+            # インデックスの最適化(並列構築時はサブセグメントのマージを兼ねる)
+            shadow.optimize_index()
 
-            # インデックスの最適化
-            self.optimize_index()
+            # 既存のインデックスと入れ替え
+            self.commit_rebuild(shadow)
 
             self.logger.info("インデックスの再構築が完了しました")
 
         except Exception as e:
+            if shadow is not None:
+                self.abort_rebuild(shadow)
             error_msg = f"インデックスの再構築に失敗しました: {e}"
             self.logger.error(error_msg)
             raise IndexingError(error_msg) from e
 
+    def begin_rebuild(self, folder_path: str | None = None) -> "IndexManager":
+        """
+        再構築用の新しいインデックスを隣接ディレクトリに作成
+
+        返されたIndexManagerにドキュメントを追加し、commit_rebuildで入れ替えます。
+        その間も既存のインデックスで検索でき、既存のインデックスへの追加・削除
+        (デルタセグメントを含む)は記録して入れ替え後の新しいインデックスにも適用します。
+
+        Args:
+            folder_path (str, optional): 再構築するフォルダ(ShardedIndexManagerとの互換用。
+                単一のインデックスでは常にインデックス全体を再構築する)
+
+        Returns:
+            IndexManager: 空の新しいインデックス
+        """
+        shadow_path = self._sibling_path(self.SHADOW_SUFFIX)
+        if shadow_path.exists():
+            # 前回中断された再構築の残り
+            shutil.rmtree(shadow_path)
+        self.logger.info(f"再構築用のインデックスを作成します: {shadow_path}")
+        with self._swap_lock:
+            self._rebuild_changes = {}
+        return IndexManager(str(shadow_path))
+
+    def _replace_with_empty_index(self) -> None:
+        """
+        既存のインデックスを空のインデックスとディレクトリ名の変更で入れ替え
+
+        入れ替えまでは既存のインデックスで検索できます。破棄するインデックスへの
+        未反映の変更(デルタセグメント)は新しいインデックスに引き継ぎません。
+        """
+        shadow = self.begin_rebuild()
+        with self._swap_lock:
+            if self._delta is not None:
+                self._delta.reset()
+            self._rebuild_changes = {}
+        try:
+            self.commit_rebuild(shadow)
+        except Exception:
+            self.abort_rebuild(shadow)
+            raise
+
+    def _record_rebuild_change(self, doc_id: str, doc: Document | None) -> None:
+        """
+        再構築中であれば、既存のインデックスへの変更を記録(_swap_lockを保持して呼ぶ)
+
+        Args:
+            doc_id (str): ドキュメントID
+            doc (Document | None): 最新の状態(削除の場合はNone)
+        """
+        if self._rebuild_changes is not None:
+            self._rebuild_changes[doc_id] = doc
+
+    def commit_rebuild(self, shadow: "IndexManager") -> None:
+        """
+        再構築したインデックスを既存のインデックスとディレクトリ名の変更で入れ替え
+
+        旧インデックスを退避してから新しいインデックスを所定の場所に移動し、開き直します。
+        begin_rebuild以降に既存のインデックスへ行われた追加・削除(反映済みのデルタセグメントを含む)と、
+        入れ替え前にデルタセグメントにたまっていた変更は、新しいインデックスにも反映します。
+
+        _swap_lockは新しいサーチャーを開くことだけを止め、検索中のサーチャーの終了は待ちません。
+        Windowsでは開いているセグメントファイルがあるとディレクトリ名を変更できないため、
+        検索が終わるまで名前の変更を再試行します(SWAP_RETRY_COUNT回失敗した場合は入れ替えを中止)。
+
+        Args:
+            shadow (IndexManager): begin_rebuildで作成し、構築を終えたインデックス
+        """
+        try:
+            shadow.close()
+            backup_path = self._sibling_path(self.BACKUP_SUFFIX)
+
+            with self._swap_lock:
+                changes = self._delta.pending() if self._delta is not None else {}
+                changes.update(self._rebuild_changes or {})
+                if backup_path.exists():
+                    shutil.rmtree(backup_path)
+
+                if self._index:
+                    self._index.close()
+                    self._index = None
+                self._filter_cache.clear()
+
+                try:
+                    self._rename_with_retry(self.index_path, backup_path)
+                except OSError:
+                    # 旧インデックスを退避できない場合は、そのまま開き直す
+                    self._initialize_index()
+                    raise
+                try:
+                    self._rename_with_retry(shadow.index_path, self.index_path)
+                except OSError:
+                    # 新しいインデックスを移動できない場合は旧インデックスを戻す
+                    os.rename(backup_path, self.index_path)
+                    self._initialize_index()
+                    raise
+
+                self._rebuild_changes = None
+                self._initialize_index()
+                if changes:
+                    self._apply_changes(changes)
+
+            # 検索中のサーチャーが読み終えてから消えるよう、失敗しても処理は継続
+            shutil.rmtree(backup_path, ignore_errors=True)
+            self.logger.info(f"再構築したインデックスに入れ替えました: {self.index_path}")
+
+        except Exception as e:
+            error_msg = f"再構築したインデックスへの入れ替えに失敗しました: {e}"
+            self.logger.error(error_msg)
+            raise IndexingError(error_msg) from e
+
+    def abort_rebuild(self, shadow: "IndexManager | None" = None) -> None:
+        """
+        再構築を中止して隣接ディレクトリの新しいインデックスを破棄
+
+        既存のインデックスはそのまま使用できます。
+
+        Args:
+            shadow (IndexManager, optional): begin_rebuildで作成したインデックス
+        """
+        if shadow is not None:
+            shadow.close()
+        with self._swap_lock:
+            self._rebuild_changes = None
+        shadow_path = self._sibling_path(self.SHADOW_SUFFIX)
+        if shadow_path.exists():
+            shutil.rmtree(shadow_path, ignore_errors=True)
+            self.logger.info(f"中断された再構築のインデックスを破棄しました: {shadow_path}")
+
+    def _rename_with_retry(self, source: Path, target: Path) -> None:
+        """
+        ディレクトリ名を変更(開いているファイルがあるため失敗した場合は間隔をあけて再試行)
+
+        Args:
+            source (Path): 変更前のパス
+            target (Path): 変更後のパス
+
+        Raises:
+            OSError: 再試行しても名前を変更できない場合
+        """
+        for attempt in range(self.SWAP_RETRY_COUNT):
+            try:
+                os.rename(source, target)
+                return
+            except PermissionError:
+                if attempt == self.SWAP_RETRY_COUNT - 1:
+                    raise
+                self.logger.debug(f"検索中のファイルがあるため名前の変更を再試行します: {source}")
+                time.sleep(self.SWAP_RETRY_INTERVAL)
+
+    def _sibling_path(self, suffix: str) -> Path:
+        """
+        インデックスディレクトリと同じ親ディレクトリにあるパスを取得
+
+        ディレクトリ名の変更が同じファイルシステム内で完結するようにします。
+
+        Args:
+            suffix (str): ディレクトリ名に付ける接尾辞
+
+        Returns:
+            Path: 隣接ディレクトリのパス
+        """
+        return self.index_path.with_name(self.index_path.name + suffix)
+
+    def _recover_swap(self) -> None:
+        """入れ替えの途中で終了していた場合に旧インデックスを戻し、不要な退避ディレクトリを削除"""
+        backup_path = self._sibling_path(self.BACKUP_SUFFIX)
+        if not backup_path.exists():
+            return
+
+        if index.exists_in(str(self.index_path)):
+            shutil.rmtree(backup_path, ignore_errors=True)
+        else:
+            self.logger.warning(f"入れ替えが完了していないため旧インデックスを戻します: {backup_path}")
+            if self.index_path.exists():
+                shutil.rmtree(self.index_path)
+            os.rename(backup_path, self.index_path)
+
+    def _add_documents_parallel(self, documents: list[Document], procs: int) -> None:
+        """
+        複数のワーカープロセスでセグメントを並列に構築
+
+        WhooshのマルチプロセスライターをmultisegmentモードでN個のプロセスで使用します。
+        トークン化はワーカープロセス側で行われ、各プロセスが独立したセグメントを書き出します。
+
+        Args:
+            documents (List[Document]): 追加するドキュメントのリスト
+            procs (int): ワーカープロセス数
+        """
+        if not self._index:
+            raise IndexingError("インデックスが初期化されていません")
+
+        self.logger.info(f"並列セグメント構築を開始します: {procs}プロセス")
+
+        writer = self._index.writer(
+            procs=procs,
+            multisegment=True,
+            batchsize=self.PARALLEL_BATCH_SIZE,
+            limitmb=self.PARALLEL_LIMIT_MB,
+        )
+        try:
+            for i, doc in enumerate(documents, 1):
+                writer.add_document(**self._document_fields(doc))
+                if i % 1000 == 0:
+                    self.logger.info(f"進捗: {i}/{len(documents)}")
+            writer.commit()
+            self._update_stats(added_types=[doc.file_type.value for doc in documents])
+            for doc in documents:
+                self._track_filename(doc.id, doc.file_path)
+
+        except Exception as e:
+            # 待機中のワーカープロセスが残らないように終了させてから破棄
+            for task in getattr(writer, "tasks", []):
+                task.terminate()
+            writer.cancel()
+            raise e
+
     def _add_documents_batch(self, documents: list[Document]) -> None:
         """
         ドキュメントをバッチで追加
@@ -559,24 +1854,14 @@ class IndexManager:
         if not self._index:
             raise IndexingError("インデックスが初期化されていません")
 
-        writer = self._index.writer()
+        writer = self._index.writer(timeout=self.WRITER_LOCK_TIMEOUT)
         try:
             for doc in documents:
-                writer.add_document(
-                    id=doc.id,
-                    file_path=doc.file_path,
-                    title=doc.title,
-                    content=doc.content,
-                    content_ngram=doc.content,
-                    file_type=doc.file_type.value,
-                    size=doc.size,
-                    created_date=doc.created_date,
-                    modified_date=doc.modified_date,
-                    indexed_date=doc.indexed_date,
-                    content_hash=doc.content_hash,
-                    metadata=str(doc.metadata) if doc.metadata else "",
-                )
+                writer.add_document(**self._document_fields(doc))
             writer.commit()
+            self._update_stats(added_types=[doc.file_type.value for doc in documents])
+            for doc in documents:
+                self._track_filename(doc.id, doc.file_path)
 
         except Exception as e:
             writer.cancel()
@@ -592,6 +1877,8 @@ class IndexManager:
 
             self.logger.info("インデックスの最適化を開始します")
             self._index.optimize()
+            self._update_stats()
+            self._sync_lexicon_indexes()
             self.logger.info("インデックスの最適化が完了しました")
 
         except Exception as e:
@@ -599,6 +1886,150 @@ class IndexManager:
             self.logger.error(error_msg)
             raise IndexingError(error_msg) from e
 
+    def merge_segments(
+        self, max_bytes: int | None = None, should_yield: Callable[[], bool] | None = None
+    ) -> dict[str, int]:
+        """
+        小さなセグメントを段階的にマージ
+
+        セグメントをサイズの階層(MERGE_FACTORの対数)ごとにまとめ、同じ階層に
+        MERGE_FACTOR個以上たまったセグメントと、削除済みドキュメントが多い
+        セグメントを小さい階層から1階層ずつマージします。optimize_index()と異なり、
+        max_bytesを超える分のセグメントには触れず、階層ごとのマージの間で
+        should_yieldが真を返した場合は残りの階層を次回に持ち越します。
+        他のライターが書き込み中の場合と再構築中の場合は何もせずに終了します。
+
+        Args:
+            max_bytes (int, optional): 読み書きするセグメントの合計バイト数の上限
+            should_yield (Callable[[], bool], optional): 次の階層のマージを見送るかどうかを返す関数
+
+        Returns:
+            Dict[str, int]: マージしたセグメント数、バイト数、マージ後のセグメント数
+        """
+        result = {"merged_segments": 0, "merged_bytes": 0, "segments": 0}
+        while True:
+            # 入れ替え中の旧インデックスに書き込まないよう、階層ごとに_swap_lockを保持してマージする
+            with self._swap_lock:
+                if not self._index or self._rebuild_changes is not None:
+                    # 再構築中のインデックスは入れ替えで破棄されるためマージしない
+                    break
+                segment_sizes = self.get_segment_sizes()
+                result["segments"] = len(segment_sizes)
+                remaining_bytes = None if max_bytes is None else max_bytes - result["merged_bytes"]
+                targets = self._select_merge_targets(segment_sizes, remaining_bytes)
+                if not targets or not self._merge_targets(targets):
+                    break
+
+                merged_bytes = sum(segment_sizes[segid] for segid in targets)
+                result["merged_segments"] += len(targets)
+                result["merged_bytes"] += merged_bytes
+                result["segments"] = len(self.get_segment_sizes())
+                self._update_stats()
+                self._sync_lexicon_indexes()
+            self.logger.info(f"セグメントをマージしました: {len(targets)}個, {merged_bytes}バイト")
+
+            if should_yield is not None and should_yield():
+                break
+        return result
+
+    def _merge_targets(self, targets: set[str]) -> bool:
+        """
+        指定したセグメントを1つのセグメントにマージ
+
+        Args:
+            targets (Set[str]): マージするセグメントID
+
+        Returns:
+            bool: マージした場合True(他のライターが書き込み中の場合False)
+
+        Raises:
+            IndexingError: マージに失敗した場合
+        """
+        try:
+            writer = self._index.writer()
+        except LockError:
+            self.logger.debug("インデックスが書き込み中のため、セグメントのマージを見送りました")
+            return False
+
+        def merge_targets(writer, segments):
+            remaining = []
+            for segment in segments:
+                if segment.segid in targets:
+                    reader = SegmentReader(writer.storage, writer.schema, segment)
+                    writer.add_reader(reader)
+                    reader.close()
+                else:
+                    remaining.append(segment)
+            return remaining
+
+        try:
+            writer.commit(mergetype=merge_targets)
+        except Exception as e:
+            writer.cancel()
+            error_msg = f"セグメントのマージに失敗しました: {e}"
+            self.logger.error(error_msg)
+            raise IndexingError(error_msg) from e
+        return True
+
+    def _select_merge_targets(self, segment_sizes: dict[str, int], max_bytes: int | None) -> set[str]:
+        """
+        次にマージする階層のセグメントを選択
+
+        MERGE_FACTOR個以上たまった階層のセグメントと削除済みドキュメントが多い
+        セグメントのうち、最も小さい階層のものを予算内で選択します。
+
+        Args:
+            segment_sizes (Dict[str, int]): セグメントIDとバイト数の辞書
+            max_bytes (int, optional): マージ対象の合計バイト数の上限
+
+        Returns:
+            Set[str]: マージ対象のセグメントID(2個未満しか選べない場合は空)
+        """
+        tiers: dict[int, list[str]] = {}
+        for segid, size in segment_sizes.items():
+            tier = int(math.log(max(size, 1), self.MERGE_FACTOR))
+            tiers.setdefault(tier, []).append(segid)
+
+        deleted_heavy = set()
+        for segment in self._index._segments():
+            total = segment.doc_count_all()
+            if total and segment.deleted_count() / total >= self.MERGE_DELETED_RATIO:
+                deleted_heavy.add(segment.segid)
+
+        for tier in sorted(tiers):
+            segids = tiers[tier]
+            candidates = segids if len(segids) >= self.MERGE_FACTOR else [s for s in segids if s in deleted_heavy]
+            if len(candidates) <= 1:
+                continue
+
+            # 小さいセグメントから予算内で選択(大きなセグメントの書き直しを避ける)
+            targets: set[str] = set()
+            total_bytes = 0
+            for segid in sorted(candidates, key=lambda s: segment_sizes[s]):
+                if max_bytes is not None and total_bytes + segment_sizes[segid] > max_bytes:
+                    break
+                targets.add(segid)
+                total_bytes += segment_sizes[segid]
+            # 上の階層はさらに大きいため、この階層が予算に収まらなければ打ち切る
+            return targets if len(targets) > 1 else set()
+        return set()
+
+    def get_segment_sizes(self) -> dict[str, int]:
+        """
+        セグメントごとのファイルサイズを取得
+
+        Returns:
+            Dict[str, int]: セグメントIDとバイト数の辞書
+        """
+        if not self._index:
+            return {}
+
+        storage = self._index.storage
+        return {
+            segment.segid: sum(storage.file_length(name) for name in segment.list_files(storage))
+            for segment in self._index._segments()
+        }
+
     def get_document_count(self) -> int:
         """
         インデックス内のドキュメント数を取得
@@ -610,8 +2041,7 @@ class IndexManager:
             if not self._index:
                 return 0
 
-            with self._index.searcher() as searcher:
-                return searcher.doc_count()
+            return self._current_stats()["document_count"]
 
         except Exception as e:
             self.logger.error(f"ドキュメント数の取得に失敗しました: {e}")
@@ -631,6 +2061,10 @@ class IndexManager:
             if not self._index:
                 return False
 
+            staged, doc = self._delta.get(doc_id)
+            if staged:
+                return doc is not None
+
             with self._index.searcher() as searcher:
                 results = searcher.search(Term("id", doc_id), limit=1)
                 return len(results) > 0
@@ -639,10 +2073,54 @@ class IndexManager:
             self.logger.error(f"ドキュメント存在チェックに失敗しました: {e}")
             return False
 
+    def get_document(self, doc_id: str) -> Document | None:
+        """
+        指定されたIDのドキュメントをインデックスから取得
+
+        Args:
+            doc_id (str): ドキュメントID
+
+        Returns:
+            Optional[Document]: 見つかったドキュメント(存在しない場合はNone)
+        """
+        try:
+            if not self._index:
+                return None
+
+            staged, doc = self._delta.get(doc_id)
+            if staged:
+                return doc
+
+            with self._index.searcher() as searcher:
+                stored = searcher.document(id=doc_id)
+                return self._document_from_hit(stored) if stored else None
+
+        except Exception as e:
+            self.logger.error(f"ドキュメント取得に失敗しました: {doc_id} - {e}")
+            return None
+
+    def searcher(self) -> Searcher:
+        """
+        インデックスのサーチャーを取得
+
+        ディスクのインデックスだけを読みます(デルタセグメントの変更はflush_delta後に含まれます)。
+        呼び出し側でwith文を使用して閉じてください。
+
+        Returns:
+            Searcher: Whooshのサーチャー
+        """
+        with self._swap_lock:
+            if not self._index:
+                raise SearchError("インデックスが初期化されていません")
+            return self._index.searcher()
+
     def get_index_stats(self) -> dict[str, Any]:
         """
         インデックスの統計情報を取得
 
+        コミットごとに更新している統計情報を返すため、インデックスのファイルを
+        走査したりサーチャーを開いたりしません。
+
         Returns:
             Dict[str, Any]: 統計情報
         """
@@ -650,35 +2128,143 @@ class IndexManager:
             if not self._index:
                 return {"document_count": 0, "index_size": 0}
 
-            stats = {
-                "document_count": self.get_document_count(),
-                "index_size": self._get_index_size(),
-                "last_modified": self._get_index_last_modified(),
+            stats = self._current_stats()
+            last_commit = stats.get("last_commit")
+            return {
+                "document_count": stats["document_count"],
+                "index_size": sum(stats["segment_sizes"].values()),
+                "last_modified": datetime.fromisoformat(last_commit) if last_commit else None,
+                "file_type_counts": dict(stats["file_type_counts"]),
+                "segment_count": len(stats["segment_sizes"]),
+                "segment_sizes": dict(stats["segment_sizes"]),
                 "schema_version": str(self._index.schema),
             }
 
-            return stats
-
         except Exception as e:
             self.logger.error(f"統計情報の取得に失敗しました: {e}")
             return {"document_count": 0, "index_size": 0, "error": str(e)}
 
-    def _get_index_size(self) -> int:
+    def get_filter_cache_stats(self) -> dict[str, Any]:
         """
-        インデックスファイルの合計サイズを取得
+        フィルターのビットセットキャッシュのヒット率を取得
 
         Returns:
-            int: サイズ(バイト)
+            Dict[str, Any]: 参照回数、ヒット数、正規化後と正規化前のヒット率
         """
-        total_size = 0
-        try:
-            for file_path in self.index_path.rglob("*"):
-                if file_path.is_file():
-                    total_size += file_path.stat().st_size
-        except Exception as e:
-            self.logger.warning(f"インデックスサイズの計算に失敗しました: {e}")
+        return self._filter_cache.canonical_stats.snapshot()
+
+    def _current_stats(self) -> dict[str, Any]:
+        """
+        最新の統計情報を取得
+
+        別のプロセスやライターがコミットして世代が変わっている場合のみ再計算します。
+
+        Returns:
+            Dict[str, Any]: 統計情報
+        """
+        with self._stats_lock:
+            if self._stats.get("generation") != self._index.latest_generation():
+                self._recompute_stats()
+            return self._stats
 
-        return total_size
+    def _stats_path(self) -> Path:
+        """統計情報ファイルのパスを取得"""
+        return self.index_path / self.STATS_FILE_NAME
+
+    def _load_stats(self) -> None:
+        """
+        保存済みの統計情報を読み込む
+
+        ファイルがない、壊れている、またはインデックスの世代と一致しない場合は再計算します。
+        """
+        with self._stats_lock:
+            try:
+                with open(self._stats_path(), encoding="utf-8") as f:
+                    self._stats = json.load(f)
+            except (OSError, ValueError):
+                self._stats = {}
+
+            if self._stats.get("generation") != self._index.latest_generation():
+                self._recompute_stats()
+
+    def _recompute_stats(self) -> None:
+        """インデックスを読み込んで統計情報を作り直して保存"""
+        with self._stats_lock, self._index.searcher() as searcher:
+            file_type_counts = {}
+            for term in searcher.lexicon("file_type"):
+                file_type = term.decode("utf-8") if isinstance(term, bytes) else term
+                count = len(searcher.search(Term("file_type", file_type), limit=None, scored=False))
+                if count:
+                    file_type_counts[file_type] = count
+
+            last_modified = self._get_index_last_modified()
+            self._stats = {
+                "generation": self._index.latest_generation(),
+                "document_count": searcher.doc_count(),
+                "file_type_counts": file_type_counts,
+                "segment_sizes": self.get_segment_sizes(),
+                "last_commit": last_modified.isoformat() if last_modified else None,
+            }
+            self._save_stats()
+            self.logger.debug("インデックス統計情報を再計算しました")
+
+    def _update_stats(self, added_types: list[str] | None = None, removed_types: list[str] | None = None) -> None:
+        """
+        コミット後に統計情報を差分更新して保存
+
+        Args:
+            added_types (List[str], optional): 追加したドキュメントのファイルタイプ
+            removed_types (List[str], optional): 削除したドキュメントのファイルタイプ
+        """
+        with self._stats_lock:
+            try:
+                generation = self._index.latest_generation()
+                if self._stats.get("generation") != generation - 1:
+                    # 他のライターのコミットを挟んでいる場合は差分が使えないため再計算
+                    self._recompute_stats()
+                    return
+
+                counts = self._stats["file_type_counts"]
+                for file_type in added_types or []:
+                    counts[file_type] = counts.get(file_type, 0) + 1
+                for file_type in removed_types or []:
+                    counts[file_type] = counts.get(file_type, 0) - 1
+                    if counts[file_type] <= 0:
+                        del counts[file_type]
+
+                delta = len(added_types or []) - len(removed_types or [])
+                self._stats["document_count"] = max(self._stats.get("document_count", 0) + delta, 0)
+                self._stats["segment_sizes"] = self.get_segment_sizes()
+                self._stats["generation"] = generation
+                self._stats["last_commit"] = datetime.now().isoformat()
+                self._save_stats()
+
+            except Exception as e:
+                # 統計情報の更新失敗で書き込み自体を失敗させない(次回の参照時に再計算される)
+                self.logger.warning(f"インデックス統計情報の更新に失敗しました: {e}")
+                self._stats = {}
+
+    def _save_stats(self) -> None:
+        """統計情報を一時ファイル経由で原子的に保存"""
+        stats_path = self._stats_path()
+        temp_path = stats_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._stats, f, ensure_ascii=False)
+        os.replace(temp_path, stats_path)
+
+    def _stored_file_type(self, doc_id: str) -> str | None:
+        """
+        インデックス内のドキュメントのファイルタイプを取得
+
+        Args:
+            doc_id (str): ドキュメントID
+
+        Returns:
+            Optional[str]: ファイルタイプ(存在しない場合はNone)
+        """
+        with self._index.searcher() as searcher:
+            stored = searcher.document(id=doc_id)
+            return stored["file_type"] if stored else None
 
     def _get_index_last_modified(self) -> datetime | None:
         """
@@ -704,6 +2290,16 @@ class IndexManager:
         インデックスを閉じる
         """
         if self._index:
+            try:
+                self.flush_delta()
+            except IndexingError:
+                # 反映できなかった変更はWALに残り、次回起動時に復旧される
+                self.logger.warning("デルタセグメントを反映できなかったため、次回起動時にWALから復旧します")
+            if self._spelling is not None:
+                self._spelling.save()
+            if self._completion is not None:
+                self._completion.save()
             self._index.close()
             self._index = None
+            self._filter_cache.clear()
             self.logger.info("インデックスを閉じました")
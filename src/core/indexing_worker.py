@@ -108,6 +108,7 @@ class IndexingWorker(QObject):
         document_processor: DocumentProcessor,
         index_manager: IndexManager,
         file_watcher: FileWatcher | None = None,
+        rebuild: bool = False,
     ):
         super().__init__()
         self.folder_path = folder_path
@@ -116,6 +117,10 @@ class IndexingWorker(QObject):
         self.file_watcher = file_watcher
         self.should_stop = False
 
+        # 再構築時は隣接ディレクトリの新しいインデックスに書き込み、完了後に入れ替える
+        self.rebuild = rebuild
+        self._target_index: IndexManager = index_manager
+
         # ログ設定
         self.logger = logging.getLogger(__name__)
 
@@ -156,8 +161,14 @@ class IndexingWorker(QObject):
             files = self._scan_files()
             self.stats.total_files_found = len(files)
 
+            # 再構築時は既存のインデックスで検索を続けられるよう別の場所に構築
+            if self.rebuild:
+                self._target_index = self.index_manager.begin_rebuild(self.folder_path)
+
             if not files:
                 self.logger.info(f"処理対象のファイルが見つかりませんでした: {self.folder_path}")
+                if self.rebuild:
+                    self._finish_rebuild()
                 self._emit_completion()
                 return
 
@@ -169,6 +180,8 @@ class IndexingWorker(QObject):
 
             # 3. インデックス作成段階
             self._update_progress("indexing", "", self.stats.files_processed, self.stats.total_files_found)
+            if self.rebuild:
+                self._finish_rebuild()
 
             # 4. 統計情報の更新
             self.stats.processing_time = time.time() - start_time
@@ -182,10 +195,23 @@ class IndexingWorker(QObject):
             self._emit_completion()
 
         except Exception as e:
+            if self._target_index is not self.index_manager:
+                self.index_manager.abort_rebuild(self._target_index)
+                self._target_index = self.index_manager
             error_msg = f"フォルダ処理中にエラーが発生しました: {e}"
             self.logger.error(error_msg)
             self.error_occurred.emit("folder_processing", error_msg)
 
+    def _finish_rebuild(self) -> None:
+        """再構築したインデックスを既存のインデックスと入れ替える(停止された場合は破棄)"""
+        shadow = self._target_index
+        self._target_index = self.index_manager
+        if self.should_stop:
+            self.index_manager.abort_rebuild(shadow)
+            self.logger.info("再構築が停止されたため、既存のインデックスを維持します")
+            return
+        self.index_manager.commit_rebuild(shadow)
+
     def _scan_files(self) -> list[str]:
         """サポートされているファイルをスキャン"""
         self.logger.debug(f"ファイルスキャンを開始: {self.folder_path}")
@@ -334,7 +360,7 @@ class IndexingWorker(QObject):
             for document in documents:
                 if self.should_stop:
                     break
-                self.index_manager.add_document(document)
+                self._target_index.add_document(document)
 
             self.logger.debug(f"バッチ処理完了: {len(documents)}個のドキュメント")
 
@@ -0,0 +1,233 @@
+"""
+検索クエリの展開コスト見積もり・書き換えモジュール
+
+ワイルドカード(``*report*``)や短い前方一致(``a*``)は語彙全体に展開されるため、
+検索前に語彙(lexicon)を調べて展開される語の数を見積もります。
+N-gramで索引化されたフィールドでは一致させたい文字列をN-gramの検索に書き換え、
+それ以外で展開が大きすぎる場合は出現数の多い語に絞って警告を返します。
+"""
+
+from dataclasses import dataclass, field
+import fnmatch
+import heapq
+import itertools
+import logging
+import re
+
+from whoosh.analysis import NgramTokenizer
+from whoosh.fields import FieldType
+from whoosh.query import And, NullQuery, Or, Phrase, Prefix, Query, Term, Wildcard
+from whoosh.reading import IndexReader
+
+from .cjk_analyzer import CJK_CHAR_CLASS, CJKBigramTokenizer
+
+# ワイルドカードの特殊文字
+_WILDCARD_CHARS = frozenset("*?[")
+
+# CJK文字だけからなる文字列
+_CJK_ONLY = re.compile(rf"[{CJK_CHAR_CLASS}]+")
+
+# CJKの連続部分を索引化するバイグラムの文字数
+_BIGRAM_LENGTH = 2
+
+
+@dataclass
+class QueryPlan:
+    """書き換え後のクエリと、利用者に伝える警告"""
+
+    query: Query
+    warnings: list[str] = field(default_factory=list)
+    rewritten: int = 0  # N-gramの検索に書き換えたパターンの数
+    capped: int = 0  # 展開する語を絞ったパターンの数
+
+
+class QueryPlanner:
+    """
+    ワイルドカード・前方一致クエリのコストガード
+
+    パターンごとに、まずフィールドのアナライザーでN-gramの検索に書き換えられるかを調べ、
+    書き換えられない場合は語彙を最大MAX_SCAN語まで走査して展開される語を数えます。
+    展開がMAX_EXPANSION語を超える場合は出現数の多い語だけのOR検索に置き換えます。
+    """
+
+    # 1つのパターンで展開する語の最大数
+    MAX_EXPANSION = 256
+    # 1つのパターンで走査する語彙の最大数
+    MAX_SCAN = 50_000
+
+    def __init__(self, max_expansion: int = MAX_EXPANSION, max_scan: int = MAX_SCAN):
+        """
+        QueryPlannerの初期化
+
+        Args:
+            max_expansion (int): 1つのパターンで展開する語の最大数
+            max_scan (int): 1つのパターンで走査する語彙の最大数
+        """
+        self.max_expansion = max_expansion
+        self.max_scan = max_scan
+        self.logger = logging.getLogger(__name__)
+
+    def plan(self, query: Query, reader: IndexReader) -> QueryPlan:
+        """
+        クエリ内のワイルドカード・前方一致を見積もり、必要に応じて書き換える
+
+        Args:
+            query (Query): 解析済みの検索クエリ
+            reader (IndexReader): 検索に使用するリーダー
+
+        Returns:
+            QueryPlan: 書き換え後のクエリと警告
+        """
+        plan = QueryPlan(query=query)
+        plan.query = self._rewrite(query, reader, plan)
+        return plan
+
+    def _rewrite(self, query: Query, reader: IndexReader, plan: QueryPlan) -> Query:
+        """
+        クエリを再帰的にたどってパターンを書き換える
+
+        Args:
+            query (Query): 対象のクエリ
+            reader (IndexReader): 検索に使用するリーダー
+            plan (QueryPlan): 警告と件数を記録するプラン
+
+        Returns:
+            Query: 書き換え後のクエリ
+        """
+        if isinstance(query, (Prefix, Wildcard)):
+            return self._rewrite_pattern(query, reader, plan)
+        if query.is_leaf():
+            return query
+        return query.apply(lambda child: self._rewrite(child, reader, plan))
+
+    def _rewrite_pattern(self, query: Prefix | Wildcard, reader: IndexReader, plan: QueryPlan) -> Query:
+        """
+        1つのパターンをN-gramの検索、または展開を絞ったOR検索に書き換える
+
+        Args:
+            query (Prefix | Wildcard): 対象のパターン
+            reader (IndexReader): 検索に使用するリーダー
+            plan (QueryPlan): 警告と件数を記録するプラン
+
+        Returns:
+            Query: 書き換え後のクエリ(問題がなければ元のクエリ)
+        """
+        fieldname = query.fieldname
+        if fieldname not in reader.schema:
+            return query
+        field_type = reader.schema[fieldname]
+
+        pattern = query.text + "*" if isinstance(query, Prefix) else query.text
+        literal = pattern.strip("*")
+        if literal and not _WILDCARD_CHARS.intersection(literal):
+            ngram_query = self._ngram_query(fieldname, field_type, literal, query.boost)
+            if ngram_query is not None:
+                plan.rewritten += 1
+                self.logger.debug(f"パターンをN-gram検索に書き換えました: {fieldname}:{pattern}")
+                return ngram_query
+
+        terms, scanned, complete = self._expand(query, reader, field_type, pattern)
+        if complete and len(terms) <= self.max_expansion:
+            return query
+
+        top_terms = heapq.nlargest(self.max_expansion, terms, key=lambda text: reader.doc_frequency(fieldname, text))
+        plan.capped += 1
+        warning = f"「{pattern}」に一致する語が多すぎるため、出現数の多い{len(top_terms)}語に絞って検索しました"
+        if warning not in plan.warnings:
+            plan.warnings.append(warning)
+        self.logger.info(
+            f"パターンの展開を制限しました: {fieldname}:{pattern}, "
+            f"走査={scanned}, 一致={len(terms)}, 採用={len(top_terms)}"
+        )
+        if not top_terms:
+            return NullQuery
+        return Or([Term(fieldname, text) for text in top_terms], boost=query.boost)
+
+    def _ngram_query(self, fieldname: str, field_type: FieldType, literal: str, boost: float) -> Query | None:
+        """
+        部分一致させたい文字列を、フィールドのN-gramの検索に書き換える
+
+        Args:
+            fieldname (str): フィールド名
+            field_type (FieldType): フィールドの型
+            literal (str): ワイルドカードを除いた文字列
+            boost (float): 元のクエリのブースト
+
+        Returns:
+            Query | None: N-gramの検索(書き換えられない場合はNone)
+        """
+        analyzer = getattr(field_type, "analyzer", None)
+        tokenizers = getattr(analyzer, "items", [analyzer])
+
+        for tokenizer in tokenizers:
+            if isinstance(tokenizer, NgramTokenizer):
+                # 最長のN-gramがすべて含まれるドキュメントに絞る(元の文字列より広い一致)
+                grams = {token.text for token in analyzer(literal, mode="index")}
+                longest = max((len(gram) for gram in grams), default=0)
+                if longest < tokenizer.min:
+                    return None
+                grams = sorted(gram for gram in grams if len(gram) == longest)
+                return self._all_terms(fieldname, grams, boost, phrase=False)
+
+            if isinstance(tokenizer, CJKBigramTokenizer):
+                # CJKの連続部分はバイグラム単位で索引化されているため、フレーズとして照合できる
+                if len(literal) < _BIGRAM_LENGTH or not _CJK_ONLY.fullmatch(literal):
+                    return None
+                grams = [token.text for token in analyzer(literal, mode="query")]
+                return self._all_terms(fieldname, grams, boost, phrase=field_type.format.supports("positions"))
+
+        return None
+
+    @staticmethod
+    def _all_terms(fieldname: str, grams: list[str], boost: float, phrase: bool) -> Query:
+        """
+        N-gramをすべて含むドキュメントのクエリを作成
+
+        Args:
+            fieldname (str): フィールド名
+            grams (List[str]): N-gram
+            boost (float): クエリのブースト
+            phrase (bool): 出現位置の連続まで確認する場合True
+
+        Returns:
+            Query: 作成されたクエリ
+        """
+        if len(grams) == 1:
+            return Term(fieldname, grams[0], boost=boost)
+        if phrase:
+            return Phrase(fieldname, grams, boost=boost)
+        return And([Term(fieldname, gram) for gram in grams], boost=boost)
+
+    def _expand(
+        self, query: Prefix | Wildcard, reader: IndexReader, field_type: FieldType, pattern: str
+    ) -> tuple[list[str], int, bool]:
+        """
+        パターンに一致する語を語彙から最大MAX_SCAN語まで走査して集める
+
+        Args:
+            query (Prefix | Wildcard): 対象のパターン
+            reader (IndexReader): 検索に使用するリーダー
+            field_type (FieldType): フィールドの型
+            pattern (str): グロブ形式のパターン
+
+        Returns:
+            Tuple[List[str], int, bool]: 一致した語、走査した語の数、語彙を最後まで走査した場合True
+        """
+        fieldname = query.fieldname
+        prefix = "".join(itertools.takewhile(lambda char: char not in _WILDCARD_CHARS, pattern))
+        if prefix:
+            candidates = reader.expand_prefix(fieldname, prefix)
+        else:
+            candidates = reader.lexicon(fieldname)
+
+        matcher = re.compile(fnmatch.translate(pattern)).match
+        terms: list[str] = []
+        scanned = 0
+        for btext in itertools.islice(candidates, self.max_scan + 1):
+            scanned += 1
+            if scanned > self.max_scan:
+                return terms, self.max_scan, False
+            text = field_type.from_bytes(btext)
+            if matcher(text):
+                terms.append(text)
+        return terms, scanned, True
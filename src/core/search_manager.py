@@ -7,22 +7,59 @@ SearchManager - ハイブリッド検索マネージャー
 
 from collections import defaultdict
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import re
 from typing import Any
 
-from ..data.models import Document, FileType, SearchQuery, SearchResult, SearchType
+from ..data.models import Document, SearchQuery, SearchResult, SearchResultPage, SearchType
+from ..data.search_history_repository import SearchHistoryRepository
 from ..utils.background_processor import TaskPriority, get_global_task_manager
 from ..utils.cache_manager import get_global_cache_manager
+from ..utils.config import get_config
 from ..utils.error_handler import get_global_error_handler, handle_exceptions
-from ..utils.exceptions import SearchError
+from ..utils.exceptions import SearchCancelledError, SearchError
 from ..utils.graceful_degradation import (
     get_global_degradation_manager,
     with_graceful_degradation,
 )
 from ..utils.logging_config import LoggerMixin
+from ..utils.maintenance_scheduler import get_global_maintenance_scheduler
+from ..utils.query_canonicalizer import conjunctive_terms, has_pattern_terms, normalize_query_text
+from .cancellation import CancellationToken, SearchDeadline
 from .embedding_manager import EmbeddingManager
-from .index_manager import IndexManager
+from .index_manager import IndexManager, folder_keys, normalize_folder
+from .sharded_index_manager import ShardedIndexManager
+
+# 入力中の検索で、最後の語を前方一致にしないクエリ構文の演算子
+_QUERY_OPERATORS = frozenset({"AND", "OR", "NOT", "ANDNOT", "ANDMAYBE", "TO"})
+
+# 入力中の検索で、前方一致にする最後の語の最小文字数
+_MIN_PREFIX_LENGTH = 2
+
+
+def prefix_query_text(query_text: str) -> str:
+    """
+    入力途中のクエリの最後の語を前方一致にしたクエリを作成(入力中の検索用)
+
+    引用符が閉じていない場合、最後の語が演算子の場合、記号やワイルドカードで
+    終わる場合、1文字の場合はそのまま返します。日本語などはN-gramで部分一致
+    するため、英数字で終わる語だけを前方一致にします。
+
+    Args:
+        query_text: 入力途中の検索クエリ
+
+    Returns:
+        最後の語に「*」を付けたクエリ
+    """
+    text = query_text.strip()
+    if not text or text.count('"') % 2:
+        return text
+    last_word = text.split()[-1]
+    if last_word in _QUERY_OPERATORS or len(last_word) < _MIN_PREFIX_LENGTH:
+        return text
+    if not (last_word[-1].isascii() and last_word[-1].isalnum()):
+        return text
+    return text + "*"
 
 
 @dataclass
@@ -40,6 +77,15 @@ class SearchWeights:
             self.semantic /= total
 
 
+@dataclass(frozen=True)
+class _PreviousSearch:
+    """絞り込み検索の候補に使う、条件に一致する結果をすべて含んだ直前の検索"""
+
+    query: SearchQuery  # 表記を揃えた検索クエリ
+    generation: Any  # 検索した時点の世代
+    doc_ids: frozenset[str]  # 検索結果のドキュメントID
+
+
 class SearchManager(LoggerMixin):
     """
     ハイブリッド検索マネージャークラス
@@ -51,30 +97,39 @@ class SearchManager(LoggerMixin):
 
     def __init__(
         self,
-        index_manager: IndexManager,
+        index_manager: IndexManager | ShardedIndexManager,
         embedding_manager: EmbeddingManager,
         config=None,
+        history_repository: SearchHistoryRepository | None = None,
     ):
         """
         SearchManagerを初期化
 
         Args:
-            index_manager: 全文検索を担当するIndexManager
+            index_manager: 全文検索を担当するIndexManager(またはShardedIndexManager)
             embedding_manager: セマンティック検索を担当するEmbeddingManager
-            config: 設定オブジェクト(オプション)
+            config: 設定オブジェクト(オプション。検索の時間予算は省略時にグローバル設定から読み込む)
+            history_repository: 検索履歴の記録と履歴からの検索提案に使うリポジトリ(オプション)
         """
         self.index_manager = index_manager
         self.embedding_manager = embedding_manager
         self.config = config
+        self.history_repository = history_repository
 
         # デフォルト検索設定
         self.default_weights = SearchWeights()
         self.min_semantic_similarity = 0.1  # セマンティック検索の最小類似度
         self.snippet_max_length = 200  # スニペットの最大長
+        # 1回の検索の時間予算(秒)。超えた場合は途中までの結果を返す
+        search_config = config if config is not None else get_config()
+        self.search_timeout = float(search_config.get("search_timeout", 5.0))
 
-        # 検索提案用のキャッシュ
+        # 検索提案用のキャッシュ(補完候補そのものはインデックス側の補完インデックスから取得)
         self._suggestion_cache: dict[str, list[str]] = {}
-        self._indexed_terms: set[str] = set()
+
+        # 直前の検索(語やフィルターを加えた検索は、この結果の中だけを照合する)
+        self._previous_search: _PreviousSearch | None = None
+        self._refined_search_count = 0
 
         # キャッシュマネージャーとタスクマネージャーを取得
         self._cache_manager = get_global_cache_manager()
@@ -98,6 +153,7 @@ class SearchManager(LoggerMixin):
 
                 # キャッシュをクリア
                 self.clear_suggestion_cache()
+                self._cache_manager.search_cache.invalidate_cache()
 
                 # インデックスマネージャーの状態をチェック
                 if hasattr(self.index_manager, "is_healthy") and not self.index_manager.is_healthy():
@@ -130,78 +186,458 @@ class SearchManager(LoggerMixin):
         attempt_recovery=True,
         reraise=True,
     )
-    def search(self, query: SearchQuery) -> list[SearchResult]:
+    def search(
+        self,
+        query: SearchQuery,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+        on_partial_results: Callable[[list[SearchResult]], None] | None = None,
+    ) -> list[SearchResult]:
         """
         統合検索を実行(キャッシュ機能付き)
 
+        時間予算を超えた段階は途中までの結果で打ち切り、deadline.truncatedで
+        不完全な結果であることを示します。打ち切った結果はキャッシュしません。
+
+        ハイブリッド検索では、先に終わる全文検索の結果をon_partial_resultsに渡してから
+        セマンティック検索を行い、統合して並べ替えた最終結果を返します。
+
         Args:
             query: 検索クエリオブジェクト
+            cancel_token: 実行中の検索を中断するためのトークン(オプション)
+            deadline: 検索の時間予算(省略時はsearch_timeoutから作成)
+            on_partial_results: 最終結果より先に得られた途中結果を受け取る関数(オプション、検索スレッドから呼ばれる)
 
         Returns:
             検索結果のリスト(関連度順)
 
         Raises:
             SearchError: 検索実行に失敗した場合
+            SearchCancelledError: 検索中にキャンセルが要求された場合
         """
         degradation_manager = get_global_degradation_manager()
+        if deadline is None:
+            deadline = SearchDeadline(self.search_timeout)
+        # キャッシュキーは入力したままのクエリから作る(正規化前と比べたヒット率の集計に使う)
+        raw_query_text = query.query_text
+        query = self._normalize_query(query)
+
+        # 検索中は保守処理(セグメントマージなど)を控えるよう通知
+        get_global_maintenance_scheduler().notify_activity()
 
         self.logger.info(f"検索開始: '{query.query_text}' (タイプ: {query.search_type.value})")
 
-        # キャッシュから結果を取得を試行
-        filters = {
-            "file_types": ([ft.value for ft in query.file_types] if query.file_types else None),
-            "date_from": query.date_from.isoformat() if query.date_from else None,
-            "date_to": query.date_to.isoformat() if query.date_to else None,
-            "folder_paths": query.folder_paths,
-            "limit": query.limit,
-            "weights": query.weights,
-        }
+        # キャッシュから結果を取得を試行(同じ条件でより多くの件数をキャッシュしていれば切り出す)
+        filters = self._cache_filters(query)
+        limit = self._resolve_limit(query)
+        # 検索中にインデックスが変わった場合に古い結果として扱われるよう、世代は検索前に取得する
+        generation = self._cache_generation(query.search_type)
 
         cached_results = self._cache_manager.search_cache.get_search_results(
-            query.query_text, query.search_type.value, filters
+            raw_query_text,
+            query.search_type.value,
+            filters,
+            limit=limit,
+            generation=generation,
+            load_document=self._get_document_by_id,
         )
 
         if cached_results is not None:
             self.logger.debug(f"キャッシュから検索結果を取得: {len(cached_results)}件")
+            self._remember_search(query, cached_results, limit, generation)
             return cached_results
 
-        # キャッシュにない場合は検索を実行
-        results = self._execute_search(query, degradation_manager)
+        # 直前の検索に語やフィルターを加えた検索は、直前の結果の中だけを照合する
+        doc_ids = self._refinement_candidates(query, generation)
+        if doc_ids is not None:
+            self._refined_search_count += 1
+            self.logger.debug(f"直前の検索結果({len(doc_ids)}件)を絞り込みます")
 
-        # 結果をキャッシュに保存
-        self._cache_manager.search_cache.cache_search_results(
-            query.query_text, query.search_type.value, results, filters
+        # キャッシュにない場合は検索を実行
+        results = self._execute_search(
+            query,
+            degradation_manager,
+            cancel_token=cancel_token,
+            deadline=deadline,
+            on_partial_results=on_partial_results,
+            doc_ids=doc_ids,
         )
 
+        if deadline.truncated:
+            self.logger.warning(self._truncation_message(deadline))
+        else:
+            # 結果をキャッシュに保存
+            self._cache_manager.search_cache.cache_search_results(
+                raw_query_text,
+                query.search_type.value,
+                results,
+                filters,
+                limit=limit,
+                generation=generation,
+                complete=self._is_exhaustive(query, results, limit),
+            )
+            self._remember_search(query, results, limit, generation)
+
         self.logger.info(f"検索完了: {len(results)}件の結果")
         return results
 
-    def _execute_search(self, query: SearchQuery, degradation_manager) -> list[SearchResult]:
-        """実際の検索処理を実行"""
+    def search_page(
+        self,
+        query: SearchQuery,
+        page: int = 1,
+        page_size: int = 20,
+        *,
+        sort_by: str = "relevance",
+        descending: bool = True,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+    ) -> SearchResultPage:
+        """
+        検索結果の1ページ分を並び替えて取得
+
+        全文検索はインデックス側で並び替えとページングを行い、表示するページだけを取得します。
+        関連度順の2ページ目以降は、同じ条件でキャッシュした深い結果があれば切り出して返します。
+        セマンティック・ハイブリッド検索は結果全体を取得してから並び替えます。
+
+        Args:
+            query: 検索クエリオブジェクト
+            page: ページ番号(1始まり)
+            page_size: 1ページあたりの件数
+            sort_by: 並び替えのキー("relevance"、"title"、"modified_date"、"size")
+            descending: 降順の場合True
+            cancel_token: 実行中の検索を中断するためのトークン(オプション)
+            deadline: 検索の時間予算(省略時はsearch_timeoutから作成)
+
+        Returns:
+            指定ページの検索結果と総件数(時間予算を超えた場合はtruncatedがTrue)
+
+        Raises:
+            SearchError: 検索実行に失敗した場合
+            SearchCancelledError: 検索中にキャンセルが要求された場合
+        """
+        if deadline is None:
+            deadline = SearchDeadline(self.search_timeout)
+
+        if query.search_type != SearchType.FULL_TEXT:
+            results = self._sort_results(self.search(query, cancel_token, deadline), sort_by, descending)
+            offset = (page - 1) * page_size
+            page_results = results[offset : offset + page_size]
+            for i, result in enumerate(page_results, offset + 1):
+                result.rank = i
+            result_page = SearchResultPage(results=page_results, page=page, page_size=page_size, total=len(results))
+            return self._flag_truncated_page(result_page, deadline)
+
+        if not get_global_degradation_manager().is_capability_available("search_manager", "full_text_search"):
+            raise SearchError("全文検索機能は現在利用できません")
+
+        get_global_maintenance_scheduler().notify_activity()
+        raw_query_text = query.query_text
+        query = self._normalize_query(query)
+
+        # 関連度順のページはキャッシュした結果の並びと同じため、切り出して使える
+        # (綴り訂正の候補は1ページ目にだけ付くため、1ページ目は常にインデックスで検索する)
+        cacheable = sort_by == "relevance" and descending
+        filters = self._cache_filters(query)
+        generation = self._cache_generation(query.search_type)
+        offset = (page - 1) * page_size
+        if cacheable and page > 1:
+            window = self._cache_manager.search_cache.get_result_window(
+                raw_query_text,
+                query.search_type.value,
+                filters,
+                offset,
+                page_size,
+                generation=generation,
+                load_document=self._get_document_by_id,
+            )
+            if window is not None:
+                page_results, total, total_is_exact = window
+                self.logger.debug(f"キャッシュした検索結果からページを取得: ページ={page}")
+                return SearchResultPage(
+                    results=page_results, page=page, page_size=page_size, total=total, total_is_exact=total_is_exact
+                )
+
+        try:
+            result_page = self.index_manager.search_page(
+                query_text=query.query_text,
+                page=page,
+                page_size=page_size,
+                sort_by=sort_by,
+                descending=descending,
+                file_types=query.file_types,
+                date_from=query.date_from,
+                date_to=query.date_to,
+                folder_paths=query.folder_paths or None,
+                cancel_token=cancel_token,
+                deadline=deadline,
+            )
+        except SearchCancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"ページ検索に失敗しました: {e}")
+            raise SearchError(f"全文検索エラー: {e}", query=query.query_text, search_type="full_text") from e
+
+        result_page.results = [
+            self._enhance_search_result(result, query.query_text, result.rank) for result in result_page.results
+        ]
+        if cacheable and not result_page.truncated and not deadline.truncated:
+            self._cache_manager.search_cache.cache_result_window(
+                raw_query_text,
+                query.search_type.value,
+                filters,
+                offset,
+                result_page.results,
+                total=result_page.total,
+                total_is_exact=result_page.total_is_exact,
+                generation=generation,
+            )
+        return self._flag_truncated_page(result_page, deadline)
+
+    @staticmethod
+    def _normalize_query(query: SearchQuery) -> SearchQuery:
+        """
+        クエリテキストの表記を揃える(全角・半角と空白の違いで結果やキャッシュが分かれないようにする)
+
+        Args:
+            query: 検索クエリオブジェクト
+
+        Returns:
+            表記を揃えたクエリ(変更がなければ元のクエリ)
+        """
+        query_text = normalize_query_text(query.query_text)
+        if query_text == query.query_text:
+            return query
+        return replace(query, query_text=query_text)
+
+    @staticmethod
+    def _cache_filters(query: SearchQuery) -> dict[str, Any]:
+        """検索結果キャッシュのキーに含める検索条件(件数は含めず、エントリの切り出しで扱う)"""
+        return {
+            "file_types": ([ft.value for ft in query.file_types] if query.file_types else None),
+            "date_from": query.date_from.isoformat() if query.date_from else None,
+            "date_to": query.date_to.isoformat() if query.date_to else None,
+            "folder_paths": query.folder_paths,
+            "weights": query.weights,
+        }
+
+    def _resolve_limit(self, query: SearchQuery) -> int:
+        """クエリの最大結果数(指定がない場合は設定から取得)"""
+        if query.limit is not None:
+            return query.limit
+        if self.config:
+            return self.config.get("search.max_results", 100)
+        return 100
+
+    def _cache_generation(self, search_type: SearchType) -> Any:
+        """
+        検索結果キャッシュの検証に使う世代
+
+        全文・ファイル名検索はインデックスの世代、埋め込みを使う検索は
+        埋め込みの世代も含めます。いずれかが変わるとキャッシュした結果は使われません。
+        """
+        index_generation = self.index_manager.get_generation()
+        if search_type in (SearchType.SEMANTIC, SearchType.HYBRID):
+            return index_generation, self.embedding_manager.generation
+        return index_generation
+
+    @staticmethod
+    def _is_exhaustive(query: SearchQuery, results: list[SearchResult], limit: int) -> bool:
+        """件数の上限で切られておらず、条件に一致する結果をすべて含む場合True"""
+        if len(results) >= limit:
+            return False
+        # 埋め込み検索はフォルダ指定を件数制限の後に適用するため、件数が少なくても上限で切られている場合がある
+        return not (query.folder_paths and query.search_type in (SearchType.SEMANTIC, SearchType.HYBRID))
+
+    def _remember_search(self, query: SearchQuery, results: list[SearchResult], limit: int, generation: Any) -> None:
+        """
+        条件に一致する結果をすべて含む検索を、次の絞り込み検索の候補として覚える
+
+        件数の上限で切られた検索は覚えません(以前に覚えた検索も世代が同じなら候補として正しいため残す)。
+        空の結果は劣化機能による空の場合と区別できないため覚えません。
+        ワイルドカード・前方一致を含む全文検索は、クエリプランナーが展開する語を絞ることがあり、
+        件数が上限未満でも一致するすべてのドキュメントとは限らないため覚えません。
+
+        Args:
+            query: 表記を揃えた検索クエリ
+            results: 検索結果
+            limit: 最大結果数
+            generation: 検索前に取得した世代
+        """
+        if not results or not self._is_exhaustive(query, results, limit):
+            return
+        if query.search_type in (SearchType.FULL_TEXT, SearchType.HYBRID) and has_pattern_terms(query.query_text):
+            return
+        # 呼び出し側がクエリのリストを変更しても影響を受けないよう複製する
+        remembered = replace(query, file_types=list(query.file_types), folder_paths=list(query.folder_paths))
+        self._previous_search = _PreviousSearch(
+            remembered, generation, frozenset(result.document.id for result in results)
+        )
+
+    def _refinement_candidates(self, query: SearchQuery, generation: Any) -> frozenset[str] | None:
+        """
+        絞り込み検索の候補を取得
+
+        Args:
+            query: 表記を揃えた検索クエリ
+            generation: 検索前に取得した世代
+
+        Returns:
+            直前の検索結果のドキュメントID(絞り込みでない場合、またはインデックスが変わった場合はNone)
+        """
+        previous = self._previous_search
+        if previous is None or previous.generation != generation:
+            return None
+        if not self._is_narrowing(previous.query, query):
+            return None
+        return previous.doc_ids
+
+    @staticmethod
+    def _is_narrowing(previous: SearchQuery, query: SearchQuery) -> bool:
+        """
+        直前の検索に条件を加えただけの検索かを判定
+
+        全文検索は語の追加、すべての検索タイプはファイルタイプ・日付範囲・フォルダの絞り込みを
+        条件の追加として扱います。埋め込みを使う検索は語を加えると別の結果になるため、
+        クエリが同じ場合だけを対象にします。
+
+        Args:
+            previous: 直前の検索クエリ
+            query: 今回の検索クエリ
+
+        Returns:
+            今回の結果が直前の結果に必ず含まれる場合True
+        """
+        if query.search_type != previous.search_type or query.search_type == SearchType.FILENAME:
+            return False
+        if query.weights != previous.weights:
+            return False
+
+        if query.query_text != previous.query_text:
+            if query.search_type != SearchType.FULL_TEXT:
+                return False
+            previous_terms = conjunctive_terms(previous.query_text)
+            terms = conjunctive_terms(query.query_text)
+            if previous_terms is None or terms is None or not previous_terms <= terms:
+                return False
+        return SearchManager._narrows_filters(previous, query)
+
+    @staticmethod
+    def _narrows_filters(previous: SearchQuery, query: SearchQuery) -> bool:
+        """
+        ファイルタイプ・日付範囲・フォルダの指定が直前の検索と同じか、より狭いかを判定
+
+        Args:
+            previous: 直前の検索クエリ
+            query: 今回の検索クエリ
+
+        Returns:
+            すべての絞り込み条件が直前の条件に含まれる場合True
+        """
+        if previous.file_types and not (query.file_types and set(query.file_types) <= set(previous.file_types)):
+            return False
+        if previous.date_from and not (query.date_from and query.date_from >= previous.date_from):
+            return False
+        if previous.date_to and not (query.date_to and query.date_to <= previous.date_to):
+            return False
+        if previous.folder_paths:
+            # 直前に指定したフォルダかその配下のフォルダだけを指定した場合
+            folders = {normalize_folder(path) for path in previous.folder_paths}
+            if not query.folder_paths or not all(
+                folders.intersection([normalize_folder(path), *folder_keys(path)]) for path in query.folder_paths
+            ):
+                return False
+        return True
+
+    def _flag_truncated_page(self, result_page: SearchResultPage, deadline: SearchDeadline) -> SearchResultPage:
+        """時間予算を超えた場合、ページに打ち切りの印と利用者向けの警告を付ける"""
+        if deadline.truncated:
+            message = self._truncation_message(deadline)
+            self.logger.warning(message)
+            result_page.truncated = True
+            result_page.total_is_exact = False
+            result_page.warnings.append(message)
+        return result_page
+
+    @staticmethod
+    def _truncation_message(deadline: SearchDeadline) -> str:
+        """時間予算を超えて打ち切ったことを伝えるメッセージ"""
+        stages = "、".join(deadline.truncated_stages)
+        return f"時間制限({deadline.timeout:g}秒)のため{stages}を打ち切りました。結果は一部のみです"
+
+    def find_similar(self, doc_id: str, limit: int | None = None) -> list[SearchResult]:
+        """
+        指定したドキュメントに似たドキュメントを検索(埋め込みモデルを使わない)
+
+        Args:
+            doc_id: 元のドキュメントのID
+            limit: 最大結果数(Noneの場合は設定から取得)
+
+        Returns:
+            類似度順の検索結果のリスト
+
+        Raises:
+            SearchError: 検索実行に失敗した場合
+        """
+        if limit is None:
+            limit = self.config.get("search.max_results", 100) if self.config else 100
+
+        get_global_maintenance_scheduler().notify_activity()
+
+        try:
+            return self.index_manager.find_similar(doc_id, limit=limit)
+        except Exception as e:
+            self.logger.error(f"類似ドキュメント検索に失敗しました: {e}")
+            raise SearchError(f"類似ドキュメント検索エラー: {e}", search_type="full_text") from e
+
+    def _sort_results(self, results: list[SearchResult], sort_by: str, descending: bool) -> list[SearchResult]:
+        """検索結果をメモリ上で並び替え(インデックスで並び替えできない検索タイプ用)"""
+        sort_keys: dict[str, Callable[[SearchResult], Any]] = {
+            "relevance": lambda result: result.score,
+            "title": lambda result: result.document.title,
+            "modified_date": lambda result: result.document.modified_date,
+            "size": lambda result: result.document.size,
+        }
+        if sort_by not in sort_keys:
+            raise SearchError(f"サポートされていない並び替えキー: {sort_by}")
+        return sorted(results, key=sort_keys[sort_by], reverse=descending)
+
+    def _execute_search(
+        self,
+        query: SearchQuery,
+        degradation_manager,
+        *,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+        on_partial_results: Callable[[list[SearchResult]], None] | None = None,
+        doc_ids: frozenset[str] | None = None,
+    ) -> list[SearchResult]:
+        """実際の検索処理を実行(doc_idsを指定した場合は、そのドキュメントだけを照合する)"""
         # 検索タイプに応じて機能の可用性をチェック
         if query.search_type == SearchType.FULL_TEXT:
             if not degradation_manager.is_capability_available("search_manager", "full_text_search"):
                 raise SearchError("全文検索機能は現在利用できません")
-            results = self._full_text_search(query)
+            results = self._full_text_search(query, cancel_token, deadline, doc_ids)
         elif query.search_type == SearchType.SEMANTIC:
             if not degradation_manager.is_capability_available("search_manager", "semantic_search"):
                 raise SearchError("セマンティック検索機能は現在利用できません")
-            results = self._semantic_search(query)
+            results = self._semantic_search(query, cancel_token, deadline, doc_ids)
         elif query.search_type == SearchType.HYBRID:
             if not degradation_manager.is_capability_available("search_manager", "hybrid_search"):
                 # ハイブリッド検索が利用できない場合、利用可能な検索にフォールバック
                 if degradation_manager.is_capability_available("search_manager", "full_text_search"):
                     self.logger.warning("ハイブリッド検索が利用できないため、全文検索にフォールバック")
                     query.search_type = SearchType.FULL_TEXT
-                    results = self._full_text_search(query)
+                    results = self._full_text_search(query, cancel_token, deadline, doc_ids)
                 elif degradation_manager.is_capability_available("search_manager", "semantic_search"):
                     self.logger.warning("ハイブリッド検索が利用できないため、セマンティック検索にフォールバック")
                     query.search_type = SearchType.SEMANTIC
-                    results = self._semantic_search(query)
+                    results = self._semantic_search(query, cancel_token, deadline, doc_ids)
                 else:
                     raise SearchError("検索機能は現在利用できません")
             else:
-                results = self._hybrid_search(query)
+                results = self._hybrid_search(query, cancel_token, deadline, on_partial_results, doc_ids)
+        elif query.search_type == SearchType.FILENAME:
+            results = self._filename_search(query)
         else:
             raise SearchError(f"サポートされていない検索タイプ: {query.search_type}")
 
@@ -214,7 +650,13 @@ class SearchManager(LoggerMixin):
         disable_capabilities=["full_text_search", "hybrid_search"],
         fallback_return=[],
     )
-    def _full_text_search(self, query: SearchQuery) -> list[SearchResult]:
+    def _full_text_search(
+        self,
+        query: SearchQuery,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+        doc_ids: frozenset[str] | None = None,
+    ) -> list[SearchResult]:
         """全文検索を実行"""
         try:
             # limitが指定されていない場合は設定から取得
@@ -224,12 +666,17 @@ class SearchManager(LoggerMixin):
             elif limit is None:
                 limit = 100
 
+            # フォルダ指定はインデックス側のフィルターとして件数制限の前に適用される
             results = self.index_manager.search_text(
                 query_text=query.query_text,
                 limit=limit,
                 file_types=query.file_types,
                 date_from=query.date_from,
                 date_to=query.date_to,
+                folder_paths=query.folder_paths or None,
+                cancel_token=cancel_token,
+                deadline=deadline,
+                doc_ids=doc_ids,
             )
 
             # 検索結果を強化
@@ -240,16 +687,45 @@ class SearchManager(LoggerMixin):
 
             return enhanced_results
 
+        except SearchCancelledError:
+            raise
         except Exception as e:
             self.logger.error(f"全文検索に失敗しました: {e}")
             raise SearchError(f"全文検索エラー: {e}", query=query.query_text, search_type="full_text") from e
 
+    def _filename_search(self, query: SearchQuery) -> list[SearchResult]:
+        """ファイル名・パスの部分一致検索を実行"""
+        try:
+            limit = query.limit
+            if limit is None and self.config:
+                limit = self.config.get("search.max_results", 100)
+            elif limit is None:
+                limit = 100
+
+            results = self.index_manager.search_filenames(
+                query_text=query.query_text,
+                limit=limit,
+                file_types=query.file_types,
+                folder_paths=query.folder_paths or None,
+            )
+            return [self._enhance_search_result(result, query.query_text, i + 1) for i, result in enumerate(results)]
+
+        except Exception as e:
+            self.logger.error(f"ファイル名検索に失敗しました: {e}")
+            raise SearchError(f"ファイル名検索エラー: {e}", query=query.query_text, search_type="filename") from e
+
     @with_graceful_degradation(
         "search_manager",
         disable_capabilities=["semantic_search", "hybrid_search"],
         fallback_return=[],
     )
-    def _semantic_search(self, query: SearchQuery) -> list[SearchResult]:
+    def _semantic_search(
+        self,
+        query: SearchQuery,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+        doc_ids: frozenset[str] | None = None,
+    ) -> list[SearchResult]:
         """セマンティック検索を実行"""
         try:
             # limitが指定されていない場合は設定から取得
@@ -263,6 +739,9 @@ class SearchManager(LoggerMixin):
                 query_text=query.query_text,
                 limit=limit,
                 min_similarity=self.min_semantic_similarity,
+                cancel_token=cancel_token,
+                deadline=deadline,
+                doc_ids=doc_ids,
             )
 
             results = []
@@ -280,8 +759,11 @@ class SearchManager(LoggerMixin):
                     )
                     results.append(search_result)
 
-            return results
+            # 埋め込み検索にはインデックスのフィルターが効かないため、フォルダ指定はここで適用する
+            return self._filter_by_folder_paths(results, query.folder_paths)
 
+        except SearchCancelledError:
+            raise
         except Exception as e:
             self.logger.error(f"セマンティック検索に失敗しました: {e}")
             raise SearchError(
@@ -290,8 +772,15 @@ class SearchManager(LoggerMixin):
                 search_type="semantic",
             ) from e
 
-    def _hybrid_search(self, query: SearchQuery) -> list[SearchResult]:
-        """ハイブリッド検索を実行"""
+    def _hybrid_search(
+        self,
+        query: SearchQuery,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+        on_partial_results: Callable[[list[SearchResult]], None] | None = None,
+        doc_ids: frozenset[str] | None = None,
+    ) -> list[SearchResult]:
+        """ハイブリッド検索を実行(全文検索の結果はセマンティック検索の前に途中結果として渡す)"""
         try:
             weights = SearchWeights(
                 full_text=query.weights.get("full_text", self.default_weights.full_text),
@@ -313,8 +802,18 @@ class SearchManager(LoggerMixin):
                 file_types=query.file_types,
                 date_from=query.date_from,
                 date_to=query.date_to,
+                folder_paths=query.folder_paths,
             )
-            full_text_results = self._full_text_search(full_text_query)
+            full_text_results = self._full_text_search(full_text_query, cancel_token, deadline, doc_ids)
+
+            # 埋め込みの走査を待たずに表示できるよう、全文検索の結果を先に渡す
+            if on_partial_results is not None and full_text_results:
+                on_partial_results(self._post_process_results(list(full_text_results), query))
+
+            # 全文検索で時間予算を使い切った場合は、セマンティック検索を行わず全文検索の結果だけを返す
+            if deadline is not None and deadline.expired:
+                deadline.mark_truncated("セマンティック検索")
+                return self._merge_search_results(full_text_results, [], weights)[:limit]
 
             # セマンティック検索を実行
             semantic_query = SearchQuery(
@@ -324,14 +823,17 @@ class SearchManager(LoggerMixin):
                 file_types=query.file_types,
                 date_from=query.date_from,
                 date_to=query.date_to,
+                folder_paths=query.folder_paths,
             )
-            semantic_results = self._semantic_search(semantic_query)
+            semantic_results = self._semantic_search(semantic_query, cancel_token, deadline, doc_ids)
 
             # 結果をマージ
             merged_results = self._merge_search_results(full_text_results, semantic_results, weights)
 
             return merged_results[:limit]
 
+        except SearchCancelledError:
+            raise
         except Exception as e:
             self.logger.error(f"ハイブリッド検索に失敗しました: {e}")
             raise SearchError(f"ハイブリッド検索エラー: {e}") from e
@@ -406,10 +908,11 @@ class SearchManager(LoggerMixin):
 
     def _enhance_search_result(self, result: SearchResult, query_text: str, rank: int) -> SearchResult:
         """検索結果を強化"""
-        enhanced_snippet = self._generate_snippet(result.document.content, query_text)
         enhanced_terms = self._extract_query_terms(query_text)
 
-        result.snippet = enhanced_snippet
+        # インデックス側で一致箇所から切り出したスニペットはそのまま使う
+        if not result.snippet:
+            result.snippet = self._generate_snippet(result.document.content, query_text)
         result.highlighted_terms = enhanced_terms
         result.rank = rank
 
@@ -462,47 +965,7 @@ class SearchManager(LoggerMixin):
 
     def _get_document_by_id(self, doc_id: str) -> Document | None:
         """ドキュメントIDからDocumentオブジェクトを取得"""
-        try:
-            with self.index_manager._index.searcher() as searcher:
-                from whoosh.query import Term
-
-                results = searcher.search(Term("id", doc_id), limit=1)
-
-                if results:
-                    hit = results[0]
-                    # メタデータの復元
-                    metadata = {}
-                    metadata_str = hit.get("metadata", "")
-                    if metadata_str:
-                        try:
-                            import ast
-
-                            metadata = ast.literal_eval(metadata_str)
-                            if not isinstance(metadata, dict):
-                                metadata = {}
-                        except (ValueError, SyntaxError) as e:
-                            self.logger.warning(f"メタデータの復元に失敗しました: {e}")
-                            metadata = {}
-
-                    document = Document(
-                        id=hit["id"],
-                        file_path=hit["file_path"],
-                        title=hit["title"],
-                        content=hit["content"],
-                        file_type=FileType(hit["file_type"]),
-                        size=hit["size"],
-                        created_date=hit["created_date"],
-                        modified_date=hit["modified_date"],
-                        indexed_date=hit["indexed_date"],
-                        content_hash=hit["content_hash"],
-                        metadata=metadata,
-                    )
-                    return document
-
-        except Exception as e:
-            self.logger.error(f"ドキュメント取得に失敗しました: {doc_id} - {e}")
-
-        return None
+        return self.index_manager.get_document(doc_id)
 
     def _extract_query_terms(self, query_text: str) -> list[str]:
         """検索クエリから用語を抽出"""
@@ -523,10 +986,6 @@ class SearchManager(LoggerMixin):
         # 重複除去
         unique_results = self._remove_duplicate_results(results)
 
-        # フォルダパスフィルタリング
-        if query.folder_paths:
-            unique_results = self._filter_by_folder_paths(unique_results, query.folder_paths)
-
         # スコア順でソート
         unique_results.sort(key=lambda x: x.score, reverse=True)
 
@@ -561,18 +1020,25 @@ class SearchManager(LoggerMixin):
         if not folder_paths:
             return results
 
-        filtered_results = []
-        for result in results:
-            file_path = result.document.file_path
-            for folder_path in folder_paths:
-                if file_path.startswith(folder_path):
-                    filtered_results.append(result)
-                    break
-
-        return filtered_results
+        # インデックスのfolderフィールドと同じく、フォルダ境界で判定する
+        folders = {normalize_folder(path) for path in folder_paths}
+        return [result for result in results if folders.intersection(folder_keys(result.document.file_path))]
 
     def get_search_suggestions(self, partial_query: str, limit: int = 10) -> list[str]:
-        """検索提案を生成"""
+        """
+        検索提案を生成
+
+        過去に検索したクエリ(使用回数と新しさの順)を先に、続けて入力中の最後の語を
+        インデックスの補完インデックスで前方一致検索した補完(出現ドキュメント数の多い順)を
+        重複を除いて並べます。補完ではそれより前の語はそのまま残します。
+
+        Args:
+            partial_query: 入力途中の検索クエリ
+            limit: 最大件数
+
+        Returns:
+            補完した検索クエリのリスト
+        """
         try:
             if not partial_query or len(partial_query) < 2:
                 return []
@@ -582,22 +1048,17 @@ class SearchManager(LoggerMixin):
             if cache_key in self._suggestion_cache:
                 return self._suggestion_cache[cache_key][:limit]
 
-            suggestions = []
-
-            # インデックス化された用語から提案を生成
-            if not self._indexed_terms:
-                self._build_suggestion_index()
+            suggestions = self._history_suggestions(partial_query, limit)
 
-            # 部分一致する用語を検索
-            partial_lower = partial_query.lower()
-            for term in self._indexed_terms:
-                if term.startswith(partial_lower):
-                    suggestions.append(term)
-                    if len(suggestions) >= limit * 2:
-                        break
-
-            # 関連度でソート
-            suggestions.sort(key=lambda x: (len(x), x))
+            head, _, last_word = partial_query.rpartition(" ")
+            if last_word:
+                prefix = f"{head} " if head else ""
+                seen = {suggestion.lower() for suggestion in suggestions}
+                for term, _ in self.index_manager.complete_terms(last_word, limit):
+                    completion = prefix + term
+                    if completion.lower() not in seen:
+                        seen.add(completion.lower())
+                        suggestions.append(completion)
 
             # キャッシュに保存
             self._suggestion_cache[cache_key] = suggestions
@@ -608,49 +1069,57 @@ class SearchManager(LoggerMixin):
             self.logger.error(f"検索提案の生成に失敗しました: {e}")
             return []
 
-    def _build_suggestion_index(self) -> None:
-        """検索提案用のインデックスを構築"""
-        try:
-            self.logger.info("検索提案インデックスを構築中...")
-
-            with self.index_manager._index.searcher() as searcher:
-                # 全ドキュメントを取得
-                from whoosh.query import Every
-
-                results = searcher.search(Every(), limit=None)
-
-                for hit in results:
-                    content = hit.get("content", "")
-                    title = hit.get("title", "")
-
-                    terms = self._extract_indexable_terms(title + " " + content)
-                    self._indexed_terms.update(terms)
+    def _history_suggestions(self, partial_query: str, limit: int) -> list[str]:
+        """
+        検索履歴から検索提案を取得(履歴が使えない場合は空)
 
-            self.logger.info(f"検索提案インデックス構築完了: {len(self._indexed_terms)}用語")
+        Args:
+            partial_query: 入力途中の検索クエリ
+            limit: 最大件数
 
+        Returns:
+            過去に検索したクエリのリスト
+        """
+        if self.history_repository is None:
+            return []
+        try:
+            return self.history_repository.get_search_suggestions(partial_query, limit)
         except Exception as e:
-            self.logger.error(f"検索提案インデックスの構築に失敗しました: {e}")
-
-    def _extract_indexable_terms(self, text: str) -> set[str]:
-        """テキストからインデックス可能な用語を抽出"""
-        terms = set()
-
-        # 英語の単語
-        english_words = re.findall(r"\b[a-zA-Z]{2,}\b", text)
-        terms.update(word.lower() for word in english_words)
+            self.logger.debug(f"検索履歴からの提案の取得に失敗しました: {e}")
+            return []
 
-        # 日本語の単語(ひらがな、カタカナ、漢字のUnicode範囲)
-        japanese_words = re.findall(r"[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]{2,}", text)
-        terms.update(japanese_words)
+    def record_search(self, query: SearchQuery, result_count: int, execution_time: float) -> None:
+        """
+        実行した検索を検索履歴に記録し、検索提案に反映する
 
-        return terms
+        Args:
+            query: 実行した検索クエリ
+            result_count: 結果数
+            execution_time: 実行時間(秒)
+        """
+        # 検索履歴のテーブルが受け付けるのは全文・セマンティック・ハイブリッド検索のみ
+        query_text = query.query_text.strip()
+        if (
+            self.history_repository is None
+            or not query_text
+            or query.search_type not in (SearchType.FULL_TEXT, SearchType.SEMANTIC, SearchType.HYBRID)
+        ):
+            return
+        try:
+            self.history_repository.add_search_record(
+                query_text, query.search_type, result_count, int(execution_time * 1000)
+            )
+            self._suggestion_cache.clear()
+        except Exception as e:
+            self.logger.warning(f"検索履歴の記録に失敗しました: {e}")
 
     def clear_suggestion_cache(self) -> None:
-        """検索提案キャッシュをクリア"""
+        """
+        検索提案キャッシュをクリア
+
+        検索結果キャッシュはインデックスの世代で検証するため、ここではクリアしません。
+        """
         self._suggestion_cache.clear()
-        self._indexed_terms.clear()
-        # グローバルキャッシュもクリア
-        self._cache_manager.search_cache.invalidate_cache()
         self.logger.info("検索提案キャッシュをクリアしました")
 
     def search_async(
@@ -707,8 +1176,15 @@ class SearchManager(LoggerMixin):
         return {
             "indexed_documents": self.index_manager.get_document_count(),
             "cached_embeddings": len(self.embedding_manager.embeddings),
-            "suggestion_terms": len(self._indexed_terms),
+            "suggestion_terms": self.index_manager.get_completion_size(),
             "suggestion_cache_size": len(self._suggestion_cache),
+            "refined_searches": self._refined_search_count,
+            # 正規化したキーでのヒット率と、正規化しなかった場合のヒット率
+            "cache_hit_rates": {
+                "search_results": self._cache_manager.search_cache.canonical_stats.snapshot(),
+                "query_embeddings": self.embedding_manager.query_cache_stats.snapshot(),
+                "filters": self.index_manager.get_filter_cache_stats(),
+            },
             "default_weights": {
                 "full_text": self.default_weights.full_text,
                 "semantic": self.default_weights.semantic,
@@ -724,8 +1200,13 @@ class SearchManager(LoggerMixin):
 
         if "min_semantic_similarity" in kwargs:
             self.min_semantic_similarity = kwargs["min_semantic_similarity"]
+            # 類似度の下限が変わると、直前の結果は絞り込みの候補として使えない
+            self._previous_search = None
 
         if "snippet_max_length" in kwargs:
             self.snippet_max_length = kwargs["snippet_max_length"]
 
+        if "search_timeout" in kwargs:
+            self.search_timeout = float(kwargs["search_timeout"])
+
         self.logger.info("検索設定を更新しました")
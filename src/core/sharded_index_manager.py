@@ -0,0 +1,810 @@
+"""
+フォルダ単位のシャードインデックス管理モジュール
+
+インデックス対象フォルダ(Config.get_indexed_folders()のルート)ごとに独立した
+Whooshインデックス(シャード)を持ち、検索時は対象シャードへ並列に問い合わせて
+上位k件をヒープでマージします。フォルダの削除や再構築は該当シャードだけで完結します。
+"""
+
+from collections import defaultdict
+from collections.abc import Callable, Collection
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+from pathlib import Path
+import shutil
+import threading
+from typing import Any
+
+from whoosh.reading import MultiReader
+from whoosh.searching import Searcher
+
+from ..data.models import Document, FileType, SearchResult, SearchResultPage
+from ..utils.config import Config
+from ..utils.exceptions import IndexingError, SearchError
+from ..utils.query_canonicalizer import CanonicalHitStats
+from .cancellation import CancellationToken, SearchDeadline
+from .index_manager import IndexManager
+
+
+def _normalize_path(path: str) -> str:
+    """
+    パスの比較用に正規化
+
+    Args:
+        path (str): 正規化するパス
+
+    Returns:
+        str: 区切り文字と大文字小文字(Windows)を揃えたパス
+    """
+    return os.path.normcase(os.path.normpath(path))
+
+
+def _is_under(path: str, root: str) -> bool:
+    """
+    パスがルートフォルダ配下(ルート自身を含む)かどうかを判定
+
+    Args:
+        path (str): 正規化済みのパス
+        root (str): 正規化済みのルートフォルダ
+
+    Returns:
+        bool: 配下にある場合True
+    """
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+class ShardedIndexManager:
+    """
+    フォルダ単位のシャードインデックス管理クラス
+
+    IndexManagerと同じ公開APIを提供し、ドキュメントはファイルパスから
+    最も深く一致するルートフォルダのシャードへ振り分けます。
+    どのルートにも属さないドキュメントは既定シャードに格納します。
+
+    スコアは各シャードの統計(文書頻度など)に基づくため、シャード間の
+    マージは各シャードで正規化済みのスコアをそのまま比較して行います。
+    """
+
+    # シャードを格納するサブディレクトリ名
+    SHARDS_DIR = "shards"
+    # どのルートフォルダにも属さないドキュメント用のシャード名
+    DEFAULT_SHARD = "default"
+
+    def __init__(self, index_path: str, folders: list[str] | None = None, max_workers: int | None = None):
+        """
+        ShardedIndexManagerの初期化
+
+        Args:
+            index_path (str): シャードを保存するディレクトリパス
+            folders (List[str], optional): シャードを作成するルートフォルダのリスト
+            max_workers (int, optional): 並列検索のワーカースレッド数(省略時はCPU数)
+        """
+        self.index_path = Path(index_path)
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        # 正規化済みルートフォルダ -> シャード
+        self._shards: dict[str, IndexManager] = {}
+        self._lock = threading.RLock()
+        # 再構築中の新しいインデックスのID -> (再構築するシャード, 新しいインデックス)
+        self._rebuilds: dict[int, tuple[IndexManager, IndexManager]] = {}
+
+        self._default_shard = IndexManager(str(self.index_path / self.SHARDS_DIR / self.DEFAULT_SHARD))
+        for folder in folders or []:
+            self.add_folder(folder)
+
+        self.logger.info(f"シャードインデックスを初期化しました: {len(self._shards)}フォルダ")
+
+    def _shard_dir(self, root: str) -> Path:
+        """
+        ルートフォルダに対応するシャードのディレクトリを取得
+
+        Args:
+            root (str): 正規化済みのルートフォルダ
+
+        Returns:
+            Path: シャードのディレクトリ
+        """
+        digest = hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+        return self.index_path / self.SHARDS_DIR / digest
+
+    @property
+    def folders(self) -> list[str]:
+        """シャードを持つルートフォルダ(正規化済み)のリスト"""
+        with self._lock:
+            return list(self._shards)
+
+    def _all_shards(self) -> list[IndexManager]:
+        """既定シャードを含むすべてのシャードを取得"""
+        with self._lock:
+            return [*self._shards.values(), self._default_shard]
+
+    def add_folder(self, folder_path: str) -> IndexManager:
+        """
+        ルートフォルダのシャードを追加(既存のシャードがあれば開く)
+
+        Args:
+            folder_path (str): ルートフォルダのパス
+
+        Returns:
+            IndexManager: フォルダのシャード
+        """
+        root = _normalize_path(folder_path)
+        with self._lock:
+            if root not in self._shards:
+                self._shards[root] = IndexManager(str(self._shard_dir(root)))
+                self.logger.info(f"シャードを追加しました: {folder_path}")
+            return self._shards[root]
+
+    def drop_folder(self, folder_path: str) -> None:
+        """
+        ルートフォルダのシャードを削除
+
+        他のシャードには触れずに、シャードのディレクトリごと削除します。
+
+        Args:
+            folder_path (str): ルートフォルダのパス
+        """
+        root = _normalize_path(folder_path)
+        with self._lock:
+            shard = self._shards.pop(root, None)
+
+        if shard is None:
+            self.logger.warning(f"シャードが存在しません: {folder_path}")
+            return
+
+        try:
+            shard.close()
+            if shard.index_path.exists():
+                shutil.rmtree(shard.index_path)
+            self.logger.info(f"シャードを削除しました: {folder_path}")
+
+        except Exception as e:
+            error_msg = f"シャードの削除に失敗しました: {folder_path} - {e}"
+            self.logger.error(error_msg)
+            raise IndexingError(error_msg) from e
+
+    def rebuild_folder(self, folder_path: str, documents: list[Document], procs: int = 1) -> None:
+        """
+        ルートフォルダのシャードだけを再構築
+
+        Args:
+            folder_path (str): ルートフォルダのパス
+            documents (List[Document]): フォルダ内のドキュメントのリスト
+            procs (int): セグメントを構築するワーカープロセス数
+        """
+        self.add_folder(folder_path).rebuild_index(documents, procs=procs)
+
+    def shard_for_path(self, file_path: str) -> IndexManager:
+        """
+        ファイルパスが属するシャードを取得
+
+        複数のルートが入れ子になっている場合は最も深いルートを優先します。
+
+        Args:
+            file_path (str): ファイルパス
+
+        Returns:
+            IndexManager: 振り分け先のシャード
+        """
+        path = _normalize_path(file_path)
+        with self._lock:
+            matches = [root for root in self._shards if _is_under(path, root)]
+            if not matches:
+                return self._default_shard
+            return self._shards[max(matches, key=len)]
+
+    def select_shards(self, folder_paths: list[str] | None = None) -> list[IndexManager]:
+        """
+        フォルダパスの指定から検索対象のシャードを選択
+
+        指定フォルダがルート配下にある場合はそのルートのシャードを、
+        指定フォルダがルートを含む場合は含まれるすべてのシャードを選択します。
+
+        Args:
+            folder_paths (List[str], optional): 絞り込むフォルダパス(Noneの場合は全シャード)
+
+        Returns:
+            List[IndexManager]: 検索対象のシャード
+        """
+        if not folder_paths:
+            return self._all_shards()
+
+        selected: dict[int, IndexManager] = {}
+        with self._lock:
+            for folder_path in folder_paths:
+                folder = _normalize_path(folder_path)
+                covering = [root for root in self._shards if _is_under(folder, root)]
+                contained = [root for root in self._shards if _is_under(root, folder)]
+
+                if covering:
+                    shard = self._shards[max(covering, key=len)]
+                    selected[id(shard)] = shard
+                else:
+                    # ルート外のフォルダは既定シャードに格納されている可能性がある
+                    selected[id(self._default_shard)] = self._default_shard
+                for root in contained:
+                    selected[id(self._shards[root])] = self._shards[root]
+
+        return list(selected.values())
+
+    def create_index(self) -> None:
+        """すべてのシャードを作り直す"""
+        for shard in self._all_shards():
+            shard.create_index()
+
+    def add_document(self, doc: Document) -> None:
+        """
+        ドキュメントを振り分け先のシャードに追加
+
+        Args:
+            doc (Document): 追加するドキュメント
+        """
+        self.shard_for_path(doc.file_path).add_document(doc)
+
+    def update_document(self, doc: Document) -> None:
+        """
+        ドキュメントを振り分け先のシャードで更新
+
+        Args:
+            doc (Document): 更新するドキュメント
+        """
+        self.shard_for_path(doc.file_path).update_document(doc)
+
+    def remove_document(self, doc_id: str) -> None:
+        """
+        ドキュメントを保持しているシャードから削除
+
+        Args:
+            doc_id (str): 削除するドキュメントのID
+        """
+        for shard in self._all_shards():
+            if shard.document_exists(doc_id):
+                shard.remove_document(doc_id)
+
+    def stage_document(self, doc: Document) -> None:
+        """
+        ドキュメントの追加・更新を振り分け先のシャードのデルタセグメントにためる
+
+        Args:
+            doc (Document): 追加・更新するドキュメント
+        """
+        self.shard_for_path(doc.file_path).stage_document(doc)
+
+    def stage_removal(self, doc_id: str) -> None:
+        """
+        ドキュメントの削除を保持しているシャードのデルタセグメントにためる
+
+        Args:
+            doc_id (str): 削除するドキュメントのID
+        """
+        for shard in self._all_shards():
+            if shard.document_exists(doc_id):
+                shard.stage_removal(doc_id)
+
+    def flush_delta(self) -> int:
+        """
+        すべてのシャードのデルタセグメントをディスクのインデックスに反映
+
+        Returns:
+            int: 反映した変更の件数の合計
+        """
+        return sum(shard.flush_delta() for shard in self._all_shards())
+
+    def get_delta_size(self) -> int:
+        """
+        全シャードで未反映の変更の件数を取得
+
+        Returns:
+            int: デルタセグメント内の変更の件数の合計
+        """
+        return sum(shard.get_delta_size() for shard in self._all_shards())
+
+    def clear_index(self) -> None:
+        """すべてのシャードをクリア"""
+        for shard in self._all_shards():
+            shard.clear_index()
+
+    def rebuild_index(self, documents: list[Document], procs: int = 1) -> None:
+        """
+        すべてのシャードを再構築
+
+        Args:
+            documents (List[Document]): インデックス化するドキュメントのリスト
+            procs (int): シャードごとにセグメントを構築するワーカープロセス数
+        """
+        grouped: dict[int, list[Document]] = {id(shard): [] for shard in self._all_shards()}
+        for doc in documents:
+            grouped[id(self.shard_for_path(doc.file_path))].append(doc)
+
+        for shard in self._all_shards():
+            shard.rebuild_index(grouped[id(shard)], procs=procs)
+
+    def begin_rebuild(self, folder_path: str | None = None) -> IndexManager:
+        """
+        ルートフォルダのシャードの再構築を開始
+
+        返されたIndexManagerにフォルダ内のドキュメントを追加し、commit_rebuildで
+        シャードと入れ替えます。他のシャードには触れず、その間も検索できます。
+
+        Args:
+            folder_path (str): 再構築するルートフォルダのパス(シャードがなければ追加する)
+
+        Returns:
+            IndexManager: シャードの空の新しいインデックス
+
+        Raises:
+            IndexingError: フォルダが指定されていない場合
+        """
+        if folder_path is None:
+            raise IndexingError("シャードインデックスの再構築にはフォルダの指定が必要です")
+
+        shard = self.add_folder(folder_path)
+        shadow = shard.begin_rebuild()
+        with self._lock:
+            self._rebuilds[id(shadow)] = (shard, shadow)
+        return shadow
+
+    def commit_rebuild(self, shadow: IndexManager) -> None:
+        """
+        再構築したインデックスを元のシャードと入れ替え
+
+        Args:
+            shadow (IndexManager): begin_rebuildで作成し、構築を終えたインデックス
+
+        Raises:
+            IndexingError: begin_rebuildで作成したインデックスでない場合
+        """
+        with self._lock:
+            entry = self._rebuilds.pop(id(shadow), None)
+        if entry is None:
+            raise IndexingError(f"再構築中のシャードが見つかりません: {shadow.index_path}")
+        entry[0].commit_rebuild(shadow)
+
+    def abort_rebuild(self, shadow: IndexManager | None = None) -> None:
+        """
+        再構築を中止して新しいインデックスを破棄
+
+        shadowを省略した場合は、再構築中のすべてのシャードと、前回中断された
+        再構築の残りを破棄します。
+
+        Args:
+            shadow (IndexManager, optional): begin_rebuildで作成したインデックス
+        """
+        with self._lock:
+            if shadow is not None:
+                entries = [self._rebuilds.pop(id(shadow))] if id(shadow) in self._rebuilds else []
+            else:
+                entries = list(self._rebuilds.values())
+                self._rebuilds.clear()
+
+        for shard, rebuilding in entries:
+            shard.abort_rebuild(rebuilding)
+        if shadow is None:
+            for shard in self._all_shards():
+                shard.abort_rebuild()
+
+    def search_text(
+        self,
+        query_text: str,
+        limit: int = 100,
+        file_types: list[FileType] | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        *,
+        folder_paths: list[str] | None = None,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+        doc_ids: Collection[str] | None = None,
+    ) -> list[SearchResult]:
+        """
+        対象シャードへ並列に全文検索を行い、上位の結果をマージ
+
+        Args:
+            query_text (str): 検索クエリ
+            limit (int): 最大結果数
+            file_types (List[FileType], optional): フィルター対象のファイルタイプ
+            date_from (datetime, optional): 日付範囲の開始
+            date_to (datetime, optional): 日付範囲の終了
+            folder_paths (List[str], optional): 検索対象のフォルダ(シャードの選択と各シャード内の絞り込みに使用)
+            cancel_token (CancellationToken, optional): 各シャードの照合中に確認するキャンセル用トークン
+            deadline (SearchDeadline, optional): すべてのシャードで共有する検索の時間予算
+            doc_ids (Collection[str], optional): 照合の対象に限定するドキュメントID
+
+        Returns:
+            List[SearchResult]: スコア順の検索結果のリスト
+        """
+        if not query_text.strip():
+            return []
+
+        shards = self.select_shards(folder_paths)
+
+        def search_shard(shard: IndexManager) -> list[SearchResult]:
+            return shard.search_text(
+                query_text,
+                limit,
+                file_types,
+                date_from,
+                date_to,
+                folder_paths=folder_paths,
+                cancel_token=cancel_token,
+                deadline=deadline,
+                doc_ids=doc_ids,
+            )
+
+        try:
+            if len(shards) == 1:
+                shard_results = [search_shard(shards[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(shards))) as executor:
+                    shard_results = list(executor.map(search_shard, shards))
+
+        except SearchError:
+            raise
+        except Exception as e:
+            error_msg = f"シャード検索に失敗しました: {query_text} - {e}"
+            self.logger.error(error_msg)
+            raise SearchError(error_msg) from e
+
+        # 各シャードの結果はスコア順のため、全体の上位k件だけをヒープで取り出す
+        merged = heapq.nlargest(
+            limit,
+            (result for results in shard_results for result in results),
+            key=lambda result: result.score,
+        )
+        for rank, result in enumerate(merged, 1):
+            result.rank = rank
+
+        self.logger.info(f"シャード検索完了: クエリ='{query_text}', シャード数={len(shards)}, 結果数={len(merged)}")
+        return merged
+
+    def find_similar(
+        self, doc_id: str, limit: int = 10, file_types: list[FileType] | None = None
+    ) -> list[SearchResult]:
+        """
+        元のドキュメントのシャードでキーワードを抽出し、すべてのシャードから類似ドキュメントを検索
+
+        Args:
+            doc_id (str): 元のドキュメントのID
+            limit (int): 最大結果数
+            file_types (List[FileType], optional): フィルター対象のファイルタイプ
+
+        Returns:
+            List[SearchResult]: 類似度順の検索結果(元のドキュメントは含まない)
+        """
+        key_terms: list[tuple[str, float]] = []
+        for shard in self._all_shards():
+            key_terms = shard.get_key_terms(doc_id)
+            if key_terms:
+                break
+        if not key_terms:
+            return []
+
+        merged = heapq.nlargest(
+            limit,
+            (
+                result
+                for shard in self._all_shards()
+                for result in shard.find_similar(doc_id, limit, file_types, key_terms=key_terms)
+            ),
+            key=lambda result: result.score,
+        )
+        for rank, result in enumerate(merged, 1):
+            result.rank = rank
+        return merged
+
+    def search_filenames(
+        self,
+        query_text: str,
+        limit: int = 100,
+        file_types: list[FileType] | None = None,
+        folder_paths: list[str] | None = None,
+    ) -> list[SearchResult]:
+        """
+        対象シャードのファイル名索引を検索し、一致度の高い結果をマージ
+
+        Args:
+            query_text (str): 検索語
+            limit (int): 最大結果数
+            file_types (List[FileType], optional): フィルター対象のファイルタイプ
+            folder_paths (List[str], optional): 検索対象のフォルダ(シャードの選択と各シャード内の絞り込みに使用)
+
+        Returns:
+            List[SearchResult]: ファイル名の一致度順の検索結果
+        """
+        if not query_text.strip():
+            return []
+
+        shard_results = [
+            shard.search_filenames(query_text, limit, file_types, folder_paths)
+            for shard in self.select_shards(folder_paths)
+        ]
+        merged = heapq.nlargest(
+            limit,
+            (result for results in shard_results for result in results),
+            key=lambda result: result.score,
+        )
+        for rank, result in enumerate(merged, 1):
+            result.rank = rank
+        return merged
+
+    def search_page(
+        self,
+        query_text: str,
+        page: int = 1,
+        page_size: int = 20,
+        *,
+        sort_by: str = "relevance",
+        descending: bool = True,
+        file_types: list[FileType] | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        folder_paths: list[str] | None = None,
+        cancel_token: CancellationToken | None = None,
+        deadline: SearchDeadline | None = None,
+    ) -> SearchResultPage:
+        """
+        対象シャードの並び替え済みの先頭部分をマージして1ページ分を取得
+
+        Args:
+            query_text (str): 検索クエリ
+            page (int): ページ番号(1始まり)
+            page_size (int): 1ページあたりの件数
+            sort_by (str): 並び替えのキー(IndexManager.SORT_FIELDSのいずれか)
+            descending (bool): 降順の場合True
+            file_types (List[FileType], optional): フィルター対象のファイルタイプ
+            date_from (datetime, optional): 日付範囲の開始
+            date_to (datetime, optional): 日付範囲の終了
+            folder_paths (List[str], optional): 検索対象のフォルダ
+            cancel_token (CancellationToken, optional): 各シャードの照合中に確認するキャンセル用トークン
+            deadline (SearchDeadline, optional): すべてのシャードで共有する検索の時間予算
+
+        Returns:
+            SearchResultPage: 指定ページの検索結果と総件数
+        """
+        if sort_by not in IndexManager.SORT_FIELDS:
+            raise SearchError(f"サポートされていない並び替えキー: {sort_by}")
+
+        shards = self.select_shards(folder_paths)
+
+        # 各シャードから指定ページの末尾までを取得すれば、全体のページを組み立てられる
+        def search_shard(shard: IndexManager) -> SearchResultPage:
+            return shard.search_page(
+                query_text,
+                1,
+                page * page_size,
+                sort_by=sort_by,
+                descending=descending,
+                file_types=file_types,
+                date_from=date_from,
+                date_to=date_to,
+                folder_paths=folder_paths,
+                cancel_token=cancel_token,
+                deadline=deadline,
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(shards))) as executor:
+                shard_pages = list(executor.map(search_shard, shards))
+        except SearchError:
+            raise
+        except Exception as e:
+            error_msg = f"シャードのページ検索に失敗しました: {query_text} - {e}"
+            self.logger.error(error_msg)
+            raise SearchError(error_msg) from e
+
+        sort_keys = {
+            "relevance": lambda result: result.score,
+            "title": lambda result: result.document.title,
+            "modified_date": lambda result: result.document.modified_date,
+            "size": lambda result: result.document.size,
+        }
+        merged = heapq.merge(
+            *(shard_page.results for shard_page in shard_pages),
+            key=sort_keys[sort_by],
+            reverse=descending,
+        )
+        offset = (page - 1) * page_size
+        results = list(itertools.islice(merged, offset, offset + page_size))
+        for rank, result in enumerate(results, offset + 1):
+            result.rank = rank
+
+        return SearchResultPage(
+            results=results,
+            page=page,
+            page_size=page_size,
+            total=sum(shard_page.total for shard_page in shard_pages),
+            total_is_exact=all(shard_page.total_is_exact for shard_page in shard_pages),
+            warnings=list(dict.fromkeys(warning for shard_page in shard_pages for warning in shard_page.warnings)),
+            suggestions=list(
+                dict.fromkeys(suggestion for shard_page in shard_pages for suggestion in shard_page.suggestions)
+            )[:3],
+            truncated=any(shard_page.truncated for shard_page in shard_pages),
+        )
+
+    def optimize_index(self) -> None:
+        """すべてのシャードを最適化"""
+        for shard in self._all_shards():
+            shard.optimize_index()
+
+    def merge_segments(
+        self, max_bytes: int | None = None, should_yield: Callable[[], bool] | None = None
+    ) -> dict[str, int]:
+        """
+        各シャードの小さなセグメントを段階的にマージ
+
+        Args:
+            max_bytes (int, optional): 全シャード合計で読み書きするバイト数の上限
+            should_yield (Callable[[], bool], optional): 次のマージを見送るかどうかを返す関数
+
+        Returns:
+            Dict[str, int]: マージしたセグメント数、バイト数、マージ後のセグメント数の合計
+        """
+        total = {"merged_segments": 0, "merged_bytes": 0, "segments": 0}
+        shards = self._all_shards()
+        for i, shard in enumerate(shards):
+            if should_yield is not None and should_yield():
+                # 残りのシャードはマージせず、セグメント数だけを集計する
+                total["segments"] += sum(len(rest.get_segment_sizes()) for rest in shards[i:])
+                break
+            remaining = None if max_bytes is None else max(max_bytes - total["merged_bytes"], 0)
+            for key, value in shard.merge_segments(remaining, should_yield).items():
+                total[key] += value
+        return total
+
+    def get_document_count(self) -> int:
+        """
+        全シャードのドキュメント数の合計を取得
+
+        Returns:
+            int: ドキュメント数
+        """
+        return sum(shard.get_document_count() for shard in self._all_shards())
+
+    def get_generation(self) -> tuple[Any, ...]:
+        """
+        全シャードのインデックスの内容の世代を取得
+
+        シャードの追加・削除、いずれかのシャードの変更のたびに変わります。
+
+        Returns:
+            Tuple[Any, ...]: シャードごとのルートフォルダと世代の組
+        """
+        with self._lock:
+            shards = [*self._shards.items(), ("", self._default_shard)]
+        return tuple((root, shard.get_generation()) for root, shard in shards)
+
+    def get_filter_cache_stats(self) -> dict[str, Any]:
+        """
+        全シャードのフィルターのビットセットキャッシュのヒット率を取得
+
+        Returns:
+            Dict[str, Any]: 参照回数、ヒット数、正規化後と正規化前のヒット率
+        """
+        stats = [shard.get_filter_cache_stats() for shard in self._all_shards()]
+        return CanonicalHitStats.summarize(
+            sum(item["requests"] for item in stats),
+            sum(item["hits"] for item in stats),
+            sum(item["raw_hits"] for item in stats),
+        )
+
+    def complete_terms(self, prefix: str, limit: int = 10) -> list[tuple[str, int]]:
+        """
+        すべてのシャードの補完候補を重みを合計してマージ
+
+        Args:
+            prefix (str): 入力途中の語
+            limit (int): 最大件数
+
+        Returns:
+            List[Tuple[str, int]]: 語と重み(出現ドキュメント数)
+        """
+        totals: dict[str, int] = defaultdict(int)
+        for shard in self._all_shards():
+            for term, weight in shard.complete_terms(prefix, limit):
+                totals[term] += weight
+        return sorted(totals.items(), key=lambda item: (-item[1], len(item[0]), item[0]))[:limit]
+
+    def get_completion_size(self) -> int:
+        """
+        すべてのシャードの補完インデックスの語数の合計を取得
+
+        Returns:
+            int: 語数の合計
+        """
+        return sum(shard.get_completion_size() for shard in self._all_shards())
+
+    def document_exists(self, doc_id: str) -> bool:
+        """
+        指定されたIDのドキュメントがいずれかのシャードに存在するかチェック
+
+        Args:
+            doc_id (str): ドキュメントID
+
+        Returns:
+            bool: 存在する場合True
+        """
+        return any(shard.document_exists(doc_id) for shard in self._all_shards())
+
+    def get_document(self, doc_id: str) -> Document | None:
+        """
+        指定されたIDのドキュメントをシャードから取得
+
+        Args:
+            doc_id (str): ドキュメントID
+
+        Returns:
+            Optional[Document]: 見つかったドキュメント(存在しない場合はNone)
+        """
+        for shard in self._all_shards():
+            document = shard.get_document(doc_id)
+            if document is not None:
+                return document
+        return None
+
+    def searcher(self) -> Searcher:
+        """
+        全シャードを1つのインデックスとして読むサーチャーを取得
+
+        呼び出し側でwith文を使用して閉じてください。
+
+        Returns:
+            Searcher: 全シャードのリーダーを束ねたサーチャー
+        """
+        readers = [shard.searcher().reader() for shard in self._all_shards()]
+        return Searcher(MultiReader(readers))
+
+    def get_index_stats(self) -> dict[str, Any]:
+        """
+        全シャードの統計情報を集計
+
+        Returns:
+            Dict[str, Any]: 統計情報(シャードごとの内訳を含む)
+        """
+        shard_stats = {}
+        with self._lock:
+            named_shards = {**self._shards, "": self._default_shard}
+        for root, shard in named_shards.items():
+            shard_stats[root or self.DEFAULT_SHARD] = shard.get_index_stats()
+
+        last_modified = [stats["last_modified"] for stats in shard_stats.values() if stats.get("last_modified")]
+        file_type_counts: dict[str, int] = {}
+        for stats in shard_stats.values():
+            for file_type, count in stats.get("file_type_counts", {}).items():
+                file_type_counts[file_type] = file_type_counts.get(file_type, 0) + count
+
+        return {
+            "document_count": sum(stats.get("document_count", 0) for stats in shard_stats.values()),
+            "index_size": sum(stats.get("index_size", 0) for stats in shard_stats.values()),
+            "last_modified": max(last_modified) if last_modified else None,
+            "file_type_counts": file_type_counts,
+            "shard_count": len(shard_stats),
+            "shards": shard_stats,
+        }
+
+    def close(self) -> None:
+        """すべてのシャードを閉じる"""
+        for shard in self._all_shards():
+            shard.close()
+        self.logger.info("シャードインデックスを閉じました")
+
+
+def create_index_manager(index_path: str, config: Config | None = None) -> IndexManager | ShardedIndexManager:
+    """
+    設定のインデックス構成に応じたインデックスマネージャーを作成
+
+    Args:
+        index_path (str): インデックスを保存するディレクトリパス
+        config (Config, optional): 設定オブジェクト(省略時は単一インデックス)
+
+    Returns:
+        IndexManager | ShardedIndexManager: 作成されたインデックスマネージャー
+    """
+    if config is not None and config.is_sharded_index_enabled():
+        return ShardedIndexManager(index_path, config.get_indexed_folders())
+    return IndexManager(index_path)
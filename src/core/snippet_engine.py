@@ -0,0 +1,176 @@
+"""
+検索結果スニペット生成モジュール
+
+クエリを検索ごとに一度だけ解析し、インデックスのポスティングに保存された
+文字オフセットから一致箇所を取り出してスニペットを切り出します。
+ドキュメント全体の再トークン化やHTMLの生成・除去は行いません。
+"""
+
+import logging
+
+from whoosh.analysis import Analyzer
+from whoosh.query import Query
+from whoosh.reading import TermNotFound
+from whoosh.searching import Searcher
+
+
+class SnippetEngine:
+    """
+    検索1回分のスニペット生成器
+
+    クエリから対象フィールドの語を一度だけ取り出し、ページ内のヒットについて
+    語ごとのポスティングをドキュメント番号順にたどって一致箇所の文字範囲を集めます。
+    文字オフセットを保存していない旧形式のインデックスでは、コンテンツを一度だけ
+    トークン化して一致箇所を探します。
+    """
+
+    # スニペットの対象にするクエリ語の最大数(ワイルドカード展開で増えすぎないように)
+    MAX_TERMS = 64
+
+    def __init__(
+        self,
+        searcher: Searcher,
+        query: Query,
+        analyzer: Analyzer,
+        *,
+        fieldname: str = "content",
+        max_chars: int = 200,
+        surround: int = 50,
+    ):
+        """
+        SnippetEngineの初期化
+
+        Args:
+            searcher (Searcher): 検索に使用したサーチャー
+            query (Query): 解析済みの検索クエリ
+            analyzer (Analyzer): 対象フィールドのアナライザー(旧形式のインデックス用)
+            fieldname (str): スニペットを作成するフィールド
+            max_chars (int): スニペットの最大文字数
+            surround (int): 最初の一致箇所より前に含める最大文字数
+        """
+        self.searcher = searcher
+        self.analyzer = analyzer
+        self.fieldname = fieldname
+        self.max_chars = max_chars
+        self.surround = surround
+        self.logger = logging.getLogger(__name__)
+
+        schema = searcher.schema
+        self.use_postings = fieldname in schema and schema[fieldname].format.supports("characters")
+
+        terms = query.existing_terms(searcher.reader(), phrases=True, expand=True, fieldname=fieldname)
+        self.terms = sorted(text for field, text in terms if field == fieldname)[: self.MAX_TERMS]
+        self._term_texts = {text.decode("utf-8") for text in self.terms}
+        self._spans: dict[int, list[tuple[int, int]]] = {}
+
+    def load(self, docnums) -> None:
+        """
+        ドキュメントの一致箇所をまとめて読み込む
+
+        語ごとにポスティングを一度だけ開き、ドキュメント番号順にスキップしながら読みます。
+
+        Args:
+            docnums: 読み込むドキュメント番号
+        """
+        if not self.use_postings:
+            return
+
+        wanted = sorted(set(docnums) - self._spans.keys())
+        for docnum in wanted:
+            self._spans[docnum] = []
+
+        for text in self.terms:
+            try:
+                matcher = self.searcher.postings(self.fieldname, text)
+            except TermNotFound:
+                continue
+
+            for docnum in wanted:
+                if not matcher.is_active():
+                    break
+                if matcher.id() < docnum:
+                    matcher.skip_to(docnum)
+                    if not matcher.is_active():
+                        break
+                if matcher.id() == docnum:
+                    self._spans[docnum].extend((start, end) for _, start, end in matcher.value_as("characters"))
+
+    def snippet(self, docnum: int, content: str) -> str:
+        """
+        ドキュメントのスニペットを作成
+
+        Args:
+            docnum (int): ドキュメント番号
+            content (str): 保存されているコンテンツ
+
+        Returns:
+            str: 一致箇所を多く含む範囲を切り出したスニペット
+        """
+        if not content:
+            return ""
+        if len(content) <= self.max_chars:
+            return content
+
+        if self.use_postings:
+            if docnum not in self._spans:
+                self.load([docnum])
+            spans = self._spans[docnum]
+        else:
+            spans = self._scan(content)
+
+        return self._cut(content, spans)
+
+    def _scan(self, content: str) -> list[tuple[int, int]]:
+        """
+        コンテンツを一度だけトークン化して一致箇所を探す(文字オフセットのない旧形式用)
+
+        Args:
+            content (str): 対象のコンテンツ
+
+        Returns:
+            List[Tuple[int, int]]: 一致箇所の文字範囲
+        """
+        if not self._term_texts:
+            return []
+        return [
+            (token.startchar, token.endchar)
+            for token in self.analyzer(content, chars=True, mode="index")
+            if token.text in self._term_texts
+        ]
+
+    def _cut(self, content: str, spans: list[tuple[int, int]]) -> str:
+        """
+        一致箇所を最も多く含む範囲を切り出す
+
+        Args:
+            content (str): 対象のコンテンツ
+            spans (List[Tuple[int, int]]): 一致箇所の文字範囲
+
+        Returns:
+            str: 切り出したスニペット(前後を省略した場合は「...」を付与)
+        """
+        if not spans:
+            return content[: self.max_chars] + "..."
+
+        # 窓の幅に収まる一致箇所が最も多くなる開始位置を探す
+        spans = sorted(spans)
+        best_index, best_count = 0, 0
+        end_index = 0
+        for index, (start, _) in enumerate(spans):
+            end_index = max(end_index, index)
+            while end_index < len(spans) and spans[end_index][1] <= start + self.max_chars:
+                end_index += 1
+            if end_index - index > best_count:
+                best_index, best_count = index, end_index - index
+
+        # 一致箇所の前に余白を取り、残りを後ろの文脈に割り当てる
+        match_start = spans[best_index][0]
+        match_end = spans[best_index + max(best_count, 1) - 1][1]
+        slack = max(self.max_chars - (match_end - match_start), 0)
+        start = max(match_start - min(slack // 2, self.surround), 0)
+        end = min(start + self.max_chars, len(content))
+        start = max(end - self.max_chars, 0)
+
+        prefix = "..." if start > 0 else ""
+        suffix = "..." if end < len(content) else ""
+        return prefix + content[start:end] + suffix
@@ -0,0 +1,319 @@
+"""
+綴り訂正(「もしかして」)用のSymSpell辞書モジュール
+
+インデックスの語彙から、語の一部の文字を削除した形(削除形)を引くと元の語が
+見つかる辞書を作り、検索語の綴りの誤りを語彙全体を走査せずに訂正します。
+語彙はセグメント単位で取り込み、コミットで追加されたセグメントだけを読み足します。
+"""
+
+from collections.abc import Callable, Iterable
+import logging
+import os
+from pathlib import Path
+import pickle
+import re
+import threading
+
+from whoosh.reading import IndexReader
+
+from .cjk_analyzer import CJK_CHAR_CLASS
+
+# 訂正の対象にする語(CJK以外の文字だけからなる3文字以上の語)
+_WORD_PATTERN = re.compile(rf"[^\W\d_{CJK_CHAR_CLASS}]{{3,40}}")
+
+# クエリ構文の演算子(訂正の対象外)
+_OPERATORS = frozenset({"AND", "OR", "NOT", "ANDNOT", "ANDMAYBE", "TO"})
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    隣接文字の入れ替えを1回の操作と数える編集距離(制限付きDamerau-Levenshtein)
+
+    Args:
+        a (str): 比較する文字列
+        b (str): 比較する文字列
+        max_distance (int): 打ち切る距離
+
+    Returns:
+        int: 編集距離(max_distanceを超える場合はmax_distance + 1)
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            cost = 0 if char_a == char_b else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+
+    return min(previous[-1], max_distance + 1)
+
+
+class SpellingIndex:
+    """
+    SymSpellの削除形辞書
+
+    語の先頭PREFIX_LENGTH文字から最大MAX_EDIT_DISTANCE文字を削除した形をキーに、
+    元の語の一覧を保持します。検索語の削除形を引いて候補を集め、実際の編集距離と
+    インデックス上の出現数で並べます。辞書は語を追加するだけで、削除された語は
+    検索時の出現数が0になることで候補から外れます。
+    """
+
+    # 訂正で許容する最大の編集距離
+    MAX_EDIT_DISTANCE = 2
+    # この文字数以下の語は編集距離1までに限る(短い語は候補が多く、訂正も不自然になるため)
+    SHORT_WORD_LENGTH = 4
+    # 削除形を作る語の先頭の文字数(辞書の大きさを抑えるため)
+    PREFIX_LENGTH = 7
+    # この出現数以下の語は、はるかに多く出現する候補があれば訂正を提案する
+    RARE_FREQUENCY = 1
+    # 出現数の少ない語を訂正するときに候補に求める出現数の倍率
+    RARE_FACTOR = 10
+    # 保存形式のバージョン
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: str | Path | None = None):
+        """
+        SpellingIndexの初期化
+
+        Args:
+            path (str | Path, optional): 辞書の保存先(省略時は保存しない)
+        """
+        self.path = Path(path) if path else None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._words: set[str] = set()
+        self._deletes: dict[str, list[str]] = {}
+        self._segments: set[str] = set()
+        self._dirty = False
+
+    def load(self) -> bool:
+        """
+        保存されている辞書を読み込む
+
+        Returns:
+            bool: 読み込めた場合True
+        """
+        if self.path is None or not self.path.exists():
+            return False
+
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") != self.FORMAT_VERSION:
+                return False
+        except Exception as e:
+            self.logger.warning(f"綴り訂正辞書を読み込めませんでした: {e}")
+            return False
+
+        with self._lock:
+            self._words = data["words"]
+            self._deletes = data["deletes"]
+            self._segments = data["segments"]
+            self._dirty = False
+        return True
+
+    def save(self) -> None:
+        """変更があれば辞書を保存(一時ファイルに書いてから置き換える)"""
+        if self.path is None:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": self.FORMAT_VERSION,
+                "words": self._words,
+                "deletes": self._deletes,
+                "segments": self._segments,
+            }
+            temp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(temp_path, "wb") as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self.path)
+                self._dirty = False
+            except Exception as e:
+                self.logger.warning(f"綴り訂正辞書を保存できませんでした: {e}")
+
+    def sync(self, reader: IndexReader, fieldnames: Iterable[str]) -> int:
+        """
+        まだ取り込んでいないセグメントの語彙を辞書に追加
+
+        Args:
+            reader (IndexReader): ディスクのインデックスのリーダー
+            fieldnames (Iterable[str]): 語彙を取り込むフィールド
+
+        Returns:
+            int: 新しく追加した語の数
+        """
+        fieldnames = list(fieldnames)
+        added = 0
+        with self._lock:
+            live_segments: set[str] = set()
+            for leaf, _ in reader.leaf_readers():
+                segment = getattr(leaf, "segment", None)
+                segment_id = segment().segid if segment else None
+                if segment_id:
+                    live_segments.add(segment_id)
+                    if segment_id in self._segments:
+                        continue
+                for fieldname in fieldnames:
+                    if fieldname in leaf.schema:
+                        added += self.add_words(text.decode("utf-8") for text in leaf.lexicon(fieldname))
+
+            # マージで消えたセグメントは忘れる(語は残し、検索時の出現数で判定する)
+            if live_segments != self._segments:
+                self._segments = live_segments
+                self._dirty = True
+
+        if added:
+            self.logger.debug(f"綴り訂正辞書に{added}語を追加しました")
+        return added
+
+    def add_words(self, words: Iterable[str]) -> int:
+        """
+        語を辞書に追加
+
+        Args:
+            words (Iterable[str]): 追加する語(訂正の対象外の語は無視)
+
+        Returns:
+            int: 新しく追加した語の数
+        """
+        added = 0
+        with self._lock:
+            for word in words:
+                if word in self._words or not _WORD_PATTERN.fullmatch(word):
+                    continue
+                self._words.add(word)
+                for key in self._delete_forms(word):
+                    self._deletes.setdefault(key, []).append(word)
+                added += 1
+            if added:
+                self._dirty = True
+        return added
+
+    def lookup(self, word: str, frequency: Callable[[str], int]) -> list[tuple[str, int, int]]:
+        """
+        語の訂正候補を取得
+
+        Args:
+            word (str): 小文字化済みの語
+            frequency: 語のインデックス上の出現数を返す関数
+
+        Returns:
+            List[Tuple[str, int, int]]: (候補, 編集距離, 出現数)を距離の近い順・出現数の多い順に並べたもの
+        """
+        max_distance = 1 if len(word) <= self.SHORT_WORD_LENGTH else self.MAX_EDIT_DISTANCE
+        with self._lock:
+            candidates: set[str] = set()
+            for key in self._delete_forms(word, max_distance):
+                candidates.update(self._deletes.get(key, ()))
+
+        results = []
+        for candidate in candidates:
+            if candidate == word:
+                continue
+            distance = edit_distance(word, candidate, max_distance)
+            if distance > max_distance:
+                continue
+            count = frequency(candidate)
+            if count > 0:
+                results.append((candidate, distance, count))
+
+        results.sort(key=lambda item: (item[1], -item[2], item[0]))
+        return results
+
+    def suggest(self, query_text: str, frequency: Callable[[str], int], max_suggestions: int = 3) -> list[str]:
+        """
+        綴りを訂正した検索クエリを提案
+
+        インデックスにない語、または出現数がRARE_FREQUENCY以下で、はるかに多く
+        出現する候補がある語を置き換えます。
+
+        Args:
+            query_text (str): 検索クエリ
+            frequency: 語のインデックス上の出現数を返す関数
+            max_suggestions (int): 提案するクエリの最大数
+
+        Returns:
+            List[str]: 訂正したクエリ(訂正の必要がない場合は空)
+        """
+        corrections: list[tuple[re.Match, list[str]]] = []
+        for match, word, count in self.rare_words(query_text, frequency):
+            candidates = [
+                candidate
+                for candidate, _, candidate_count in self.lookup(word, frequency)
+                if count == 0 or candidate_count >= count * self.RARE_FACTOR
+            ]
+            if candidates:
+                corrections.append((match, candidates))
+
+        if not corrections:
+            return []
+
+        # 最初に訂正する語の候補ごとに1つずつ、他の語は最良の候補で置き換える
+        suggestions: list[str] = []
+        for choice in corrections[0][1][:max_suggestions]:
+            pieces, last = [], 0
+            for index, (match, candidates) in enumerate(corrections):
+                pieces.append(query_text[last : match.start()])
+                pieces.append(choice if index == 0 else candidates[0])
+                last = match.end()
+            pieces.append(query_text[last:])
+            suggestions.append("".join(pieces))
+        return suggestions
+
+    @classmethod
+    def rare_words(cls, query_text: str, frequency: Callable[[str], int]) -> list[tuple[re.Match, str, int]]:
+        """
+        訂正を検討する語(インデックスにないか、出現数がRARE_FREQUENCY以下の語)を列挙
+
+        辞書を使わずに判定できるため、辞書を読み込む前の絞り込みに使用します。
+
+        Args:
+            query_text (str): 検索クエリ
+            frequency: 語のインデックス上の出現数を返す関数
+
+        Returns:
+            List[Tuple[re.Match, str, int]]: クエリ内の位置、小文字化した語、出現数
+        """
+        words = []
+        for match in _WORD_PATTERN.finditer(query_text):
+            if match.group() in _OPERATORS:
+                continue
+            word = match.group().lower()
+            count = frequency(word)
+            if count <= cls.RARE_FREQUENCY:
+                words.append((match, word, count))
+        return words
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def _delete_forms(self, word: str, max_distance: int | None = None) -> set[str]:
+        """
+        語の先頭PREFIX_LENGTH文字からmax_distance文字以内を削除した形を列挙
+
+        Args:
+            word (str): 対象の語
+            max_distance (int, optional): 削除する最大の文字数(省略時はMAX_EDIT_DISTANCE)
+
+        Returns:
+            Set[str]: 削除形(元の先頭部分を含む)
+        """
+        prefix = word[: self.PREFIX_LENGTH]
+        forms = {prefix}
+        frontier = {prefix}
+        for _ in range(self.MAX_EDIT_DISTANCE if max_distance is None else max_distance):
+            frontier = {form[:i] + form[i + 1 :] for form in frontier for i in range(len(form)) if len(form) > 1}
+            forms.update(frontier)
+        return forms
@@ -235,13 +235,16 @@ class IndexingThreadManager(QObject):
         with self.lock:
             return list(self.active_threads.values())
 
-    def start_indexing_thread(self, folder_path: str, document_processor, index_manager) -> str | None:
+    def start_indexing_thread(
+        self, folder_path: str, document_processor, index_manager, rebuild: bool = False
+    ) -> str | None:
         """インデックス処理スレッドを開始
 
         Args:
             folder_path (str): インデックス化するフォルダのパス
             document_processor: ドキュメントプロセッサー
             index_manager: インデックスマネージャー
+            rebuild (bool): 新しいインデックスを別の場所に構築し、完了後に入れ替える場合True
 
         Returns:
             Optional[str]: 開始されたスレッドのID(開始できない場合はNone)
@@ -275,6 +278,7 @@ class IndexingThreadManager(QObject):
                     folder_path=folder_path,
                     document_processor=document_processor,
                     index_manager=index_manager,
+                    rebuild=rebuild,
                 )
 
                 # QThreadを作成
@@ -55,6 +55,8 @@ class ConnectionPool:
         conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
 
         # 最適化設定
+        # 新規データベースでは空きページを少しずつ回収できるようにする(既存のDBには影響しない)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
         conn.execute("PRAGMA foreign_keys = ON")
         conn.execute("PRAGMA journal_mode = WAL")
         conn.execute("PRAGMA synchronous = NORMAL")
@@ -114,7 +116,12 @@ class DatabaseManager(LoggerMixin):
     """
 
     # データベーススキーマのバージョン
-    SCHEMA_VERSION = 1
+    SCHEMA_VERSION = 2
+    # 重複なしの検索クエリテーブルを追加したスキーマのバージョン
+    SEARCH_QUERIES_SCHEMA_VERSION = 2
+
+    # PRAGMA auto_vacuumがINCREMENTALのときに返す値
+    AUTO_VACUUM_INCREMENTAL = 2
 
     def __init__(self, db_path: str, pool_size: int = 10):
         """DatabaseManagerを初期化
@@ -390,12 +397,62 @@ class DatabaseManager(LoggerMixin):
         """
         )
 
+        # 検索クエリ(重複なし)テーブルと前方一致用の全文インデックス
+        self._create_search_query_tables(conn)
+
         # インデックス作成
         self._create_indexes(conn)
 
         conn.commit()
         self.logger.info("データベーススキーマを作成しました")
 
+    def _create_search_query_tables(self, conn: sqlite3.Connection):
+        """検索提案用の重複なしの検索クエリテーブルとFTS5の前方一致インデックスを作成
+
+        検索履歴は検索のたびに行が増えるため、提案では重複をまとめたsearch_queriesを引きます。
+        FTS5が使えないSQLiteでは全文インデックスを作らず、queryのインデックスで前方一致します。
+        """
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_queries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL UNIQUE,
+                use_count INTEGER NOT NULL DEFAULT 1,
+                last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT chk_use_count CHECK (use_count >= 0)
+            )
+        """
+        )
+
+        try:
+            # クエリ内の各語の先頭1〜3文字を索引化し、入力途中の語でも1回の索引引きで一致させる
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS search_queries_fts USING fts5(
+                    query, content='search_queries', content_rowid='id', prefix='1 2 3'
+                )
+            """
+            )
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"FTS5が使用できないため、検索提案は前方一致の索引で検索します: {e}")
+            return
+
+        # search_queriesの追加・削除を全文インデックスに反映する(use_countなどの更新は索引に影響しない)
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS search_queries_fts_insert AFTER INSERT ON search_queries BEGIN
+                INSERT INTO search_queries_fts(rowid, query) VALUES (new.id, new.query);
+            END
+        """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS search_queries_fts_delete AFTER DELETE ON search_queries BEGIN
+                INSERT INTO search_queries_fts(search_queries_fts, rowid, query) VALUES ('delete', old.id, old.query);
+            END
+        """
+        )
+
     def _create_indexes(self, conn: sqlite3.Connection):
         """パフォーマンス最適化のためのインデックスを作成"""
 
@@ -410,6 +467,7 @@ class DatabaseManager(LoggerMixin):
         conn.execute("CREATE INDEX IF NOT EXISTS idx_search_history_timestamp ON search_history(timestamp)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_search_history_type ON search_history(search_type)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_search_history_query ON search_history(query)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_search_queries_last_used ON search_queries(last_used)")
 
         # 保存された検索テーブルのインデックス
         conn.execute("CREATE INDEX IF NOT EXISTS idx_saved_searches_name ON saved_searches(name)")
@@ -428,8 +486,20 @@ class DatabaseManager(LoggerMixin):
         """
         self.logger.info(f"スキーママイグレーションを開始: v{from_version} -> v{to_version}")
 
+        if from_version < self.SEARCH_QUERIES_SCHEMA_VERSION:
+            # v2: 検索履歴から重複なしの検索クエリテーブルを作成(全文インデックスはトリガーで作られる)
+            self._create_search_query_tables(conn)
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO search_queries (query, use_count, last_used)
+                SELECT query, COUNT(*), MAX(timestamp)
+                FROM search_history
+                GROUP BY query
+            """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_queries_last_used ON search_queries(last_used)")
+
         # 将来のマイグレーション処理をここに追加
-        # 現在はバージョン1のみなので、マイグレーション処理は不要
 
         self._set_schema_version(conn, to_version)
         self.logger.info("スキーママイグレーションが完了しました")
@@ -500,6 +570,8 @@ class DatabaseManager(LoggerMixin):
         """データベースの最適化(VACUUM)を実行"""
         try:
             with self.get_connection() as conn:
+                # 既存のデータベースもVACUUMの際に増分バキュームへ切り替える
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
                 conn.execute("VACUUM")
                 self.logger.info("データベースの最適化が完了しました")
 
@@ -507,6 +579,40 @@ class DatabaseManager(LoggerMixin):
             self.logger.error(f"データベース最適化エラー: {e}")
             raise DatabaseError(f"データベースの最適化に失敗しました: {e}") from e
 
+    def incremental_vacuum(self, max_bytes: int) -> int:
+        """空きページを上限まで回収する増分バキュームを実行
+
+        auto_vacuumがINCREMENTALでないデータベースでは何もしません
+        (vacuum_databaseを一度実行すると切り替わります)。
+
+        Args:
+            max_bytes (int): 回収するバイト数の上限
+
+        Returns:
+            int: 回収したバイト数
+        """
+        try:
+            with self.get_connection() as conn:
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != self.AUTO_VACUUM_INCREMENTAL:
+                    self.logger.debug("増分バキュームが無効なデータベースのためスキップしました")
+                    return 0
+
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+                free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                pages = min(free_pages, max_bytes // page_size)
+                if pages <= 0:
+                    return 0
+
+                # incremental_vacuumは1ステップで1ページずつ処理されるためスクリプトとして最後まで実行する
+                conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+                reclaimed = (free_pages - conn.execute("PRAGMA freelist_count").fetchone()[0]) * page_size
+                self.logger.info(f"増分バキュームを実行しました: {reclaimed}バイト回収")
+                return reclaimed
+
+        except Exception as e:
+            self.logger.error(f"増分バキュームエラー: {e}")
+            raise DatabaseError(f"増分バキュームに失敗しました: {e}") from e
+
     def close(self):
         """データベース接続を閉じる"""
         if hasattr(self, "_connection_pool"):
@@ -9,6 +9,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 import hashlib
+import math
 import os
 from pathlib import Path
 from typing import Any
@@ -23,6 +24,7 @@ class SearchType(Enum):
     FULL_TEXT = "full_text"  # 全文検索(Whooshベース)
     SEMANTIC = "semantic"  # セマンティック検索(埋め込みベース)
     HYBRID = "hybrid"  # ハイブリッド検索(全文+セマンティック)
+    FILENAME = "filename"  # ファイル名検索(ファイル名・パスの部分一致)
 
 
 class FileType(Enum):
@@ -258,10 +260,33 @@ class SearchResult:
             SearchType.FULL_TEXT: "全文検索",
             SearchType.SEMANTIC: "セマンティック検索",
             SearchType.HYBRID: "ハイブリッド検索",
+            SearchType.FILENAME: "ファイル名検索",
         }
         return type_names.get(self.search_type, "不明")
 
 
+@dataclass
+class SearchResultPage:
+    """検索結果の1ページ分を表すデータクラス
+
+    ページングされた検索で、表示対象のページの結果と総件数を保持します。
+    """
+
+    results: list[SearchResult]  # 表示対象ページの検索結果
+    page: int  # ページ番号(1始まり)
+    page_size: int  # 1ページあたりの件数
+    total: int  # 総ヒット数(total_is_exactがFalseの場合は推定値)
+    total_is_exact: bool = True  # 総ヒット数が正確な値かどうか
+    warnings: list[str] = field(default_factory=list)  # 利用者に表示する検索時の警告(展開の制限など)
+    suggestions: list[str] = field(default_factory=list)  # 綴りを訂正したクエリの候補(「もしかして」)
+    truncated: bool = False  # 時間予算を超えたため途中までの結果かどうか
+
+    @property
+    def page_count(self) -> int:
+        """総ページ数(最低1ページ)"""
+        return max(1, math.ceil(self.total / self.page_size))
+
+
 @dataclass
 class SearchQuery:
     """検索クエリを表すデータクラス
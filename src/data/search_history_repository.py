@@ -22,6 +22,9 @@ class SearchHistoryRepository:
     ユーザーの検索体験向上をサポートします。
     """
 
+    # 検索提案の順位付けに使うスコア(使用回数を、最終使用からの経過日数が7日で半分になるよう減衰させる)
+    _SUGGESTION_SCORE = "q.use_count / (1.0 + (julianday('now') - julianday(q.last_used)) / 7.0)"
+
     def __init__(self, db_manager: DatabaseManager):
         """SearchHistoryRepositoryを初期化
 
@@ -30,6 +33,7 @@ class SearchHistoryRepository:
         """
         self.db_manager = db_manager
         self.logger = logging.getLogger(__name__)
+        self._fts_available: bool | None = None
 
     def add_search_record(
         self,
@@ -60,6 +64,17 @@ class SearchHistoryRepository:
                     (query, search_type.value, result_count, execution_time_ms),
                 )
 
+                # 検索提案用の重複なしのクエリの使用回数と最終使用日時を更新
+                conn.execute(
+                    """
+                    INSERT INTO search_queries (query) VALUES (?)
+                    ON CONFLICT(query) DO UPDATE SET
+                        use_count = use_count + 1,
+                        last_used = CURRENT_TIMESTAMP
+                """,
+                    (query,),
+                )
+
                 conn.commit()
                 self.logger.debug(f"検索履歴を記録: {query} ({search_type.value})")
                 return True
@@ -151,6 +166,10 @@ class SearchHistoryRepository:
     def get_search_suggestions(self, partial_query: str, limit: int = 10) -> list[str]:
         """検索提案を取得
 
+        重複なしの検索クエリテーブルから、入力中のクエリの各語で始まる語を含むクエリを
+        FTS5の前方一致インデックスで引き、使用回数を最終使用からの経過日数で減衰させた
+        スコアの高い順に返します。
+
         Args:
             partial_query (str): 部分的な検索クエリ
             limit (int): 取得する最大件数
@@ -158,19 +177,40 @@ class SearchHistoryRepository:
         Returns:
             List[str]: 検索提案のリスト
         """
+        words = partial_query.split()
+        if not words:
+            return []
+
         try:
             with self.db_manager.get_connection() as conn:
-                cursor = conn.execute(
-                    """
-                    SELECT DISTINCT query, COUNT(*) as frequency
-                    FROM search_history
-                    WHERE query LIKE ? AND LENGTH(query) > ?
-                    GROUP BY query
-                    ORDER BY frequency DESC, LENGTH(query) ASC
-                    LIMIT ?
-                """,
-                    (f"{partial_query}%", len(partial_query), limit),
-                )
+                if self._has_fts_index(conn):
+                    # 各語を引用符で囲んで構文として解釈させず、入力途中の最後の語だけ前方一致にする
+                    terms = ['"' + word.replace('"', '""') + '"' for word in words]
+                    if not partial_query[-1].isspace():
+                        terms[-1] += "*"
+                    cursor = conn.execute(
+                        f"""
+                        SELECT q.query
+                        FROM search_queries_fts
+                        JOIN search_queries AS q ON q.id = search_queries_fts.rowid
+                        WHERE search_queries_fts MATCH ? AND LENGTH(q.query) > ?
+                        ORDER BY {self._SUGGESTION_SCORE} DESC, LENGTH(q.query) ASC
+                        LIMIT ?
+                    """,
+                        (" ".join(terms), len(partial_query), limit),
+                    )
+                else:
+                    # FTS5がない場合はqueryの一意インデックスを範囲検索して前方一致する
+                    cursor = conn.execute(
+                        f"""
+                        SELECT q.query
+                        FROM search_queries AS q
+                        WHERE q.query >= ? AND q.query < ? AND LENGTH(q.query) > ?
+                        ORDER BY {self._SUGGESTION_SCORE} DESC, LENGTH(q.query) ASC
+                        LIMIT ?
+                    """,
+                        (partial_query, partial_query + "\U0010ffff", len(partial_query), limit),
+                    )
 
                 return [row[0] for row in cursor.fetchall()]
 
@@ -178,6 +218,20 @@ class SearchHistoryRepository:
             self.logger.error(f"検索提案取得エラー: {e}")
             raise DatabaseError(f"検索提案の取得に失敗しました: {e}") from e
 
+    def _has_fts_index(self, conn) -> bool:
+        """検索クエリの全文インデックス(FTS5)があるかを確認(結果は保持する)
+
+        Args:
+            conn: データベース接続
+
+        Returns:
+            bool: 全文インデックスがある場合True
+        """
+        if self._fts_available is None:
+            cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_queries_fts'")
+            self._fts_available = cursor.fetchone() is not None
+        return self._fts_available
+
     def get_search_statistics(self, days: int = 30) -> dict[str, Any]:
         """検索統計情報を取得
 
@@ -294,6 +348,14 @@ class SearchHistoryRepository:
                 )
 
                 deleted_count = cursor.rowcount
+
+                # 保持期間内に使われていないクエリは検索提案からも外す
+                conn.execute(
+                    """
+                    DELETE FROM search_queries WHERE last_used < ?
+                """,
+                    (cutoff_date,),
+                )
                 conn.commit()
 
                 self.logger.info(f"{deleted_count}件の古い検索履歴を削除しました")
@@ -43,7 +43,7 @@ class IndexController(QObject, LoggerMixin):
         このメソッドは要件1.1-1.4に基づいて実装されており、以下の処理を行います:
         1. ユーザーに確認ダイアログを表示(要件1.1)
         2. 現在選択されているフォルダの検証(要件1.2)
-        3. 既存インデックスのクリア(要件1.3)
+        3. 新しいインデックスを別の場所に構築し、完了後に既存インデックスと入れ替え(要件1.3)
         4. IndexingThreadManagerを使用したバックグラウンド処理開始(要件1.4)
         5. タイムアウト監視の開始(要件6.1)
         6. 進捗表示の開始(要件2.1)
@@ -66,9 +66,8 @@ class IndexController(QObject, LoggerMixin):
                 self.main_window.dialog_manager.show_folder_not_selected_dialog()
                 return
 
-            # 既存のインデックスをクリア
+            # 既存のインデックスはクリアせず、再構築が完了するまで検索に使用する
             self.logger.info(f"インデックス再構築開始: {current_folder}")
-            self.main_window.index_manager.clear_index()
 
             # 進捗表示を開始
             self.main_window.show_progress("インデックスを再構築中...", 0)
@@ -79,6 +78,7 @@ class IndexController(QObject, LoggerMixin):
                     folder_path=current_folder,
                     document_processor=self.main_window.document_processor,
                     index_manager=self.main_window.index_manager,
+                    rebuild=True,
                 )
 
                 if thread_id:
@@ -309,8 +309,8 @@ class IndexController(QObject, LoggerMixin):
             if hasattr(self.main_window, "timeout_manager") and self.main_window.timeout_manager:
                 self.main_window.timeout_manager.cancel_timeout(thread_id)
 
-            # 部分的なインデックスをクリア(要件6.3対応)
-            self.main_window.index_manager.clear_index()
+            # 構築途中のインデックスを破棄(要件6.3対応)
+            self.main_window.index_manager.abort_rebuild()
 
             # 検索キャッシュもクリア
             if hasattr(self.main_window, "search_manager") and self.main_window.search_manager:
@@ -327,7 +327,7 @@ class IndexController(QObject, LoggerMixin):
                 self.main_window,
                 "処理中断",
                 "インデックス再構築が中断されました。\n\n"
-                "部分的に処理されたインデックスはクリアされました。\n"
+                "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。\n"
                 "システム状態がリセットされ、再度インデックス再構築を実行できます。",
             )
 
@@ -589,7 +589,7 @@ class IndexController(QObject, LoggerMixin):
 
         self.logger.error(f"権限エラー: {folder_path}")
 
-        # 部分的なインデックスをクリア
+        # 構築途中のインデックスを破棄(既存のインデックスは維持)
         self._cleanup_partial_index()
 
         QMessageBox.critical(
@@ -602,7 +602,7 @@ class IndexController(QObject, LoggerMixin):
             "• 管理者権限でアプリケーションを実行してください\n"
             "• フォルダの権限設定を確認してください\n"
             "• 別のフォルダを選択してください\n\n"
-            "部分的に処理されたインデックスはクリアされました。",
+            "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。",
         )
 
     def _handle_resource_error(self, thread_id: str, error_message: str, thread_info: object | None) -> None:
@@ -613,7 +613,7 @@ class IndexController(QObject, LoggerMixin):
 
         self.logger.error(f"リソースエラー: {folder_path}")
 
-        # 部分的なインデックスをクリア
+        # 構築途中のインデックスを破棄(既存のインデックスは維持)
         self._cleanup_partial_index()
 
         QMessageBox.critical(
@@ -626,7 +626,7 @@ class IndexController(QObject, LoggerMixin):
             "• 他のアプリケーションを終了してください\n"
             "• より小さなフォルダから開始してください\n"
             "• システムを再起動してください\n\n"
-            "部分的に処理されたインデックスはクリアされました。",
+            "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。",
         )
 
     def _handle_disk_space_error(self, thread_id: str, error_message: str, thread_info: object | None) -> None:
@@ -637,7 +637,7 @@ class IndexController(QObject, LoggerMixin):
 
         self.logger.error(f"ディスク容量エラー: {folder_path}")
 
-        # 部分的なインデックスをクリア
+        # 構築途中のインデックスを破棄(既存のインデックスは維持)
         self._cleanup_partial_index()
 
         QMessageBox.critical(
@@ -650,7 +650,7 @@ class IndexController(QObject, LoggerMixin):
             "• 不要なファイルを削除してください\n"
             "• 一時ファイルをクリアしてください\n"
             "• より小さなフォルダから開始してください\n\n"
-            "部分的に処理されたインデックスはクリアされました。",
+            "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。",
         )
 
     def _handle_corruption_error(self, thread_id: str, error_message: str, thread_info: object | None) -> None:
@@ -685,7 +685,7 @@ class IndexController(QObject, LoggerMixin):
 
         self.logger.error(f"システムエラー: {folder_path}")
 
-        # 部分的なインデックスをクリア
+        # 構築途中のインデックスを破棄(既存のインデックスは維持)
         self._cleanup_partial_index()
 
         QMessageBox.critical(
@@ -698,7 +698,7 @@ class IndexController(QObject, LoggerMixin):
             "• しばらく待ってから再試行してください\n"
             "• システムを再起動してください\n"
             "• より小さなフォルダから開始してください\n\n"
-            "部分的に処理されたインデックスはクリアされました。",
+            "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。",
         )
 
     def _cleanup_partial_index(self) -> None:
@@ -710,7 +710,7 @@ class IndexController(QObject, LoggerMixin):
         try:
             if hasattr(self.main_window, "index_manager") and self.main_window.index_manager:
                 self.logger.info("部分的インデックスのクリーンアップを開始")
-                self.main_window.index_manager.clear_index()
+                self.main_window.index_manager.abort_rebuild()
 
                 # 検索結果をクリア
                 if hasattr(self.main_window, "search_results_widget"):
@@ -726,7 +726,7 @@ class IndexController(QObject, LoggerMixin):
 
                 # システム情報を更新
                 if hasattr(self.main_window, "system_info_label"):
-                    self.main_window.system_info_label.setText("インデックス: エラーによりクリア済み")
+                    self.main_window.system_info_label.setText("インデックス: 再構築前の状態を維持")
 
                 self.logger.info("部分的インデックスのクリーンアップが完了")
 
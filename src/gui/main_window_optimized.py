@@ -15,11 +15,12 @@ from PySide6.QtWidgets import QMainWindow, QWidget
 
 from src.core.document_processor import DocumentProcessor
 from src.core.embedding_manager import EmbeddingManager
-from src.core.index_manager import IndexManager
 from src.core.rebuild_timeout_manager import RebuildTimeoutManager
 from src.core.search_manager import SearchManager
+from src.core.sharded_index_manager import create_index_manager
 from src.core.thread_manager import IndexingThreadManager
 from src.data.database import DatabaseManager
+from src.data.search_history_repository import SearchHistoryRepository
 from src.gui.controllers.index_controller import IndexController
 from src.gui.dialogs.dialog_manager import DialogManager
 from src.gui.managers.cleanup_manager import CleanupManager
@@ -42,6 +43,10 @@ from src.utils.config import Config
 from src.utils.error_handler import handle_exceptions
 from src.utils.graceful_degradation import get_global_degradation_manager
 from src.utils.logging_config import LoggerMixin
+from src.utils.maintenance_scheduler import (
+    initialize_maintenance_scheduler,
+    register_default_maintenance_tasks,
+)
 
 
 class MainWindow(QMainWindow, LoggerMixin):
@@ -134,14 +139,28 @@ class MainWindow(QMainWindow, LoggerMixin):
             self.database_manager = DatabaseManager(str(db_path))
             # インデックスパスを設定
             index_path = self.config.data_dir / "whoosh_index"
-            # インデックスマネージャーの初期化
-            self.index_manager = IndexManager(str(index_path))
+            # インデックスマネージャーの初期化(設定に応じて単一インデックスまたはフォルダ別シャード)
+            self.index_manager = create_index_manager(str(index_path), self.config)
             # 埋め込みマネージャーの初期化
             self.embedding_manager = EmbeddingManager()
             # ドキュメントプロセッサーの初期化
             self.document_processor = DocumentProcessor()
-            # 検索マネージャーの初期化
-            self.search_manager = SearchManager(self.index_manager, self.embedding_manager)
+            # 検索マネージャーの初期化(検索履歴を記録し、検索提案にも使う)
+            self.search_manager = SearchManager(
+                self.index_manager,
+                self.embedding_manager,
+                config=self.config,
+                history_repository=SearchHistoryRepository(self.database_manager),
+            )
+            # アイドル時保守スケジューラーの初期化(セグメントマージ、増分バキューム、埋め込みジャーナル統合)
+            self.maintenance_scheduler = initialize_maintenance_scheduler(**self.config.get_maintenance_settings())
+            register_default_maintenance_tasks(
+                self.maintenance_scheduler,
+                index_manager=self.index_manager,
+                database_manager=self.database_manager,
+                embedding_manager=self.embedding_manager,
+            )
+            self.maintenance_scheduler.start()
             # スレッドマネージャーの初期化
             self.thread_manager = IndexingThreadManager(max_concurrent_threads=2)
             # タイムアウトマネージャーの初期化
@@ -327,6 +346,10 @@ class MainWindow(QMainWindow, LoggerMixin):
         """プレビュー要求処理(event_ui_managerに委譲)"""
         self.event_ui_manager.handle_preview_requested(result)
 
+    def _on_similar_requested(self, result) -> None:
+        """類似ドキュメント検索要求処理(search_handler_managerに委譲)"""
+        self.search_handler_manager.handle_similar_requested(result)
+
     def _on_page_changed(self, page: int) -> None:
         """ページ変更処理(event_ui_managerに委譲)"""
         self.event_ui_manager.handle_page_changed(page)
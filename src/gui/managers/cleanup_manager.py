@@ -160,6 +160,15 @@ class CleanupManager(QObject, LoggerMixin):
                     self.logger.debug(f"検索ワーカー停止エラー: {e}")
                 self.logger.info("検索インターフェースをクリーンアップしました")
 
+            # 検索提案ワーカーの停止
+            if hasattr(self.main_window, "search_handler_manager") and self.main_window.search_handler_manager:
+                self.main_window.search_handler_manager.shutdown_suggestions()
+
+            # 保守スケジューラーを停止(インデックスを閉じる前に実行中のマージを終わらせる)
+            if hasattr(self.main_window, "maintenance_scheduler") and self.main_window.maintenance_scheduler:
+                self.main_window.maintenance_scheduler.stop()
+                self.logger.info("保守スケジューラーを停止しました")
+
             # 検索マネージャーのクリーンアップ
             if hasattr(self.main_window, "search_manager"):
                 try:
@@ -227,7 +236,7 @@ class CleanupManager(QObject, LoggerMixin):
         try:
             if hasattr(self.main_window, "index_manager") and self.main_window.index_manager:
                 self.logger.info("部分的インデックスのクリーンアップを開始")
-                self.main_window.index_manager.clear_index()
+                self.main_window.index_manager.abort_rebuild()
 
                 # 検索結果をクリア
                 if hasattr(self.main_window, "search_results_widget"):
@@ -243,7 +252,7 @@ class CleanupManager(QObject, LoggerMixin):
 
                 # システム情報を更新
                 if hasattr(self.main_window, "system_info_label"):
-                    self.main_window.system_info_label.setText("インデックス: エラーによりクリア済み")
+                    self.main_window.system_info_label.setText("インデックス: 再構築前の状態を維持")
 
                 self.logger.info("部分的インデックスのクリーンアップが完了")
 
@@ -121,9 +121,9 @@ class ErrorRebuildManager(QObject, LoggerMixin):
             if hasattr(self.main_window, "timeout_manager") and self.main_window.timeout_manager:
                 self.main_window.timeout_manager.cancel_timeout(thread_id)
 
-            # 部分的なインデックスをクリア(要件6.3対応)
+            # 構築途中のインデックスを破棄(要件6.3対応)
             if hasattr(self.main_window, "index_manager"):
-                self.main_window.index_manager.clear_index()
+                self.main_window.index_manager.abort_rebuild()
 
             # 検索キャッシュもクリア
             if hasattr(self.main_window, "search_manager") and self.main_window.search_manager:
@@ -141,7 +141,7 @@ class ErrorRebuildManager(QObject, LoggerMixin):
                 self.main_window,
                 "処理中断",
                 "インデックス再構築が中断されました。\\n\\n"
-                "部分的に処理されたインデックスはクリアされました。\\n"
+                "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。\\n"
                 "システム状態がリセットされ、再度インデックス再構築を実行できます。",
             )
 
@@ -408,7 +408,7 @@ class ErrorRebuildManager(QObject, LoggerMixin):
 
         self.logger.error(f"権限エラー: {folder_path}")
 
-        # 部分的なインデックスをクリア
+        # 構築途中のインデックスを破棄(既存のインデックスは維持)
         if hasattr(self.main_window, "cleanup_manager"):
             self.main_window.cleanup_manager.cleanup_partial_index()
 
@@ -422,7 +422,7 @@ class ErrorRebuildManager(QObject, LoggerMixin):
             "• 管理者権限でアプリケーションを実行してください\\n"
             "• フォルダの権限設定を確認してください\\n"
             "• 別のフォルダを選択してください\\n\\n"
-            "部分的に処理されたインデックスはクリアされました。",
+            "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。",
         )
 
     def _handle_resource_error(self, thread_id: str, error_message: str, thread_info: object | None) -> None:
@@ -433,7 +433,7 @@ class ErrorRebuildManager(QObject, LoggerMixin):
 
         self.logger.error(f"リソースエラー: {folder_path}")
 
-        # 部分的なインデックスをクリア
+        # 構築途中のインデックスを破棄(既存のインデックスは維持)
         if hasattr(self.main_window, "cleanup_manager"):
             self.main_window.cleanup_manager.cleanup_partial_index()
 
@@ -447,7 +447,7 @@ class ErrorRebuildManager(QObject, LoggerMixin):
             "• 他のアプリケーションを終了してください\\n"
             "• より小さなフォルダから開始してください\\n"
             "• システムを再起動してください\\n\\n"
-            "部分的に処理されたインデックスはクリアされました。",
+            "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。",
         )
 
     def _handle_disk_space_error(self, thread_id: str, error_message: str, thread_info: object | None) -> None:
@@ -458,7 +458,7 @@ class ErrorRebuildManager(QObject, LoggerMixin):
 
         self.logger.error(f"ディスク容量エラー: {folder_path}")
 
-        # 部分的なインデックスをクリア
+        # 構築途中のインデックスを破棄(既存のインデックスは維持)
         if hasattr(self.main_window, "cleanup_manager"):
             self.main_window.cleanup_manager.cleanup_partial_index()
 
@@ -472,7 +472,7 @@ class ErrorRebuildManager(QObject, LoggerMixin):
             "• 不要なファイルを削除してください\\n"
             "• 一時ファイルをクリアしてください\\n"
             "• より小さなフォルダから開始してください\\n\\n"
-            "部分的に処理されたインデックスはクリアされました。",
+            "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。",
         )
 
     def _handle_corruption_error(self, thread_id: str, error_message: str, thread_info: object | None) -> None:
@@ -508,7 +508,7 @@ class ErrorRebuildManager(QObject, LoggerMixin):
 
         self.logger.error(f"システムエラー: {folder_path}")
 
-        # 部分的なインデックスをクリア
+        # 構築途中のインデックスを破棄(既存のインデックスは維持)
         if hasattr(self.main_window, "cleanup_manager"):
             self.main_window.cleanup_manager.cleanup_partial_index()
 
@@ -522,7 +522,7 @@ class ErrorRebuildManager(QObject, LoggerMixin):
             "• しばらく待ってから再試行してください\\n"
             "• システムを再起動してください\\n"
             "• より小さなフォルダから開始してください\\n\\n"
-            "部分的に処理されたインデックスはクリアされました。",
+            "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。",
         )
 
     def _perform_error_cleanup(self, thread_id: str, error_type: str, thread_info: object | None) -> None:
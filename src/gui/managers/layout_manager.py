@@ -135,6 +135,7 @@ class LayoutManager(QObject, LoggerMixin):
         # 検索結果ウィジェットのシグナル接続
         self.main_window.search_results_widget.result_selected.connect(self.main_window._on_search_result_selected)
         self.main_window.search_results_widget.preview_requested.connect(self.main_window._on_preview_requested)
+        self.main_window.search_results_widget.similar_requested.connect(self.main_window._on_similar_requested)
         self.main_window.search_results_widget.page_changed.connect(self.main_window._on_page_changed)
         self.main_window.search_results_widget.sort_changed.connect(self.main_window._on_sort_changed)
         self.main_window.search_results_widget.filter_changed.connect(self.main_window._on_filter_changed)
@@ -378,8 +378,8 @@ class RebuildHandlerManager(QObject, LoggerMixin):
             if hasattr(self.main_window, "timeout_manager") and self.main_window.timeout_manager:
                 self.main_window.timeout_manager.cancel_timeout(thread_id)
 
-            # 部分的なインデックスをクリア
-            self.main_window.index_manager.clear_index()
+            # 構築途中のインデックスを破棄(既存のインデックスは維持)
+            self.main_window.index_manager.abort_rebuild()
 
             # 検索キャッシュもクリア
             if hasattr(self.main_window, "search_manager") and self.main_window.search_manager:
@@ -396,7 +396,7 @@ class RebuildHandlerManager(QObject, LoggerMixin):
                 self.main_window,
                 "処理中断",
                 "インデックス再構築が中断されました。\\n\\n"
-                "部分的に処理されたインデックスはクリアされました。\\n"
+                "構築途中のインデックスは破棄され、再構築前のインデックスを引き続き使用できます。\\n"
                 "システム状態がリセットされ、再度インデックス再構築を実行できます。",
             )
 
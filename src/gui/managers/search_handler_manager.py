@@ -6,10 +6,14 @@ DocMind 検索・プレビューハンドラーマネージャー
 検索ワーカースレッド管理、結果表示、プレビュー制御を統合処理します。
 """
 
-from PySide6.QtCore import QObject
+from PySide6.QtCore import QObject, QTimer
 from PySide6.QtWidgets import QMainWindow
 
+from src.core.search_manager import prefix_query_text
+from src.data.models import SearchQuery, SearchType
+from src.gui.search.widgets.suggestion_worker import SuggestionController
 from src.gui.search.widgets.worker_thread import SearchWorkerThread
+from src.gui.search_results import SORT_KEYS
 from src.utils.logging_config import LoggerMixin
 
 
@@ -19,8 +23,15 @@ class SearchHandlerManager(QObject, LoggerMixin):
 
     検索関連のイベント処理を専門的に管理し、
     検索実行、結果表示、プレビュー制御を統合処理します。
+    入力中の検索(as-you-type)では、入力が止まるたびに前方一致の検索を実行し、
+    実行中の古い検索はキャンセルして最新のクエリの結果だけを表示します。
     """
 
+    # 入力中の検索を行う検索タイプ(埋め込みモデルを使う検索は重いため対象外)
+    AS_YOU_TYPE_SEARCH_TYPES = (SearchType.FULL_TEXT, SearchType.FILENAME)
+    # 入力中の検索を行う最小の文字数
+    AS_YOU_TYPE_MIN_LENGTH = 2
+
     def __init__(self, main_window: QMainWindow):
         """
         検索・プレビューハンドラーマネージャーの初期化
@@ -31,6 +42,17 @@ class SearchHandlerManager(QObject, LoggerMixin):
         super().__init__(main_window)
         self.main_window = main_window
         self.search_worker: SearchWorkerThread | None = None
+        self.search_query: SearchQuery | None = None
+        self.suggestion_controller: SuggestionController | None = None
+        # キャンセル済みで終了待ちのワーカー(実行中のQThreadを破棄しないよう参照を保持する)
+        self._retired_workers: list[SearchWorkerThread] = []
+        # 現在の検索の途中結果を表示済みかどうか(最終結果は表示を保ったまま置き換える)
+        self._partial_results_shown = False
+
+        # 入力中の検索のデバウンス用タイマー
+        self._as_you_type_timer = QTimer(self)
+        self._as_you_type_timer.setSingleShot(True)
+        self._as_you_type_timer.timeout.connect(self._run_as_you_type_search)
 
         self.logger.debug("検索・プレビューハンドラーマネージャーが初期化されました")
 
@@ -49,24 +71,90 @@ class SearchHandlerManager(QObject, LoggerMixin):
             return
 
         self.main_window.show_status_message(f"検索実行: '{search_query.query_text}'", 3000)
+        self._as_you_type_timer.stop()
+        self._start_search(search_query)
+
+    def _start_search(self, search_query: SearchQuery, speculative: bool = False) -> None:
+        """実行中の検索をキャンセルし、検索ワーカースレッドを作成して実行
 
-        # 検索ワーカースレッドを作成して実行
-        self.search_worker = SearchWorkerThread(self.main_window.search_manager, search_query)
-        self.search_worker.progress_updated.connect(self.main_window.search_interface.progress_widget.update_progress)
+        Args:
+            search_query: 検索クエリオブジェクト
+            speculative: 入力中の検索の場合True(進捗表示と検索履歴の記録を行わない)
+        """
+        self._cancel_running_search()
+
+        # 全文検索はインデックス側でページングし、表示するページだけを取得する
+        page_kwargs = {}
+        if search_query.search_type == SearchType.FULL_TEXT:
+            results_widget = self.main_window.search_results_widget
+            sort_by, descending = SORT_KEYS[results_widget.current_sort_order]
+            page_kwargs = {
+                "page_size": results_widget.results_per_page,
+                "sort_by": sort_by,
+                "descending": descending,
+            }
+        self.search_query = search_query
+        self._partial_results_shown = False
+        self.search_worker = SearchWorkerThread(
+            self.main_window.search_manager, search_query, speculative=speculative, **page_kwargs
+        )
+        if not speculative:
+            self.search_worker.progress_updated.connect(
+                self.main_window.search_interface.progress_widget.update_progress
+            )
+        self.search_worker.partial_results.connect(self.handle_partial_results)
         self.search_worker.search_completed.connect(self.handle_search_completed)
+        self.search_worker.page_completed.connect(self.handle_page_completed)
         self.search_worker.search_error.connect(self.handle_search_error)
         self.search_worker.start()
 
+    def _cancel_running_search(self) -> None:
+        """実行中の検索をキャンセル(終了を待たず、終了するまで参照を保持する)"""
+        worker = self.search_worker
+        self.search_worker = None
+        if worker is None or not worker.isRunning():
+            return
+
+        worker.cancel()
+        self._retired_workers.append(worker)
+        worker.finished.connect(lambda: self._retired_workers.remove(worker))
+
+    def _is_stale_signal(self) -> bool:
+        """シグナルの送信元が現在の検索ワーカー以外(キャンセル済みの古い検索)の場合True"""
+        sender = self.sender()
+        return isinstance(sender, SearchWorkerThread) and sender is not self.search_worker
+
+    def _is_speculative(self) -> bool:
+        """現在の検索が入力中の検索の場合True"""
+        return self.search_worker is not None and self.search_worker.speculative
+
     def handle_search_cancelled(self) -> None:
         """検索キャンセル時の処理"""
         self.logger.info("検索がキャンセルされました")
         self.main_window.show_status_message("検索がキャンセルされました", 3000)
 
-        # 実際の検索キャンセル処理
+        # 実際の検索キャンセル処理(照合中の検索もトークンで中断される)
+        self._as_you_type_timer.stop()
         if self.search_worker and self.search_worker.isRunning():
             self.search_worker.cancel()
             self.search_worker.wait()
 
+    def handle_partial_results(self, results) -> None:
+        """途中結果の受信時の処理(ハイブリッド検索の全文検索の結果を先に表示)
+
+        Args:
+            results: 途中結果
+        """
+        if self._is_stale_signal():
+            return
+        self.logger.debug(f"途中結果を表示: {len(results)}件")
+
+        self.main_window.search_results_widget.display_results(results)
+        self._partial_results_shown = True
+        self.main_window.show_status_message(
+            f"全文検索の結果 {len(results)}件を表示中 - セマンティック検索で並べ替えています...", 5000
+        )
+
     def handle_search_completed(self, results, execution_time: float) -> None:
         """検索完了時の処理
 
@@ -74,17 +162,86 @@ class SearchHandlerManager(QObject, LoggerMixin):
             results: 検索結果
             execution_time: 実行時間(秒)
         """
+        if self._is_stale_signal():
+            return
         self.logger.info(f"検索完了: {len(results)}件, {execution_time:.1f}秒")
 
-        # 検索結果を表示
-        self.main_window.search_results_widget.display_results(results)
+        # 検索結果を表示(途中結果を表示済みの場合はスクロール位置と選択を保ったまま置き換える)
+        if self._partial_results_shown:
+            self.main_window.search_results_widget.update_results(results)
+        else:
+            self.main_window.search_results_widget.display_results(results)
+
+        if self._is_speculative():
+            self.main_window.show_status_message(f"入力中の検索: {len(results)}件の結果", 3000)
+            return
 
         # 検索インターフェースに完了を通知
         self.main_window.search_interface.on_search_completed(results, execution_time)
 
-        # ステータス更新
+        # ステータス更新(時間予算を超えて打ち切った場合はその旨も表示する)
         result_count = len(results)
-        self.main_window.show_status_message(f"検索完了: {result_count}件の結果 ({execution_time:.1f}秒)", 5000)
+        status = f"検索完了: {result_count}件の結果 ({execution_time:.1f}秒)"
+        deadline = getattr(self.search_worker, "deadline", None)
+        truncated = deadline is not None and deadline.truncated
+        if truncated:
+            status += " - 時間制限のため結果は一部のみです"
+        self.main_window.show_status_message(status, 10000 if truncated else 5000)
+
+        # 検索履歴に記録(次回以降の検索提案に使われる)
+        self._record_search(result_count, execution_time)
+
+    def handle_page_completed(self, result_page, execution_time: float) -> None:
+        """ページ検索完了時の処理
+
+        Args:
+            result_page: 最初のページの検索結果(SearchResultPage)
+            execution_time: 実行時間(秒)
+        """
+        if self._is_stale_signal():
+            return
+        total_text = f"{result_page.total}件" if result_page.total_is_exact else f"約{result_page.total}件"
+        self.logger.info(f"検索完了: {total_text}, {execution_time:.1f}秒")
+
+        # ページ・ソート変更時は同じクエリで該当ページだけを取得し直す
+        search_manager = self.main_window.search_manager
+        search_query = self.search_query
+
+        def fetch_page(page: int, page_size: int, sort_by: str, descending: bool):
+            return search_manager.search_page(search_query, page, page_size, sort_by=sort_by, descending=descending)
+
+        self.main_window.search_results_widget.display_page(result_page, fetch_page)
+
+        if self._is_speculative():
+            self.main_window.show_status_message(f"入力中の検索: {total_text}の結果", 3000)
+            return
+
+        # 検索インターフェースに完了を通知
+        self.main_window.search_interface.on_search_completed(result_page.results, execution_time)
+
+        # ステータス更新(クエリの展開を制限した場合などは警告も表示する)
+        status = f"検索完了: {total_text}の結果 ({execution_time:.1f}秒)"
+        if result_page.suggestions:
+            status += " - もしかして: " + "、".join(f"「{suggestion}」" for suggestion in result_page.suggestions)
+        if result_page.warnings:
+            status += " - " + " / ".join(result_page.warnings)
+        notice = result_page.suggestions or result_page.warnings
+        self.main_window.show_status_message(status, 10000 if notice else 5000)
+
+        # 検索履歴に記録(次回以降の検索提案に使われる)
+        self._record_search(result_page.total, execution_time)
+
+    def _record_search(self, result_count: int, execution_time: float) -> None:
+        """完了した検索を検索履歴に記録
+
+        Args:
+            result_count: 結果数
+            execution_time: 実行時間(秒)
+        """
+        search_manager = getattr(self.main_window, "search_manager", None)
+        if search_manager is None or self.search_query is None:
+            return
+        search_manager.record_search(self.search_query, result_count, execution_time)
 
     def handle_search_error(self, error_message: str) -> None:
         """検索エラー時の処理
@@ -92,6 +249,12 @@ class SearchHandlerManager(QObject, LoggerMixin):
         Args:
             error_message: エラーメッセージ
         """
+        if self._is_stale_signal():
+            return
+        if self._is_speculative():
+            # 入力途中のクエリは構文が不完全なことが多いため、エラー表示はしない
+            self.logger.debug(f"入力中の検索エラー: {error_message}")
+            return
         self.logger.error(f"検索エラー: {error_message}")
 
         # 検索インターフェースにエラーを通知
@@ -101,18 +264,85 @@ class SearchHandlerManager(QObject, LoggerMixin):
         self.main_window.show_status_message("検索エラーが発生しました", 5000)
 
     def handle_search_text_changed(self, text: str) -> None:
-        """検索テキスト変更時の処理(検索提案を更新)
+        """検索テキスト変更時の処理(検索提案を非同期に更新し、入力中の検索を予約)
+
+        入力が止まってから専用スレッドで取得し、最新の入力に対する結果だけを
+        update_search_suggestionsに渡すため、入力をブロックしません。
+
+        Args:
+            text: 入力されたテキスト
+        """
+        search_manager = getattr(self.main_window, "search_manager", None)
+        if search_manager is None:
+            return
+
+        if self.suggestion_controller is None:
+            self.suggestion_controller = SuggestionController(search_manager, self)
+            self.suggestion_controller.suggestions_ready.connect(
+                self.main_window.search_interface.update_search_suggestions
+            )
+        self.suggestion_controller.request(text)
+
+        self._schedule_as_you_type_search(text)
+
+    def _schedule_as_you_type_search(self, text: str) -> None:
+        """入力が止まってから入力中の検索を実行するようタイマーを再始動
 
         Args:
             text: 入力されたテキスト
         """
-        if hasattr(self.main_window, "search_manager") and self.main_window.search_manager and len(text.strip()) >= 2:
-            try:
-                suggestions = self.main_window.search_manager.get_search_suggestions(text.strip(), limit=10)
-                self.main_window.search_interface.update_search_suggestions(suggestions)
-            except Exception as e:
-                self.logger.debug(f"検索提案の取得に失敗: {e}")
-                # エラーが発生しても検索提案は必須機能ではないため、ログのみ出力
+        self._as_you_type_timer.stop()
+        enabled, delay_ms = self._as_you_type_settings()
+        if not enabled:
+            return
+
+        if len(text.strip()) < self.AS_YOU_TYPE_MIN_LENGTH:
+            # 入力を消した場合は実行中の入力中の検索も不要になる
+            if self._is_speculative():
+                self._cancel_running_search()
+            return
+
+        self._as_you_type_timer.start(delay_ms)
+
+    def _as_you_type_settings(self) -> tuple[bool, int]:
+        """入力中の検索の設定を取得
+
+        Returns:
+            tuple[bool, int]: 有効かどうか、入力が止まってから検索するまでの待ち時間(ミリ秒)
+        """
+        config = getattr(self.main_window, "config", None)
+        if config is None:
+            return True, 300
+        enabled = config.get("search_as_you_type", True)
+        delay_ms = config.get("search_as_you_type_delay_ms", 300)
+        if not isinstance(enabled, bool) or not isinstance(delay_ms, int):
+            return True, 300
+        return enabled, max(0, delay_ms)
+
+    def _run_as_you_type_search(self) -> None:
+        """入力中のテキストを前方一致のクエリにして検索を実行"""
+        search_interface = self.main_window.search_interface
+        text = search_interface.get_search_text().strip()
+        if len(text) < self.AS_YOU_TYPE_MIN_LENGTH:
+            return
+        # 明示的に実行した検索が進行中の場合はそれを優先する
+        if self.search_worker is not None and self.search_worker.isRunning() and not self.search_worker.speculative:
+            return
+
+        search_query = search_interface.build_search_query(text)
+        if search_query.search_type not in self.AS_YOU_TYPE_SEARCH_TYPES:
+            return
+        if search_query.search_type == SearchType.FULL_TEXT:
+            search_query.query_text = prefix_query_text(text)
+
+        self.logger.debug(f"入力中の検索: '{search_query.query_text}'")
+        self._start_search(search_query, speculative=True)
+
+    def shutdown_suggestions(self) -> None:
+        """検索提案ワーカーを停止"""
+        if self.suggestion_controller is not None:
+            self.suggestion_controller.shutdown()
+            self.suggestion_controller = None
 
     def handle_search_result_selected(self, result) -> None:
         """検索結果が選択された時の処理
@@ -148,6 +378,31 @@ class SearchHandlerManager(QObject, LoggerMixin):
         if hasattr(result, "highlighted_terms") and result.highlighted_terms:
             self.main_window.preview_widget.highlight_search_terms(result.highlighted_terms)
 
+    def handle_similar_requested(self, result) -> None:
+        """類似ドキュメントの検索が要求された時の処理
+
+        キーワードによる検索のため埋め込みモデルを使わず、その場で実行します。
+
+        Args:
+            result: 元になる検索結果
+        """
+        self.logger.info(f"類似ドキュメント検索が要求されました: {result.document.title}")
+
+        search_manager = getattr(self.main_window, "search_manager", None)
+        if search_manager is None:
+            self.main_window.show_status_message("検索機能が初期化されていません", 3000)
+            return
+
+        try:
+            results = search_manager.find_similar(result.document.id)
+        except Exception as e:
+            self.logger.error(f"類似ドキュメント検索に失敗しました: {e}")
+            self.main_window.show_status_message(f"類似ドキュメント検索に失敗しました: {e}", 5000)
+            return
+
+        self.main_window.search_results_widget.display_results(results)
+        self.main_window.show_status_message(f"「{result.document.title}」の類似ドキュメント: {len(results)}件", 5000)
+
     def handle_page_changed(self, page: int) -> None:
         """ページが変更された時の処理
 
@@ -54,6 +54,9 @@ class SettingsThemeManager(QObject, LoggerMixin):
             # フォント設定の更新
             self._update_font_settings(settings)
 
+            # 検索設定の更新
+            self._update_search_settings(settings)
+
             self.logger.info("設定変更が適用されました")
 
         except Exception as e:
@@ -90,6 +93,24 @@ class SettingsThemeManager(QObject, LoggerMixin):
         except Exception as e:
             self.logger.warning(f"ログ設定の更新に失敗: {e}")
 
+    def _update_search_settings(self, settings: dict[str, Any]) -> None:
+        """
+        検索設定の更新
+
+        Args:
+            settings: 設定辞書
+        """
+        try:
+            search_timeout = settings.get("search_timeout")
+            search_manager = getattr(self.main_window, "search_manager", None)
+
+            if search_timeout and search_manager is not None:
+                search_manager.update_search_settings(search_timeout=search_timeout)
+                self.logger.debug(f"検索の時間予算を更新: {search_timeout}秒")
+
+        except Exception as e:
+            self.logger.warning(f"検索設定の更新に失敗: {e}")
+
     def _update_window_size(self, settings: dict[str, Any]) -> None:
         """
         ウィンドウサイズの更新
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+検索提案ワーカー
+
+入力のたびに検索提案を取得すると、GUIスレッドで補完インデックスの読み込みや
+検索履歴の問い合わせが走り入力が止まるため、入力が落ち着いてから専用のスレッドで
+取得し、最新の入力に対する結果だけをシグナルで返します。
+"""
+
+import logging
+import time
+
+from PySide6.QtCore import QObject, QThread, QTimer, Signal, Slot
+
+from ....utils.latency_histogram import LatencyHistogram
+
+
+class SuggestionWorker(QObject):
+    """
+    検索提案を取得するワーカー(専用スレッドで動作)
+
+    取得前と取得後に要求が最新かを確認し、古くなった要求は取得・通知を省きます。
+    """
+
+    # 取得完了 (要求ID, 提案リスト)
+    suggestions_fetched = Signal(int, list)
+
+    def __init__(self, search_manager, controller: "SuggestionController"):
+        """
+        検索提案ワーカーを初期化
+
+        Args:
+            search_manager: 検索マネージャー
+            controller: 最新の要求IDと処理時間の集計を持つコントローラー
+        """
+        super().__init__()
+        self.search_manager = search_manager
+        self.controller = controller
+        self.logger = logging.getLogger(__name__)
+
+    @Slot(int, str, int)
+    def fetch(self, request_id: int, text: str, limit: int) -> None:
+        """
+        検索提案を取得
+
+        Args:
+            request_id: 要求ID
+            text: 入力中の検索テキスト
+            limit: 最大件数
+        """
+        if not self.controller.is_current(request_id):
+            return
+
+        start_time = time.perf_counter()
+        try:
+            suggestions = self.search_manager.get_search_suggestions(text, limit=limit)
+        except Exception as e:
+            # 検索提案は必須機能ではないため、ログのみ出力
+            self.logger.debug(f"検索提案の取得に失敗: {e}")
+            return
+        finally:
+            self.controller.latency.record((time.perf_counter() - start_time) * 1000)
+
+        if self.controller.is_current(request_id):
+            self.suggestions_fetched.emit(request_id, suggestions)
+
+
+class SuggestionController(QObject):
+    """
+    検索提案の非同期取得を制御するコントローラー
+
+    入力のたびにタイマーを再始動し、入力が止まってから要求を専用スレッドのワーカーに送ります。
+    新しい入力があるたびに要求IDを進めるため、待ち行列や処理中の古い要求は結果を返しません。
+    """
+
+    # 最新の入力に対する検索提案 (提案リスト)
+    suggestions_ready = Signal(list)
+    # ワーカーへの取得要求 (要求ID, 検索テキスト, 最大件数)
+    _fetch_requested = Signal(int, str, int)
+
+    # 入力が止まってから取得するまでの待ち時間(ミリ秒)
+    DEBOUNCE_MS = 150
+    # 検索提案を取得する最小の文字数
+    MIN_LENGTH = 2
+
+    def __init__(self, search_manager, parent: QObject | None = None, debounce_ms: int = DEBOUNCE_MS, limit: int = 10):
+        """
+        検索提案コントローラーを初期化
+
+        Args:
+            search_manager: 検索マネージャー
+            parent: 親オブジェクト
+            debounce_ms: 入力が止まってから取得するまでの待ち時間(ミリ秒)
+            limit: 最大件数
+        """
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self.limit = limit
+        self.latency = LatencyHistogram("検索提案")
+        self._request_id = 0
+        self._pending_text = ""
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._dispatch)
+
+        self._thread = QThread(self)
+        self._worker = SuggestionWorker(search_manager, self)
+        self._worker.moveToThread(self._thread)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._fetch_requested.connect(self._worker.fetch)
+        self._worker.suggestions_fetched.connect(self._on_suggestions_fetched)
+
+    def request(self, text: str) -> None:
+        """
+        入力中のテキストに対する検索提案を要求(入力が止まってから取得する)
+
+        Args:
+            text: 入力中の検索テキスト
+        """
+        # 以前の要求を古いものにする
+        self._request_id += 1
+        self._pending_text = text.strip()
+        if len(self._pending_text) < self.MIN_LENGTH:
+            self._timer.stop()
+            return
+        self._timer.start()
+
+    def is_current(self, request_id: int) -> bool:
+        """
+        要求が最新かを確認(ワーカースレッドからも呼ばれる)
+
+        Args:
+            request_id: 要求ID
+
+        Returns:
+            bool: 最新の要求の場合True
+        """
+        return request_id == self._request_id
+
+    def shutdown(self) -> None:
+        """ワーカースレッドを停止し、処理時間の集計をログに出力"""
+        self._timer.stop()
+        self._request_id += 1
+        if self._thread.isRunning():
+            self._thread.quit()
+            self._thread.wait()
+        if self.latency.snapshot()["count"]:
+            self.logger.info(self.latency.summary())
+
+    def _dispatch(self) -> None:
+        """待ち時間が経過した入力の検索提案をワーカーに要求"""
+        if not self._thread.isRunning():
+            self._thread.start()
+        self._fetch_requested.emit(self._request_id, self._pending_text, self.limit)
+
+    @Slot(int, list)
+    def _on_suggestions_fetched(self, request_id: int, suggestions: list) -> None:
+        """
+        ワーカーの取得結果を受け取る(最新の要求の結果だけを通知)
+
+        Args:
+            request_id: 要求ID
+            suggestions: 提案リスト
+        """
+        if self.is_current(request_id):
+            self.suggestions_ready.emit(suggestions)
@@ -2,7 +2,7 @@
 """
 検索タイプ選択ウィジェット
 
-全文検索、セマンティック検索、ハイブリッド検索の選択機能を提供します。
+全文検索、セマンティック検索、ハイブリッド検索、ファイル名検索の選択機能を提供します。
 """
 
 import logging
@@ -18,7 +18,7 @@ class SearchTypeSelector(QWidget):
     """
     検索タイプ選択ウィジェット
 
-    全文検索、セマンティック検索、ハイブリッド検索の選択機能を提供します。
+    全文検索、セマンティック検索、ハイブリッド検索、ファイル名検索の選択機能を提供します。
     """
 
     # シグナル定義
@@ -72,6 +72,12 @@ class SearchTypeSelector(QWidget):
         self.button_group.addButton(self.hybrid_radio, 2)
         layout.addWidget(self.hybrid_radio)
 
+        # ファイル名検索ラジオボタン
+        self.filename_radio = QRadioButton("ファイル名検索")
+        self.filename_radio.setToolTip("ファイル名・フォルダパスの部分一致による検索")
+        self.button_group.addButton(self.filename_radio, 3)
+        layout.addWidget(self.filename_radio)
+
         # スペーサー
         layout.addStretch()
 
@@ -111,6 +117,8 @@ class SearchTypeSelector(QWidget):
             self.current_search_type = SearchType.SEMANTIC
         elif button == self.hybrid_radio:
             self.current_search_type = SearchType.HYBRID
+        elif button == self.filename_radio:
+            self.current_search_type = SearchType.FILENAME
 
         self.search_type_changed.emit(self.current_search_type)
         self.logger.debug(f"検索タイプ変更: {self.current_search_type.value}")
@@ -129,3 +137,5 @@ class SearchTypeSelector(QWidget):
             self.semantic_radio.setChecked(True)
         elif search_type == SearchType.HYBRID:
             self.hybrid_radio.setChecked(True)
+        elif search_type == SearchType.FILENAME:
+            self.filename_radio.setChecked(True)
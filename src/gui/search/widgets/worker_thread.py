@@ -11,7 +11,9 @@ import logging
 from PySide6.QtCore import QThread, Signal
 from PySide6.QtWidgets import QWidget
 
+from ....core.cancellation import CancellationToken, SearchDeadline
 from ....data.models import SearchQuery
+from ....utils.exceptions import SearchCancelledError
 
 
 class SearchWorkerThread(QThread):
@@ -20,14 +22,30 @@ class SearchWorkerThread(QThread):
 
     UIをブロックすることなく検索処理を実行し、
     進捗更新とキャンセル機能を提供します。
+    キャンセルはトークンで検索処理に伝わり、照合の途中でも中断されます。
+    検索は検索マネージャーの時間予算(search_timeout)内で打ち切られ、
+    途中までの結果になった場合はdeadline.truncatedがTrueになります。
+    ハイブリッド検索では、全文検索の結果をpartial_resultsで先に通知します。
     """
 
     # シグナル定義
     progress_updated = Signal(str, int)  # 進捗更新 (メッセージ, 進捗%)
+    partial_results = Signal(list)  # 最終結果より先に得られた途中結果 (結果)
     search_completed = Signal(list, float)  # 検索完了 (結果, 実行時間)
+    page_completed = Signal(object, float)  # ページ検索完了 (SearchResultPage, 実行時間)
     search_error = Signal(str)  # 検索エラー (エラーメッセージ)
 
-    def __init__(self, search_manager, query: SearchQuery, parent: QWidget | None = None):
+    def __init__(
+        self,
+        search_manager,
+        query: SearchQuery,
+        parent: QWidget | None = None,
+        *,
+        page_size: int | None = None,
+        sort_by: str = "relevance",
+        descending: bool = True,
+        speculative: bool = False,
+    ):
         """
         検索ワーカーを初期化
 
@@ -35,18 +53,29 @@ class SearchWorkerThread(QThread):
             search_manager: 検索マネージャー
             query: 検索クエリ
             parent: 親ウィジェット
+            page_size: 指定した場合は最初のページだけを取得してpage_completedを発行
+            sort_by: ページ検索の並び替えキー
+            descending: ページ検索を降順にする場合True
+            speculative: 入力中の検索(確定した検索ではない)の場合True
         """
         super().__init__(parent)
 
         self.search_manager = search_manager
         self.query = query
+        self.page_size = page_size
+        self.sort_by = sort_by
+        self.descending = descending
+        self.speculative = speculative
         self.is_cancelled = False
+        self.cancel_token = CancellationToken()
+        self.deadline: SearchDeadline | None = None
         self.logger = logging.getLogger(__name__)
 
     def run(self) -> None:
         """検索処理を実行"""
         try:
             start_time = datetime.now()
+            self.deadline = SearchDeadline(self.search_manager.search_timeout)
 
             # 検索実行
             self.progress_updated.emit("検索を実行中...", 10)
@@ -54,7 +83,23 @@ class SearchWorkerThread(QThread):
             if self.is_cancelled:
                 return
 
-            results = self.search_manager.search(self.query)
+            if self.page_size is not None:
+                results = self.search_manager.search_page(
+                    self.query,
+                    1,
+                    self.page_size,
+                    sort_by=self.sort_by,
+                    descending=self.descending,
+                    cancel_token=self.cancel_token,
+                    deadline=self.deadline,
+                )
+            else:
+                results = self.search_manager.search(
+                    self.query,
+                    cancel_token=self.cancel_token,
+                    deadline=self.deadline,
+                    on_partial_results=self._emit_partial_results,
+                )
 
             if self.is_cancelled:
                 return
@@ -65,14 +110,31 @@ class SearchWorkerThread(QThread):
             execution_time = (datetime.now() - start_time).total_seconds()
 
             self.progress_updated.emit("完了", 100)
-            self.search_completed.emit(results, execution_time)
+            if self.page_size is not None:
+                self.page_completed.emit(results, execution_time)
+            else:
+                self.search_completed.emit(results, execution_time)
 
+        except SearchCancelledError:
+            self.logger.debug(f"検索を中断しました: '{self.query.query_text}'")
         except Exception as e:
             if not self.is_cancelled:
                 self.logger.error(f"検索スレッドエラー: {e}")
                 self.search_error.emit(str(e))
 
+    def _emit_partial_results(self, results: list) -> None:
+        """
+        途中結果を通知(検索スレッドから呼ばれる)
+
+        Args:
+            results: 途中結果
+        """
+        if not self.is_cancelled:
+            self.progress_updated.emit("全文検索の結果を表示しています...", 50)
+            self.partial_results.emit(results)
+
     def cancel(self) -> None:
-        """検索をキャンセル"""
+        """検索をキャンセル(実行中の検索も照合の途中で中断される)"""
         self.is_cancelled = True
+        self.cancel_token.cancel()
         self.logger.debug("検索スレッドのキャンセルが要求されました")
@@ -213,6 +213,20 @@ class SearchInterface(QWidget):
         """現在の検索テキストを取得"""
         return self.api_manager.get_search_text(self.search_input)
 
+    def build_search_query(self, query_text: str) -> SearchQuery:
+        """
+        現在の検索タイプと検索オプションで検索クエリを構築
+
+        Args:
+            query_text: 検索テキスト
+
+        Returns:
+            構築された検索クエリ
+        """
+        search_type = self.search_type_selector.get_search_type()
+        search_options = self.advanced_options.get_search_options()
+        return self.search_controller._build_search_query(query_text, search_type, search_options)
+
     def clear_search(self) -> None:
         """検索フィールドをクリア"""
         self.api_manager.clear_search(self.search_input)
@@ -7,6 +7,7 @@ QListWidgetを拡張した検索結果表示機能を実装します。
 結果のソート、フィルタリング、ページネーション機能を提供します。
 """
 
+from collections.abc import Callable
 from enum import Enum
 import logging
 import math
@@ -19,6 +20,7 @@ from PySide6.QtWidgets import (
     QFrame,
     QHBoxLayout,
     QLabel,
+    QMenu,
     QPushButton,
     QScrollArea,
     QSpinBox,
@@ -26,7 +28,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from src.data.models import FileType, SearchResult, SearchType
+from src.data.models import FileType, SearchResult, SearchResultPage, SearchType
 
 
 class SortOrder(Enum):
@@ -42,6 +44,22 @@ class SortOrder(Enum):
     SIZE_ASC = "size_asc"  # サイズ昇順
 
 
+# ソート順とSearchManager.search_pageの並び替えキー・降順指定の対応
+SORT_KEYS: dict[SortOrder, tuple[str, bool]] = {
+    SortOrder.RELEVANCE_DESC: ("relevance", True),
+    SortOrder.RELEVANCE_ASC: ("relevance", False),
+    SortOrder.TITLE_ASC: ("title", False),
+    SortOrder.TITLE_DESC: ("title", True),
+    SortOrder.DATE_DESC: ("modified_date", True),
+    SortOrder.DATE_ASC: ("modified_date", False),
+    SortOrder.SIZE_DESC: ("size", True),
+    SortOrder.SIZE_ASC: ("size", False),
+}
+
+# ページ取得関数 (ページ番号, 1ページあたりの件数, 並び替えキー, 降順) -> SearchResultPage
+PageFetcher = Callable[[int, int, str, bool], SearchResultPage]
+
+
 class SearchResultItemWidget(QFrame):
     """
     検索結果の個別アイテムを表示するカスタムウィジェット
@@ -53,6 +71,7 @@ class SearchResultItemWidget(QFrame):
     # シグナル定義
     item_clicked = Signal(SearchResult)  # アイテムがクリックされた時
     preview_requested = Signal(SearchResult)  # プレビューが要求された時
+    similar_requested = Signal(SearchResult)  # 類似ドキュメントの検索が要求された時
 
     def __init__(self, search_result: SearchResult, parent: QWidget | None = None):
         """
@@ -232,6 +251,7 @@ class SearchResultItemWidget(QFrame):
             SearchType.FULL_TEXT: "#2196f3",  # 青
             SearchType.SEMANTIC: "#9c27b0",  # 紫
             SearchType.HYBRID: "#ff5722",  # 深いオレンジ
+            SearchType.FILENAME: "#607d8b",  # ブルーグレー
         }
         return type_colors.get(search_type, "#666666")
 
@@ -252,6 +272,18 @@ class SearchResultItemWidget(QFrame):
             self.preview_requested.emit(self.search_result)
         super().mouseDoubleClickEvent(event)
 
+    def contextMenuEvent(self, event) -> None:
+        """右クリックメニューを表示"""
+        menu = QMenu(self)
+        preview_action = menu.addAction("プレビュー")
+        similar_action = menu.addAction("類似ドキュメントを検索")
+
+        action = menu.exec(event.globalPos())
+        if action == preview_action:
+            self.preview_requested.emit(self.search_result)
+        elif action == similar_action:
+            self.similar_requested.emit(self.search_result)
+
     def enterEvent(self, event) -> None:
         """マウスエンターイベントをハンドル"""
         self.is_hovered = True
@@ -264,6 +296,21 @@ class SearchResultItemWidget(QFrame):
         self._update_style()
         super().leaveEvent(event)
 
+    def set_search_result(self, search_result: SearchResult) -> None:
+        """
+        表示する検索結果を置き換え(ウィジェットを作り直さずに内容だけを更新)
+
+        Args:
+            search_result: 新しく表示する検索結果
+        """
+        self.search_result = search_result
+        self.title_label.setText(search_result.document.title)
+        self.score_label.setText(search_result.get_formatted_score())
+        self.snippet_label.setText(self._format_snippet())
+        self.file_info_label.setText(self._format_file_info())
+        self.search_type_label.setText(search_result.get_search_type_display())
+        self._update_style()
+
     def set_selected(self, selected: bool) -> None:
         """選択状態を設定"""
         self.is_selected = selected
@@ -285,6 +332,7 @@ class SearchResultsWidget(QWidget):
     # シグナル定義
     result_selected = Signal(SearchResult)  # 結果が選択された時
     preview_requested = Signal(SearchResult)  # プレビューが要求された時
+    similar_requested = Signal(SearchResult)  # 類似ドキュメントの検索が要求された時
     page_changed = Signal(int)  # ページが変更された時
     sort_changed = Signal(SortOrder)  # ソート順が変更された時
     filter_changed = Signal(dict)  # フィルターが変更された時
@@ -311,6 +359,11 @@ class SearchResultsWidget(QWidget):
         self.current_page = 1
         self.total_pages = 1
 
+        # サーバー側ページング(設定時は表示中のページだけを保持し、ページ・ソート変更時に再取得)
+        self.page_fetcher: PageFetcher | None = None
+        self.total_results = 0
+        self.total_is_exact = True
+
         # ソート・フィルター設定
         self.current_sort_order = SortOrder.RELEVANCE_DESC
         self.current_filters: dict[str, Any] = {}
@@ -494,6 +547,7 @@ class SearchResultsWidget(QWidget):
         """
         self.logger.info(f"検索結果を表示: {len(results)}件")
 
+        self.page_fetcher = None
         self.all_results = results.copy()
         self.selected_result = None
 
@@ -512,6 +566,118 @@ class SearchResultsWidget(QWidget):
         # 結果数を更新
         self._update_result_count()
 
+    def update_results(self, results: list[SearchResult]) -> None:
+        """
+        表示中の検索結果を置き換えます(途中結果を最終結果で更新する場合など)
+
+        表示中のページ、スクロール位置、選択中のドキュメントを保ったまま、
+        既存のアイテムウィジェットの内容を書き換えます。
+
+        Args:
+            results: 新しい検索結果のリスト
+        """
+        if self.page_fetcher is not None or not self.result_items:
+            self.display_results(results)
+            return
+
+        self.logger.info(f"検索結果を更新: {len(results)}件")
+
+        self.all_results = results.copy()
+        self._apply_filters()
+        self._apply_sort()
+        self._update_pagination()
+
+        start_index = (self.current_page - 1) * self.results_per_page
+        self.current_results = self.filtered_results[start_index : start_index + self.results_per_page]
+
+        # 選択中のドキュメントが新しい結果にも含まれていれば選択を引き継ぐ
+        selected_id = self.selected_result.document.id if self.selected_result else None
+        self.selected_result = next((r for r in self.all_results if r.document.id == selected_id), None)
+
+        self._update_current_page_in_place()
+        self._update_result_count()
+
+    def _update_current_page_in_place(self) -> None:
+        """既存のアイテムウィジェットを再利用して現在のページの結果を表示"""
+        if not self.current_results:
+            self._display_current_page()
+            return
+
+        for index, result in enumerate(self.current_results):
+            if index < len(self.result_items):
+                item_widget = self.result_items[index]
+                item_widget.set_search_result(result)
+            else:
+                item_widget = SearchResultItemWidget(result)
+                item_widget.item_clicked.connect(self._on_result_selected)
+                item_widget.preview_requested.connect(self._on_preview_requested)
+                item_widget.similar_requested.connect(self._on_similar_requested)
+                # 末尾のストレッチの手前に追加する
+                self.results_layout.insertWidget(index, item_widget)
+                self.result_items.append(item_widget)
+            selected = self.selected_result is not None and result.document.id == self.selected_result.document.id
+            item_widget.set_selected(selected)
+
+        # 余ったアイテムを削除
+        for item_widget in self.result_items[len(self.current_results) :]:
+            self.results_layout.removeWidget(item_widget)
+            item_widget.deleteLater()
+        del self.result_items[len(self.current_results) :]
+
+    def display_page(self, result_page: SearchResultPage, page_fetcher: PageFetcher) -> None:
+        """
+        サーバー側でページングされた検索結果を表示します
+
+        以降のページ移動、ソート順や表示件数の変更ではpage_fetcherで該当ページだけを再取得します。
+
+        Args:
+            result_page: 最初に表示するページ
+            page_fetcher: ページを取得する関数
+        """
+        self.logger.info(f"検索結果を表示: {result_page.total}件中 {len(result_page.results)}件")
+
+        self.page_fetcher = page_fetcher
+        self.all_results = []
+        self.filtered_results = []
+        self.selected_result = None
+        self._show_page(result_page)
+
+    def _fetch_page(self, page: int) -> None:
+        """
+        現在のソート順と表示件数で指定ページを取得して表示
+
+        Args:
+            page: 取得するページ番号
+        """
+        sort_by, descending = SORT_KEYS[self.current_sort_order]
+        try:
+            result_page = self.page_fetcher(page, self.results_per_page, sort_by, descending)
+        except Exception as e:
+            self.logger.error(f"検索結果ページの取得に失敗しました: {e}")
+            return
+        self._show_page(result_page)
+
+    def _show_page(self, result_page: SearchResultPage) -> None:
+        """
+        取得したページを表示し、ページネーションと結果数を更新
+
+        Args:
+            result_page: 表示するページ
+        """
+        self.current_results = result_page.results
+        self.current_page = result_page.page
+        self.total_results = result_page.total
+        self.total_is_exact = result_page.total_is_exact
+        self.total_pages = result_page.page_count
+        self.page_spin.setMaximum(self.total_pages)
+
+        self._display_current_page()
+        self._update_pagination_controls()
+        self._update_result_count()
+
+        self.page_changed.emit(self.current_page)
+        self.logger.debug(f"ページ {self.current_page} を取得: {len(self.current_results)}件表示")
+
     def _apply_filters(self) -> None:
         """現在のフィルター設定を適用"""
         self.filtered_results = self.all_results.copy()
@@ -571,6 +737,11 @@ class SearchResultsWidget(QWidget):
 
     def _update_result_count(self) -> None:
         """結果数表示を更新"""
+        if self.page_fetcher is not None:
+            prefix = "" if self.total_is_exact else "約"
+            self.result_count_label.setText(f"結果: {prefix}{self.total_results}件")
+            return
+
         total_count = len(self.all_results)
         filtered_count = len(self.filtered_results)
 
@@ -589,6 +760,12 @@ class SearchResultsWidget(QWidget):
         if page < 1 or page > self.total_pages:
             return
 
+        # サーバー側ページングでは表示中でないページだけを取得する
+        if self.page_fetcher is not None:
+            if page != self.current_page:
+                self._fetch_page(page)
+            return
+
         self.current_page = page
 
         # 現在のページの結果を取得
@@ -621,6 +798,7 @@ class SearchResultsWidget(QWidget):
             item_widget = SearchResultItemWidget(result)
             item_widget.item_clicked.connect(self._on_result_selected)
             item_widget.preview_requested.connect(self._on_preview_requested)
+            item_widget.similar_requested.connect(self._on_similar_requested)
 
             self.results_layout.addWidget(item_widget)
             self.result_items.append(item_widget)
@@ -664,9 +842,13 @@ class SearchResultsWidget(QWidget):
 
         if 0 <= index < len(sort_orders):
             self.current_sort_order = sort_orders[index]
-            self._apply_sort()
-            self._update_pagination()
-            self.go_to_page(1)  # 最初のページに戻る
+            if self.page_fetcher is not None:
+                # 並び替えはインデックス側で行い、最初のページを取得し直す
+                self._fetch_page(1)
+            else:
+                self._apply_sort()
+                self._update_pagination()
+                self.go_to_page(1)  # 最初のページに戻る
 
             self.sort_changed.emit(self.current_sort_order)
             self.logger.debug(f"ソート順変更: {self.current_sort_order}")
@@ -682,8 +864,11 @@ class SearchResultsWidget(QWidget):
             new_per_page = int(text)
             if new_per_page != self.results_per_page:
                 self.results_per_page = new_per_page
-                self._update_pagination()
-                self.go_to_page(1)  # 最初のページに戻る
+                if self.page_fetcher is not None:
+                    self._fetch_page(1)
+                else:
+                    self._update_pagination()
+                    self.go_to_page(1)  # 最初のページに戻る
                 self.logger.debug(f"1ページあたりの結果数変更: {new_per_page}")
         except ValueError:
             pass
@@ -712,13 +897,21 @@ class SearchResultsWidget(QWidget):
         self.preview_requested.emit(result)
         self.logger.debug(f"プレビュー要求: {result.document.title}")
 
+    def _on_similar_requested(self, result: SearchResult) -> None:
+        """類似ドキュメントの検索が要求された時の処理"""
+        self.similar_requested.emit(result)
+        self.logger.debug(f"類似ドキュメント検索要求: {result.document.title}")
+
     # パブリックメソッド
 
     def clear_results(self) -> None:
         """すべての結果をクリア"""
+        self.page_fetcher = None
+        self.total_results = 0
+        self.total_is_exact = True
         self.all_results.clear()
         self.filtered_results.clear()
-        self.current_results.clear()
+        self.current_results = []
         self.selected_result = None
 
         self._clear_result_items()
@@ -736,7 +929,7 @@ class SearchResultsWidget(QWidget):
         return self.selected_result
 
     def get_all_results(self) -> list[SearchResult]:
-        """すべての結果を取得"""
+        """すべての結果を取得(サーバー側ページングでは空で、表示中のページはcurrent_resultsに保持)"""
         return self.all_results.copy()
 
     def get_filtered_results(self) -> list[SearchResult]:
@@ -748,12 +941,17 @@ class SearchResultsWidget(QWidget):
         if count > 0:
             self.results_per_page = count
             self.per_page_combo.setCurrentText(str(count))
-            self._update_pagination()
-            self.go_to_page(1)
+            if self.page_fetcher is not None:
+                self._fetch_page(1)
+            else:
+                self._update_pagination()
+                self.go_to_page(1)
 
     def refresh_display(self) -> None:
         """表示を更新"""
-        if self.all_results:
+        if self.page_fetcher is not None:
+            self._fetch_page(self.current_page)
+        elif self.all_results:
             self._apply_filters()
             self._apply_sort()
             self._update_pagination()
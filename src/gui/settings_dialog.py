@@ -181,6 +181,10 @@ class SettingsDialog(QDialog):
         weight_layout.addWidget(self.semantic_weight_label)
         params_layout.addRow("セマンティック検索の重み:", weight_layout)
 
+        # 入力中の検索
+        self.search_as_you_type_check = QCheckBox("入力中に検索する(全文検索・ファイル名検索)")
+        params_layout.addRow(self.search_as_you_type_check)
+
         layout.addWidget(params_group)
         layout.addStretch()
 
@@ -387,6 +391,7 @@ class SettingsDialog(QDialog):
             self.embedding_model_combo.setCurrentText(self.config.get_embedding_model())
             self.max_results_spin.setValue(self.config.get("max_results", 100))
             self.semantic_weight_slider.setValue(int(self.config.get("semantic_weight", 50)))
+            self.search_as_you_type_check.setChecked(self.config.get("search_as_you_type", True))
 
             # フォルダ設定
             indexed_folders = self.config.get("indexed_folders", [])
@@ -494,6 +499,7 @@ class SettingsDialog(QDialog):
         settings["embedding_model"] = self.embedding_model_combo.currentText()
         settings["max_results"] = self.max_results_spin.value()
         settings["semantic_weight"] = self.semantic_weight_slider.value()
+        settings["search_as_you_type"] = self.search_as_you_type_check.isChecked()
 
         # フォルダ設定
         indexed_folders = []
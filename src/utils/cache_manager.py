@@ -4,20 +4,24 @@
 このモジュールは、検索結果、ドキュメント、埋め込みなどの
 頻繁にアクセスされるデータのキャッシュ機能を提供します。
 LRU(Least Recently Used)キャッシュとTTL(Time To Live)機能を実装しています。
+検索結果とドキュメントのキャッシュは件数に加えて使用バイト数の上限でも制限します。
 """
 
 from collections import OrderedDict
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
 import hashlib
 from pathlib import Path
 import pickle
+import sys
 import threading
 import time
-from typing import Any, Generic, TypeVar
+from typing import Any, Generic, NamedTuple, TypeVar
 
-from ..data.models import Document, SearchResult
+from ..data.models import Document, SearchResult, SearchType
 from ..utils.exceptions import CacheError
 from ..utils.logging_config import LoggerMixin
+from .query_canonicalizer import CanonicalHitStats, canonical_filters, canonical_query_text
 
 T = TypeVar("T")
 
@@ -30,6 +34,7 @@ class CacheEntry(Generic[T]):
     timestamp: float
     access_count: int = 0
     ttl: float | None = None
+    size: int = 0  # キーを含む使用バイト数(バイト数の上限を設定した場合のみ計算)
 
     def is_expired(self) -> bool:
         """エントリが期限切れかどうかをチェック"""
@@ -47,22 +52,35 @@ class LRUCache(Generic[T], LoggerMixin):
     LRU(Least Recently Used)キャッシュの実装
 
     スレッドセーフで、TTL(Time To Live)機能をサポートします。
+    max_bytesを指定した場合は、size_ofで計算した使用バイト数の合計が上限を超えないよう
+    古いエントリから削除し、単独で上限を超える値は保存しません。
     """
 
-    def __init__(self, max_size: int = 1000, default_ttl: float | None = None):
+    def __init__(
+        self,
+        max_size: int = 1000,
+        default_ttl: float | None = None,
+        max_bytes: int | None = None,
+        size_of: Callable[[T], int] | None = None,
+    ):
         """
         LRUキャッシュを初期化
 
         Args:
             max_size: キャッシュの最大サイズ
             default_ttl: デフォルトのTTL(秒)
+            max_bytes: 使用バイト数の上限(Noneの場合は件数のみで制限)
+            size_of: 値の使用バイト数を計算する関数(省略時はsys.getsizeof)
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._size_of = size_of or sys.getsizeof
         self._cache: OrderedDict[str, CacheEntry[T]] = OrderedDict()
         self._lock = threading.RLock()
         self._hits = 0
         self._misses = 0
+        self._bytes = 0
 
     def get(self, key: str) -> T | None:
         """
@@ -83,7 +101,7 @@ class LRUCache(Generic[T], LoggerMixin):
 
             # 期限切れチェック
             if entry.is_expired():
-                del self._cache[key]
+                self._delete(key)
                 self._misses += 1
                 return None
 
@@ -94,6 +112,22 @@ class LRUCache(Generic[T], LoggerMixin):
 
             return entry.value
 
+    def peek(self, key: str) -> T | None:
+        """
+        LRUの順序と統計を更新せずに値を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            キャッシュされた値、または None
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry.is_expired():
+                return None
+            return entry.value
+
     def put(self, key: str, value: T, ttl: float | None = None) -> None:
         """
         キーと値をキャッシュに保存
@@ -107,21 +141,23 @@ class LRUCache(Generic[T], LoggerMixin):
             current_time = time.time()
             effective_ttl = ttl if ttl is not None else self.default_ttl
 
-            entry = CacheEntry(value=value, timestamp=current_time, ttl=effective_ttl)
+            size = self._size_of(value) + sys.getsizeof(key) if self.max_bytes is not None else 0
+            entry = CacheEntry(value=value, timestamp=current_time, ttl=effective_ttl, size=size)
 
             if key in self._cache:
                 # 既存エントリを更新
-                self._cache[key] = entry
-                self._cache.move_to_end(key)
-            else:
-                # 新しいエントリを追加
-                self._cache[key] = entry
-
-                # サイズ制限チェック
-                if len(self._cache) > self.max_size:
-                    # 最も古いエントリを削除
-                    oldest_key = next(iter(self._cache))
-                    del self._cache[oldest_key]
+                self._delete(key)
+
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.logger.debug(f"キャッシュの上限を超えるため保存しません: {size}バイト")
+                return
+
+            self._cache[key] = entry
+            self._bytes += size
+
+            # サイズ制限チェック(最も古いエントリから削除)
+            while len(self._cache) > self.max_size or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._delete(next(iter(self._cache)))
 
     def remove(self, key: str) -> bool:
         """
@@ -135,16 +171,22 @@ class LRUCache(Generic[T], LoggerMixin):
         """
         with self._lock:
             if key in self._cache:
-                del self._cache[key]
+                self._delete(key)
                 return True
             return False
 
+    def _delete(self, key: str) -> None:
+        """ロックを取得済みの状態でエントリを削除し、使用バイト数を減らす"""
+        entry = self._cache.pop(key)
+        self._bytes -= entry.size
+
     def clear(self) -> None:
         """キャッシュをクリア"""
         with self._lock:
             self._cache.clear()
             self._hits = 0
             self._misses = 0
+            self._bytes = 0
 
     def cleanup_expired(self) -> int:
         """
@@ -162,7 +204,7 @@ class LRUCache(Generic[T], LoggerMixin):
                     expired_keys.append(key)
 
             for key in expired_keys:
-                del self._cache[key]
+                self._delete(key)
 
             return len(expired_keys)
 
@@ -175,6 +217,8 @@ class LRUCache(Generic[T], LoggerMixin):
             return {
                 "size": len(self._cache),
                 "max_size": self.max_size,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
                 "hits": self._hits,
                 "misses": self._misses,
                 "hit_rate": hit_rate,
@@ -182,22 +226,221 @@ class LRUCache(Generic[T], LoggerMixin):
             }
 
 
+def document_size(document: Document) -> int:
+    """
+    ドキュメントの使用バイト数を計算
+
+    Args:
+        document: 対象のドキュメント
+
+    Returns:
+        インスタンスと各フィールドの値(テキストを含む)のバイト数の合計
+    """
+    fields = vars(document)
+    return (
+        sys.getsizeof(document)
+        + sys.getsizeof(fields)
+        + sum(sys.getsizeof(value) for value in fields.values())
+        + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in document.metadata.items())
+    )
+
+
+class DocumentCache(LoggerMixin):
+    """
+    ドキュメント専用のキャッシュクラス
+
+    頻繁にアクセスされるドキュメントをメモリにキャッシュします。
+    抽出したテキストを含むため、件数に加えて使用バイト数でも制限します。
+    """
+
+    def __init__(
+        self, max_size: int = 200, ttl: float = 600.0, max_bytes: int = 64 * 1024 * 1024
+    ):  # 10分のTTL、64MBまで
+        """
+        ドキュメントキャッシュを初期化
+
+        Args:
+            max_size: 最大キャッシュサイズ
+            ttl: TTL(秒)
+            max_bytes: 使用バイト数の上限
+        """
+        self._cache = LRUCache[Document](max_size=max_size, default_ttl=ttl, max_bytes=max_bytes, size_of=document_size)
+
+    def get_document(self, doc_id: str) -> Document | None:
+        """
+        ドキュメントをキャッシュから取得
+
+        Args:
+            doc_id: ドキュメントID
+
+        Returns:
+            キャッシュされたドキュメント、またはNone
+        """
+        return self._cache.get(doc_id)
+
+    def cache_document(self, document: Document) -> None:
+        """
+        ドキュメントをキャッシュに保存
+
+        Args:
+            document: キャッシュするドキュメント
+        """
+        self._cache.put(document.id, document)
+        self.logger.debug(f"ドキュメントをキャッシュに保存: {document.title}")
+
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        ドキュメントをキャッシュから削除
+
+        Args:
+            doc_id: ドキュメントID
+
+        Returns:
+            削除に成功した場合True
+        """
+        removed = self._cache.remove(doc_id)
+        if removed:
+            self.logger.debug(f"ドキュメントをキャッシュから削除: {doc_id}")
+        return removed
+
+    def clear(self) -> None:
+        """キャッシュをクリア"""
+        self._cache.clear()
+        self.logger.info("ドキュメントキャッシュをクリアしました")
+
+    def get_stats(self) -> dict[str, Any]:
+        """キャッシュ統計を取得"""
+        return self._cache.get_stats()
+
+
+class CachedHit(NamedTuple):
+    """
+    検索結果キャッシュに保持する1件分の検索結果
+
+    ドキュメント本体は持たず、ドキュメントIDから共有のドキュメントキャッシュ
+    (なければインデックス)を引いてSearchResultに戻します。
+    """
+
+    doc_id: str
+    score: float
+    search_type: SearchType
+    snippet: str
+    highlighted_terms: tuple[str, ...]
+    relevance_explanation: str
+
+    @classmethod
+    def from_result(cls, result: SearchResult) -> "CachedHit":
+        """検索結果からドキュメント本体を除いた1件分を作成"""
+        return cls(
+            doc_id=result.document.id,
+            score=result.score,
+            search_type=result.search_type,
+            snippet=result.snippet,
+            highlighted_terms=tuple(result.highlighted_terms),
+            relevance_explanation=result.relevance_explanation,
+        )
+
+    def size(self) -> int:
+        """使用バイト数(検索タイプの列挙値は共有のため含めない)"""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.doc_id)
+            + sys.getsizeof(self.score)
+            + sys.getsizeof(self.snippet)
+            + sys.getsizeof(self.highlighted_terms)
+            + sum(sys.getsizeof(term) for term in self.highlighted_terms)
+            + sys.getsizeof(self.relevance_explanation)
+        )
+
+
+@dataclass
+class CachedSearchResults:
+    """
+    検索結果キャッシュのエントリ
+
+    上位limit件までの検索結果を、検索時のインデックスの世代とともに保持します。
+    件数の少ない要求や後ろのページの要求には、このエントリを切り出して応えます。
+    """
+
+    hits: list[CachedHit]  # 関連度順の上位の検索結果(ドキュメント本体を除く)
+    limit: int  # 結果を求めた件数(これ以下の件数の要求に応えられる)
+    generation: Any = None  # 検索時のインデックスの世代
+    complete: bool = False  # 条件に一致する結果をすべて含む(件数の上限で切られていない)場合True
+    total: int | None = None  # ページ検索で得た総ヒット数
+    total_is_exact: bool = True  # totalが正確な値かどうか
+    raw_keys: set[str] = field(default_factory=set)  # 使われた正規化前のキー(ヒット率の集計用)
+
+    def covers(self, count: int | None) -> bool:
+        """
+        上位count件の要求にこのエントリで応えられるかを判定
+
+        Args:
+            count: 要求する件数(Noneの場合はエントリの全件)
+
+        Returns:
+            応えられる場合True
+        """
+        return count is None or self.complete or count <= self.limit
+
+    @property
+    def known_total(self) -> int | None:
+        """総ヒット数(分からない場合はNone)"""
+        return len(self.hits) if self.complete else self.total
+
+    def size(self) -> int:
+        """使用バイト数"""
+        fields = vars(self)
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(fields)
+            + sys.getsizeof(self.hits)
+            + sum(hit.size() for hit in self.hits)
+            + sys.getsizeof(self.generation)
+            + sys.getsizeof(self.raw_keys)
+            + sum(sys.getsizeof(key) for key in self.raw_keys)
+        )
+
+
 class SearchResultCache(LoggerMixin):
     """
     検索結果専用のキャッシュクラス
 
-    検索クエリをキーとして検索結果をキャッシュします。
+    検索クエリと条件(件数を除く)をキーとして、上位の検索結果をインデックスの世代とともに
+    キャッシュします。世代が変わったエントリは使わずに削除するため、インデックスの変更と
+    同時に無効になります。件数の少ない要求や後ろのページの要求は、より深い結果を
+    キャッシュしたエントリを切り出して応えます。
+
+    キーは正規化したクエリと条件から作るため、全角・半角や空白、語順などの表記の揺れだけが
+    異なる検索は同じエントリを使います。正規化しなかった場合と比べたヒット率も集計します。
+
+    エントリにはドキュメント本体を持たないCachedHitだけを保持し、取り出すときに
+    共有のドキュメントキャッシュ(なければ呼び出し側の読み込み関数)から
+    SearchResultに戻します。使用バイト数はmax_bytesまでに制限します。
     """
 
-    def __init__(self, max_size: int = 500, ttl: float = 300.0):  # 5分のTTL
+    def __init__(
+        self,
+        max_size: int = 500,
+        ttl: float = 300.0,  # 5分のTTL
+        max_bytes: int = 16 * 1024 * 1024,
+        document_cache: DocumentCache | None = None,
+    ):
         """
         検索結果キャッシュを初期化
 
         Args:
             max_size: 最大キャッシュサイズ
             ttl: TTL(秒)
+            max_bytes: 使用バイト数の上限
+            document_cache: 検索結果のドキュメント本体を共有するキャッシュ
         """
-        self._cache = LRUCache[list[SearchResult]](max_size=max_size, default_ttl=ttl)
+        self._cache = LRUCache[CachedSearchResults](
+            max_size=max_size, default_ttl=ttl, max_bytes=max_bytes, size_of=CachedSearchResults.size
+        )
+        self._document_cache = document_cache if document_cache is not None else DocumentCache()
+        self._lock = threading.RLock()
+        self._stale_count = 0
+        self.canonical_stats = CanonicalHitStats("検索結果")
         self._cleanup_interval = 60.0  # 1分間隔でクリーンアップ
         self._last_cleanup = time.time()
 
@@ -211,21 +454,66 @@ class SearchResultCache(LoggerMixin):
             filters: 検索フィルター
 
         Returns:
-            ハッシュ化されたキャッシュキー
+            正規化したクエリと条件をハッシュ化したキャッシュキー
         """
         # キャッシュキーの構成要素
         key_components = [
-            query_text.lower().strip(),
+            canonical_query_text(query_text, search_type),
             search_type,
-            str(sorted(filters.items()) if filters else ""),
+            repr(canonical_filters(filters)),
         ]
 
         # ハッシュ化してキーを生成
         key_string = "|".join(key_components)
         return hashlib.sha256(key_string.encode("utf-8")).hexdigest()
 
+    def _generate_raw_key(self, query_text: str, search_type: str, filters: dict[str, Any] | None = None) -> str:
+        """
+        正規化しない場合のキャッシュキーを生成(ヒット率の比較用)
+
+        Args:
+            query_text: 検索クエリ
+            search_type: 検索タイプ
+            filters: 検索フィルター
+
+        Returns:
+            クエリの小文字化と前後の空白の除去だけを行ったキャッシュキー
+        """
+        key_string = "|".join([
+            query_text.lower().strip(),
+            search_type,
+            str(sorted(filters.items()) if filters else ""),
+        ])
+        return hashlib.sha256(key_string.encode("utf-8")).hexdigest()
+
+    def _get_entry(self, cache_key: str, generation: Any, peek: bool = False) -> CachedSearchResults | None:
+        """
+        現在の世代のエントリを取得(古い世代のエントリは削除する)
+
+        Args:
+            cache_key: キャッシュキー
+            generation: 現在のインデックスの世代(Noneの場合は確認しない)
+            peek: Trueの場合はLRUの順序と統計を更新しない
+
+        Returns:
+            エントリ、またはNone
+        """
+        entry = self._cache.peek(cache_key) if peek else self._cache.get(cache_key)
+        if entry is not None and generation is not None and entry.generation != generation:
+            self._cache.remove(cache_key)
+            self._stale_count += 1
+            return None
+        return entry
+
     def get_search_results(
-        self, query_text: str, search_type: str, filters: dict[str, Any] | None = None
+        self,
+        query_text: str,
+        search_type: str,
+        filters: dict[str, Any] | None = None,
+        *,
+        limit: int | None = None,
+        generation: Any = None,
+        load_document: Callable[[str], Document | None] | None = None,
     ) -> list[SearchResult] | None:
         """
         キャッシュから検索結果を取得
@@ -234,18 +522,28 @@ class SearchResultCache(LoggerMixin):
             query_text: 検索クエリ
             search_type: 検索タイプ
             filters: 検索フィルター
+            limit: 要求する件数(これ以上の件数をキャッシュしたエントリから切り出す)
+            generation: 現在のインデックスの世代(異なる世代のエントリは使わない)
+            load_document: ドキュメントキャッシュにないドキュメントを読み込む関数
 
         Returns:
-            キャッシュされた検索結果、またはNone
+            キャッシュされた検索結果の上位limit件、またはNone
         """
         self._maybe_cleanup()
 
         cache_key = self._generate_cache_key(query_text, search_type, filters)
-        results = self._cache.get(cache_key)
+        raw_key = self._generate_raw_key(query_text, search_type, filters)
+        with self._lock:
+            entry = self._get_entry(cache_key, generation)
+            hit = entry is not None and entry.covers(limit)
+            self.canonical_stats.record(hit, raw_key, entry.raw_keys if hit else None)
+            if not hit:
+                return None
+            hits = entry.hits[:limit] if limit is not None else list(entry.hits)
 
+        results = self._hydrate(hits, 0, load_document)
         if results is not None:
             self.logger.debug(f"検索結果をキャッシュから取得: {query_text}")
-
         return results
 
     def cache_search_results(
@@ -254,102 +552,205 @@ class SearchResultCache(LoggerMixin):
         search_type: str,
         results: list[SearchResult],
         filters: dict[str, Any] | None = None,
+        *,
+        limit: int | None = None,
+        generation: Any = None,
+        complete: bool = False,
     ) -> None:
         """
         検索結果をキャッシュに保存
 
+        同じ世代でより深い結果をキャッシュしている場合は置き換えません。
+
         Args:
             query_text: 検索クエリ
             search_type: 検索タイプ
             results: 検索結果
             filters: 検索フィルター
+            limit: 結果を求めた件数(省略時は結果の件数)
+            generation: 検索時のインデックスの世代
+            complete: 条件に一致する結果をすべて含む場合True
         """
         cache_key = self._generate_cache_key(query_text, search_type, filters)
-        self._cache.put(cache_key, results)
+        entry = CachedSearchResults(
+            hits=self._compact(results),
+            limit=limit if limit is not None else len(results),
+            generation=generation,
+            complete=complete,
+            raw_keys={self._generate_raw_key(query_text, search_type, filters)},
+        )
+        with self._lock:
+            existing = self._get_entry(cache_key, generation, peek=True)
+            if existing is not None:
+                if existing.covers(entry.limit):
+                    existing.raw_keys.update(entry.raw_keys)
+                    return
+                # ページ検索で得た総ヒット数は引き継ぐ
+                entry.total, entry.total_is_exact = existing.total, existing.total_is_exact
+                entry.raw_keys.update(existing.raw_keys)
+            self._cache.put(cache_key, entry)
 
         self.logger.debug(f"検索結果をキャッシュに保存: {query_text} ({len(results)}件)")
 
-    def invalidate_cache(self) -> None:
-        """キャッシュを無効化(クリア)"""
-        self._cache.clear()
-        self.logger.info("検索結果キャッシュを無効化しました")
-
-    def _maybe_cleanup(self) -> None:
-        """必要に応じて期限切れエントリをクリーンアップ"""
-        current_time = time.time()
-        if current_time - self._last_cleanup > self._cleanup_interval:
-            expired_count = self._cache.cleanup_expired()
-            if expired_count > 0:
-                self.logger.debug(f"期限切れキャッシュエントリを削除: {expired_count}件")
-            self._last_cleanup = current_time
-
-    def get_stats(self) -> dict[str, Any]:
-        """キャッシュ統計を取得"""
-        return self._cache.get_stats()
-
-
-class DocumentCache(LoggerMixin):
-    """
-    ドキュメント専用のキャッシュクラス
-
-    頻繁にアクセスされるドキュメントをメモリにキャッシュします。
-    """
-
-    def __init__(self, max_size: int = 200, ttl: float = 600.0):  # 10分のTTL
+    def get_result_window(
+        self,
+        query_text: str,
+        search_type: str,
+        filters: dict[str, Any] | None,
+        offset: int,
+        count: int,
+        *,
+        generation: Any = None,
+        load_document: Callable[[str], Document | None] | None = None,
+    ) -> tuple[list[SearchResult], int, bool] | None:
         """
-        ドキュメントキャッシュを初期化
+        キャッシュした深い検索結果から1ページ分を切り出す
 
         Args:
-            max_size: 最大キャッシュサイズ
-            ttl: TTL(秒)
-        """
-        self._cache = LRUCache[Document](max_size=max_size, default_ttl=ttl)
+            query_text: 検索クエリ
+            search_type: 検索タイプ
+            filters: 検索フィルター
+            offset: ページの先頭の位置(0始まり)
+            count: 1ページあたりの件数
+            generation: 現在のインデックスの世代
+            load_document: ドキュメントキャッシュにないドキュメントを読み込む関数
 
-    def get_document(self, doc_id: str) -> Document | None:
+        Returns:
+            ページの検索結果、総ヒット数、総ヒット数が正確かどうかの組。
+            エントリがページを含まない、または総ヒット数が分からない場合はNone
         """
-        ドキュメントをキャッシュから取得
+        cache_key = self._generate_cache_key(query_text, search_type, filters)
+        raw_key = self._generate_raw_key(query_text, search_type, filters)
+        with self._lock:
+            entry = self._get_entry(cache_key, generation)
+            hit = entry is not None and entry.known_total is not None and entry.covers(offset + count)
+            self.canonical_stats.record(hit, raw_key, entry.raw_keys if hit else None)
+            if not hit:
+                return None
+            hits = entry.hits[offset : offset + count]
+            total, total_is_exact = entry.known_total, entry.complete or entry.total_is_exact
 
-        Args:
-            doc_id: ドキュメントID
+        results = self._hydrate(hits, offset, load_document)
+        return (results, total, total_is_exact) if results is not None else None
 
-        Returns:
-            キャッシュされたドキュメント、またはNone
+    def cache_result_window(
+        self,
+        query_text: str,
+        search_type: str,
+        filters: dict[str, Any] | None,
+        offset: int,
+        results: list[SearchResult],
+        *,
+        total: int,
+        total_is_exact: bool,
+        generation: Any = None,
+    ) -> None:
         """
-        return self._cache.get(doc_id)
+        ページ検索の結果をキャッシュに反映
 
-    def cache_document(self, document: Document) -> None:
+        エントリの末尾に続くページは結果を継ぎ足し、それ以外は総ヒット数だけを記録します。
+        先頭から順にページを送ると、キャッシュされる結果も深くなります。
+
+        Args:
+            query_text: 検索クエリ
+            search_type: 検索タイプ
+            filters: 検索フィルター
+            offset: ページの先頭の位置(0始まり)
+            results: ページの検索結果
+            total: 総ヒット数
+            total_is_exact: 総ヒット数が正確な値かどうか
+            generation: 検索時のインデックスの世代
         """
-        ドキュメントをキャッシュに保存
+        cache_key = self._generate_cache_key(query_text, search_type, filters)
+        with self._lock:
+            entry = self._get_entry(cache_key, generation, peek=True)
+            if entry is None:
+                if offset != 0:
+                    return
+                entry = CachedSearchResults(hits=[], limit=0, generation=generation)
+            if offset == len(entry.hits) and not entry.complete:
+                entry.hits = entry.hits + self._compact(results)
+                entry.limit = max(entry.limit, len(entry.hits))
+            entry.total = total
+            entry.total_is_exact = total_is_exact
+            entry.raw_keys.add(self._generate_raw_key(query_text, search_type, filters))
+            if total_is_exact and len(entry.hits) >= total:
+                entry.complete = True
+            self._cache.put(cache_key, entry)
+
+    def _compact(self, results: list[SearchResult]) -> list[CachedHit]:
+        """
+        検索結果をドキュメント本体を除いた形に変換
+
+        ドキュメント本体は取り出すときに使えるよう、共有のドキュメントキャッシュに入れます
+        (同じIDの古い版が残っていれば置き換わります)。
 
         Args:
-            document: キャッシュするドキュメント
+            results: 検索結果
+
+        Returns:
+            キャッシュに保持する1件分のリスト
         """
-        self._cache.put(document.id, document)
-        self.logger.debug(f"ドキュメントをキャッシュに保存: {document.title}")
+        for result in results:
+            self._document_cache.cache_document(result.document)
+        return [CachedHit.from_result(result) for result in results]
 
-    def remove_document(self, doc_id: str) -> bool:
+    def _hydrate(
+        self, hits: list[CachedHit], offset: int, load_document: Callable[[str], Document | None] | None
+    ) -> list[SearchResult] | None:
         """
-        ドキュメントをキャッシュから削除
+        キャッシュした1件分のリストをSearchResultに戻す
 
         Args:
-            doc_id: ドキュメントID
+            hits: キャッシュした1件分のリスト
+            offset: 先頭の順位-1
+            load_document: ドキュメントキャッシュにないドキュメントを読み込む関数
 
         Returns:
-            削除に成功した場合True
-        """
-        removed = self._cache.remove(doc_id)
-        if removed:
-            self.logger.debug(f"ドキュメントをキャッシュから削除: {doc_id}")
-        return removed
+            検索結果のリスト。読み込めないドキュメントがある場合はNone(キャッシュなしとして扱う)
+        """
+        results = []
+        for rank, hit in enumerate(hits, offset + 1):
+            document = self._document_cache.get_document(hit.doc_id)
+            if document is None and load_document is not None:
+                document = load_document(hit.doc_id)
+                if document is not None:
+                    self._document_cache.cache_document(document)
+            if document is None:
+                return None
+            results.append(
+                SearchResult(
+                    document=document,
+                    score=hit.score,
+                    search_type=hit.search_type,
+                    snippet=hit.snippet,
+                    highlighted_terms=list(hit.highlighted_terms),
+                    relevance_explanation=hit.relevance_explanation,
+                    rank=rank,
+                )
+            )
+        return results
 
-    def clear(self) -> None:
-        """キャッシュをクリア"""
+    def invalidate_cache(self) -> None:
+        """キャッシュを無効化(クリア)"""
         self._cache.clear()
-        self.logger.info("ドキュメントキャッシュをクリアしました")
+        self.logger.info("検索結果キャッシュを無効化しました")
+
+    def _maybe_cleanup(self) -> None:
+        """必要に応じて期限切れエントリをクリーンアップ"""
+        current_time = time.time()
+        if current_time - self._last_cleanup > self._cleanup_interval:
+            expired_count = self._cache.cleanup_expired()
+            if expired_count > 0:
+                self.logger.debug(f"期限切れキャッシュエントリを削除: {expired_count}件")
+            self._last_cleanup = current_time
 
     def get_stats(self) -> dict[str, Any]:
         """キャッシュ統計を取得"""
-        return self._cache.get_stats()
+        stats = self._cache.get_stats()
+        stats["stale_entries"] = self._stale_count
+        stats["canonicalization"] = self.canonical_stats.snapshot()
+        return stats
 
 
 class PersistentCache(LoggerMixin):
@@ -460,9 +861,9 @@ class CacheManager(LoggerMixin):
         """
         self.cache_dir = Path(cache_dir)
 
-        # 各種キャッシュを初期化
-        self.search_cache = SearchResultCache()
+        # 各種キャッシュを初期化(検索結果はドキュメント本体をドキュメントキャッシュと共有する)
         self.document_cache = DocumentCache()
+        self.search_cache = SearchResultCache(document_cache=self.document_cache)
 
         # 永続化キャッシュ
         self.embedding_cache = PersistentCache(str(self.cache_dir), "embeddings")
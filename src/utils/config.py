@@ -51,8 +51,13 @@ class Config:
             # 検索設定
             "max_results": 100,
             "semantic_weight": 50,
+            # 入力中の検索(入力が止まってから前方一致で検索する)
+            "search_as_you_type": True,
+            "search_as_you_type_delay_ms": 300,
             # フォルダ管理
             "indexed_folders": [],
+            # インデックス構成("single": 単一インデックス, "sharded": フォルダごとのシャード)
+            "index_layout": "single",
             "exclude_patterns": [
                 "*.tmp",
                 "*.log",
@@ -72,6 +77,10 @@ class Config:
             "preview_cache_size": 50,
             "enable_search_history": True,
             "search_history_limit": 1000,
+            # 保守設定(アイドル時のセグメントマージ、増分バキューム、埋め込みジャーナル統合)
+            "maintenance_idle_seconds": 120,
+            "maintenance_time_budget": 2.0,
+            "maintenance_io_budget_mb": 64,
         }
 
         # 設定の初期化(デフォルト値で開始)
@@ -228,6 +237,15 @@ class Config:
         """Whooshインデックスディレクトリのフルパスを取得"""
         return os.path.join(self.get_data_directory(), self.get("whoosh_index_dir"))
 
+    def get_index_layout(self) -> str:
+        """インデックス構成("single" または "sharded")を取得"""
+        layout = self.get("index_layout", "single")
+        return layout if layout in ("single", "sharded") else "single"
+
+    def is_sharded_index_enabled(self) -> bool:
+        """フォルダごとのシャードインデックスが有効かどうかを取得"""
+        return self.get_index_layout() == "sharded"
+
     def get_window_size(self) -> tuple:
         """ウィンドウサイズを取得"""
         return (int(self.get("window_width")), int(self.get("window_height")))
@@ -317,6 +335,8 @@ class Config:
             "semantic_weight": float(self.get("semantic_weight", 50)),
             "enable_search_history": bool(self.get("enable_search_history", True)),
             "search_history_limit": int(self.get("search_history_limit", 1000)),
+            "search_as_you_type": bool(self.get("search_as_you_type", True)),
+            "search_as_you_type_delay_ms": int(self.get("search_as_you_type_delay_ms", 300)),
         }
 
     def get_performance_settings(self) -> dict[str, Any]:
@@ -328,6 +348,14 @@ class Config:
             "cache_size": self.get_cache_size(),
         }
 
+    def get_maintenance_settings(self) -> dict[str, Any]:
+        """アイドル時保守の設定を取得"""
+        return {
+            "idle_seconds": float(self.get("maintenance_idle_seconds", 120)),
+            "time_budget": float(self.get("maintenance_time_budget", 2.0)),
+            "io_budget_mb": float(self.get("maintenance_io_budget_mb", 64)),
+        }
+
     def validate_settings(self) -> list[str]:
         """設定の妥当性を検証し、問題があれば警告メッセージのリストを返す"""
         warnings = []
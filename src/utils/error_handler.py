@@ -17,7 +17,7 @@ from typing import Any
 
 import psutil
 
-from .exceptions import DocMindException
+from .exceptions import DocMindException, SearchCancelledError
 from .logging_config import get_logger
 
 
@@ -341,6 +341,9 @@ def handle_exceptions(
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
+            except SearchCancelledError:
+                # キャンセルは障害ではないため、エラー処理や回復処理を行わずに呼び出し元へ伝える
+                raise
             except Exception as e:
                 # グローバルエラーハンドラーを使用
                 error_handler = get_global_error_handler()
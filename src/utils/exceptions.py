@@ -139,6 +139,14 @@ class SearchError(DocMindException):
         self.search_type = search_type
 
 
+class SearchCancelledError(SearchError):
+    """検索がキャンセルされた場合に発生する例外
+
+    入力中の検索が新しい入力で置き換えられた場合などに、実行中の検索を
+    中断するために使用します。障害ではないため、劣化管理やエラー通知の対象外です。
+    """
+
+
 class EmbeddingError(DocMindException):
     """埋め込み操作中に発生するエラー
 
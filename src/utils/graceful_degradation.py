@@ -11,6 +11,7 @@ from enum import Enum
 from functools import wraps
 from typing import Any
 
+from .exceptions import SearchCancelledError
 from .logging_config import get_logger
 
 
@@ -343,6 +344,9 @@ def with_graceful_degradation(component_name: str, disable_capabilities: list[st
 
             try:
                 return func(*args, **kwargs)
+            except SearchCancelledError:
+                # キャンセルは障害ではないため、機能を無効化せずに呼び出し元へ伝える
+                raise
             except Exception as e:
                 # コンポーネントを失敗状態にマーク
                 fallback_success = degradation_manager.mark_component_failed(component_name, e, disable_capabilities)
@@ -0,0 +1,118 @@
+"""
+処理時間のヒストグラムモジュール
+
+検索提案などの要求ごとの処理時間を固定の区間(ミリ秒)に数え上げ、
+件数・平均・パーセンタイルの概算を少ないメモリで集計します。
+"""
+
+from bisect import bisect_left
+import threading
+from typing import Any
+
+
+class LatencyHistogram:
+    """
+    処理時間のヒストグラム
+
+    各区間は上限値(ミリ秒)で表し、最後の区間は上限なしです。
+    パーセンタイルは該当する区間の上限値で概算します。
+    """
+
+    # 区間の上限(ミリ秒)
+    DEFAULT_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self, name: str, bounds_ms: tuple[float, ...] = DEFAULT_BOUNDS_MS):
+        """
+        LatencyHistogramの初期化
+
+        Args:
+            name (str): 集計対象の名前(ログ出力用)
+            bounds_ms (Tuple[float, ...]): 昇順の区間の上限(ミリ秒)
+        """
+        self.name = name
+        self.bounds_ms = tuple(bounds_ms)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.bounds_ms) + 1)
+        self._total = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+
+    def record(self, elapsed_ms: float) -> None:
+        """
+        1回の処理時間を記録
+
+        Args:
+            elapsed_ms (float): 処理時間(ミリ秒)
+        """
+        index = bisect_left(self.bounds_ms, elapsed_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+            self._sum_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+
+    def percentile(self, percent: float) -> float:
+        """
+        パーセンタイルを概算
+
+        Args:
+            percent (float): 0〜100のパーセント
+
+        Returns:
+            float: 該当する区間の上限(ミリ秒)。上限なしの区間では最大値、記録がなければ0
+        """
+        with self._lock:
+            return self._percentile(percent)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        集計結果を取得
+
+        Returns:
+            Dict[str, Any]: 件数、平均、p50/p95/p99、最大値、区間ごとの件数
+        """
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in self.bounds_ms] + [f">{self.bounds_ms[-1]}ms"]
+            return {
+                "count": self._total,
+                "mean_ms": self._sum_ms / self._total if self._total else 0.0,
+                "p50_ms": self._percentile(50),
+                "p95_ms": self._percentile(95),
+                "p99_ms": self._percentile(99),
+                "max_ms": self._max_ms,
+                "buckets": dict(zip(labels, self._counts, strict=True)),
+            }
+
+    def summary(self) -> str:
+        """
+        ログ出力用の要約
+
+        Returns:
+            str: 件数・平均・パーセンタイルの要約
+        """
+        stats = self.snapshot()
+        return (
+            f"{self.name}: {stats['count']}件, 平均{stats['mean_ms']:.1f}ms, "
+            f"p50≦{stats['p50_ms']:g}ms, p95≦{stats['p95_ms']:g}ms, p99≦{stats['p99_ms']:g}ms, "
+            f"最大{stats['max_ms']:.1f}ms"
+        )
+
+    def reset(self) -> None:
+        """集計をリセット"""
+        with self._lock:
+            self._counts = [0] * (len(self.bounds_ms) + 1)
+            self._total = 0
+            self._sum_ms = 0.0
+            self._max_ms = 0.0
+
+    def _percentile(self, percent: float) -> float:
+        """ロックを取得済みの状態でパーセンタイルを概算"""
+        if self._total == 0:
+            return 0.0
+        threshold = self._total * percent / 100
+        cumulative = 0
+        for index, count in enumerate(self._counts):
+            cumulative += count
+            if cumulative >= threshold and count:
+                return float(self.bounds_ms[index]) if index < len(self.bounds_ms) else self._max_ms
+        return self._max_ms
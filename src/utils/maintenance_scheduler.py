@@ -0,0 +1,415 @@
+"""
+アイドル時保守スケジューラーモジュール
+
+ユーザー操作がなくCPUに余裕があるときだけ、インデックスの段階的セグメントマージ、
+SQLiteの増分バキューム、埋め込みジャーナルの統合などの保守処理を実行します。
+1回の保守サイクルは時間とI/O量の予算で制限され、ユーザー操作があると
+残りの処理を次のアイドル時間に持ち越します。
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import Enum
+import threading
+import time
+from typing import Any
+
+import psutil
+
+from .logging_config import LoggerMixin
+
+
+class MaintenanceState(Enum):
+    """保守スケジューラーの状態"""
+
+    STOPPED = "stopped"  # 停止中
+    WAITING = "waiting"  # アイドル待ち
+    RUNNING = "running"  # 保守処理を実行中
+
+
+class MaintenanceBudget:
+    """
+    1回の保守サイクルの予算
+
+    経過時間と読み書きしたバイト数を管理し、ユーザー操作による中断も反映します。
+    """
+
+    def __init__(self, time_seconds: float, io_bytes: int):
+        """
+        予算を初期化
+
+        Args:
+            time_seconds: 使用できる時間(秒)
+            io_bytes: 読み書きできるバイト数
+        """
+        self.deadline = time.monotonic() + time_seconds
+        self.io_bytes = io_bytes
+        self.used_io_bytes = 0
+        self.cancelled = False
+
+    def remaining_seconds(self) -> float:
+        """残り時間(秒)を取得"""
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def remaining_io_bytes(self) -> int:
+        """残りのI/Oバイト数を取得"""
+        return max(self.io_bytes - self.used_io_bytes, 0)
+
+    def charge(self, io_bytes: int) -> None:
+        """
+        使用したI/O量を記録
+
+        Args:
+            io_bytes: 読み書きしたバイト数
+        """
+        self.used_io_bytes += max(io_bytes, 0)
+
+    @property
+    def exhausted(self) -> bool:
+        """予算を使い切った、または中断された場合True"""
+        return self.cancelled or self.remaining_seconds() <= 0 or self.remaining_io_bytes() <= 0
+
+
+@dataclass
+class MaintenanceTask:
+    """保守タスクの登録情報と実行状況"""
+
+    name: str
+    func: Callable[[MaintenanceBudget], int]  # 予算を受け取り、読み書きしたバイト数を返す
+    interval: float  # 前回の実行から次の実行までの最小間隔(秒)
+    last_run: float | None = None
+    last_io_bytes: int = 0
+    last_duration: float = 0.0
+    last_error: str | None = None
+    run_count: int = 0
+    total_io_bytes: int = 0
+
+    def is_due(self, now: float) -> bool:
+        """実行間隔を満たしているかどうか"""
+        return self.last_run is None or now - self.last_run >= self.interval
+
+    def to_dict(self) -> dict[str, Any]:
+        """状態表示用の辞書に変換"""
+        return {
+            "interval": self.interval,
+            "last_run": self.last_run,
+            "last_io_bytes": self.last_io_bytes,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "run_count": self.run_count,
+            "total_io_bytes": self.total_io_bytes,
+        }
+
+
+@dataclass
+class MaintenanceCycle:
+    """直近の保守サイクルの結果"""
+
+    started_at: float
+    duration: float = 0.0
+    io_bytes: int = 0
+    tasks_run: list[str] = field(default_factory=list)
+    interrupted: bool = False
+
+
+class MaintenanceScheduler(LoggerMixin):
+    """
+    アイドル時保守スケジューラークラス
+
+    登録された保守タスクを、ユーザーが一定時間操作しておらず
+    CPU使用率が低いときに、時間とI/Oの予算内で順番に実行します。
+    """
+
+    def __init__(
+        self,
+        idle_seconds: float = 120.0,
+        check_interval: float = 15.0,
+        time_budget: float = 2.0,
+        io_budget_mb: float = 64.0,
+        max_cpu_percent: float = 30.0,
+    ):
+        """
+        保守スケジューラーを初期化
+
+        Args:
+            idle_seconds: 最後の操作からアイドルとみなすまでの秒数
+            check_interval: アイドル判定の間隔(秒)
+            time_budget: 1サイクルで使用できる時間(秒)
+            io_budget_mb: 1サイクルで読み書きできるデータ量(MB)
+            max_cpu_percent: アイドルとみなすシステムCPU使用率の上限(%)
+        """
+        self.idle_seconds = idle_seconds
+        self.check_interval = check_interval
+        self.time_budget = time_budget
+        self.io_budget_bytes = int(io_budget_mb * 1024 * 1024)
+        self.max_cpu_percent = max_cpu_percent
+
+        self._tasks: list[MaintenanceTask] = []
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._state = MaintenanceState.STOPPED
+        self._last_activity = time.monotonic()
+        self._current_budget: MaintenanceBudget | None = None
+        self._last_cycle: MaintenanceCycle | None = None
+
+    def register_task(self, name: str, func: Callable[[MaintenanceBudget], int], interval: float = 300.0) -> None:
+        """
+        保守タスクを登録
+
+        Args:
+            name: タスク名
+            func: 予算を受け取り、読み書きしたバイト数を返す関数
+            interval: 前回の実行から次の実行までの最小間隔(秒)
+        """
+        with self._lock:
+            self._tasks = [task for task in self._tasks if task.name != name]
+            self._tasks.append(MaintenanceTask(name=name, func=func, interval=interval))
+        self.logger.debug(f"保守タスクを登録しました: {name}")
+
+    def notify_activity(self) -> None:
+        """
+        ユーザー操作や書き込みがあったことを通知
+
+        実行中の保守サイクルは現在のタスクの終了後に中断されます。
+        """
+        self._last_activity = time.monotonic()
+        budget = self._current_budget
+        if budget is not None:
+            budget.cancelled = True
+
+    def is_idle(self) -> bool:
+        """
+        保守処理を実行してよいアイドル状態かどうかを判定
+
+        Returns:
+            bool: 最後の操作から一定時間が経過し、CPU使用率が低い場合True
+        """
+        if time.monotonic() - self._last_activity < self.idle_seconds:
+            return False
+        return psutil.cpu_percent(interval=None) <= self.max_cpu_percent
+
+    def run_pending(self) -> MaintenanceCycle:
+        """
+        実行間隔を満たしたタスクを予算内で1サイクル実行
+
+        前回の実行が古いタスクから順に実行し、予算を使い切るか
+        ユーザー操作があった時点で残りのタスクを次のサイクルに持ち越します。
+
+        Returns:
+            MaintenanceCycle: サイクルの実行結果
+        """
+        with self._lock:
+            now = time.time()
+            due_tasks = sorted(
+                (task for task in self._tasks if task.is_due(now)),
+                key=lambda task: task.last_run or 0.0,
+            )
+            budget = MaintenanceBudget(self.time_budget, self.io_budget_bytes)
+            cycle = MaintenanceCycle(started_at=now)
+            self._current_budget = budget
+            previous_state = self._state
+            self._state = MaintenanceState.RUNNING
+
+        try:
+            for task in due_tasks:
+                if budget.exhausted:
+                    break
+                self._run_task(task, budget)
+                cycle.tasks_run.append(task.name)
+        finally:
+            with self._lock:
+                cycle.duration = time.time() - cycle.started_at
+                cycle.io_bytes = budget.used_io_bytes
+                cycle.interrupted = budget.cancelled
+                self._last_cycle = cycle
+                self._current_budget = None
+                self._state = previous_state
+
+        if cycle.tasks_run:
+            self.logger.info(
+                f"保守サイクル完了: タスク={cycle.tasks_run}, {cycle.duration:.2f}秒, {cycle.io_bytes}バイト"
+                + (" (操作により中断)" if cycle.interrupted else "")
+            )
+        return cycle
+
+    def _run_task(self, task: MaintenanceTask, budget: MaintenanceBudget) -> None:
+        """
+        保守タスクを1つ実行して状態を記録
+
+        Args:
+            task: 実行するタスク
+            budget: 現在のサイクルの予算
+        """
+        started = time.monotonic()
+        io_bytes = 0
+        try:
+            io_bytes = int(task.func(budget) or 0)
+            task.last_error = None
+        except Exception as e:
+            task.last_error = str(e)
+            self.logger.warning(f"保守タスク '{task.name}' でエラー: {e}")
+
+        budget.charge(io_bytes)
+        task.last_run = time.time()
+        task.last_duration = time.monotonic() - started
+        task.last_io_bytes = io_bytes
+        task.total_io_bytes += io_bytes
+        task.run_count += 1
+
+    def start(self) -> None:
+        """アイドル監視を開始"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+
+            self._stop_event.clear()
+            self._state = MaintenanceState.WAITING
+            # 初回のCPU使用率計測の基準点を作る
+            psutil.cpu_percent(interval=None)
+            self._thread = threading.Thread(target=self._run_loop, name="MaintenanceScheduler", daemon=True)
+            self._thread.start()
+
+        self.logger.info("保守スケジューラーを開始しました")
+
+    def stop(self) -> None:
+        """アイドル監視を停止(実行中のタスクは中断を要求して終了を待機)"""
+        with self._lock:
+            if not self._thread:
+                return
+            self._stop_event.set()
+            budget = self._current_budget
+            if budget is not None:
+                budget.cancelled = True
+            thread = self._thread
+            self._thread = None
+
+        # ロック外でスレッド終了を待機
+        if thread.is_alive():
+            thread.join(timeout=self.time_budget + 5.0)
+
+        self._state = MaintenanceState.STOPPED
+        self.logger.info("保守スケジューラーを停止しました")
+
+    def _run_loop(self) -> None:
+        """アイドル監視ループ"""
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                if self.is_idle():
+                    self.run_pending()
+            except Exception as e:
+                self.logger.error(f"保守スケジューラーでエラー: {e}")
+
+    def get_state(self) -> dict[str, Any]:
+        """
+        スケジューラーの状態を取得
+
+        Returns:
+            Dict[str, Any]: 状態、アイドル経過時間、直近のサイクル、タスクごとの実行状況
+        """
+        with self._lock:
+            last_cycle = self._last_cycle
+            return {
+                "state": self._state.value,
+                "idle_for": time.monotonic() - self._last_activity,
+                "idle_seconds": self.idle_seconds,
+                "time_budget": self.time_budget,
+                "io_budget_bytes": self.io_budget_bytes,
+                "last_cycle": (
+                    {
+                        "started_at": last_cycle.started_at,
+                        "duration": last_cycle.duration,
+                        "io_bytes": last_cycle.io_bytes,
+                        "tasks_run": list(last_cycle.tasks_run),
+                        "interrupted": last_cycle.interrupted,
+                    }
+                    if last_cycle
+                    else None
+                ),
+                "tasks": {task.name: task.to_dict() for task in self._tasks},
+            }
+
+
+def register_default_maintenance_tasks(
+    scheduler: MaintenanceScheduler,
+    index_manager=None,
+    database_manager=None,
+    embedding_manager=None,
+    embedding_journal_min_mb: float = 1.0,
+) -> None:
+    """
+    標準の保守タスクを登録
+
+    Args:
+        scheduler: 登録先のスケジューラー
+        index_manager: 段階的セグメントマージを行うインデックスマネージャー
+        database_manager: 増分バキュームを行うデータベースマネージャー
+        embedding_manager: ジャーナルを統合する埋め込みマネージャー
+        embedding_journal_min_mb: 統合を行う埋め込みジャーナルの最小サイズ(MB)
+    """
+    if index_manager is not None and hasattr(index_manager, "merge_segments"):
+
+        def merge_index_segments(budget: MaintenanceBudget) -> int:
+            # マージは読み込みと書き込みの両方が発生するため予算の半分を上限にし、
+            # 時間切れやユーザー操作があれば階層ごとのマージの間で打ち切る
+            result = index_manager.merge_segments(
+                max_bytes=budget.remaining_io_bytes() // 2, should_yield=lambda: budget.exhausted
+            )
+            return result["merged_bytes"] * 2
+
+        scheduler.register_task("index_merge", merge_index_segments, interval=60.0)
+
+    if database_manager is not None and hasattr(database_manager, "incremental_vacuum"):
+
+        def vacuum_database(budget: MaintenanceBudget) -> int:
+            return database_manager.incremental_vacuum(budget.remaining_io_bytes())
+
+        scheduler.register_task("sqlite_incremental_vacuum", vacuum_database, interval=600.0)
+
+    if embedding_manager is not None and hasattr(embedding_manager, "compact_journal"):
+        min_journal_bytes = int(embedding_journal_min_mb * 1024 * 1024)
+
+        def compact_embeddings(budget: MaintenanceBudget) -> int:
+            return embedding_manager.compact_journal(
+                max_bytes=budget.remaining_io_bytes(), min_journal_bytes=min_journal_bytes
+            )
+
+        scheduler.register_task("embedding_compaction", compact_embeddings, interval=300.0)
+
+
+# グローバル保守スケジューラーインスタンス
+_global_maintenance_scheduler: MaintenanceScheduler | None = None
+_global_maintenance_scheduler_lock = threading.Lock()
+
+
+def get_global_maintenance_scheduler() -> MaintenanceScheduler:
+    """グローバル保守スケジューラーを取得"""
+    global _global_maintenance_scheduler
+    with _global_maintenance_scheduler_lock:
+        if _global_maintenance_scheduler is None:
+            _global_maintenance_scheduler = MaintenanceScheduler()
+        return _global_maintenance_scheduler
+
+
+def initialize_maintenance_scheduler(**kwargs) -> MaintenanceScheduler:
+    """
+    保守スケジューラーを初期化
+
+    既存のスケジューラーが動作している場合は停止してから置き換えます。
+
+    Args:
+        **kwargs: MaintenanceSchedulerの初期化引数
+
+    Returns:
+        MaintenanceScheduler: 初期化されたスケジューラー
+    """
+    global _global_maintenance_scheduler
+    scheduler = MaintenanceScheduler(**kwargs)
+    with _global_maintenance_scheduler_lock:
+        previous = _global_maintenance_scheduler
+        _global_maintenance_scheduler = scheduler
+
+    # 停止の待機中に検索スレッドからの取得を止めないよう、ロックの外で停止する
+    if previous is not None:
+        previous.stop()
+    return scheduler
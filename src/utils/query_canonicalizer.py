@@ -0,0 +1,284 @@
+"""
+検索クエリの正規化モジュール
+
+表記の揺れ(全角・半角、空白、OR・ANDで並べた語の順序、フィルターの指定順)だけが
+異なるクエリを同じ形に揃え、検索結果・クエリの埋め込み・フィルターのビットセットの
+キャッシュキーに使います。正規化しなかった場合と比べたヒット率も集計します。
+"""
+
+import os
+import re
+import threading
+from typing import Any
+import unicodedata
+
+from ..data.models import SearchType
+
+# Whooshのクエリ構文の演算子(大文字の場合だけ演算子として扱われる)
+OPERATORS = frozenset({"AND", "OR", "NOT", "ANDNOT", "ANDMAYBE"})
+# 語順を入れ替えると意味が変わる、または判定が難しい構文(フレーズ、グループ、範囲、ブースト)
+_STRUCTURED_TOKEN = re.compile(r"[\"'()\[\]{}^]")
+# 語彙に展開される語(ワイルドカード・前方一致)。展開はクエリプランナーで書き換え・打ち切りされることがある
+_PATTERN_TOKEN = re.compile(r"[*?]")
+
+
+def normalize_query_text(query_text: str) -> str:
+    """
+    クエリテキストの表記を揃える
+
+    NFKC正規化で全角英数字・記号と半角カナを揃え、連続する空白(全角空白を含む)を
+    1つの半角空白にまとめます。検索そのものにもこの形を使うため、結果は変わりません。
+
+    Args:
+        query_text (str): 検索クエリ
+
+    Returns:
+        str: 表記を揃えたクエリ
+    """
+    return " ".join(unicodedata.normalize("NFKC", query_text).split())
+
+
+def canonical_query_text(query_text: str, search_type: str = SearchType.FULL_TEXT.value) -> str:
+    """
+    キャッシュキー用にクエリを正規化
+
+    表記を揃えたうえで、結果が語順と大文字小文字によらない検索では語を並べ替えます。
+
+    - 全文検索: 演算子以外の語を小文字にし(インデックスは小文字で照合する)、同じ演算子だけで
+      並べた語の列を並べ替えます。明示したANDは空白区切り(既定の結合)と同じ形にします。
+      フレーズ・グループ・NOTなどを含むクエリは語順を保ちます。
+    - ファイル名検索: すべての語を含むものに一致するため、小文字にして並べ替えます。
+    - セマンティック・ハイブリッド検索: 埋め込みが語順に依存するため、表記を揃えるだけです。
+
+    Args:
+        query_text (str): 検索クエリ
+        search_type (str): 検索タイプ(SearchTypeの値)
+
+    Returns:
+        str: 正規化したクエリ
+    """
+    normalized = normalize_query_text(query_text)
+    if search_type == SearchType.FILENAME.value:
+        return " ".join(sorted(normalized.casefold().split()))
+    if search_type != SearchType.FULL_TEXT.value:
+        return normalized
+
+    tokens = [token if token in OPERATORS else token.lower() for token in normalized.split()]
+    return _sort_operands(tokens) or " ".join(tokens)
+
+
+def has_pattern_terms(query_text: str) -> bool:
+    """
+    ワイルドカード・前方一致の語を含むかを判定
+
+    これらの語はクエリプランナーがN-gramの検索に書き換えたり、展開する語を出現数の多いものに
+    絞ったりするため、結果が条件に一致するすべてのドキュメントとは限りません。
+
+    Args:
+        query_text (str): 検索クエリ
+
+    Returns:
+        bool: ワイルドカード・前方一致の語を含む場合True
+    """
+    return bool(_PATTERN_TOKEN.search(query_text))
+
+
+def conjunctive_terms(query_text: str) -> frozenset[str] | None:
+    """
+    語をANDだけで結合した全文検索のクエリから語の集合を取り出す
+
+    直前のクエリの語をすべて含むクエリは、直前のクエリの絞り込みとして扱えます。
+
+    Args:
+        query_text (str): 検索クエリ
+
+    Returns:
+        FrozenSet[str] | None: 小文字にした語の集合(OR・NOT・フレーズ・グループ・ワイルドカード・
+        フィールド指定などを含む場合はNone)
+    """
+    tokens = normalize_query_text(query_text).split()
+    if any(_STRUCTURED_TOKEN.search(token) or _PATTERN_TOKEN.search(token) or ":" in token for token in tokens):
+        return None
+    if OPERATORS.difference({"AND"}).intersection(tokens):
+        return None
+    return frozenset(token.lower() for token in tokens if token != "AND")
+
+
+def _sort_operands(tokens: list[str]) -> str | None:
+    """
+    同じ演算子だけで並べた語の列を並べ替える
+
+    Args:
+        tokens (List[str]): クエリの語と演算子
+
+    Returns:
+        str | None: 並べ替えたクエリ(並べ替えられない構文の場合はNone)
+    """
+    if any(_STRUCTURED_TOKEN.search(token) for token in tokens):
+        return None
+
+    if not OPERATORS.intersection(tokens):
+        # 空白区切りはANDで結合される
+        return " ".join(sorted(tokens))
+
+    # 「語 演算子 語 演算子 語」の形で、演算子がすべてANDまたはすべてORの場合だけ並べ替える
+    operands, operators = tokens[::2], set(tokens[1::2])
+    if len(tokens) % 2 == 0 or OPERATORS.intersection(operands) or len(operators) != 1:
+        return None
+    operator = operators.pop()
+    if operator == "AND":
+        return " ".join(sorted(operands))
+    if operator == "OR":
+        return " OR ".join(sorted(operands))
+    return None
+
+
+def normalize_folder(path: str) -> str:
+    """
+    フォルダパスを絞り込み用のキーに正規化
+
+    Args:
+        path (str): フォルダまたはファイルのパス
+
+    Returns:
+        str: 区切り文字と大文字小文字(Windows)を揃えたパス
+    """
+    return os.path.normcase(os.path.normpath(path))
+
+
+def canonical_folders(folder_paths: list[str] | None) -> tuple[str, ...]:
+    """
+    フォルダ指定を正規化(重複を除き、指定順によらない形にする)
+
+    Args:
+        folder_paths (List[str] | None): 検索対象のフォルダ
+
+    Returns:
+        Tuple[str, ...]: 正規化したフォルダのキー(昇順)
+    """
+    return tuple(sorted({normalize_folder(path) for path in folder_paths or ()}))
+
+
+def canonical_filters(filters: dict[str, Any] | None) -> tuple[tuple[str, Any], ...]:
+    """
+    検索条件の辞書を正規化
+
+    リストは重複を除いて並べ替え、辞書は項目を並べ替えたタプルにします。
+    未指定(None)と空の指定は同じ条件として除きます。
+
+    Args:
+        filters (Dict[str, Any] | None): 検索条件
+
+    Returns:
+        Tuple[Tuple[str, Any], ...]: (条件名, 正規化した値)の組(条件名の昇順)
+    """
+    items = []
+    for key, value in (filters or {}).items():
+        canonical = canonical_folders(value) if key == "folder_paths" else _canonical_value(value)
+        if canonical is None or canonical in ((), ""):
+            continue
+        items.append((key, canonical))
+    return tuple(sorted(items))
+
+
+def _canonical_value(value: Any) -> Any:
+    """条件の値を比較・ハッシュできる正規の形にする"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _canonical_value(item)) for key, item in value.items()))
+    if isinstance(value, list | tuple | set | frozenset):
+        return tuple(sorted({_canonical_value(item) for item in value}, key=repr))
+    return value
+
+
+class CanonicalHitStats:
+    """
+    正規化したキーで引くキャッシュのヒット率
+
+    キーごとに実際に使われた正規化前のキーを覚えておき、正規化前のキーでも
+    ヒットしていたかを数えます。正規化の前後のヒット率を比べられます。
+    """
+
+    # キーごとに覚えておく正規化前のキーの最大数
+    MAX_RAW_KEYS = 16
+
+    def __init__(self, name: str):
+        """
+        CanonicalHitStatsの初期化
+
+        Args:
+            name (str): 集計対象のキャッシュの名前(ログ出力用)
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self.raw_hits = 0
+
+    def record(self, hit: bool, raw_key: Any = None, raw_keys: set | None = None) -> None:
+        """
+        1回の参照を記録
+
+        Args:
+            hit (bool): 正規化したキーでヒットした場合True
+            raw_key (Any): 今回の正規化前のキー
+            raw_keys (Set | None): ヒットしたエントリに使われた正規化前のキー(今回のキーを追加する)
+        """
+        raw_hit = hit and raw_keys is not None and raw_key in raw_keys
+        if hit and raw_keys is not None and not raw_hit and len(raw_keys) < self.MAX_RAW_KEYS:
+            # 正規化しなければ、ここで検索し直したキーが以降はヒットする
+            raw_keys.add(raw_key)
+        with self._lock:
+            self.requests += 1
+            self.hits += int(hit)
+            self.raw_hits += int(raw_hit)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        集計結果を取得
+
+        Returns:
+            Dict[str, Any]: 参照回数、ヒット数、正規化後と正規化前のヒット率
+        """
+        with self._lock:
+            return self.summarize(self.requests, self.hits, self.raw_hits)
+
+    @staticmethod
+    def summarize(requests: int, hits: int, raw_hits: int) -> dict[str, Any]:
+        """
+        参照回数とヒット数からヒット率を計算
+
+        Args:
+            requests (int): 参照回数
+            hits (int): 正規化したキーでのヒット数
+            raw_hits (int): 正規化前のキーでもヒットしていた数
+
+        Returns:
+            Dict[str, Any]: 参照回数、ヒット数、正規化後と正規化前のヒット率
+        """
+        return {
+            "requests": requests,
+            "hits": hits,
+            "raw_hits": raw_hits,
+            "hit_rate": hits / requests if requests else 0.0,
+            "hit_rate_without_canonicalization": raw_hits / requests if requests else 0.0,
+        }
+
+    def summary(self) -> str:
+        """
+        ログ出力用の要約
+
+        Returns:
+            str: 正規化の前後のヒット率の要約
+        """
+        stats = self.snapshot()
+        return (
+            f"{self.name}: {stats['requests']}回, ヒット率{stats['hit_rate']:.1%}"
+            f"(正規化なし{stats['hit_rate_without_canonicalization']:.1%})"
+        )
+
+    def reset(self) -> None:
+        """集計をリセット"""
+        with self._lock:
+            self.requests = 0
+            self.hits = 0
+            self.raw_hits = 0
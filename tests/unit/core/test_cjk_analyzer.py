@@ -0,0 +1,105 @@
+"""
+CJKバイグラムアナライザーのテスト
+
+日本語のバイグラム分割、英数字の単語分割、およびIndexManagerでの
+フレーズクエリによる部分一致検索を検証します。
+"""
+
+from datetime import datetime
+from pathlib import Path
+import shutil
+import tempfile
+
+import pytest
+
+from src.core.cjk_analyzer import CJKBigramAnalyzer
+from src.core.index_manager import IndexManager
+from src.data.models import Document, FileType
+
+
+class TestCJKBigramAnalyzer:
+    """CJKバイグラムアナライザーのテスト"""
+
+    @pytest.fixture
+    def analyzer(self):
+        """テスト用アナライザー"""
+        return CJKBigramAnalyzer()
+
+    def test_japanese_run_is_split_into_bigrams(self, analyzer):
+        """かな・漢字の連続部分が重なりのあるバイグラムになることを確認"""
+        tokens = [t.text for t in analyzer("機械学習")]
+        assert tokens == ["機械", "械学", "学習"]
+
+    def test_latin_words_are_kept_as_words(self, analyzer):
+        """英数字は小文字化された単語トークンになることを確認"""
+        tokens = [t.text for t in analyzer("Python入門 v1.2")]
+        assert tokens == ["python", "入門", "v1.2"]
+
+    def test_single_cjk_character_is_emitted(self, analyzer):
+        """1文字だけのCJK部分も失われないことを確認"""
+        tokens = [t.text for t in analyzer("本 PDF")]
+        assert tokens == ["本", "pdf"]
+
+    def test_positions_and_offsets(self, analyzer):
+        """位置情報と文字オフセットが元のテキストと一致することを確認"""
+        text = "東京都 Tokyo"
+        tokens = [(t.text, t.pos, t.startchar, t.endchar) for t in analyzer(text, positions=True, chars=True)]
+        assert tokens == [("東京", 0, 0, 2), ("京都", 1, 1, 3), ("tokyo", 2, 4, 9)]
+        for _, _, start, end in tokens:
+            assert text[start:end].lower() in ("東京", "京都", "tokyo")
+
+    def test_full_width_text_is_normalized(self, analyzer):
+        """全角英数字と半角カナがNFKC正規化され、オフセットは元のテキストを指すことを確認"""
+        # 全角英字で書いたPDFと半角カナ
+        full_width_pdf = "\uff30\uff24\uff26"
+        text = f"{full_width_pdf} ｶﾀｶﾅ"
+        tokens = [(t.text, t.startchar, t.endchar) for t in analyzer(text, chars=True)]
+        assert [token for token, _, _ in tokens] == ["pdf", "カタ", "タカ", "カナ"]
+        assert text[tokens[0][1] : tokens[0][2]] == full_width_pdf
+
+
+class TestIndexManagerCJKSearch:
+    """IndexManagerでのCJK部分一致検索のテスト"""
+
+    @pytest.fixture
+    def manager(self):
+        """テスト用IndexManager"""
+        temp_dir = tempfile.mkdtemp()
+        manager = IndexManager(str(Path(temp_dir) / "index"))
+        yield manager
+        manager.close()
+        shutil.rmtree(temp_dir)
+
+    def _add(self, manager, doc_id, content):
+        """テスト用ドキュメントを追加"""
+        manager.add_document(
+            Document(
+                id=doc_id,
+                file_path=f"/test/{doc_id}.txt",
+                title=doc_id,
+                content=content,
+                file_type=FileType.TEXT,
+                size=len(content),
+                created_date=datetime.now(),
+                modified_date=datetime.now(),
+                indexed_date=datetime.now(),
+            )
+        )
+
+    def test_schema_has_no_duplicate_ngram_field(self, manager):
+        """コンテンツが一度だけインデックス化されることを確認"""
+        assert "content_ngram" not in manager._index.schema
+
+    def test_partial_japanese_match(self, manager):
+        """文中の日本語の部分文字列で検索できることを確認"""
+        self._add(manager, "doc1", "東京都の人工知能研究所の報告書です。")
+        self._add(manager, "doc2", "京都の観光案内です。")
+
+        assert [r.document.id for r in manager.search_text("人工知能")] == ["doc1"]
+        assert [r.document.id for r in manager.search_text("東京")] == ["doc1"]
+
+    def test_bigram_phrase_requires_adjacent_characters(self, manager):
+        """バイグラムが離れて出現する場合はヒットしないことを確認"""
+        self._add(manager, "doc1", "学生と習字の教室")
+
+        assert manager.search_text("学習") == []
@@ -223,12 +223,6 @@ class TestCoreLogicCoverage:
         processed = processor._process_markdown_content(markdown_content)
         assert "見出し" in processed
 
-        # インデックス用語抽出
-        search_manager = SearchManager(Mock(), Mock())
-        terms = search_manager._extract_indexable_terms("テスト text 123")
-        assert "テスト" in terms
-        assert "text" in terms
-
     def test_integration_coverage(self, temp_dir, mock_document):
         """統合テスト カバレッジ"""
         # 実際のファイル作成
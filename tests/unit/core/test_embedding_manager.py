@@ -5,15 +5,21 @@ EmbeddingManager強化テスト
 Phase7強化版の内容を統合済み。
 """
 
+from datetime import datetime
+import hashlib
 import os
 from pathlib import Path
 import shutil
 import tempfile
+from unittest.mock import patch
 
 import numpy as np
 import pytest
 
-from src.core.embedding_manager import EmbeddingManager
+from src.core.cancellation import CancellationToken, SearchDeadline
+from src.core.embedding_manager import DocumentEmbedding, EmbeddingManager
+from src.data.models import Document, FileType
+from src.utils.exceptions import SearchCancelledError
 
 
 class TestEmbeddingManager:
@@ -292,3 +298,87 @@ class TestEmbeddingManager:
         else:
             # メソッドがない場合は基本的な確認
             assert "meta_doc" in manager.embeddings
+
+    def test_similarity_scan_is_chunked_and_respects_deadline(self, temp_cache_dir):
+        """類似度の走査がチャンク単位で行われ、時間予算を超えたら走査済みの結果を返すテスト"""
+        manager = EmbeddingManager(embeddings_path=str(temp_cache_dir / "embeddings.pkl"))
+        manager.SCAN_CHUNK_SIZE = 4
+        for i in range(10):
+            vector = np.array([1.0, i / 10.0, 0.0])
+            manager.embeddings[f"doc{i}"] = DocumentEmbedding(f"doc{i}", vector, "", 0.0)
+
+        with patch.object(manager, "generate_embedding", return_value=np.array([1.0, 0.0, 0.0])):
+            # チャンクに分けても全件を走査した結果は類似度の降順
+            results = manager.search_similar("query", limit=3)
+            assert [doc_id for doc_id, _ in results] == ["doc0", "doc1", "doc2"]
+            assert results[0][1] == pytest.approx(1.0)
+
+            deadline = SearchDeadline(30.0)
+            assert len(manager.search_similar("query", deadline=deadline)) == 10
+            assert not deadline.truncated
+
+            # 対象を限定した場合は、そのドキュメントの埋め込みだけを走査する
+            limited = manager.search_similar("query", doc_ids={"doc7", "doc3", "missing"})
+            assert [doc_id for doc_id, _ in limited] == ["doc3", "doc7"]
+
+            # 時間切れの場合は走査を打ち切り、セマンティック検索の打ち切りを記録する
+            expired = SearchDeadline(0.0)
+            assert manager.search_similar("query", deadline=expired) == []
+            assert expired.truncated_stages == ["セマンティック検索"]
+
+            token = CancellationToken()
+            token.cancel()
+            with pytest.raises(SearchCancelledError):
+                manager.search_similar("query", cancel_token=token)
+
+    def test_query_embedding_is_cached_by_normalized_text(self, temp_cache_dir):
+        """全角・半角や空白だけが異なるクエリの埋め込みが使い回されるテスト"""
+        manager = EmbeddingManager(embeddings_path=str(temp_cache_dir / "embeddings.pkl"))
+        with patch.object(manager, "generate_embedding", return_value=np.ones(3)) as generate:
+            # 全角英字と全角空白で書いた「AI 検索」も同じクエリとして扱う
+            for text in ("\uff21\uff29\u3000検索", "AI 検索", " AI   検索 ", "AI 検索"):
+                manager.embed_query(text)
+
+            # 埋め込みは表記を揃えたクエリから1回だけ生成する
+            generate.assert_called_once_with("AI 検索")
+            stats = manager.get_cache_info()["query_cache"]
+            assert stats["requests"] == 4
+            assert stats["hits"] == 3
+            # 正規化しなければ、最後の「AI 検索」しかヒットしない
+            assert stats["raw_hits"] == 1
+            assert stats["hit_rate"] > stats["hit_rate_without_canonicalization"]
+
+            manager.clear_cache()
+            manager.embed_query("AI 検索")
+            assert generate.call_count == 2
+
+    def test_rebuild_reuses_embeddings_saved_by_another_process(self, temp_cache_dir):
+        """保存済みの埋め込みのハッシュがプロセスに依存せず、再構築で再利用されるテスト"""
+        text = "機械学習は人工知能の重要な分野です"
+        path = str(temp_cache_dir / "embeddings.pkl")
+        writer = EmbeddingManager(embeddings_path=path)
+        with patch.object(writer, "generate_embedding", return_value=np.ones(3)):
+            writer.add_document_embedding("doc1", text)
+        writer.save_embeddings()
+
+        # 変更検出用のハッシュはランダム化されるhash()ではなく安定したダイジェスト
+        assert writer.embeddings["doc1"].text_hash == hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+        now = datetime.now()
+        document = Document(
+            id="doc1",
+            file_path=str(temp_cache_dir / "doc1.txt"),
+            title="doc1",
+            content=text,
+            file_type=FileType.TEXT,
+            size=len(text),
+            created_date=now,
+            modified_date=now,
+            indexed_date=now,
+        )
+        reader = EmbeddingManager(embeddings_path=path)
+        with patch.object(reader, "generate_embedding", return_value=np.zeros(3)) as generate:
+            reader.rebuild_embeddings([document])
+
+        generate.assert_not_called()
+        assert np.array_equal(reader.embeddings["doc1"].embedding, np.ones(3))
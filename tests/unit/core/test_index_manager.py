@@ -5,16 +5,25 @@ IndexManager強化テスト
 Phase7強化版の内容を統合済み。
 """
 
+from datetime import datetime, timedelta
+import os
 from pathlib import Path
 import shutil
 import tempfile
 import time
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
+from whoosh import fields, index
+from whoosh.query import Term
 
+from src.core.cancellation import CancellationToken, SearchDeadline
 from src.core.index_manager import IndexManager
-from src.utils.exceptions import IndexingError
+from src.core.query_planner import QueryPlanner
+from src.core.snippet_engine import SnippetEngine
+from src.data.models import Document, FileType, SearchType
+from src.utils.exceptions import IndexingError, SearchCancelledError
+from tests.fixtures.mock_models import create_mock_document
 
 
 class TestIndexManager:
@@ -394,3 +403,544 @@ class TestIndexManager:
                 # 各検索が2秒以内に完了することを確認
                 assert (end_time - start_time) < 2.0
                 assert len(results) >= 0  # 結果の存在を確認
+
+    def test_parallel_rebuild_matches_serial_rebuild(self, temp_index_dir):
+        """並列セグメント構築による再構築テスト"""
+        documents = []
+        for i in range(250):
+            content = f"並列構築テストドキュメント{i} parallel build"
+            documents.append(
+                Document(
+                    id=f"parallel_doc_{i}",
+                    file_path=f"/parallel/doc_{i}.txt",
+                    title=f"Parallel Document {i}",
+                    content=content,
+                    file_type=FileType.TEXT,
+                    size=len(content),
+                    created_date=datetime.now(),
+                    modified_date=datetime.now(),
+                    indexed_date=datetime.now(),
+                )
+            )
+
+        manager = IndexManager(str(temp_index_dir))
+        manager.rebuild_index(documents, procs=2)
+
+        # すべてのドキュメントが登録され、最適化で1セグメントにマージされていること
+        assert manager.get_document_count() == len(documents)
+        assert len(manager._index._segments()) == 1
+        assert len(manager.search_text("並列構築", limit=500)) == len(documents)
+        manager.close()
+
+    def test_index_stats_are_maintained_incrementally(self, temp_index_dir):
+        """統計情報がコミットごとに差分更新され、再オープン後も保持されることを確認"""
+        def make_document(doc_id, file_type):
+            return Document(
+                id=doc_id,
+                file_path=f"/stats/{doc_id}",
+                title=doc_id,
+                content=f"統計テスト {doc_id}",
+                file_type=file_type,
+                size=10,
+                created_date=datetime.now(),
+                modified_date=datetime.now(),
+                indexed_date=datetime.now(),
+            )
+
+        manager = IndexManager(str(temp_index_dir))
+        with patch.object(manager, "_recompute_stats") as recompute:
+            manager.add_document(make_document("doc1", FileType.TEXT))
+            manager.add_document(make_document("doc2", FileType.PDF))
+            manager.add_document(make_document("doc3", FileType.PDF))
+            manager.update_document(make_document("doc1", FileType.MARKDOWN))
+            manager.remove_document("doc2")
+            stats = manager.get_index_stats()
+            recompute.assert_not_called()
+
+        assert stats["document_count"] == 2
+        assert stats["file_type_counts"] == {"pdf": 1, "markdown": 1}
+        assert stats["index_size"] == sum(stats["segment_sizes"].values()) > 0
+        assert stats["last_modified"] is not None
+        assert (temp_index_dir / IndexManager.STATS_FILE_NAME).exists()
+        manager.close()
+
+        # 再オープン時は保存済みの統計情報をそのまま使う
+        with patch.object(IndexManager, "_recompute_stats") as recompute:
+            reopened = IndexManager(str(temp_index_dir))
+            assert reopened.get_index_stats()["file_type_counts"] == {"pdf": 1, "markdown": 1}
+            recompute.assert_not_called()
+
+        # 別のライターがコミットした場合は再計算される
+        writer = reopened._index.writer()
+        writer.add_document(**reopened._document_fields(make_document("doc4", FileType.TEXT)))
+        writer.commit()
+        assert reopened.get_index_stats()["file_type_counts"] == {"pdf": 1, "markdown": 1, "text": 1}
+        reopened.close()
+
+    def test_filter_bitsets_are_cached_per_segment(self, temp_index_dir):
+        """フィルターのビットセットがキャッシュされ、コミット後は新しいセグメントだけ再評価されることを確認"""
+        def make_document(doc_id, file_type):
+            return Document(
+                id=doc_id,
+                file_path=f"/filter/{doc_id}",
+                title=doc_id,
+                content=f"フィルターテスト {doc_id}",
+                file_type=file_type,
+                size=10,
+                created_date=datetime.now(),
+                modified_date=datetime.now(),
+                indexed_date=datetime.now(),
+            )
+
+        manager = IndexManager(str(temp_index_dir))
+        manager.add_document(make_document("pdf1", FileType.PDF))
+        manager.add_document(make_document("text1", FileType.TEXT))
+
+        results = manager.search_text("フィルター", file_types=[FileType.PDF])
+        assert [r.document.id for r in results] == ["pdf1"]
+
+        # 同じ世代では再評価しない(指定順が違っても同じフィルター)
+        with patch.object(Term, "docs", autospec=True) as docs:
+            manager.search_text("フィルター", file_types=[FileType.PDF, FileType.TEXT])
+            evaluated = docs.call_count
+            manager.search_text("フィルター", file_types=[FileType.TEXT, FileType.PDF])
+            assert docs.call_count == evaluated
+        assert manager._filter_cache.hits >= 1
+        # 指定順が違うだけの条件は、正規化しなければヒットしない
+        stats = manager.get_filter_cache_stats()
+        assert stats["hits"] > stats["raw_hits"]
+
+        # コミット後は追加されたセグメントの分だけ評価される
+        writer = manager._index.writer()
+        writer.add_document(**manager._document_fields(make_document("pdf2", FileType.PDF)))
+        writer.commit(merge=False)
+        with patch.object(Term, "docs", autospec=True, return_value=iter([0])) as docs:
+            results = manager.search_text("フィルター", file_types=[FileType.PDF])
+            assert docs.call_count == 1
+        assert {r.document.id for r in results} == {"pdf1", "pdf2"}
+        manager.close()
+
+    def test_filter_matching_nothing_returns_no_results(self, temp_index_dir):
+        """どのドキュメントにも一致しないフィルターで、絞り込みなしの結果が返らないことを確認"""
+        manager = IndexManager(str(temp_index_dir))
+        manager.rebuild_index([create_mock_document(doc_id=f"doc{i}", content="会議資料") for i in range(5)])
+
+        assert len(manager.search_text("会議")) == 5
+        assert manager.search_text("会議", file_types=[FileType.PDF]) == []
+        assert manager.search_text("会議", date_from=datetime.now() + timedelta(days=30)) == []
+        manager.close()
+
+    def test_folder_filter_is_applied_before_limit(self, temp_index_dir):
+        """フォルダ指定が件数制限の前にインデックス側で適用されることを確認"""
+        folder_a = os.path.join("data", "a")
+        folder_ab = os.path.join("data", "ab")
+        documents = [
+            create_mock_document(doc_id=f"other{i}", file_path=os.path.join(folder_ab, f"{i}.txt"), content="会議資料")
+            for i in range(5)
+        ]
+        documents.append(
+            create_mock_document(doc_id="target", file_path=os.path.join(folder_a, "sub", "t.txt"), content="会議資料")
+        )
+
+        manager = IndexManager(str(temp_index_dir / "index"))
+        manager.rebuild_index(documents)
+
+        # 別フォルダの結果で上限が埋まっても、配下のサブフォルダの文書が返る
+        results = manager.search_text("会議", limit=2, folder_paths=[folder_a])
+        assert [r.document.id for r in results] == ["target"]
+        assert len(manager.search_text("会議", limit=10, folder_paths=["data"])) == 6
+        manager.close()
+
+        # folderフィールドのない既存インデックスでも同じ結果になる
+        legacy_dir = temp_index_dir / "legacy"
+        legacy_dir.mkdir()
+        schema = IndexManager(str(temp_index_dir / "schema"))._create_schema()
+        legacy_schema = fields.Schema(**{name: schema[name] for name in schema.names() if name != "folder"})
+        index.create_in(str(legacy_dir), legacy_schema)
+        legacy = IndexManager(str(legacy_dir))
+        assert not legacy._has_folder_field()
+        for document in documents:
+            legacy.add_document(document)
+        results = legacy.search_text("会議", limit=2, folder_paths=[folder_a])
+        assert [r.document.id for r in results] == ["target"]
+        legacy.close()
+
+    def test_folder_without_documents_returns_no_results(self, temp_index_dir):
+        """ドキュメントのないフォルダを指定した場合に、他のフォルダの結果が返らないことを確認"""
+        manager = IndexManager(str(temp_index_dir))
+        manager.rebuild_index([
+            create_mock_document(doc_id=f"doc{i}", file_path=f"/data/a/{i}.txt", content="会議資料") for i in range(5)
+        ])
+
+        assert len(manager.search_text("会議", folder_paths=["/data/a"])) == 5
+        assert manager.search_text("会議", folder_paths=["/data/empty"]) == []
+        manager.close()
+
+    def test_search_page_sorts_and_pages_in_index(self, temp_index_dir):
+        """インデックス側で並び替えたページだけが取得され、総件数が返ることを確認"""
+        base = datetime(2024, 1, 1)
+        documents = [
+            Document(
+                id=f"doc{i}",
+                file_path=f"/page/doc{i}.txt",
+                title=f"資料{i:02d}",
+                content="四半期の売上報告" * (i + 1),
+                file_type=FileType.TEXT,
+                size=100 * (i + 1),
+                created_date=base,
+                modified_date=base + timedelta(days=i),
+                indexed_date=base,
+            )
+            for i in range(7)
+        ]
+        manager = IndexManager(str(temp_index_dir))
+        manager.rebuild_index(documents)
+
+        page = manager.search_page("売上", page=2, page_size=3, sort_by="size", descending=True)
+        assert [r.document.id for r in page.results] == ["doc3", "doc2", "doc1"]
+        assert [r.rank for r in page.results] == [4, 5, 6]
+        assert page.total == 7
+        assert page.page_count == 3
+        # 並び替え時も関連度スコアが設定される
+        assert all(r.score > 0 for r in page.results)
+
+        page = manager.search_page("売上", page=1, page_size=2, sort_by="title", descending=False)
+        assert [r.document.title for r in page.results] == ["資料00", "資料01"]
+
+        page = manager.search_page("売上", page=1, page_size=2, sort_by="modified_date", descending=True)
+        assert [r.document.id for r in page.results] == ["doc6", "doc5"]
+
+        relevance = manager.search_page("売上", page=1, page_size=7)
+        assert [r.document.id for r in relevance.results] == [r.document.id for r in manager.search_text("売上")]
+
+        # 一致するドキュメントのないフィルターでは総件数も0
+        empty = manager.search_page("売上", page=1, page_size=3, file_types=[FileType.PDF])
+        assert empty.results == []
+        assert empty.total == 0
+        manager.close()
+
+    def test_snippet_is_cut_around_matches_from_postings(self, temp_index_dir):
+        """スニペットがポスティングの文字オフセットから一致箇所の周辺で切り出されることを確認"""
+        content = "前置きの文章です。" * 40 + "ここに機械学習の説明があります。" + "後書きの文章です。" * 40
+        manager = IndexManager(str(temp_index_dir))
+        manager.add_document(create_mock_document(doc_id="doc1", content=content))
+
+        # コンテンツ全体の再トークン化は行わない
+        with patch.object(SnippetEngine, "_scan") as scan:
+            results = manager.search_text("機械学習")
+            scan.assert_not_called()
+
+        snippet = results[0].snippet
+        assert "機械学習" in snippet
+        assert snippet.startswith("...") and snippet.endswith("...")
+        assert len(snippet) <= IndexManager.SNIPPET_MAX_CHARS + 6
+        manager.close()
+
+    def test_staged_changes_are_searchable_before_flush(self, temp_index_dir):
+        """デルタセグメントの変更がすぐに検索でき、WALから復旧され、反映後も同じ結果になることを確認"""
+        manager = IndexManager(str(temp_index_dir))
+        manager.add_document(create_mock_document(doc_id="doc1", content="古い議事録"))
+        manager.add_document(create_mock_document(doc_id="doc2", content="議事録の下書き"))
+
+        manager.stage_document(create_mock_document(doc_id="doc1", content="新しい議事録"))
+        manager.stage_document(create_mock_document(doc_id="doc3", content="追加の議事録"))
+        manager.stage_removal("doc2")
+
+        # ディスクの古い版と削除されたドキュメントは隠される
+        assert manager.get_delta_size() == 3
+        assert sorted(r.document.id for r in manager.search_text("議事録")) == ["doc1", "doc3"]
+        assert [r.document.id for r in manager.search_text("古い")] == []
+        assert [r.document.id for r in manager.search_text("新しい", file_types=[FileType.TEXT])] == ["doc1"]
+        assert manager.search_page("議事録", page_size=1).total == 2
+        assert not manager.document_exists("doc2")
+        assert manager.get_document("doc3").content == "追加の議事録"
+
+        # 反映せずに終了しても、次回起動時にWALから復旧される
+        recovered = IndexManager(str(temp_index_dir))
+        assert recovered.get_delta_size() == 0
+        assert sorted(r.document.id for r in recovered.search_text("議事録")) == ["doc1", "doc3"]
+        assert recovered.get_document_count() == 2
+        recovered.close()
+
+        assert manager.flush_delta() == 3
+        assert manager.get_delta_size() == 0
+        assert sorted(r.document.id for r in manager.search_text("議事録")) == ["doc1", "doc3"]
+        manager.close()
+
+    def test_rebuild_is_built_aside_and_swapped_in(self, temp_index_dir):
+        """再構築中も既存のインデックスで検索でき、完了後に入れ替わることを確認"""
+        index_path = temp_index_dir / "index"
+        manager = IndexManager(str(index_path))
+        manager.add_document(create_mock_document(doc_id="old", content="旧版の報告書"))
+
+        shadow = manager.begin_rebuild()
+        shadow.add_document(create_mock_document(doc_id="new", content="新版の報告書"))
+        assert [r.document.id for r in manager.search_text("報告書")] == ["old"]
+
+        # 入れ替え前にデルタセグメントにたまった変更も引き継がれる
+        manager.stage_document(create_mock_document(doc_id="watched", content="監視中の報告書"))
+        manager.commit_rebuild(shadow)
+
+        assert sorted(r.document.id for r in manager.search_text("報告書")) == ["new", "watched"]
+        assert manager.get_document_count() == 2
+        assert not (temp_index_dir / "index.rebuild").exists()
+        assert not (temp_index_dir / "index.old").exists()
+
+        # 中止した再構築は破棄され、既存のインデックスはそのまま
+        manager.abort_rebuild(manager.begin_rebuild())
+        assert not (temp_index_dir / "index.rebuild").exists()
+        assert manager.get_document_count() == 2
+        manager.close()
+
+        # 旧インデックスを退避した直後に終了した場合は、次回起動時に戻される
+        os.rename(index_path, temp_index_dir / "index.old")
+        recovered = IndexManager(str(index_path))
+        assert recovered.get_document_count() == 2
+        assert not (temp_index_dir / "index.old").exists()
+        recovered.close()
+
+    def test_changes_during_rebuild_survive_swap(self, temp_index_dir):
+        """再構築中に既存のインデックスへ反映した変更が入れ替え後に失われず、名前の変更は再試行されることを確認"""
+        manager = IndexManager(str(temp_index_dir / "index"))
+        manager.add_document(create_mock_document(doc_id="old", content="旧版の報告書"))
+
+        # デルタセグメントの反映と直接の追加・削除は、入れ替え後のインデックスにも適用される
+        shadow = manager.begin_rebuild()
+        shadow.add_document(create_mock_document(doc_id="new", content="新版の報告書"))
+        shadow.add_document(create_mock_document(doc_id="watched", content="監視中の報告書"))
+        manager.stage_document(create_mock_document(doc_id="flushed", content="反映済みの報告書"))
+        assert manager.flush_delta() == 1
+        manager.add_document(create_mock_document(doc_id="added", content="追加した報告書"))
+        manager.remove_document("watched")
+        manager.commit_rebuild(shadow)
+        assert sorted(r.document.id for r in manager.search_text("報告書")) == ["added", "flushed", "new"]
+
+        # 開いているファイルがあって名前を変更できない間は再試行する
+        real_rename = os.rename
+        failures = iter([PermissionError("in use"), PermissionError("in use")])
+
+        def flaky_rename(source, target):
+            error = next(failures, None)
+            if error is not None:
+                raise error
+            real_rename(source, target)
+
+        manager.SWAP_RETRY_INTERVAL = 0
+        shadow = manager.begin_rebuild()
+        shadow.add_document(create_mock_document(doc_id="retried", content="再試行の報告書"))
+        with patch("os.rename", side_effect=flaky_rename):
+            manager.commit_rebuild(shadow)
+        assert manager.document_exists("retried")
+        assert manager.get_document_count() == 1
+
+        manager.close()
+
+    def test_create_and_clear_index_swap_in_an_empty_index(self, temp_index_dir):
+        """インデックスの作り直しとクリアで既存のインデックスを削除せず、空のインデックスと入れ替えることを確認"""
+        manager = IndexManager(str(temp_index_dir / "index"))
+        manager.add_document(create_mock_document(doc_id="doc1", content="報告書"))
+        manager.stage_document(create_mock_document(doc_id="staged", content="未反映の報告書"))
+
+        real_rmtree = shutil.rmtree
+        with patch("shutil.rmtree", side_effect=real_rmtree) as rmtree:
+            manager.create_index()
+            assert Path(temp_index_dir / "index") not in [Path(call.args[0]) for call in rmtree.call_args_list]
+        # 破棄したインデックスへの未反映の変更は引き継がない
+        assert manager.get_document_count() == 0
+        assert manager.search_text("報告書") == []
+
+        manager.add_document(create_mock_document(doc_id="doc2", content="報告書"))
+        with patch("shutil.rmtree", side_effect=real_rmtree) as rmtree:
+            manager.clear_index()
+            assert Path(temp_index_dir / "index") not in [Path(call.args[0]) for call in rmtree.call_args_list]
+        assert manager.get_document_count() == 0
+        manager.close()
+
+    def test_search_filenames_matches_names_and_paths(self, temp_index_dir):
+        """ファイル名・パスの部分一致とあいまい一致、変更の反映を確認"""
+        manager = IndexManager(str(temp_index_dir / "index"))
+        manager.add_document(create_mock_document(doc_id="plan", file_path="/work/2024/project_plan.txt"))
+        manager.add_document(create_mock_document(doc_id="report", file_path="/work/2024/Annual_Report.md"))
+        manager.add_document(
+            create_mock_document(doc_id="budget", file_path="/work/planning/budget.pdf", file_type=FileType.PDF)
+        )
+
+        results = manager.search_filenames("plan")
+        assert [r.document.id for r in results] == ["plan", "budget"]
+        assert all(r.search_type == SearchType.FILENAME for r in results)
+        assert results[0].snippet == "/work/2024/project_plan.txt"
+
+        # 大文字小文字を区別せず、フォルダやファイルタイプで絞り込める
+        assert [r.document.id for r in manager.search_filenames("annual")] == ["report"]
+        assert [r.document.id for r in manager.search_filenames("plan", file_types=[FileType.PDF])] == ["budget"]
+        assert [r.document.id for r in manager.search_filenames("plan", folder_paths=["/work/2024"])] == ["plan"]
+
+        # 綴りの誤りはあいまい一致で補う
+        assert "report" in [r.document.id for r in manager.search_filenames("anual_report")]
+
+        # 作成済みの索引に追加・削除が反映される
+        manager.stage_document(create_mock_document(doc_id="memo", file_path="/work/memo_plan.txt"))
+        manager.stage_removal("plan")
+        assert [r.document.id for r in manager.search_filenames("plan")] == ["memo", "budget"]
+        manager.flush_delta()
+        assert [r.document.id for r in manager.search_filenames("plan")] == ["memo", "budget"]
+        manager.close()
+
+    def test_expensive_patterns_are_rewritten_or_capped(self, temp_index_dir):
+        """CJKのワイルドカードはバイグラム検索に書き換え、展開の大きいパターンは絞って警告することを確認"""
+        manager = IndexManager(str(temp_index_dir / "index"))
+        manager.add_document(create_mock_document(doc_id="jp", content="四半期の報告書を提出しました"))
+        manager.add_document(create_mock_document(doc_id="en1", content="report reporter reporting"))
+        manager.add_document(create_mock_document(doc_id="en2", content="reported reports repeat"))
+
+        # バイグラムより長い語は語彙に存在しないため、展開せずにフレーズとして照合する
+        assert [r.document.id for r in manager.search_text("*報告書*")] == ["jp"]
+
+        manager._query_planner = QueryPlanner(max_expansion=2)
+        page = manager.search_page("rep*")
+        assert page.warnings
+        assert {r.document.id for r in page.results} <= {"en1", "en2"}
+        assert page.results
+
+        # 展開が上限以内なら警告は出ない
+        assert manager.search_page("reporte*").warnings == []
+        manager.close()
+
+    def test_suggest_corrections_for_misspelled_terms(self, temp_index_dir):
+        """綴りの誤りに訂正したクエリを提案し、辞書が保存されることを確認"""
+        index_path = temp_index_dir / "index"
+        manager = IndexManager(str(index_path))
+        manager.add_document(create_mock_document(doc_id="doc1", content="quarterly report 報告書"))
+        manager.add_document(create_mock_document(doc_id="doc2", content="annual report budget"))
+
+        page = manager.search_page("reprot 報告書")
+        assert page.total == 0
+        assert page.suggestions[0] == "report 報告書"
+        assert manager.search_page("report").suggestions == []
+
+        # 結果が十分にある検索では辞書を引かない
+        manager.SUGGESTION_MAX_HITS = 1
+        with patch.object(manager, "suggest_corrections") as suggest:
+            assert manager.search_page("report").total == 2
+            suggest.assert_not_called()
+
+        # コミットで追加された語も訂正の候補になる
+        manager.add_document(create_mock_document(doc_id="doc3", content="invoice"))
+        assert manager.suggest_corrections("invoise") == ["invoice"]
+        manager.close()
+
+        assert (index_path / IndexManager.SPELLING_FILE_NAME).exists()
+        reopened = IndexManager(str(index_path))
+        assert reopened.suggest_corrections("budgte") == ["budget"]
+        reopened.close()
+
+    def test_find_similar_uses_key_terms_of_the_document(self, temp_index_dir):
+        """タームベクトルのキーワードで類似ドキュメントを検索し、元のドキュメントを除くことを確認"""
+        manager = IndexManager(str(temp_index_dir / "index"))
+        manager.add_document(create_mock_document(doc_id="base", content="whoosh index segment merge tuning"))
+        manager.add_document(create_mock_document(doc_id="near", content="segment merge policy for whoosh index"))
+        manager.add_document(create_mock_document(doc_id="far", content="holiday travel photos"))
+        manager.stage_document(create_mock_document(doc_id="staged", content="index merge tuning notes"))
+
+        assert manager._index.schema["content"].vector is not None
+        results = manager.find_similar("base")
+        ids = [r.document.id for r in results]
+        assert "base" not in ids
+        assert "far" not in ids
+        assert ids[0] == "near"
+        assert "staged" in ids
+        assert "類似ドキュメント" in results[0].relevance_explanation
+        manager.close()
+
+    def test_search_is_cancelled_cooperatively(self, temp_index_dir):
+        """キャンセルトークンで照合中の検索が中断され、未キャンセルなら結果が変わらないことを確認"""
+        class CancelAfterToken(CancellationToken):
+            """指定回数の確認の後にキャンセルされるトークン"""
+
+            def __init__(self, checks):
+                super().__init__()
+                self.checks = checks
+
+            @property
+            def cancelled(self):
+                self.checks -= 1
+                if self.checks < 0:
+                    self.cancel()
+                return super().cancelled
+
+        manager = IndexManager(str(temp_index_dir / "index"))
+        manager.rebuild_index([
+            create_mock_document(doc_id=f"doc{i}", file_path=f"/data/doc{i}.txt", content="quarterly report")
+            for i in range(20)
+        ])
+
+        expected = [r.document.id for r in manager.search_text("report", limit=5)]
+        results = manager.search_text("report", limit=5, cancel_token=CancellationToken())
+        assert [r.document.id for r in results] == expected
+
+        cancelled = CancellationToken()
+        cancelled.cancel()
+        with pytest.raises(SearchCancelledError):
+            manager.search_text("report", cancel_token=cancelled)
+        with pytest.raises(SearchCancelledError):
+            manager.search_page("report", page=1, page_size=5, cancel_token=cancelled)
+
+        # 照合の途中でキャンセルされた場合も、フォルダ指定の有無によらず中断される
+        with pytest.raises(SearchCancelledError):
+            manager.search_text("report", cancel_token=CancelAfterToken(3))
+        with pytest.raises(SearchCancelledError):
+            manager.search_text("report", folder_paths=["/data"], cancel_token=CancelAfterToken(3))
+        manager.close()
+
+    def test_search_deadline_returns_truncated_partial_results(self, temp_index_dir):
+        """時間予算を超えた検索が途中までの結果を打ち切りの印付きで返すことを確認"""
+        class ShortDeadline(SearchDeadline):
+            """残り時間は十分だが、スニペットを省く段階とみなされる時間予算"""
+
+            @property
+            def short(self):
+                return True
+
+        content = "前置きの文章です。" * 40 + "ここに報告書の要点があります"
+        manager = IndexManager(str(temp_index_dir / "index"))
+        manager.rebuild_index([
+            create_mock_document(doc_id=f"doc{i}", file_path=f"/data/doc{i}.txt", content=content) for i in range(10)
+        ])
+
+        # 十分な時間予算では打ち切られず、結果も変わらない
+        deadline = SearchDeadline(30.0)
+        page = manager.search_page("報告書", page=1, page_size=5, deadline=deadline)
+        assert not deadline.truncated
+        assert not page.truncated
+        assert page.total == 10
+        assert "報告書" in page.results[0].snippet
+
+        # 予算を使い切っている場合は照合を打ち切り、総件数も推定値になる
+        expired = SearchDeadline(0.0)
+        page = manager.search_page("報告書", page=1, page_size=5, deadline=expired)
+        assert page.truncated
+        assert not page.total_is_exact
+        assert expired.truncated_stages == ["全文検索"]
+        assert manager.search_text("報告書", folder_paths=["/data"], deadline=SearchDeadline(0.0)) == []
+
+        # 残り時間が少ない場合は一致箇所を探さず、本文の先頭をスニペットにする
+        results = manager.search_text("報告書", limit=3, deadline=ShortDeadline(30.0))
+        assert len(results) == 3
+        assert results[0].snippet.startswith("前置きの文章です。")
+        manager.close()
+
+    def test_search_is_limited_to_candidate_documents(self, temp_index_dir):
+        """doc_idsを指定した検索が対象のドキュメントだけを返し、対象がなければ何も返さないことを確認"""
+        manager = IndexManager(str(temp_index_dir))
+        documents = [create_mock_document(doc_id=f"doc{i}", content="会議資料") for i in range(4)]
+        documents.append(create_mock_document(doc_id="pdf", content="会議資料", file_type=FileType.PDF))
+        manager.rebuild_index(documents)
+
+        results = manager.search_text("会議", doc_ids=["doc1", "pdf"])
+        assert {r.document.id for r in results} == {"doc1", "pdf"}
+
+        # 対象が空、存在しない、またはフィルターで残らない場合はインデックス全体を照合しない
+        assert manager.search_text("会議", doc_ids=[]) == []
+        assert manager.search_text("会議", doc_ids=["zzz"]) == []
+        assert manager.search_text("会議", doc_ids=["doc1"], file_types=[FileType.PDF]) == []
+        manager.close()
@@ -0,0 +1,200 @@
+"""
+アイドル時保守スケジューラーのテスト
+
+予算による打ち切り、ユーザー操作による中断、状態の取得と、
+各保守タスク(段階的セグメントマージ、増分バキューム、埋め込みジャーナル統合)を検証します。
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+
+from src.core.embedding_manager import EmbeddingManager
+from src.core.index_manager import IndexManager
+from src.data.database import DatabaseManager
+from src.utils.maintenance_scheduler import (
+    MaintenanceBudget,
+    MaintenanceScheduler,
+    register_default_maintenance_tasks,
+)
+from tests.fixtures.mock_models import create_mock_document
+
+
+class TestMaintenanceScheduler:
+    """MaintenanceSchedulerのテスト"""
+
+    def test_tasks_stop_when_io_budget_is_exhausted(self):
+        """I/O予算を使い切ると残りのタスクが次のサイクルに持ち越されることを確認"""
+        scheduler = MaintenanceScheduler(io_budget_mb=1.0)
+        calls = []
+        scheduler.register_task("first", lambda budget: calls.append("first") or 1024 * 1024)
+        scheduler.register_task("second", lambda budget: calls.append("second") or 0)
+
+        cycle = scheduler.run_pending()
+        assert cycle.tasks_run == ["first"]
+        assert calls == ["first"]
+
+        # 実行済みのタスクは間隔を満たすまで実行されない
+        cycle = scheduler.run_pending()
+        assert cycle.tasks_run == ["second"]
+
+    def test_activity_interrupts_cycle(self):
+        """ユーザー操作の通知でサイクルが中断されることを確認"""
+        scheduler = MaintenanceScheduler()
+        scheduler.register_task("busy", lambda budget: scheduler.notify_activity() or 0)
+        scheduler.register_task("later", lambda budget: 0)
+
+        cycle = scheduler.run_pending()
+
+        assert cycle.interrupted
+        assert cycle.tasks_run == ["busy"]
+        assert not scheduler.is_idle()
+
+    def test_state_reports_tasks_and_errors(self):
+        """状態にタスクごとの実行結果とエラーが含まれることを確認"""
+        scheduler = MaintenanceScheduler()
+
+        def failing(budget):
+            raise RuntimeError("disk busy")
+
+        scheduler.register_task("failing", failing, interval=10.0)
+        scheduler.run_pending()
+
+        state = scheduler.get_state()
+        assert state["state"] == "stopped"
+        assert state["last_cycle"]["tasks_run"] == ["failing"]
+        assert state["tasks"]["failing"]["last_error"] == "disk busy"
+        assert state["tasks"]["failing"]["run_count"] == 1
+
+    def test_is_idle_after_idle_seconds(self):
+        """最後の操作から一定時間経過し、CPUに余裕があるとアイドルと判定されることを確認"""
+        scheduler = MaintenanceScheduler(idle_seconds=0.0, max_cpu_percent=30.0)
+        with patch("src.utils.maintenance_scheduler.psutil.cpu_percent", return_value=5.0):
+            assert scheduler.is_idle()
+        with patch("src.utils.maintenance_scheduler.psutil.cpu_percent", return_value=90.0):
+            assert not scheduler.is_idle()
+
+    def test_start_and_stop(self):
+        """アイドル監視スレッドの開始と停止で状態が切り替わることを確認"""
+        scheduler = MaintenanceScheduler(check_interval=0.05)
+        scheduler.start()
+        assert scheduler.get_state()["state"] == "waiting"
+        scheduler.stop()
+        assert scheduler.get_state()["state"] == "stopped"
+
+
+class TestMaintenanceTasks:
+    """標準の保守タスクのテスト"""
+
+    def test_merge_segments_merges_small_tiers(self, tmp_path):
+        """同じ階層にたまった小さなセグメントがマージされることを確認"""
+        manager = IndexManager(str(tmp_path / "index"))
+        for i in range(6):
+            writer = manager._index.writer()
+            writer.add_document(
+                **manager._document_fields(create_mock_document(doc_id=f"doc{i}", content=f"機械学習 文書{i}"))
+            )
+            writer.commit(merge=False)
+        assert len(manager.get_segment_sizes()) == 6
+
+        # 予算が足りない場合はマージしない
+        assert manager.merge_segments(max_bytes=0)["merged_segments"] == 0
+
+        result = manager.merge_segments()
+
+        assert result["merged_segments"] == 6
+        assert len(manager.get_segment_sizes()) == 1
+        assert manager.get_document_count() == 6
+        assert len(manager.search_text("機械学習")) == 6
+        manager.close()
+
+    def test_merge_segments_merges_one_tier_at_a_time(self, tmp_path):
+        """階層ごとのマージの間で打ち切りを確認し、残りの階層を次回に持ち越すことを確認"""
+        manager = IndexManager(str(tmp_path / "index"))
+        for i in range(4):
+            small = create_mock_document(doc_id=f"small{i}", content=f"機械学習 {i}")
+            large = create_mock_document(
+                doc_id=f"large{i}", content="機械学習 " + " ".join(f"word{i}x{j}" for j in range(500))
+            )
+            for document in (small, large):
+                writer = manager._index.writer()
+                writer.add_document(**manager._document_fields(document))
+                writer.commit(merge=False)
+        assert len(manager.get_segment_sizes()) == 8
+
+        # ユーザー操作で中断された予算では、最初の階層(小さいセグメント)だけをマージして打ち切る
+        scheduler = MaintenanceScheduler()
+        register_default_maintenance_tasks(scheduler, index_manager=manager)
+        budget = MaintenanceBudget(60.0, 64 * 1024 * 1024)
+        budget.cancelled = True
+        merged_bytes = scheduler._tasks[0].func(budget)
+        assert 0 < merged_bytes < 64 * 1024 * 1024
+        assert len(manager.get_segment_sizes()) == 5
+
+        checks = []
+        result = manager.merge_segments(should_yield=lambda: checks.append(1) or False)
+        assert checks == [1]
+        assert result["merged_segments"] == 4
+        assert len(manager.get_segment_sizes()) == 2
+        assert len(manager.search_text("機械学習", limit=20)) == 8
+        manager.close()
+
+    def test_merge_segments_is_skipped_during_rebuild(self, tmp_path):
+        """再構築中は入れ替えで破棄される旧インデックスのセグメントをマージしないことを確認"""
+        manager = IndexManager(str(tmp_path / "index"))
+        for i in range(4):
+            writer = manager._index.writer()
+            writer.add_document(**manager._document_fields(create_mock_document(doc_id=f"doc{i}", content="機械学習")))
+            writer.commit(merge=False)
+
+        shadow = manager.begin_rebuild()
+        assert manager.merge_segments()["merged_segments"] == 0
+        assert len(manager.get_segment_sizes()) == 4
+
+        manager.abort_rebuild(shadow)
+        assert manager.merge_segments()["merged_segments"] == 4
+        manager.close()
+
+    def test_incremental_vacuum_reclaims_free_pages(self, tmp_path):
+        """増分バキュームで空きページが回収されることを確認"""
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        with db.get_connection() as conn:
+            conn.execute("CREATE TABLE filler (data BLOB)")
+            conn.executemany("INSERT INTO filler VALUES (?)", [(b"x" * 4000,) for _ in range(200)])
+            conn.commit()
+            conn.execute("DELETE FROM filler")
+            conn.commit()
+
+        reclaimed = db.incremental_vacuum(max_bytes=64 * 1024)
+
+        assert 0 < reclaimed <= 64 * 1024
+        db.close()
+
+    def test_embedding_journal_is_replayed_and_compacted(self, tmp_path):
+        """埋め込みジャーナルが再読み込み時に適用され、統合で削除されることを確認"""
+        path = str(tmp_path / "embeddings.pkl")
+        with patch.object(EmbeddingManager, "generate_embedding", return_value=np.ones(4, dtype=np.float32)):
+            manager = EmbeddingManager(embeddings_path=path)
+            manager.add_document_embedding("doc1", "テキスト1")
+            manager.add_document_embedding("doc2", "テキスト2")
+            manager.remove_document_embedding("doc1")
+
+        assert manager.get_journal_size() > 0
+        assert set(EmbeddingManager(embeddings_path=path).embeddings) == {"doc2"}
+
+        # 書き込み量が予算を超える場合は見送る
+        assert manager.compact_journal(max_bytes=1) == 0
+
+        assert manager.compact_journal() > 0
+        assert manager.get_journal_size() == 0
+        assert set(EmbeddingManager(embeddings_path=path).embeddings) == {"doc2"}
+
+    def test_default_tasks_are_registered(self, tmp_path):
+        """渡したマネージャーに応じて標準タスクが登録されることを確認"""
+        scheduler = MaintenanceScheduler()
+        manager = IndexManager(str(tmp_path / "index"))
+        register_default_maintenance_tasks(scheduler, index_manager=manager)
+
+        assert list(scheduler.get_state()["tasks"]) == ["index_merge"]
+        assert scheduler.run_pending().tasks_run == ["index_merge"]
+        manager.close()
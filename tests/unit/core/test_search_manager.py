@@ -13,10 +13,16 @@ from unittest.mock import patch
 
 import pytest
 
+from src.core.cancellation import SearchDeadline
 from src.core.embedding_manager import EmbeddingManager
 from src.core.index_manager import IndexManager
-from src.core.search_manager import SearchManager
+from src.core.query_planner import QueryPlanner
+from src.core.search_manager import SearchManager, prefix_query_text
+from src.data.database import DatabaseManager
 from src.data.models import FileType, SearchQuery, SearchResult, SearchType
+from src.data.search_history_repository import SearchHistoryRepository
+from src.utils.cache_manager import SearchResultCache
+from src.utils.config import Config
 from src.utils.exceptions import SearchError
 from tests.fixtures.mock_models import create_mock_document, create_mock_documents
 
@@ -154,6 +160,254 @@ class TestSearchManager:
             for i in range(len(results) - 1):
                 assert results[i].score >= results[i + 1].score
 
+    @patch("src.core.embedding_manager.EmbeddingManager.search_similar")
+    def test_search_deadline_truncates_without_caching(self, mock_search_similar, search_manager, sample_documents):
+        """検証対象: 検索の時間予算
+        目的: 時間切れの段階は打ち切られ、打ち切った結果はキャッシュされず、ページに警告が付くことを確認"""
+        mock_search_similar.return_value = [("test_doc_2", 0.7)]
+        for doc in sample_documents:
+            search_manager.index_manager.add_document(doc)
+
+        query = SearchQuery(query_text="スケジュール", search_type=SearchType.HYBRID, limit=7)
+
+        # 予算を使い切っている場合はセマンティック検索を行わない
+        deadline = SearchDeadline(0.0)
+        assert search_manager.search(query, deadline=deadline) == []
+        assert deadline.truncated_stages == ["全文検索", "セマンティック検索"]
+        mock_search_similar.assert_not_called()
+
+        # 打ち切った結果はキャッシュされていないため、次の検索は最後まで実行される
+        deadline = SearchDeadline(30.0)
+        results = search_manager.search(query, deadline=deadline)
+        assert not deadline.truncated
+        assert [result.document.id for result in results] == ["test_doc_2"]
+        mock_search_similar.assert_called_once()
+
+        page = search_manager.search_page(
+            SearchQuery(query_text="スケジュール", search_type=SearchType.FULL_TEXT), deadline=SearchDeadline(0.0)
+        )
+        assert page.truncated
+        assert any("時間制限" in warning for warning in page.warnings)
+
+    @patch("src.core.embedding_manager.EmbeddingManager.search_similar")
+    def test_hybrid_search_delivers_full_text_results_first(
+        self, mock_search_similar, search_manager, sample_documents
+    ):
+        """検証対象: ハイブリッド検索の段階的な結果通知
+        目的: セマンティック検索の前に全文検索の結果が途中結果として渡され、最終結果は統合されることを確認"""
+        for doc in sample_documents:
+            search_manager.index_manager.add_document(doc)
+
+        phases = []
+
+        def search_similar(*args, **kwargs):
+            phases.append("semantic")
+            return [("test_doc_0", 0.9)]
+
+        mock_search_similar.side_effect = search_similar
+
+        def on_partial_results(results):
+            phases.append("partial")
+            assert [result.document.id for result in results] == ["test_doc_1"]
+            assert all(result.search_type == SearchType.FULL_TEXT for result in results)
+
+        query = SearchQuery(query_text="統計的手法", search_type=SearchType.HYBRID, limit=6)
+        results = search_manager.search(query, on_partial_results=on_partial_results)
+
+        assert phases == ["partial", "semantic"]
+        assert {result.document.id for result in results} == {"test_doc_0", "test_doc_1"}
+        assert all(result.search_type == SearchType.HYBRID for result in results)
+
+    def test_search_cache_is_sliced_and_versioned_by_generation(self, search_manager, sample_documents):
+        """検証対象: インデックスの世代付きの検索結果キャッシュ
+        目的: 件数の少ない要求と後ろのページは深い結果から切り出され、インデックスの変更で無効になることを確認"""
+        for doc in sample_documents:
+            search_manager.index_manager.add_document(doc)
+
+        index_manager = search_manager.index_manager
+        with (
+            patch.object(index_manager, "search_text", wraps=index_manager.search_text) as search_text,
+            patch.object(index_manager, "search_page", wraps=index_manager.search_page) as search_page,
+        ):
+            deep = search_manager.search(SearchQuery(query_text="手法", search_type=SearchType.FULL_TEXT, limit=50))
+            assert len(deep) == 2
+
+            # 件数の少ない要求は深い結果の上位を切り出す
+            shallow = search_manager.search(SearchQuery(query_text="手法", search_type=SearchType.FULL_TEXT, limit=1))
+            assert [result.document.id for result in shallow] == [deep[0].document.id]
+
+            # 2ページ目も深い結果から切り出す
+            page = search_manager.search_page(
+                SearchQuery(query_text="手法", search_type=SearchType.FULL_TEXT), page=2, page_size=1
+            )
+            assert [result.document.id for result in page.results] == [deep[1].document.id]
+            assert page.results[0].rank == 2
+            assert page.total == 2 and page.total_is_exact
+            assert search_text.call_count == 1
+            search_page.assert_not_called()
+
+            # インデックスが変わるとキャッシュした結果は使われない
+            index_manager.add_document(
+                create_mock_document(
+                    doc_id="test_doc_3",
+                    file_path="test/doc_3.txt",
+                    title="品質管理",
+                    content="品質管理の手法を紹介します。",
+                    file_type=FileType.TEXT,
+                )
+            )
+            results = search_manager.search(SearchQuery(query_text="手法", search_type=SearchType.FULL_TEXT, limit=1))
+            assert search_text.call_count == 2
+            assert len(results) == 1
+            assert search_manager._cache_manager.search_cache.get_stats()["stale_entries"] >= 1
+
+    def test_search_cache_holds_compact_hits_within_byte_budget(self, search_manager, sample_documents):
+        """検証対象: ドキュメント本体を持たない検索結果キャッシュ
+        目的: キャッシュはIDとスコアだけを保持して取り出し時にドキュメントを読み込み、バイト数の上限を守ることを確認"""
+        for doc in sample_documents:
+            search_manager.index_manager.add_document(doc)
+
+        query = SearchQuery(query_text="データ", search_type=SearchType.FULL_TEXT, limit=11)
+        results = search_manager.search(query)
+        assert results
+
+        # ドキュメントキャッシュが空でも、インデックスから読み込んで同じ結果を返す
+        cache_manager = search_manager._cache_manager
+        cache_manager.document_cache.clear()
+        index_manager = search_manager.index_manager
+        with patch.object(index_manager, "search_text", wraps=index_manager.search_text) as search_text:
+            cached = search_manager.search(query)
+        search_text.assert_not_called()
+        assert [(r.document.id, r.document.content, r.score, r.snippet) for r in cached] == [
+            (r.document.id, r.document.content, r.score, r.snippet) for r in results
+        ]
+
+        # 使用バイト数をエントリごとに数える
+        cache = SearchResultCache(max_bytes=4096)
+        cache.cache_search_results("データ", "full_text", results, limit=11, generation=1)
+        stats = cache.get_stats()
+        assert 0 < stats["bytes"] <= 4096
+
+        # 上限を超えると古いエントリから削除し、単独で上限を超える結果は保存しない
+        for i in range(20):
+            cache.cache_search_results(f"クエリ{i}", "full_text", results, limit=11, generation=1)
+        assert cache.get_stats()["bytes"] <= 4096
+        assert cache.get_search_results("データ", "full_text", limit=11, generation=1) is None
+        cache.cache_search_results("大きな結果", "full_text", results * 50, limit=550, generation=1)
+        assert cache.get_search_results("大きな結果", "full_text", limit=550, generation=1) is None
+
+    def test_search_cache_keys_on_canonical_query(self, search_manager, sample_documents):
+        """検証対象: 正規化したクエリによる検索結果キャッシュのキー
+        目的: 全角・半角、空白、ORで並べた語の順序だけが異なる検索が同じエントリを使い、
+              正規化前と比べたヒット率が集計されることを確認"""
+        for doc in sample_documents:
+            search_manager.index_manager.add_document(doc)
+
+        def search(text: str) -> list:
+            return search_manager.search(SearchQuery(query_text=text, search_type=SearchType.FULL_TEXT, limit=10))
+
+        results = search("データ OR 機械")
+        assert results
+        before = search_manager.get_search_stats()["cache_hit_rates"]["search_results"]
+
+        index_manager = search_manager.index_manager
+        with patch.object(index_manager, "search_text", wraps=index_manager.search_text) as search_text:
+            for text in ("機械 OR データ", "　機械　 OR データ ", "データ OR 機械"):
+                assert [r.document.id for r in search(text)] == [r.document.id for r in results]
+        search_text.assert_not_called()
+
+        after = search_manager.get_search_stats()["cache_hit_rates"]
+        assert after["search_results"]["hits"] - before["hits"] == 3
+        # 正規化しなければ、最初と同じ表記の検索しかヒットしない
+        assert after["search_results"]["raw_hits"] - before["raw_hits"] == 1
+        assert set(after) == {"search_results", "query_embeddings", "filters"}
+
+    def test_refined_search_matches_only_previous_results(self, search_manager, sample_documents):
+        """検証対象: 直前の検索結果の絞り込み
+        目的: 語やフィルターを加えた検索は直前の結果の中だけを照合し、最初から検索した場合と同じ結果になることを確認"""
+        for doc in sample_documents:
+            search_manager.index_manager.add_document(doc)
+
+        def search(text: str, **kwargs) -> list:
+            return search_manager.search(
+                SearchQuery(query_text=text, search_type=SearchType.FULL_TEXT, limit=10, **kwargs)
+            )
+
+        assert {r.document.id for r in search("手法")} == {"test_doc_1", "test_doc_2"}
+
+        index_manager = search_manager.index_manager
+        with patch.object(index_manager, "search_text", wraps=index_manager.search_text) as search_text:
+            refined = search("手法 データ")
+            assert search_text.call_args.kwargs["doc_ids"] == {"test_doc_1", "test_doc_2"}
+            # フィルターの追加も絞り込みとして扱う
+            search("手法 データ", file_types=[FileType.TEXT])
+            assert search_text.call_args.kwargs["doc_ids"] == {"test_doc_1"}
+            # ORを含む検索は絞り込みではない
+            search("手法 OR 学習")
+            assert search_text.call_args.kwargs["doc_ids"] is None
+        assert search_manager.get_search_stats()["refined_searches"] == 2
+
+        # 最初から検索した場合と同じ結果とスコア
+        search_manager._cache_manager.search_cache.invalidate_cache()
+        search_manager._previous_search = None
+        fresh = search("手法 データ")
+        assert [(r.document.id, r.score) for r in refined] == [(r.document.id, r.score) for r in fresh]
+
+    def test_capped_pattern_search_is_not_refined(self, search_manager):
+        """検証対象: 展開を絞ったワイルドカード検索の絞り込み
+        目的: 展開する語を絞った検索の結果は一致するすべてのドキュメントではないため、
+              絞り込みの候補にしないことを確認"""
+        index_manager = search_manager.index_manager
+        index_manager._query_planner = QueryPlanner(max_expansion=1)
+        for doc_id, word in [("d1", "reporting"), ("d2", "reports"), ("d3", "reported")]:
+            index_manager.add_document(create_mock_document(doc_id=doc_id, content=f"{word} alpha"))
+
+        def search(text: str, **kwargs) -> list:
+            return search_manager.search(
+                SearchQuery(query_text=text, search_type=SearchType.FULL_TEXT, limit=10, **kwargs)
+            )
+
+        # 展開が1語に絞られ、件数は上限未満でも一致するすべてのドキュメントではない
+        assert len(search("report*")) == 1
+        assert search_manager._previous_search is None
+
+        with patch.object(index_manager, "search_text", wraps=index_manager.search_text) as search_text:
+            search("report*", file_types=[FileType.TEXT])
+            assert search_text.call_args.kwargs["doc_ids"] is None
+            assert {r.document.id for r in search("alpha")} == {"d1", "d2", "d3"}
+            # ワイルドカードやフィールド指定の語を加えた検索は絞り込みとして扱わない
+            search("alpha report*")
+            assert search_text.call_args.kwargs["doc_ids"] is None
+            search("alpha content:reports")
+            assert search_text.call_args.kwargs["doc_ids"] is None
+        assert search_manager.get_search_stats()["refined_searches"] == 0
+
+    def test_narrowing_detection(self):
+        """検証対象: 絞り込み検索の判定
+        目的: 条件を加えただけの検索だけが絞り込みとして扱われることを確認"""
+
+        def query(text="機械 学習", search_type=SearchType.FULL_TEXT, **kwargs) -> SearchQuery:
+            return SearchQuery(query_text=text, search_type=search_type, **kwargs)
+
+        previous = query(folder_paths=["/docs"], date_from=datetime(2024, 1, 1))
+        assert SearchManager._is_narrowing(
+            previous, query("機械 AND 学習 入門", folder_paths=["/docs"], date_from=datetime(2024, 1, 1))
+        )
+        assert SearchManager._is_narrowing(previous, query(folder_paths=["/docs/sub"], date_from=datetime(2024, 6, 1)))
+        # 範囲を広げた条件、OR、語の削除は絞り込みではない
+        assert not SearchManager._is_narrowing(previous, query(folder_paths=["/"], date_from=datetime(2024, 1, 1)))
+        assert not SearchManager._is_narrowing(previous, query(folder_paths=["/docs"]))
+        assert not SearchManager._is_narrowing(
+            previous, query("機械 OR 学習", folder_paths=["/docs"], date_from=datetime(2024, 1, 1))
+        )
+        assert not SearchManager._is_narrowing(
+            previous, query("機械", folder_paths=["/docs"], date_from=datetime(2024, 1, 1))
+        )
+        # 埋め込みを使う検索は、語を加えると別の結果になる
+        semantic = query(search_type=SearchType.SEMANTIC)
+        assert SearchManager._is_narrowing(semantic, query(search_type=SearchType.SEMANTIC, file_types=[FileType.PDF]))
+        assert not SearchManager._is_narrowing(semantic, query("機械 学習 入門", search_type=SearchType.SEMANTIC))
+
     def test_search_with_file_type_filter(self, search_manager, sample_documents):
         """検証対象: ファイルタイプフィルター付き検索
         目的: 特定のファイルタイプのみを検索対象とする機能が正常に動作することを確認"""
@@ -227,21 +481,65 @@ class TestSearchManager:
     def test_search_suggestions(self, search_manager):
         """検証対象: 検索提案機能
         目的: 部分的なクエリから検索提案を生成する機能が正常に動作することを確認"""
-        # インデックス化された用語をモック
-        search_manager._indexed_terms = {
-            "機械学習",
-            "機械学習基礎",
-            "データ分析",
-            "データベース",
-        }
+        index_manager = search_manager.index_manager
+        index_manager.add_document(
+            create_mock_document(doc_id="doc1", title="機械学習基礎", content="machine learning basics")
+        )
+        index_manager.add_document(create_mock_document(doc_id="doc2", title="機械学習", content="machine vision"))
+        index_manager.add_document(create_mock_document(doc_id="doc3", title="データ分析", content="data mining"))
 
         suggestions = search_manager.get_search_suggestions("機械", limit=5)
 
         assert isinstance(suggestions, list)
         assert len(suggestions) <= 5
-        # "機械"で始まる用語が含まれることを確認
-        machine_suggestions = [s for s in suggestions if s.startswith("機械")]
-        assert len(machine_suggestions) >= 0  # 結果があることを期待するが、実装に依存
+        # "機械"で始まる用語が、含むタイトルの多い順に含まれることを確認
+        assert suggestions[:2] == ["機械学習", "機械学習基礎"]
+
+        # 英単語は語彙の出現ドキュメント数の多い順に補完し、前の語はそのまま残す
+        assert search_manager.get_search_suggestions("ma", limit=5) == ["machine"]
+        assert search_manager.get_search_suggestions("data mi", limit=5) == ["data mining"]
+
+        # コミットで追加された語も補完される
+        index_manager.add_document(create_mock_document(doc_id="doc4", title="memo", content="machinery"))
+        assert index_manager.complete_terms("machin") == [("machine", 2), ("machinery", 1)]
+
+    def test_search_suggestions_blend_search_history(self, temp_dirs, search_manager):
+        """検証対象: 検索履歴からの検索提案
+        目的: 過去のクエリが使用回数の多い順に、語彙の補完より先に提案されることを確認"""
+        index_dir, _ = temp_dirs
+        search_manager.history_repository = SearchHistoryRepository(
+            DatabaseManager(str(Path(index_dir).parent / "history.db"))
+        )
+        search_manager.index_manager.add_document(
+            create_mock_document(doc_id="doc1", title="memo", content="machinery manual")
+        )
+
+        for query_text in ["machine learning", "machine learning", "deep machine vision", "data"]:
+            query = SearchQuery(query_text=query_text, search_type=SearchType.FULL_TEXT)
+            search_manager.record_search(query, result_count=1, execution_time=0.01)
+        # 検索履歴のテーブルが受け付けない検索タイプは記録しない
+        search_manager.record_search(
+            SearchQuery(query_text="machine.txt", search_type=SearchType.FILENAME), result_count=1, execution_time=0.01
+        )
+
+        # 語の途中からも前方一致し、使用回数の多い履歴、語彙の補完の順に並ぶ
+        assert search_manager.get_search_suggestions("mach", limit=5) == [
+            "machine learning",
+            "deep machine vision",
+            "machinery",
+        ]
+        assert search_manager.get_search_suggestions("machine l", limit=5) == ["machine learning"]
+
+    def test_search_timeout_is_read_from_config(self, temp_dirs, mock_index_manager, mock_embedding_manager):
+        """検証対象: 検索の時間予算の設定
+        目的: 時間予算が設定から読み込まれ、設定を渡さない場合はグローバル設定が使われることを確認"""
+        index_dir, _ = temp_dirs
+        config = Config(str(Path(index_dir).parent / "config.json"))
+        config.set("search_timeout", 2.5)
+        assert SearchManager(mock_index_manager, mock_embedding_manager, config).search_timeout == 2.5
+
+        with patch("src.core.search_manager.get_config", return_value=config):
+            assert SearchManager(mock_index_manager, mock_embedding_manager).search_timeout == 2.5
 
     def test_error_handling_empty_query(self, search_manager):
         """検証対象: 空クエリのエラーハンドリング
@@ -307,14 +605,25 @@ class TestSearchManager:
         目的: 検索提案キャッシュが正常にクリアされることを確認"""
         # キャッシュにデータを追加
         search_manager._suggestion_cache["test"] = ["test1", "test2"]
-        search_manager._indexed_terms.add("test_term")
 
         # キャッシュをクリア
         search_manager.clear_suggestion_cache()
 
         # キャッシュがクリアされたことを確認
         assert not search_manager._suggestion_cache
-        assert not search_manager._indexed_terms
+
+    def test_prefix_query_text_for_as_you_type(self):
+        """検証対象: 入力中の検索用の前方一致クエリ
+        目的: 最後の英数字の語だけが前方一致になり、入力途中の構文は変更しないことを確認"""
+        assert prefix_query_text("quarterly repo") == "quarterly repo*"
+        assert prefix_query_text("  report ") == "report*"
+        # 演算子、1文字、記号で終わる語、閉じていない引用符はそのまま
+        assert prefix_query_text("budget AND") == "budget AND"
+        assert prefix_query_text("budget r") == "budget r"
+        assert prefix_query_text("repo*") == "repo*"
+        assert prefix_query_text('"annual rep') == '"annual rep'
+        # 日本語はN-gramで部分一致するため前方一致にしない
+        assert prefix_query_text("会議資料") == "会議資料"
 
     def test_search_performance(self, search_manager, large_documents):
         """検証対象: 検索パフォーマンス
@@ -0,0 +1,175 @@
+"""
+ShardedIndexManagerのテスト
+
+フォルダ単位のシャードへの振り分け、並列検索結果のマージ、
+フォルダ指定によるシャード選択、シャード単位の削除・再構築を検証します。
+"""
+
+from datetime import datetime
+import os
+from pathlib import Path
+import shutil
+import tempfile
+
+import pytest
+
+from src.core.index_manager import IndexManager
+from src.core.sharded_index_manager import ShardedIndexManager, create_index_manager
+from src.data.models import Document, FileType
+from src.utils.config import Config
+
+FOLDER_A = os.path.join("data", "folder_a")
+FOLDER_B = os.path.join("data", "folder_b")
+
+
+def _document(doc_id: str, folder: str, content: str) -> Document:
+    """テスト用ドキュメントを作成"""
+    return Document(
+        id=doc_id,
+        file_path=os.path.join(folder, f"{doc_id}.txt"),
+        title=doc_id,
+        content=content,
+        file_type=FileType.TEXT,
+        size=len(content),
+        created_date=datetime.now(),
+        modified_date=datetime.now(),
+        indexed_date=datetime.now(),
+    )
+
+
+class TestShardedIndexManager:
+    """ShardedIndexManagerのテスト"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """一時ディレクトリを作成"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def manager(self, temp_dir):
+        """2つのルートフォルダを持つShardedIndexManager"""
+        manager = ShardedIndexManager(str(Path(temp_dir) / "index"), [FOLDER_A, FOLDER_B])
+        manager.add_document(_document("a1", FOLDER_A, "機械学習の報告書です。"))
+        manager.add_document(_document("a2", os.path.join(FOLDER_A, "sub"), "機械学習とデータ分析。"))
+        manager.add_document(_document("b1", FOLDER_B, "機械学習の会議議事録。"))
+        manager.add_document(_document("x1", "other", "機械学習の資料。"))
+        yield manager
+        manager.close()
+
+    def test_documents_are_routed_to_folder_shards(self, manager):
+        """ドキュメントがルートフォルダのシャードに振り分けられることを確認"""
+        shard_a = manager.shard_for_path(os.path.join(FOLDER_A, "a1.txt"))
+        shard_b = manager.shard_for_path(os.path.join(FOLDER_B, "b1.txt"))
+
+        assert shard_a is not shard_b
+        assert shard_a.get_document_count() == 2
+        assert shard_b.get_document_count() == 1
+        assert manager.get_document_count() == 4
+
+    def test_fan_out_search_merges_top_k(self, manager):
+        """全シャードの結果がスコア順に上位k件へマージされることを確認"""
+        results = manager.search_text("機械学習", limit=3)
+
+        assert len(results) == 3
+        assert [r.rank for r in results] == [1, 2, 3]
+        scores = [r.score for r in results]
+        assert scores == sorted(scores, reverse=True)
+        assert {r.document.id for r in manager.search_text("機械学習")} == {"a1", "a2", "b1", "x1"}
+
+    def test_folder_paths_select_shards(self, manager):
+        """フォルダ指定が検索対象シャードの選択になることを確認"""
+        results = manager.search_text("機械学習", folder_paths=[FOLDER_B])
+        assert [r.document.id for r in results] == ["b1"]
+
+        # ルート配下のサブフォルダ指定ではそのルートのシャードが選ばれる
+        assert manager.select_shards([os.path.join(FOLDER_A, "sub")]) == [manager.shard_for_path(FOLDER_A)]
+
+        # ルートを含む親フォルダ指定では含まれるすべてのシャードが選ばれる
+        assert len(manager.select_shards(["data"])) == 3
+
+    def test_drop_folder_touches_only_its_shard(self, manager):
+        """フォルダの削除が他のシャードに影響しないことを確認"""
+        shard_b_path = manager.shard_for_path(FOLDER_B).index_path
+        shard_a_path = manager.shard_for_path(FOLDER_A).index_path
+
+        manager.drop_folder(FOLDER_A)
+
+        assert not shard_a_path.exists()
+        assert shard_b_path.exists()
+        assert manager.document_exists("b1")
+        assert not manager.document_exists("a1")
+        assert {r.document.id for r in manager.search_text("機械学習")} == {"b1", "x1"}
+
+    def test_rebuild_folder_touches_only_its_shard(self, manager):
+        """フォルダの再構築が該当シャードだけを置き換えることを確認"""
+        manager.rebuild_folder(FOLDER_A, [_document("a3", FOLDER_A, "新しい機械学習の資料。")])
+
+        assert manager.document_exists("a3")
+        assert not manager.document_exists("a1")
+        assert manager.document_exists("b1")
+        assert manager.document_exists("x1")
+
+    def test_staged_rebuild_swaps_only_the_folder_shard(self, manager):
+        """フォルダ単位で構築した新しいシャードが入れ替わり、中止時は破棄されることを確認"""
+        shadow = manager.begin_rebuild(FOLDER_A)
+        shadow.add_document(_document("a3", FOLDER_A, "新しい機械学習の資料。"))
+        # 再構築中も既存のシャードで検索でき、再構築中の変更は入れ替え後にも残る
+        assert manager.document_exists("a1")
+        manager.update_document(_document("a2", os.path.join(FOLDER_A, "sub"), "更新したデータ分析。"))
+        manager.commit_rebuild(shadow)
+
+        assert manager.document_exists("a3")
+        assert not manager.document_exists("a1")
+        assert [r.document.id for r in manager.search_text("更新")] == ["a2"]
+        assert manager.document_exists("b1")
+        assert manager.document_exists("x1")
+
+        # 引数なしの中止は、再構築中のすべてのシャードを破棄する
+        shadow = manager.begin_rebuild(FOLDER_B)
+        manager.abort_rebuild()
+        assert not shadow.index_path.exists()
+        assert manager.document_exists("b1")
+
+    def test_search_page_merges_sorted_shards(self, manager):
+        """各シャードの並び替え済み結果がマージされ、指定ページが返ることを確認"""
+        first = manager.search_page("機械学習", page=1, page_size=2, sort_by="title")
+        second = manager.search_page("機械学習", page=2, page_size=2, sort_by="title")
+
+        assert [r.document.id for r in first.results + second.results] == ["x1", "b1", "a2", "a1"]
+        assert [r.rank for r in second.results] == [3, 4]
+        assert first.total == 4
+
+    def test_remove_and_get_document(self, manager):
+        """IDによる取得と削除がシャードを横断して行われることを確認"""
+        assert manager.get_document("b1").file_path == os.path.join(FOLDER_B, "b1.txt")
+
+        manager.remove_document("b1")
+
+        assert manager.get_document("b1") is None
+        assert manager.get_document_count() == 3
+
+    def test_searcher_reads_all_shards(self, manager):
+        """サーチャーが全シャードを1つのインデックスとして読めることを確認"""
+        with manager.searcher() as searcher:
+            assert searcher.doc_count() == 4
+
+
+class TestCreateIndexManager:
+    """create_index_managerのテスト"""
+
+    def test_layout_follows_config(self, tmp_path):
+        """設定のインデックス構成に応じたマネージャーが作成されることを確認"""
+        config = Config(str(tmp_path / "config.json"))
+
+        single = create_index_manager(str(tmp_path / "single"), config)
+        assert isinstance(single, IndexManager)
+        single.close()
+
+        config.set("index_layout", "sharded")
+        config.set("indexed_folders", [FOLDER_A])
+        sharded = create_index_manager(str(tmp_path / "sharded"), config)
+        assert isinstance(sharded, ShardedIndexManager)
+        assert sharded.folders == [os.path.normcase(os.path.normpath(FOLDER_A))]
+        sharded.close()
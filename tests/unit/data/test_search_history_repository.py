@@ -0,0 +1,26 @@
+"""
+SearchHistoryRepositoryのテスト
+
+保存された検索の削除と、検索履歴からの提案を検証します。
+"""
+
+from src.data.database import DatabaseManager
+from src.data.models import SearchType
+from src.data.search_history_repository import SearchHistoryRepository
+
+
+class TestSearchHistoryRepository:
+    """検索履歴リポジトリのテスト"""
+
+    def test_saved_search_can_be_deleted(self, tmp_path):
+        """検証対象: 保存された検索の削除
+        目的: 保存された検索を削除でき、検索履歴からの提案には影響しないことを確認"""
+        repository = SearchHistoryRepository(DatabaseManager(str(tmp_path / "history.db")))
+        repository.add_search_record("machine learning", SearchType.FULL_TEXT, 3, 10)
+        assert repository.save_search("ML", "machine learning", SearchType.FULL_TEXT)
+        saved_id = repository.get_saved_searches()[0]["id"]
+
+        assert repository.delete_saved_search(saved_id)
+        assert repository.get_saved_searches() == []
+        assert not repository.delete_saved_search(saved_id)
+        assert repository.get_search_suggestions("mach") == ["machine learning"]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+SearchResultsWidgetのユニットテスト
+"""
+
+from datetime import datetime
+
+from src.data.models import Document, FileType, SearchResult, SearchType
+from src.gui.search_results import SearchResultsWidget
+
+
+def _result(doc_id: str, score: float, search_type: SearchType) -> SearchResult:
+    """テスト用の検索結果を作成"""
+    document = Document(
+        id=doc_id,
+        file_path=f"/docs/{doc_id}.txt",
+        title=f"資料 {doc_id}",
+        content="本文",
+        file_type=FileType.TEXT,
+        size=100,
+        created_date=datetime(2024, 1, 1),
+        modified_date=datetime(2024, 1, 1),
+        indexed_date=datetime(2024, 1, 1),
+    )
+    return SearchResult(document=document, score=score, search_type=search_type, snippet="本文", highlighted_terms=[])
+
+
+class TestSearchResultsWidget:
+    """SearchResultsWidgetのテストクラス"""
+
+    def test_update_results_keeps_page_scroll_and_selection(self, qapp):
+        """検証対象: 途中結果から最終結果への置き換え
+        目的: アイテムウィジェットを作り直さず、表示中のページ・スクロール位置・選択を保つことを確認"""
+        widget = SearchResultsWidget()
+        widget.resize(400, 300)
+        widget.show()
+
+        partial = [_result(f"doc{i}", 0.9 - i * 0.01, SearchType.FULL_TEXT) for i in range(30)]
+        widget.display_results(partial)
+        widget.go_to_page(2)
+        for _ in range(3):
+            qapp.processEvents()
+
+        items = list(widget.result_items)
+        widget._on_result_selected(widget.current_results[3])
+        scroll_bar = widget.results_area.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum() // 2)
+        scroll_value = scroll_bar.value()
+        assert scroll_value > 0
+
+        # 並び替え後の最終結果(doc25が先頭に上がり、選択中のdoc23はページ内で1つ下がる)
+        final = [_result(f"doc{i}", 0.95 if i == 25 else 0.9 - i * 0.01, SearchType.HYBRID) for i in range(28)]
+        widget.update_results(final)
+        qapp.processEvents()
+
+        assert widget.current_page == 2
+        assert widget.result_items[: len(items)] == items[: len(widget.result_items)]
+        assert len(widget.result_items) == 8
+        assert all(item.get_search_result().search_type == SearchType.HYBRID for item in widget.result_items)
+        assert scroll_bar.value() == scroll_value
+        assert widget.get_selected_result().document.id == "doc23"
+        assert widget.get_selected_result().search_type == SearchType.HYBRID
+        assert [item.is_selected for item in widget.result_items] == [i == 4 for i in range(8)]
+        assert widget.result_count_label.text() == "結果: 28件"
+        widget.close()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+SuggestionControllerのユニットテスト
+"""
+
+import threading
+import time
+from unittest.mock import Mock
+
+from src.gui.search.widgets.suggestion_worker import SuggestionController
+from src.utils.latency_histogram import LatencyHistogram
+
+
+def _wait_until(qapp, condition, timeout: float = 5.0) -> bool:
+    """条件を満たすまでイベントを処理"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestSuggestionController:
+    """SuggestionControllerのテストクラス"""
+
+    def test_only_latest_input_is_fetched_off_the_gui_thread(self, qapp):
+        """検証対象: 検索提案の非同期取得
+        目的: 連続した入力は最後の入力だけが別スレッドで取得され、結果がシグナルで返ることを確認"""
+        gui_thread = threading.get_ident()
+        calls = []
+
+        def get_search_suggestions(text, limit):
+            calls.append((text, threading.get_ident()))
+            return [f"{text}ing"]
+
+        search_manager = Mock()
+        search_manager.get_search_suggestions.side_effect = get_search_suggestions
+        controller = SuggestionController(search_manager, debounce_ms=20)
+        received = []
+        controller.suggestions_ready.connect(received.append)
+
+        try:
+            for text in ["le", "lea", "lear", "learn"]:
+                controller.request(text)
+            # 1文字の入力は取得せず、それまでの要求も古いものになる
+            assert _wait_until(qapp, lambda: received)
+            assert received == [["learning"]]
+            assert [text for text, _ in calls] == ["learn"]
+            assert calls[0][1] != gui_thread
+            assert controller.latency.snapshot()["count"] == 1
+
+            controller.request("l")
+            _wait_until(qapp, lambda: False, timeout=0.1)
+            assert len(calls) == 1
+        finally:
+            controller.shutdown()
+
+
+class TestLatencyHistogram:
+    """LatencyHistogramのテストクラス"""
+
+    def test_percentiles_use_bucket_upper_bounds(self):
+        """検証対象: パーセンタイルの概算
+        目的: 記録した処理時間が区間に数えられ、区間の上限でパーセンタイルが求まることを確認"""
+        histogram = LatencyHistogram("テスト", bounds_ms=(1, 10, 100))
+        for elapsed_ms in [0.5] * 90 + [5] * 8 + [50, 250]:
+            histogram.record(elapsed_ms)
+
+        stats = histogram.snapshot()
+        assert stats["count"] == 100
+        assert stats["buckets"] == {"<=1ms": 90, "<=10ms": 8, "<=100ms": 1, ">100ms": 1}
+        assert stats["p50_ms"] == 1
+        assert stats["p95_ms"] == 10
+        assert stats["p99_ms"] == 100
+        assert histogram.percentile(100) == 250